@@ -0,0 +1,123 @@
+"""
+Small-object ingest rate of the batch upload endpoint against one
+POST /api/upload per file.
+
+Starts a fake S3 server (see fake_s3.py) in this process and the proxy with
+uvicorn in a subprocess pointed at it (see load_test.py). Both modes upload
+the same files with the same client concurrency; batches are sent as tar
+archives.
+
+Usage (from the project root):
+    python benchmarks/batch_upload.py --files 2000 --file-size-kb 10 --batch-size 500
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import tarfile
+import time
+from typing import List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_s3 import FakeS3Server  # noqa: E402
+from load_test import BUCKET_NAME, free_port, start_proxy  # noqa: E402
+
+
+def tar_archive(names: List[str], payload: bytes) -> bytes:
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        for name in names:
+            info = tarfile.TarInfo(name)
+            info.size = len(payload)
+            tar.addfile(info, io.BytesIO(payload))
+    return archive.getvalue()
+
+
+async def upload_single(client: httpx.AsyncClient, names: List[str], payload: bytes):
+    for name in names:
+        response = await client.post(
+            "/api/upload",
+            data={"bucket_name": BUCKET_NAME, "object_name": name},
+            files={"file": (name, payload)},
+        )
+        response.raise_for_status()
+
+
+async def upload_batches(client: httpx.AsyncClient, batches: List[bytes]):
+    for batch in batches:
+        response = await client.post(
+            f"/api/upload/batch/{BUCKET_NAME}",
+            content=batch,
+            headers={"Content-Type": "application/x-tar"},
+        )
+        response.raise_for_status()
+        assert response.json()["failed"] == 0, response.text
+
+
+async def run(base_url: str, args) -> dict:
+    payload = b"x" * (args.file_size_kb * 1024)
+    names = [f"ingest/file-{index}.bin" for index in range(args.files)]
+    workers = [names[worker :: args.concurrency] for worker in range(args.concurrency)]
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=300
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *[upload_single(client, worker_names, payload) for worker_names in workers]
+        )
+        results["single"] = time.perf_counter() - started
+
+        batches = [
+            [
+                tar_archive(worker_names[start : start + args.batch_size], payload)
+                for start in range(0, len(worker_names), args.batch_size)
+            ]
+            for worker_names in workers
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(
+            *[upload_batches(client, worker_batches) for worker_batches in batches]
+        )
+        results["batch"] = time.perf_counter() - started
+
+    return {
+        mode: {
+            "elapsed_s": round(elapsed, 3),
+            "files_per_s": round(args.files / elapsed, 1),
+        }
+        for mode, elapsed in results.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--file-size-kb", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    fake_s3 = FakeS3Server(latency_ms=args.latency_ms, sink=True).start()
+    fake_s3.buckets[BUCKET_NAME] = {}
+    port = free_port()
+    proxy = start_proxy(fake_s3.endpoint, port, {})
+    try:
+        summary = asyncio.run(run(f"http://127.0.0.1:{port}", args))
+    finally:
+        proxy.terminate()
+        proxy.wait()
+        fake_s3.stop()
+
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
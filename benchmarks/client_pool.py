@@ -0,0 +1,89 @@
+"""
+Requests/sec of S3Service downloads with a minio client per request (the way
+the proxy worked before) against the shared pooled client.
+
+Usage (from the project root):
+    python benchmarks/client_pool.py --requests 2000 --threads 16
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_s3 import FakeS3Server  # noqa: E402
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUCKET_NAME = "client-pool"
+
+
+def run(mode: str, requests: int, threads: int, fake_s3: FakeS3Server) -> dict:
+    from minio import Minio
+
+    from src.service.s3_client_provider import S3ClientProvider
+    from src.service.s3_service import S3Service
+
+    def new_service() -> S3Service:
+        if mode == "shared":
+            return S3Service()
+        return S3Service(
+            client=Minio(
+                endpoint=os.getenv("MINIO_HOST"),
+                access_key=os.getenv("MINIO_ACCESS_KEY"),
+                secret_key=os.getenv("MINIO_SECRET_KEY"),
+                secure=False,
+            )
+        )
+
+    def download(request_number: int):
+        return new_service().download_file(BUCKET_NAME, f"object-{request_number % 10}")
+
+    S3ClientProvider().close()
+    connections_before = fake_s3.connections_accepted
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(download, range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "requests": requests,
+        "requests_per_s": round(requests / elapsed, 1),
+        "tcp_connections": fake_s3.connections_accepted - connections_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--object-size-kb", type=int, default=4)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT_PATH)
+    fake_s3 = FakeS3Server().start()
+    for index in range(10):
+        fake_s3.put_object(
+            BUCKET_NAME, f"object-{index}", b"x" * args.object_size_kb * 1024
+        )
+    os.environ.update(
+        {
+            "MINIO_HOST": fake_s3.endpoint,
+            "MINIO_ACCESS_KEY": "bench-access-key",
+            "MINIO_SECRET_KEY": "bench-secret-key",
+        }
+    )
+    try:
+        results = [
+            run(mode, args.requests, args.threads, fake_s3)
+            for mode in ("per-request", "shared")
+        ]
+    finally:
+        fake_s3.stop()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Compares two result files of suite.py, e.g. of the main branch and a change.
+
+Lists the relative change of throughput, latency percentiles and per request
+CPU time and peak RSS of the workers for every workload and concurrency level
+measured in both files. Exits with status 1 when a metric got worse by more
+than the threshold, so the comparison can gate a CI job.
+
+Usage (from the project root):
+    python benchmarks/compare_results.py baseline.json current.json --threshold-pct 10
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+HIGHER_IS_BETTER = "higher"
+LOWER_IS_BETTER = "lower"
+
+
+def metrics(result: dict) -> Iterator[Tuple[str, float, str]]:
+    """
+    :param result: result of a workload run
+    :return: name, value and better direction of the compared metrics
+    """
+    yield "requests_per_s", result["requests_per_s"], HIGHER_IS_BETTER
+    yield "mb_per_s", result["mb_per_s"], HIGHER_IS_BETTER
+    for operation in ("download", "upload"):
+        if result[operation]["count"]:
+            for name in ("p50_ms", "p95_ms", "p99_ms"):
+                yield f"{operation}.{name}", result[operation][name], LOWER_IS_BETTER
+    workers = result["workers"]
+    cpu_ms = sum(worker["cpu_s"] for worker in workers) * 1000 / result["requests"]
+    yield "cpu_ms_per_request", round(cpu_ms, 3), LOWER_IS_BETTER
+    yield "peak_rss_mb", max(
+        worker["peak_rss_mb"] for worker in workers
+    ), LOWER_IS_BETTER
+
+
+def by_run(summary: dict) -> Dict[Tuple[str, int], dict]:
+    return {
+        (result["workload"], result["concurrency"]): result
+        for result in summary["results"]
+    }
+
+
+def compare(baseline: dict, current: dict, threshold_pct: float) -> dict:
+    """
+    :param baseline: suite results to compare against
+    :param current: suite results to compare
+    :param threshold_pct: change in the worse direction reported as regression
+    :return: comparison of every metric of the runs found in both results
+    """
+    baseline_runs = by_run(baseline)
+    comparisons = []
+    for key, result in by_run(current).items():
+        baseline_result = baseline_runs.get(key)
+        if baseline_result is None:
+            continue
+        baseline_metrics = {name: value for name, value, _ in metrics(baseline_result)}
+        for name, value, better in metrics(result):
+            baseline_value = baseline_metrics.get(name)
+            if not baseline_value:
+                continue
+            change_pct = (value - baseline_value) / baseline_value * 100
+            worse_pct = -change_pct if better == HIGHER_IS_BETTER else change_pct
+            comparisons.append(
+                {
+                    "workload": key[0],
+                    "concurrency": key[1],
+                    "metric": name,
+                    "baseline": baseline_value,
+                    "current": value,
+                    "change_pct": round(change_pct, 1),
+                    "regression": worse_pct > threshold_pct,
+                }
+            )
+    return {
+        "baseline": baseline.get("revision"),
+        "current": current.get("revision"),
+        "threshold_pct": threshold_pct,
+        "regressions": sum(comparison["regression"] for comparison in comparisons),
+        "comparisons": comparisons,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold-pct", type=float, default=10)
+    args = parser.parse_args()
+
+    with open(args.baseline) as baseline_file, open(args.current) as current_file:
+        comparison = compare(
+            json.load(baseline_file), json.load(current_file), args.threshold_pct
+        )
+
+    print(json.dumps(comparison, indent=2))
+    sys.exit(1 if comparison["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
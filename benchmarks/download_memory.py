@@ -0,0 +1,175 @@
+"""
+Peak RSS of a single download against object size.
+
+Every measurement runs in a fresh interpreter, so ru_maxrss of the child is
+the high-water mark of exactly one request. Minio is replaced by an in-process
+fake that generates the object on the fly, no network or MinIO is involved.
+
+Usage (from the project root):
+    python benchmarks/download_memory.py --sizes 1,10,100,500 --modes stream,buffered
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+from unittest.mock import PropertyMock, patch
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MB: int = 1024 * 1024
+
+
+class FakeObjectResponse:
+    """Mimics urllib3 response returned by Minio.get_object."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.headers = {
+            "Content-Length": str(size),
+            "Content-Type": "application/octet-stream",
+        }
+
+    @property
+    def data(self) -> bytes:
+        return b"x" * self.size
+
+    def stream(self, amt: int):
+        left = self.size
+        while left > 0:
+            chunk_size = min(amt, left)
+            left -= chunk_size
+            yield b"x" * chunk_size
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    def __init__(self, size: int):
+        self.size = size
+
+    def get_object(self, bucket_name: str, object_name: str, **kwargs):
+        return FakeObjectResponse(self.size)
+
+
+async def drive(app, path: str) -> int:
+    """
+    Sends GET request straight to ASGI app and discards response body
+    :return: number of body bytes received
+    """
+    done = asyncio.Event()
+    received = 0
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    await app(scope, receive, send)
+    return received
+
+
+def run_single(mode: str, size_mb: int) -> dict:
+    sys.path.insert(0, ROOT_PATH)
+    os.chdir(ROOT_PATH)
+    from fastapi import FastAPI, Response
+
+    from main import app
+    from src.service.s3_client_provider import S3ClientProvider
+    from src.service.s3_service import S3Service
+
+    size = size_mb * MB
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if mode == "buffered":
+        # Behaviour before streaming: whole object loaded, then sent at once.
+        app = FastAPI()
+
+        @app.get("/api/download/{bucket_name}/{object_name}")
+        def download(bucket_name: str, object_name: str):
+            return Response(content=S3Service().download_file(bucket_name, object_name))
+
+    with patch.object(
+        S3ClientProvider,
+        "client",
+        new_callable=PropertyMock,
+        return_value=FakeMinio(size),
+    ):
+        received = asyncio.run(drive(app, "/api/download/bench-bucket/object"))
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    assert received == size, f"expected {size} bytes, received {received}"
+    return {
+        "mode": mode,
+        "object_size_mb": size_mb,
+        "baseline_rss_mb": round(baseline_kb / 1024, 1),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "request_rss_mb": round((peak_kb - baseline_kb) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,100,500", help="object sizes, MB")
+    parser.add_argument("--modes", default="stream,buffered")
+    parser.add_argument(
+        "--run", nargs=2, metavar=("MODE", "SIZE_MB"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_single(args.run[0], int(args.run[1]))))
+        return
+
+    results = []
+    for mode in args.modes.split(","):
+        for size_mb in args.sizes.split(","):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run", mode, size_mb],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print(
+                f"{result['mode']:>9} {result['object_size_mb']:>6} MB object: "
+                f"peak RSS {result['peak_rss_mb']:>8} MB "
+                f"(+{result['request_rss_mb']} MB over baseline)"
+            )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Download throughput and peak memory of parallel ranged downloads against the
+single-stream get_object path for a range of object sizes.
+
+Objects are served by a fake S3 server (see fake_s3.py) in a child process
+that limits the bandwidth of every response, like a single TCP stream to S3
+is limited. Downloads run from this process through S3Service.stream_file,
+as the download endpoint does. Peak RSS is that of the downloading process.
+
+Usage (from the project root):
+    python benchmarks/download_throughput.py --sizes-mb 16,64,256,1024 --bandwidth-mb-per-s 50
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from typing import Dict, List
+
+import urllib3
+from minio import Minio
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fake_s3 import FakeS3Server  # noqa: E402
+from src.service.s3_service import MB, S3Service  # noqa: E402
+
+BUCKET_NAME = "download-benchmark"
+
+
+def reset_peak_rss():
+    """
+    Resets the peak RSS of this process where the kernel supports it (Linux)
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return 0.0
+
+
+def measure(s3_service: S3Service, size: int, parallel: bool) -> Dict[str, float]:
+    os.environ["PARALLEL_DOWNLOAD_ENABLED"] = str(parallel).lower()
+    object_info = s3_service.stat_file(BUCKET_NAME, f"object-{size}")
+    reset_peak_rss()
+    started = time.perf_counter()
+    received = 0
+    for chunk in s3_service.stream_file(
+        BUCKET_NAME, object_info.object_name, object_info=object_info
+    ):
+        received += len(chunk)
+    elapsed = time.perf_counter() - started
+    assert received == size, f"received {received} bytes instead of {size}"
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "mb_per_s": round(size / MB / elapsed, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def serve_fake_s3(port: int, sizes: List[int], latency_ms: float, bandwidth: float):
+    server = FakeS3Server(
+        port=port, latency_ms=latency_ms, bandwidth_mb_per_s=bandwidth
+    )
+    for size in sizes:
+        server.put_object(BUCKET_NAME, f"object-{size}", b"x" * size)
+    server.serve_forever()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes-mb", default="16,64,256,1024")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--bandwidth-mb-per-s", type=float, default=50)
+    parser.add_argument("--ranges", type=int, default=4)
+    parser.add_argument("--range-size-mb", type=int, default=8)
+    args = parser.parse_args()
+
+    os.environ["PARALLEL_DOWNLOAD_THRESHOLD_MB"] = "0"
+    os.environ["PARALLEL_DOWNLOAD_RANGES"] = str(args.ranges)
+    os.environ["PARALLEL_DOWNLOAD_RANGE_SIZE_MB"] = str(args.range_size_mb)
+    sizes = [int(size) * MB for size in args.sizes_mb.split(",")]
+    port = free_port()
+    fake_s3 = multiprocessing.Process(
+        target=serve_fake_s3,
+        args=(port, sizes, args.latency_ms, args.bandwidth_mb_per_s),
+        daemon=True,
+    )
+    fake_s3.start()
+    client = Minio(
+        endpoint=f"127.0.0.1:{port}",
+        access_key="benchmark-access-key",
+        secret_key="benchmark-secret-key",
+        secure=False,
+        http_client=urllib3.PoolManager(maxsize=32),
+    )
+    s3_service = S3Service(client)
+
+    results: List[dict] = []
+    while not client.bucket_exists(BUCKET_NAME):
+        time.sleep(0.1)
+    try:
+        for size in sizes:
+            result = {
+                "size_mb": size // MB,
+                "single_stream": measure(s3_service, size, parallel=False),
+                "parallel_ranges": measure(s3_service, size, parallel=True),
+            }
+            results.append(result)
+            print(json.dumps(result), flush=True)
+    finally:
+        fake_s3.terminate()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
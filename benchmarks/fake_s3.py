@@ -0,0 +1,475 @@
+"""
+Minimal S3-compatible server good enough for the minio client calls made by the
+proxy. Objects are kept in memory, request signatures are not verified.
+In sink mode uploaded bytes are only counted, so multi-GB uploads can be
+benchmarked; such objects can be stat'ed but not downloaded. A bandwidth limit
+paces every response body on its own, like a single TCP stream to S3 would be.
+
+Run standalone:
+    python benchmarks/fake_s3.py --port 9000 --latency-ms 20 --bandwidth-mb-per-s 50
+"""
+
+import argparse
+import hashlib
+from email.parser import BytesParser
+from email.policy import HTTP
+import re
+import threading
+import time
+import uuid
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>'
+S3_NAMESPACE = "http://s3.amazonaws.com/doc/2006-03-01/"
+BODY_WRITE_SIZE = 64 * 1024
+
+
+class StoredObject:
+    def __init__(
+        self,
+        data: Optional[bytes],
+        content_type: str,
+        etag: Optional[str] = None,
+        size: Optional[int] = None,
+        content_encoding: Optional[str] = None,
+    ):
+        self.data = data
+        self.content_type = content_type
+        self.content_encoding = content_encoding
+        self.size = len(data) if data is not None else size
+        self.etag = etag or hashlib.md5(data).hexdigest()
+        self.modified_at = time.time()
+        self.last_modified = formatdate(self.modified_at, usegmt=True)
+
+
+class MultipartUpload:
+    def __init__(
+        self,
+        bucket_name: str,
+        object_name: str,
+        content_type: str,
+        content_encoding: Optional[str] = None,
+    ):
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+        self.content_type = content_type
+        self.content_encoding = content_encoding
+        self.parts: Dict[int, Tuple[Optional[bytes], int, str]] = {}
+
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeS3Server"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _split_path(self) -> Tuple[str, str, Dict[str, list]]:
+        url = urlparse(self.path)
+        parts = unquote(url.path).lstrip("/").split("/", 1)
+        bucket_name = parts[0]
+        object_name = parts[1] if len(parts) > 1 else ""
+        return bucket_name, object_name, parse_qs(url.query, keep_blank_values=True)
+
+    def _read_body(self) -> Tuple[Optional[bytes], int, str]:
+        """
+        :return: body (None in sink mode), its size and MD5 hex digest
+        """
+        length = int(self.headers.get("Content-Length", "0"))
+        if not self.server.sink or self.command != "PUT":
+            body = self.rfile.read(length) if length else b""
+            return body, length, hashlib.md5(body).hexdigest()
+        digest = hashlib.md5()
+        remaining = length
+        while remaining:
+            chunk = self.rfile.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+        return None, length, digest.hexdigest()
+
+    def _send(
+        self,
+        status: int,
+        body: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+        send_body: bool = True,
+    ):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body and body:
+            self._write_body(body)
+
+    def _write_body(self, body: bytes):
+        rate = self.server.bandwidth_bytes_per_s
+        if not rate:
+            return self.wfile.write(body)
+        view = memoryview(body)
+        started = time.perf_counter()
+        for start in range(0, len(view), BODY_WRITE_SIZE):
+            self.wfile.write(view[start : start + BODY_WRITE_SIZE])
+            delay = (start + BODY_WRITE_SIZE) / rate - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+    def _send_error(self, status: int, code: str, bucket_name: str, object_name=""):
+        body = (
+            f"{XML_HEADER}<Error><Code>{code}</Code><Message>{code}</Message>"
+            f"<Resource>/{bucket_name}/{object_name}</Resource>"
+            f"<RequestId>fake</RequestId><HostId>fake</HostId>"
+            f"<BucketName>{bucket_name}</BucketName><Key>{object_name}</Key></Error>"
+        ).encode()
+        self._send(
+            status,
+            body,
+            {"Content-Type": "application/xml"},
+            send_body=self.command != "HEAD",
+        )
+
+    def _object_headers(self, stored: StoredObject) -> Dict[str, str]:
+        headers = {
+            "Content-Type": stored.content_type,
+            "ETag": f'"{stored.etag}"',
+            "Last-Modified": stored.last_modified,
+            "Accept-Ranges": "bytes",
+        }
+        if stored.content_encoding:
+            headers["Content-Encoding"] = stored.content_encoding
+        return headers
+
+    def _send_object(self, stored: StoredObject):
+        headers = self._object_headers(stored)
+        if_match = self.headers.get("If-Match")
+        if if_match and if_match != headers["ETag"]:
+            return self._send_error(412, "PreconditionFailed", "", "")
+        range_header = self.headers.get("Range")
+        if not range_header:
+            return self._send(200, stored.data, headers)
+
+        size = stored.size
+        first, _, last = range_header.split("=", 1)[1].partition("-")
+        start, end = int(first), min(int(last) if last else size - 1, size - 1)
+        if start >= size:
+            headers["Content-Range"] = f"bytes */{size}"
+            return self._send(416, b"", headers)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return self._send(206, stored.data[start : end + 1], headers)
+
+    def _handle(self):
+        self.server.simulate_latency()
+        bucket_name, object_name, query = self._split_path()
+        body, size, md5 = (
+            self._read_body() if self.command in ("PUT", "POST") else (b"", 0, "")
+        )
+        buckets = self.server.buckets
+
+        if not object_name:
+            if "location" in query:
+                return self._send(
+                    200,
+                    f'{XML_HEADER}<LocationConstraint xmlns="{S3_NAMESPACE}"/>'.encode(),
+                    {"Content-Type": "application/xml"},
+                )
+            if self.command == "HEAD":
+                return self._send(200 if bucket_name in buckets else 404)
+            if self.command == "PUT":
+                with self.server.lock:
+                    buckets.setdefault(bucket_name, {})
+                return self._send(200)
+            if self.command == "GET" and query.get("list-type") == ["2"]:
+                return self._list_objects(bucket_name, query)
+            if self.command == "POST" and bucket_name in buckets:
+                return self._post_object(bucket_name, body)
+            return self._send_error(405, "MethodNotAllowed", bucket_name)
+
+        if bucket_name not in buckets:
+            return self._send_error(404, "NoSuchBucket", bucket_name, object_name)
+        objects = buckets[bucket_name]
+
+        if "uploads" in query or "uploadId" in query:
+            return self._handle_multipart(
+                bucket_name, object_name, query, body, size, md5
+            )
+
+        if self.command == "PUT":
+            stored = StoredObject(
+                body,
+                self.headers.get("Content-Type", "application/octet-stream"),
+                etag=md5,
+                size=size,
+                content_encoding=self.headers.get("Content-Encoding"),
+            )
+            with self.server.lock:
+                objects[object_name] = stored
+            return self._send(200, headers={"ETag": f'"{stored.etag}"'})
+
+        stored = objects.get(object_name)
+        if stored is None:
+            return self._send_error(404, "NoSuchKey", bucket_name, object_name)
+        if self.command == "HEAD":
+            headers = self._object_headers(stored)
+            headers["Content-Length"] = str(stored.size)
+            self.send_response(200)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            return self.end_headers()
+        if self.command == "GET":
+            return self._send_object(stored)
+        return self._send_error(405, "MethodNotAllowed", bucket_name, object_name)
+
+    def _post_object(self, bucket_name: str, body: bytes):
+        """
+        Stores the file of a presigned POST form, the policy is not checked
+        """
+        form = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+        )
+        fields = {
+            part.get_param("name", header="content-disposition"): part
+            for part in form.iter_parts()
+        }
+        data = fields["file"].get_payload(decode=True)
+        content_type = fields.get("Content-Type")
+        stored = StoredObject(
+            data,
+            (
+                content_type.get_payload(decode=True).decode()
+                if content_type is not None
+                else "application/octet-stream"
+            ),
+            etag=hashlib.md5(data).hexdigest(),
+            size=len(data),
+        )
+        with self.server.lock:
+            self.server.buckets[bucket_name][
+                fields["key"].get_payload(decode=True).decode()
+            ] = stored
+        return self._send(204, headers={"ETag": f'"{stored.etag}"'})
+
+    def _handle_multipart(
+        self,
+        bucket_name: str,
+        object_name: str,
+        query: Dict[str, list],
+        body: Optional[bytes],
+        size: int,
+        md5: str,
+    ):
+        server = self.server
+        if "uploads" in query and self.command == "POST":
+            upload_id = uuid.uuid4().hex
+            with server.lock:
+                server.uploads[upload_id] = MultipartUpload(
+                    bucket_name,
+                    object_name,
+                    self.headers.get("Content-Type", "application/octet-stream"),
+                    self.headers.get("Content-Encoding"),
+                )
+            return self._send_xml(
+                "InitiateMultipartUploadResult",
+                f"<Bucket>{bucket_name}</Bucket><Key>{object_name}</Key>"
+                f"<UploadId>{upload_id}</UploadId>",
+            )
+
+        upload_id = query["uploadId"][0]
+        upload = server.uploads.get(upload_id)
+        if upload is None:
+            return self._send_error(404, "NoSuchUpload", bucket_name, object_name)
+
+        if self.command == "PUT":
+            part_number = int(query["partNumber"][0])
+            with server.lock:
+                upload.parts[part_number] = (body, size, md5)
+                server.parts_received += 1
+            return self._send(200, headers={"ETag": f'"{md5}"'})
+
+        if self.command == "DELETE":
+            with server.lock:
+                server.uploads.pop(upload_id, None)
+            return self._send(204)
+
+        if self.command == "GET":
+            with server.lock:
+                parts = sorted(upload.parts.items())
+            return self._send_xml(
+                "ListPartsResult",
+                f"<Bucket>{bucket_name}</Bucket><Key>{object_name}</Key>"
+                f"<UploadId>{upload_id}</UploadId><IsTruncated>false</IsTruncated>"
+                + "".join(
+                    f"<Part><PartNumber>{part_number}</PartNumber>"
+                    f'<ETag>"{md5}"</ETag><Size>{size}</Size></Part>'
+                    for part_number, (_, size, md5) in parts
+                ),
+            )
+
+        part_numbers = [
+            int(n) for n in re.findall(rb"<PartNumber>(\d+)</PartNumber>", body or b"")
+        ]
+        with server.lock:
+            server.uploads.pop(upload_id, None)
+            parts = [upload.parts[n] for n in part_numbers]
+            digest = hashlib.md5(b"".join(bytes.fromhex(p[2]) for p in parts))
+            etag = f"{digest.hexdigest()}-{len(parts)}"
+            data = None if server.sink else b"".join(p[0] for p in parts)
+            server.buckets[bucket_name][object_name] = StoredObject(
+                data,
+                upload.content_type,
+                etag=etag,
+                size=sum(p[1] for p in parts),
+                content_encoding=upload.content_encoding,
+            )
+        return self._send_xml(
+            "CompleteMultipartUploadResult",
+            f"<Location>/{bucket_name}/{object_name}</Location>"
+            f"<Bucket>{bucket_name}</Bucket><Key>{object_name}</Key>"
+            f'<ETag>"{etag}"</ETag>',
+        )
+
+    def _list_objects(self, bucket_name: str, query: Dict[str, list]):
+        """
+        ListObjectsV2, names are rolled up to common prefixes at the delimiter
+        """
+        if bucket_name not in self.server.buckets:
+            return self._send_error(404, "NoSuchBucket", bucket_name)
+        prefix = query.get("prefix", [""])[0]
+        delimiter = query.get("delimiter", [""])[0]
+        max_keys = int(query.get("max-keys", ["1000"])[0])
+        token = query.get("continuation-token", [""])[0]
+        start_after = (
+            bytes.fromhex(token).decode()
+            if token
+            else query.get("start-after", [""])[0]
+        )
+        with self.server.lock:
+            names = sorted(
+                name
+                for name in self.server.buckets[bucket_name]
+                if name.startswith(prefix) and name > start_after
+            )
+            entries = []
+            for name in names:
+                index = name.find(delimiter, len(prefix)) if delimiter else -1
+                if index < 0:
+                    entries.append((name, self.server.buckets[bucket_name][name]))
+                    continue
+                common_prefix = name[: index + len(delimiter)]
+                if common_prefix != start_after and (
+                    not entries or entries[-1][0] != common_prefix
+                ):
+                    entries.append((common_prefix, None))
+        listed = entries[:max_keys]
+        truncated = len(entries) > max_keys
+        common_prefixes = "".join(
+            f"<CommonPrefixes><Prefix>{quote(name)}</Prefix></CommonPrefixes>"
+            for name, stored in listed
+            if stored is None
+        )
+        contents = "".join(
+            f"<Contents><Key>{quote(name)}</Key>"
+            f"<LastModified>{time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(stored.modified_at))}</LastModified>"
+            f'<ETag>"{stored.etag}"</ETag><Size>{stored.size}</Size>'
+            f"<StorageClass>STANDARD</StorageClass></Contents>"
+            for name, stored in listed
+            if stored is not None
+        )
+        next_token = (
+            f"<NextContinuationToken>{listed[-1][0].encode().hex()}</NextContinuationToken>"
+            if truncated
+            else ""
+        )
+        self._send_xml(
+            "ListBucketResult",
+            f"<Name>{bucket_name}</Name><Prefix>{quote(prefix)}</Prefix>"
+            f"<KeyCount>{len(listed)}</KeyCount><MaxKeys>{max_keys}</MaxKeys>"
+            f"<EncodingType>url</EncodingType>"
+            f"<IsTruncated>{str(truncated).lower()}</IsTruncated>{next_token}"
+            f"{contents}{common_prefixes}",
+        )
+
+    def _send_xml(self, root: str, content: str):
+        body = f'{XML_HEADER}<{root} xmlns="{S3_NAMESPACE}">{content}</{root}>'
+        self._send(200, body.encode(), {"Content-Type": "application/xml"})
+
+    do_GET = do_PUT = do_HEAD = do_POST = do_DELETE = _handle
+
+
+class FakeS3Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0,
+        sink: bool = False,
+        bandwidth_mb_per_s: float = 0,
+    ):
+        super().__init__((host, port), FakeS3Handler)
+        self.latency_ms = latency_ms
+        self.sink = sink
+        self.bandwidth_bytes_per_s = bandwidth_mb_per_s * 1024 * 1024
+        self.buckets: Dict[str, Dict[str, StoredObject]] = {}
+        self.uploads: Dict[str, MultipartUpload] = {}
+        self.lock = threading.Lock()
+        self.connections_accepted = 0
+        self.parts_received = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def get_request(self):
+        request = super().get_request()
+        with self.lock:
+            self.connections_accepted += 1
+        return request
+
+    def simulate_latency(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def put_object(self, bucket_name: str, object_name: str, data: bytes):
+        with self.lock:
+            self.buckets.setdefault(bucket_name, {})[object_name] = StoredObject(
+                data, "application/octet-stream"
+            )
+
+    def start(self) -> "FakeS3Server":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake in-memory S3 server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--sink", action="store_true", help="count uploads only")
+    parser.add_argument(
+        "--bandwidth-mb-per-s", type=float, default=0, help="per response, 0 = no limit"
+    )
+    args = parser.parse_args()
+
+    server = FakeS3Server(
+        args.host, args.port, args.latency_ms, args.sink, args.bandwidth_mb_per_s
+    )
+    print(f"Fake S3 listening on {server.endpoint}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Load test of the proxy with concurrent mixed upload/download traffic.
+
+Starts a fake S3 server (see fake_s3.py) in this process and the proxy with
+uvicorn in a subprocess pointed at it, then reports latency percentiles per
+operation. Fake S3 latency makes every MinIO call slow, which is where a
+blocked event loop shows up in the percentiles.
+
+Usage (from the project root):
+    python benchmarks/load_test.py --requests 2000 --concurrency 64 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_s3 import FakeS3Server  # noqa: E402
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUCKET_NAME = "load-test"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_proxy(
+    minio_host: str, port: int, extra_env: Dict[str, str], workers: int = 1
+):
+    env = dict(os.environ)
+    env.update(
+        {
+            "ENV_PROFILE": "bench",
+            "MINIO_HOST": minio_host,
+            "MINIO_ACCESS_KEY": "bench-access-key",
+            "MINIO_SECRET_KEY": "bench-secret-key",
+            "CREATE_BUCKET_ON_FILE_UPLOAD": "true",
+            "MAX_UPLOAD_FILE_SIZE_MB": "100000",
+        }
+    )
+    env.update(extra_env)
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            *(["--workers", str(workers)] if workers > 1 else []),
+        ],
+        cwd=ROOT_PATH,
+        env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Proxy did not start in 30 seconds.")
+
+
+async def run_load(
+    base_url: str,
+    total_requests: int,
+    concurrency: int,
+    read_ratio: float,
+    object_size: int,
+    object_count: int,
+) -> Dict[str, List[float]]:
+    latencies: Dict[str, List[float]] = {"download": [], "upload": [], "errors": []}
+    payload = b"x" * object_size
+    counter = iter(range(total_requests))
+
+    async def worker(client: httpx.AsyncClient):
+        for request_number in counter:
+            started = time.perf_counter()
+            if random.random() < read_ratio:
+                operation = "download"
+                object_name = f"object-{random.randrange(object_count)}"
+                response = await client.get(
+                    f"/api/download/{BUCKET_NAME}/{object_name}"
+                )
+            else:
+                operation = "upload"
+                response = await client.post(
+                    "/api/upload",
+                    data={
+                        "bucket_name": BUCKET_NAME,
+                        "object_name": f"upload-{request_number}",
+                    },
+                    files={"file": ("file.bin", payload)},
+                )
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                latencies["errors"].append(elapsed)
+            latencies[operation].append(elapsed)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=120
+    ) as client:
+        await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+    return latencies
+
+
+def summarize(latencies: Dict[str, List[float]], elapsed: float) -> dict:
+    summary = {
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(
+            (len(latencies["download"]) + len(latencies["upload"])) / elapsed, 1
+        ),
+        "errors": len(latencies["errors"]),
+    }
+    for operation in ("download", "upload"):
+        values = latencies[operation]
+        summary[operation] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--read-ratio", type=float, default=0.8)
+    parser.add_argument("--object-size-kb", type=int, default=64)
+    parser.add_argument("--objects", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="extra proxy environment, e.g. --env S3_EXECUTOR_MAX_WORKERS=8",
+    )
+    args = parser.parse_args()
+
+    object_size = args.object_size_kb * 1024
+    fake_s3 = FakeS3Server(latency_ms=args.latency_ms).start()
+    for index in range(args.objects):
+        fake_s3.put_object(BUCKET_NAME, f"object-{index}", b"x" * object_size)
+
+    port = free_port()
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    proxy = start_proxy(fake_s3.endpoint, port, extra_env)
+    try:
+        started = time.perf_counter()
+        latencies = asyncio.run(
+            run_load(
+                f"http://127.0.0.1:{port}",
+                args.requests,
+                args.concurrency,
+                args.read_ratio,
+                object_size,
+                args.objects,
+            )
+        )
+        summary = summarize(latencies, time.perf_counter() - started)
+    finally:
+        proxy.terminate()
+        proxy.wait()
+        fake_s3.stop()
+
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
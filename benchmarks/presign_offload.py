@@ -0,0 +1,107 @@
+"""
+Proxy CPU time spent on uploads sent through the proxy against uploads sent to
+S3 with presigned URLs issued by the proxy.
+
+Starts a fake S3 server (see fake_s3.py) in this process and the proxy with
+uvicorn in a subprocess pointed at it (see load_test.py). Proxied uploads use
+the streaming upload endpoint, presigned ones ask the proxy for a POST form and
+send the file to the fake S3 server directly. CPU time of the proxy process is
+read from /proc, so the benchmark runs on Linux only.
+
+Usage (from the project root):
+    python benchmarks/presign_offload.py --files 50 --file-size-mb 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_s3 import FakeS3Server  # noqa: E402
+from load_test import BUCKET_NAME, free_port, start_proxy  # noqa: E402
+from process_stats import cpu_seconds  # noqa: E402
+
+MB: int = 1024 * 1024
+
+
+async def upload_proxied(client: httpx.AsyncClient, name: str, payload: bytes):
+    response = await client.post(
+        f"/api/upload/stream/{BUCKET_NAME}/{name}",
+        content=payload,
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    response.raise_for_status()
+
+
+async def upload_presigned(client: httpx.AsyncClient, name: str, payload: bytes):
+    response = await client.post(
+        f"/api/presign/upload/{BUCKET_NAME}/{name}", json={"size": len(payload)}
+    )
+    response.raise_for_status()
+    presigned_post = response.json()
+    response = await client.post(
+        presigned_post["url"],
+        data=presigned_post["fields"],
+        files={"file": (name, payload)},
+    )
+    response.raise_for_status()
+
+
+async def run(base_url: str, proxy_pid: int, args) -> dict:
+    payload = b"x" * (args.file_size_mb * MB)
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        for mode, upload in (
+            ("proxied", upload_proxied),
+            ("presigned", upload_presigned),
+        ):
+            names = iter(f"{mode}-file-{index}.bin" for index in range(args.files))
+
+            async def worker():
+                for name in names:
+                    await upload(client, name, payload)
+
+            cpu_before = cpu_seconds(proxy_pid)
+            started = time.perf_counter()
+            await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+            elapsed = time.perf_counter() - started
+            cpu = cpu_seconds(proxy_pid) - cpu_before
+            total_mb = args.files * args.file_size_mb
+            results[mode] = {
+                "elapsed_s": round(elapsed, 3),
+                "mb_per_s": round(total_mb / elapsed, 1),
+                "proxy_cpu_s": round(cpu, 3),
+                "proxy_cpu_ms_per_file": round(cpu * 1000 / args.files, 2),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--file-size-mb", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    fake_s3 = FakeS3Server(latency_ms=args.latency_ms, sink=True).start()
+    fake_s3.buckets[BUCKET_NAME] = {}
+    port = free_port()
+    proxy = start_proxy(fake_s3.endpoint, port, {"PRESIGN_DEFAULT_ROUTES": "upload"})
+    try:
+        summary = asyncio.run(run(f"http://127.0.0.1:{port}", proxy.pid, args))
+    finally:
+        proxy.terminate()
+        proxy.wait()
+        fake_s3.stop()
+
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
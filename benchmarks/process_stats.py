@@ -0,0 +1,75 @@
+"""
+CPU time and peak RSS of other processes read from /proc, so benchmarks using
+them run on Linux only.
+"""
+
+import os
+from typing import List
+
+
+def cpu_seconds(pid: int) -> float:
+    """
+    :param pid: process id
+    :return: user and system CPU time of the process
+    """
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def reset_peak_rss(pid: int):
+    """
+    Resets the peak RSS of the process where the kernel allows it
+    :param pid: process id
+    """
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb(pid: int) -> float:
+    """
+    :param pid: process id
+    :return: peak resident set size of the process since start or last reset
+    """
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return 0.0
+
+
+def child_pids(pid: int) -> List[int]:
+    """
+    :param pid: process id
+    :return: ids of the direct children of the process
+    """
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                parent_pid = int(stat.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if parent_pid == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def cmdline(pid: int) -> str:
+    """
+    :param pid: process id
+    :return: command line of the process, empty once it exited
+    """
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as command:
+            return command.read().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        return ""
@@ -0,0 +1,317 @@
+"""
+Reproducible benchmark suite replaying mixed workloads against the proxy.
+
+Starts a fake S3 server (see fake_s3.py) with the given latency and bandwidth in
+this process and the proxy app of main.py with uvicorn in a subprocess pointed
+at it (see load_test.py). Every workload of workloads.json (object size
+distribution, read/write ratio, number of requests) is replayed at each of its
+concurrency levels with a seeded random generator, so runs with the same
+arguments send the same requests. Reports throughput, latency percentiles per
+operation and CPU time and peak RSS of every proxy worker process, read from
+/proc (Linux only). Results are written as JSON together with the git commit
+they were measured at, compare two of them with compare_results.py.
+
+Usage (from the project root):
+    python benchmarks/suite.py --output bench-results.json
+    python benchmarks/suite.py --workload mixed --workers 2 --latency-ms 20 \
+        --bandwidth-mb-per-s 200 --env DOWNLOAD_CHUNK_SIZE_KB=256
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_s3 import FakeS3Server  # noqa: E402
+from load_test import (  # noqa: E402
+    BUCKET_NAME,
+    ROOT_PATH,
+    free_port,
+    percentile,
+    start_proxy,
+)
+from process_stats import (  # noqa: E402
+    child_pids,
+    cmdline,
+    cpu_seconds,
+    peak_rss_mb,
+    reset_peak_rss,
+)
+
+KB: int = 1024
+MB: int = 1024 * 1024
+WORKLOADS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "workloads.json"
+)
+
+
+class Workload:
+    """
+    Request mix read from workloads.json
+    """
+
+    def __init__(self, name: str, config: dict):
+        self.name = name
+        self.description = config.get("description", "")
+        self.requests: int = config["requests"]
+        self.concurrency: List[int] = config["concurrency"]
+        self.read_ratio: float = config["read_ratio"]
+        self.objects: int = config["objects"]
+        self.sizes = [size["size_kb"] * KB for size in config["object_sizes"]]
+        self.weights = [size["weight"] for size in config["object_sizes"]]
+
+    def plan(self, rng: random.Random) -> List[tuple]:
+        """
+        :param rng: seeded random generator
+        :return: (operation, object index, size) of every request in order
+        """
+        sizes = rng.choices(self.sizes, self.weights, k=self.requests)
+        return [
+            (
+                "download" if rng.random() < self.read_ratio else "upload",
+                rng.randrange(self.objects),
+                size,
+            )
+            for size in sizes
+        ]
+
+
+def proxy_pids(proxy_pid: int) -> List[int]:
+    """
+    :param proxy_pid: id of the uvicorn process
+    :return: ids of the processes serving requests, the workers if there are any
+    rather than the multiprocessing helpers
+    """
+    workers = [pid for pid in child_pids(proxy_pid) if "spawn_main" in cmdline(pid)]
+    return workers or [proxy_pid]
+
+
+async def replay(
+    base_url: str,
+    plan: List[tuple],
+    prefix: str,
+    object_sizes: List[int],
+    concurrency: int,
+) -> Dict[str, list]:
+    """
+    Sends the planned requests from concurrent workers
+    :param base_url: proxy url
+    :param plan: planned requests
+    :param prefix: prefix of the object names of the run, so objects of earlier
+    runs cached by the proxy are never read
+    :param object_sizes: sizes of the stored objects by index
+    :param concurrency: number of requests in flight
+    :return: latencies per operation, errors and bytes transferred
+    """
+    results: Dict[str, list] = {"download": [], "upload": [], "errors": [], "bytes": []}
+    payloads: Dict[int, bytes] = {}
+    requests = iter(enumerate(plan))
+
+    async def worker(client: httpx.AsyncClient):
+        for request_number, (operation, object_index, size) in requests:
+            started = time.perf_counter()
+            if operation == "download":
+                async with client.stream(
+                    "GET", f"/api/download/{BUCKET_NAME}/{prefix}-object-{object_index}"
+                ) as response:
+                    transferred = 0
+                    async for chunk in response.aiter_raw():
+                        transferred += len(chunk)
+                expected = object_sizes[object_index]
+            else:
+                payload = payloads.setdefault(size, b"x" * size)
+                response = await client.post(
+                    f"/api/upload/stream/{BUCKET_NAME}/{prefix}-upload-{request_number}",
+                    content=payload,
+                    headers={"Content-Type": "application/octet-stream"},
+                )
+                transferred = expected = size
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200 or transferred != expected:
+                results["errors"].append(elapsed)
+            results[operation].append(elapsed)
+            results["bytes"].append(transferred)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=600
+    ) as client:
+        await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+    return results
+
+
+def latency_summary(latencies: List[float]) -> dict:
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def run_workload(
+    workload: Workload,
+    concurrency: int,
+    fake_s3: FakeS3Server,
+    base_url: str,
+    proxy_pid: int,
+    seed: int,
+) -> dict:
+    """
+    Stores the objects of the workload and replays its requests
+    :return: results of the run
+    """
+    prefix = f"{workload.name}-{concurrency}"
+    rng = random.Random(f"{seed}-{prefix}")
+    object_sizes = rng.choices(workload.sizes, workload.weights, k=workload.objects)
+    with fake_s3.lock:
+        fake_s3.buckets[BUCKET_NAME] = {}
+    for index, size in enumerate(object_sizes):
+        fake_s3.put_object(BUCKET_NAME, f"{prefix}-object-{index}", b"x" * size)
+    plan = workload.plan(rng)
+
+    pids = proxy_pids(proxy_pid)
+    for pid in pids:
+        reset_peak_rss(pid)
+    cpu_before = {pid: cpu_seconds(pid) for pid in pids}
+    started = time.perf_counter()
+    results = asyncio.run(replay(base_url, plan, prefix, object_sizes, concurrency))
+    elapsed = time.perf_counter() - started
+    cpu = {pid: cpu_seconds(pid) - cpu_before[pid] for pid in pids}
+
+    return {
+        "workload": workload.name,
+        "concurrency": concurrency,
+        "requests": len(plan),
+        "errors": len(results["errors"]),
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(plan) / elapsed, 1),
+        "mb_per_s": round(sum(results["bytes"]) / MB / elapsed, 1),
+        "download": latency_summary(results["download"]),
+        "upload": latency_summary(results["upload"]),
+        "workers": [
+            {
+                "pid": pid,
+                "cpu_s": round(cpu[pid], 3),
+                "cpu_pct": round(cpu[pid] / elapsed * 100, 1),
+                "peak_rss_mb": peak_rss_mb(pid),
+            }
+            for pid in pids
+        ],
+    }
+
+
+def git_revision() -> dict:
+    """
+    :return: commit the proxy code was measured at and whether it had changes
+    """
+
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=ROOT_PATH, capture_output=True, text=True
+        ).stdout.strip()
+
+    return {
+        "commit": git("rev-parse", "HEAD") or None,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workloads-file", default=WORKLOADS_PATH)
+    parser.add_argument(
+        "--workload", action="append", default=[], help="run only these workloads"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        action="append",
+        default=[],
+        help="concurrency levels instead of the ones of the workloads",
+    )
+    parser.add_argument("--requests-scale", type=float, default=1)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--bandwidth-mb-per-s", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="file results are written to")
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="extra proxy environment, e.g. --env S3_EXECUTOR_MAX_WORKERS=8",
+    )
+    args = parser.parse_args()
+
+    with open(args.workloads_file) as workloads_file:
+        workloads = [
+            Workload(name, config) for name, config in json.load(workloads_file).items()
+        ]
+    if args.workload:
+        workloads = [
+            workload for workload in workloads if workload.name in args.workload
+        ]
+    for workload in workloads:
+        workload.requests = max(1, int(workload.requests * args.requests_scale))
+
+    fake_s3 = FakeS3Server(
+        latency_ms=args.latency_ms,
+        sink=True,
+        bandwidth_mb_per_s=args.bandwidth_mb_per_s,
+    ).start()
+    port = free_port()
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    proxy = start_proxy(fake_s3.endpoint, port, extra_env, args.workers)
+    summary = {
+        "revision": git_revision(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "settings": {
+            "workers": args.workers,
+            "latency_ms": args.latency_ms,
+            "bandwidth_mb_per_s": args.bandwidth_mb_per_s,
+            "seed": args.seed,
+            "requests_scale": args.requests_scale,
+            "env": extra_env,
+        },
+        "results": [],
+    }
+    try:
+        for workload in workloads:
+            for concurrency in args.concurrency or workload.concurrency:
+                result = run_workload(
+                    workload,
+                    concurrency,
+                    fake_s3,
+                    f"http://127.0.0.1:{port}",
+                    proxy.pid,
+                    args.seed,
+                )
+                print(json.dumps(result), file=sys.stderr)
+                summary["results"].append(result)
+    finally:
+        proxy.terminate()
+        proxy.wait()
+        fake_s3.stop()
+
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Upload throughput and peak memory of the multipart upload engine against the
+previous put_object call (unknown length, fixed 10 MB parts) for a range of
+file sizes.
+
+Uploads run from this process against a fake S3 server in sink mode (see
+fake_s3.py) running in a child process. It only counts received bytes, so
+multi-GB files need no memory on the server side. Fake S3 latency is added to
+every request, which is what parallel parts hide. Peak RSS is that of the
+uploading process.
+
+Usage (from the project root):
+    python benchmarks/upload_throughput.py --sizes-mb 1,16,64,256,1024,5120 --latency-ms 20
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from typing import Callable, Dict, List
+
+import urllib3
+from minio import Minio
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fake_s3 import FakeS3Server  # noqa: E402
+from src.service.multipart_uploader import MB, MultipartUploader  # noqa: E402
+
+BUCKET_NAME = "upload-benchmark"
+
+
+class GeneratedData:
+    """
+    Readable file of the given size that is never held in memory as a whole
+    """
+
+    def __init__(self, size: int):
+        self.remaining = size
+        self.block = b"x" * MB
+
+    def read(self, size: int = -1) -> bytes:
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        size = min(size, len(self.block))
+        self.remaining -= size
+        return self.block[:size]
+
+
+def sequential_upload(client: Minio, object_name: str, size: int):
+    client.put_object(
+        bucket_name=BUCKET_NAME,
+        object_name=object_name,
+        data=GeneratedData(size),
+        length=-1,
+        part_size=10 * MB,
+    )
+
+
+def engine_upload(client: Minio, object_name: str, size: int):
+    MultipartUploader(client).upload(
+        BUCKET_NAME, object_name, GeneratedData(size), None, size
+    )
+
+
+def reset_peak_rss():
+    """
+    Resets the peak RSS of this process where the kernel supports it (Linux)
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return 0.0
+
+
+def measure(
+    upload: Callable[[Minio, str, int], None], client: Minio, size: int
+) -> Dict[str, float]:
+    object_name = f"object-{size}-{upload.__name__}"
+    reset_peak_rss()
+    started = time.perf_counter()
+    upload(client, object_name, size)
+    elapsed = time.perf_counter() - started
+    stored = client.stat_object(BUCKET_NAME, object_name)
+    assert stored.size == size, f"stored {stored.size} bytes instead of {size}"
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "mb_per_s": round(size / MB / elapsed, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def serve_fake_s3(port: int, latency_ms: float):
+    server = FakeS3Server(port=port, latency_ms=latency_ms, sink=True)
+    server.buckets[BUCKET_NAME] = {}
+    server.serve_forever()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes-mb", default="1,16,64,256,1024,5120")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    os.environ["UPLOAD_PART_CONCURRENCY"] = str(args.concurrency)
+    port = free_port()
+    fake_s3 = multiprocessing.Process(
+        target=serve_fake_s3, args=(port, args.latency_ms), daemon=True
+    )
+    fake_s3.start()
+    client = Minio(
+        endpoint=f"127.0.0.1:{port}",
+        access_key="benchmark-access-key",
+        secret_key="benchmark-secret-key",
+        secure=False,
+        http_client=urllib3.PoolManager(maxsize=32),
+    )
+
+    results: List[dict] = []
+    while not client.bucket_exists(BUCKET_NAME):
+        time.sleep(0.1)
+    try:
+        for size_mb in [int(size) for size in args.sizes_mb.split(",")]:
+            size = size_mb * MB
+            result = {"size_mb": size_mb}
+            for name, upload in (
+                ("sequential", sequential_upload),
+                ("engine", engine_upload),
+            ):
+                result[name] = measure(upload, client, size)
+            results.append(result)
+            print(json.dumps(result), flush=True)
+    finally:
+        fake_s3.terminate()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Validations per second of bucket/object names of a download request.
+
+Compares the former regular expressions with lookaheads, the precompiled
+single pass checks with and without the LRU of valid bucket names, and a
+pydantic request model against the plain DownloadRequest used by the download
+endpoint. Runs in this process, no server is started.
+
+Usage (from the project root):
+    python benchmarks/validation.py --iterations 200000
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.models.base_s3_request import (  # noqa: E402
+    BaseRequest,
+    validate_bucket_name,
+    validate_object_name,
+)
+from src.models.download.download_request import DownloadRequest  # noqa: E402
+
+LOOKAHEAD_BUCKET_NAME_PATTERN = (
+    r"(?!(^((2(5[0-5]|[0-4][0-9])|[01]?[0-9]{1,2})\.){3}"
+    r"(2(5[0-5]|[0-4][0-9])|[01]?[0-9]{1,2})$|^xn--|.+-s3alias$))"
+    r"^[a-z0-9][a-z0-9.-]{1,61}[a-z0-9]$"
+)
+BUCKET_NAME = "customer-uploads.eu-west"
+OBJECT_NAME = "2024/06/invoices/invoice-000123.pdf"
+
+
+def lookahead_validation(bucket_name: str, object_name: str):
+    assert re.fullmatch(LOOKAHEAD_BUCKET_NAME_PATTERN, bucket_name)
+    assert not re.search(r"[!_\-.*\'()/]{2,}", bucket_name)
+    assert 1 <= len(object_name) <= 1024
+    assert re.fullmatch(r"^[a-zA-Z0-9!\-_.*\'()/]+$", object_name)
+
+
+def precompiled_validation(bucket_name: str, object_name: str):
+    validate_bucket_name.__wrapped__(bucket_name)
+    validate_object_name(object_name)
+
+
+def cached_validation(bucket_name: str, object_name: str):
+    validate_bucket_name(bucket_name)
+    validate_object_name(object_name)
+
+
+def pydantic_request(bucket_name: str, object_name: str):
+    BaseRequest(bucket_name=bucket_name, object_name=object_name)
+
+
+def download_request(bucket_name: str, object_name: str):
+    DownloadRequest(bucket_name=bucket_name, object_name=object_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    results = {}
+    for validation in (
+        lookahead_validation,
+        precompiled_validation,
+        cached_validation,
+        pydantic_request,
+        download_request,
+    ):
+        seconds = min(
+            timeit.repeat(
+                lambda: validation(BUCKET_NAME, OBJECT_NAME),
+                number=args.iterations,
+                repeat=3,
+            )
+        )
+        results[validation.__name__] = {
+            "validations_per_s": round(args.iterations / seconds),
+            "us_per_validation": round(seconds / args.iterations * 1e6, 3),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,27 @@
 import os
+from contextlib import asynccontextmanager
 
 import uvicorn
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from src.api.routers.s3_api import router
+from src.api.middleware.admission_control import AdmissionControlMiddleware
+from src.api.middleware.bandwidth_shaping import BandwidthShapingMiddleware
+from src.api.middleware.metrics import MetricsMiddleware
+from src.api.middleware.tracing import TracingMiddleware
+from src.api.middleware.upload_size_limit import UploadSizeLimitMiddleware
+from src.api.routers import admin_api, metrics_api, s3_api
 
+from src.core.cache.object_cache import ObjectCache
+from src.core.common.s3_executor import (
+    S3BatchExecutor,
+    S3Executor,
+    S3PartExecutor,
+)
 from src.core.config.open_api import tags_metadata
 from src.core.exceptions.exception_handler import ExceptionHandler
+from src.core.profiling.sampling_profiler import SamplingProfiler
+from src.service.resumable_upload import ResumableUploads
+from src.service.s3_client_provider import S3ClientProvider
 
 ENV_PROFILE = os.getenv("ENV_PROFILE", "dev")
 if ENV_PROFILE == "dev":
@@ -16,15 +31,39 @@ elif ENV_PROFILE == "test":
 
 os.environ["ROOT_PATH"] = os.path.dirname(os.path.abspath(__file__))
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    S3ClientProvider().start()
+    SamplingProfiler().install_signal_handler()
+    ResumableUploads().start_janitor()
+    yield
+    ResumableUploads().stop_janitor()
+    S3Executor().shutdown()
+    S3BatchExecutor().shutdown()
+    S3PartExecutor().shutdown()
+    ResumableUploads().store.close()
+    S3ClientProvider().close()
+    ObjectCache().close()
+
+
 app = FastAPI(
     title="S3 Minio Proxy Service",
     descriptaion="API minio S3",
     version="1.0",
     openapi_tags=tags_metadata,
+    lifespan=lifespan,
 )
 
 app.add_exception_handler(Exception, ExceptionHandler.handle)
-app.include_router(router)
+app.add_middleware(UploadSizeLimitMiddleware)
+app.add_middleware(BandwidthShapingMiddleware)
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+app.include_router(s3_api.router)
+app.include_router(admin_api.router)
+app.include_router(metrics_api.router)
 
 if __name__ == "__main__":
     uvicorn.run(
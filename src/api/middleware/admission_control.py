@@ -0,0 +1,112 @@
+from typing import Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api.middleware.route_resolver import resolve_route
+from src.core.admission.admission_controller import AdmissionController, RequestKind
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.exceptions.exception_handler import ExceptionHandler
+
+API_PATH_PREFIX: str = "/api/"
+UPLOAD_PATH_PREFIX: str = "/api/upload"
+DOWNLOAD_PATH_PREFIXES: tuple = ("/api/download/", "/api/archive/", "/api/list/")
+READ_METHODS: frozenset = frozenset(("GET", "HEAD", "DELETE"))
+
+
+class AdmissionControlMiddleware:
+    """
+    Admits or rejects API requests before they are routed, see
+    AdmissionController. Uploads and downloads hold their slot until the
+    response is fully sent, so a streamed download counts for as long as it
+    streams. Metrics and admin routes are never limited.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope["path"].startswith(API_PATH_PREFIX):
+            return await self.app(scope, receive, send)
+
+        controller = AdmissionController()
+        kind = self.__kind(scope)
+        try:
+            admission = controller.admit(
+                kind,
+                self.__client_keys(scope, controller),
+                self.__content_length(scope),
+            )
+        except S3ProxyServiceException as e:
+            response = await ExceptionHandler.handle(None, e)
+            return await response(scope, receive, send)
+
+        if kind != RequestKind.UPLOAD:
+            try:
+                return await self.app(scope, receive, send)
+            finally:
+                admission.release()
+
+        async def counted_receive() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                admission.receive(len(message.get("body", b"")))
+            return message
+
+        try:
+            await self.app(scope, counted_receive, send)
+        finally:
+            admission.release()
+
+    @staticmethod
+    def __kind(scope: Scope) -> str:
+        path = scope["path"]
+        if path.startswith(UPLOAD_PATH_PREFIX) and scope["method"] not in READ_METHODS:
+            return RequestKind.UPLOAD
+        if path.startswith(DOWNLOAD_PATH_PREFIXES):
+            return RequestKind.DOWNLOAD
+        return RequestKind.OTHER
+
+    @staticmethod
+    def __client_keys(
+        scope: Scope, controller: AdmissionController
+    ) -> Dict[str, Optional[str]]:
+        """
+        :param scope: request scope
+        :param controller: admission controller
+        :return: keys of the rate limits in use, None where the request has none
+        """
+        keys: Dict[str, Optional[str]] = {}
+        limits = controller.limits
+        for key_name in controller.rate_limited_keys:
+            if key_name == "ip":
+                forwarded_for = (
+                    AdmissionControlMiddleware.__header(scope, b"x-forwarded-for")
+                    if limits.trust_forwarded_for
+                    else ""
+                )
+                client = scope.get("client")
+                keys[key_name] = forwarded_for.split(",")[0].strip() or (
+                    client[0] if client else None
+                )
+            elif key_name == "api_key":
+                keys[key_name] = (
+                    AdmissionControlMiddleware.__header(
+                        scope, limits.api_key_header.lower().encode()
+                    )
+                    or None
+                )
+            elif key_name == "bucket":
+                keys[key_name] = resolve_route(scope)[1] or None
+        return keys
+
+    @staticmethod
+    def __content_length(scope: Scope) -> Optional[int]:
+        content_length = AdmissionControlMiddleware.__header(scope, b"content-length")
+        return int(content_length) if content_length.isdigit() else None
+
+    @staticmethod
+    def __header(scope: Scope, name: bytes) -> str:
+        for header_name, value in scope["headers"]:
+            if header_name.lower() == name:
+                return value.decode("latin-1")
+        return ""
@@ -0,0 +1,85 @@
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api.middleware.admission_control import (
+    DOWNLOAD_PATH_PREFIXES,
+    READ_METHODS,
+    UPLOAD_PATH_PREFIX,
+)
+from src.api.middleware.route_resolver import resolve_route
+from src.core.admission.bandwidth_shaper import BandwidthShaper, Direction
+
+
+class BandwidthShapingMiddleware:
+    """
+    Paces download response bodies and upload request bodies to the caps of
+    BandwidthShaper. A download chunk is sent only once it fits in the caps,
+    and until then the response doesn't pull the next chunk from MinIO, an
+    upload chunk is handed over only once it fits, and until then the server
+    stops reading the socket once its small buffer is full. A throttled stream
+    therefore holds a single chunk, however slow it is made.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        shaper = BandwidthShaper()
+        direction = self.__direction(scope)
+        if direction is None or not shaper.limits.enabled:
+            return await self.app(scope, receive, send)
+
+        route, bucket_name = resolve_route(scope)
+        stream = shaper.open(
+            direction,
+            self.__tenant(scope, shaper.limits.tenant_header),
+            bucket_name or None,
+            route,
+        )
+        if stream is None:
+            return await self.app(scope, receive, send)
+
+        async def shaped_send(message: Message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                await stream.throttle(len(message["body"]))
+            await send(message)
+
+        async def shaped_receive() -> Message:
+            message = await receive()
+            if message["type"] == "http.request" and message.get("body"):
+                await stream.throttle(len(message["body"]))
+            return message
+
+        try:
+            if direction == Direction.DOWNLOAD:
+                await self.app(scope, receive, shaped_send)
+            else:
+                await self.app(scope, shaped_receive, send)
+        finally:
+            stream.close()
+
+    @staticmethod
+    def __direction(scope: Scope) -> Optional[str]:
+        path = scope["path"]
+        if path.startswith(UPLOAD_PATH_PREFIX) and scope["method"] not in READ_METHODS:
+            return Direction.UPLOAD
+        if path.startswith(DOWNLOAD_PATH_PREFIXES):
+            return Direction.DOWNLOAD
+        return None
+
+    @staticmethod
+    def __tenant(scope: Scope, tenant_header: str) -> Optional[str]:
+        """
+        :param scope: request scope
+        :param tenant_header: header naming the tenant
+        :return: tenant header value, else the client address
+        """
+        name = tenant_header.lower().encode()
+        for header_name, value in scope["headers"]:
+            if header_name.lower() == name and value:
+                return value.decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else None
@@ -0,0 +1,67 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api.middleware.route_resolver import resolve_route
+from src.core.exceptions.exception_handler import ExceptionHandler
+from src.core.metrics.metrics import Metrics, Stage
+
+
+class MetricsMiddleware:
+    """
+    Counts requests, requests in flight and body bytes per route and times
+    whole requests and the receiving of their body.
+    Routes are labelled by their path template and buckets by the bucket_name
+    path parameter. Bucket names only label successful responses, so arbitrary
+    names sent by clients don't grow the number of series. Form uploads to
+    /api/upload carry their bucket in the body, their bucket label is empty.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        metrics = Metrics()
+        if scope["type"] != "http" or not metrics.enabled:
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        route, bucket_name = resolve_route(scope)
+        status_code = 0
+        received = 0
+        sent = 0
+
+        async def counted_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                body_size = len(message.get("body", b""))
+                received += body_size
+                if received and not message.get("more_body", False):
+                    metrics.observe_stage(
+                        Stage.BODY_RECEIVE, time.perf_counter() - started
+                    )
+            return message
+
+        async def counted_send(message: Message):
+            nonlocal status_code, sent
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        metrics.requests_in_flight.inc((route,))
+        try:
+            await self.app(scope, counted_receive, counted_send)
+        except Exception as e:
+            status_code = status_code or ExceptionHandler.status_code(e)
+            raise
+        finally:
+            metrics.requests_in_flight.dec((route,))
+            bucket_label = bucket_name if 200 <= status_code < 400 else ""
+            metrics.requests.inc((scope["method"], route, str(status_code)))
+            if received:
+                metrics.request_bytes.inc((route, bucket_label), received)
+            if sent:
+                metrics.response_bytes.inc((route, bucket_label), sent)
+            metrics.request_duration.observe((route,), time.perf_counter() - started)
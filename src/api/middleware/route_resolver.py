@@ -0,0 +1,23 @@
+from typing import Tuple
+
+from starlette.types import Scope
+
+UNMATCHED_ROUTE: str = "unmatched"
+
+
+def resolve_route(scope: Scope) -> Tuple[str, str]:
+    """
+    Finds the route the request is going to be handled by, only the path
+    patterns are matched as building the route scopes would cost more
+    :param scope: request scope
+    :return: path template of the route and bucket name path parameter
+    """
+    app = scope.get("app")
+    path, method = scope["path"], scope["method"]
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        path_regex = getattr(route, "path_regex", None)
+        match = path_regex.match(path) if path_regex is not None else None
+        methods = getattr(route, "methods", None)
+        if match is not None and (methods is None or method in methods):
+            return route.path, match.groupdict().get("bucket_name", "")
+    return UNMATCHED_ROUTE, ""
@@ -0,0 +1,51 @@
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api.middleware.route_resolver import resolve_route
+from src.core.exceptions.exception_handler import ExceptionHandler
+from src.core.tracing.trace_context import TRACEPARENT_HEADER
+from src.core.tracing.tracer import Tracer
+
+
+class TracingMiddleware:
+    """
+    Starts the trace of each sampled request, continuing the traceparent sent
+    by the client. The root span lasts until the end of the response body is
+    sent and its traceparent is returned in the response headers, so clients
+    can look the trace up in /admin/traces or the logs.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        tracer = Tracer()
+        if scope["type"] != "http" or not tracer.enabled:
+            return await self.app(scope, receive, send)
+
+        route, bucket_name = resolve_route(scope)
+        with tracer.trace(
+            f"{scope['method']} {route}",
+            Headers(scope=scope).get(TRACEPARENT_HEADER),
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        ) as root:
+            if root is None:
+                return await self.app(scope, receive, send)
+
+            async def traced_send(message: Message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.status_code", message["status"])
+                    message.setdefault("headers", [])
+                    message["headers"] = [
+                        *message["headers"],
+                        (TRACEPARENT_HEADER.encode(), root.traceparent.encode()),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, traced_send)
+            except Exception as e:
+                root.attributes.setdefault(
+                    "http.status_code", ExceptionHandler.status_code(e)
+                )
+                raise
@@ -0,0 +1,109 @@
+from typing import Optional
+
+from starlette.status import HTTP_413_REQUEST_ENTITY_TOO_LARGE
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config.upload_size_limits import UploadSizeLimits
+from src.core.exceptions.error_codes import UploadError
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.exceptions.exception_handler import ExceptionHandler
+
+UPLOAD_PATH_PREFIX: str = "/api/upload"
+STREAM_UPLOAD_PATH_PREFIX: str = "/api/upload/stream/"
+BATCH_UPLOAD_PATH_PREFIX: str = "/api/upload/batch/"
+MULTIPART_OVERHEAD_BYTES: int = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects upload requests larger than the upload size limit before their body
+    is read: up front by Content-Length, and for chunked bodies as soon as the
+    received bytes cross the limit. The 413 response closes the connection, so
+    the rest of the body is never consumed.
+    The limit of the bucket is applied when the bucket is part of the path,
+    otherwise the largest limit is, and the endpoint checks the exact one.
+    Batch uploads are limited as a whole.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope["path"].startswith(UPLOAD_PATH_PREFIX):
+            return await self.app(scope, receive, send)
+
+        limit = self.__body_limit(scope)
+        content_length = self.__content_length(scope)
+        if content_length is not None and content_length > limit:
+            return await self.__reject(scope, receive, send)
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise self.__error()
+            return message
+
+        async def guarded_send(message: Message):
+            nonlocal response_started
+            if exceeded:
+                return
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded or response_started:
+                raise
+        if exceeded and not response_started:
+            await self.__reject(scope, receive, send)
+
+    @staticmethod
+    def __body_limit(scope: Scope) -> int:
+        path = scope["path"]
+        limits = UploadSizeLimits()
+        if path.startswith(STREAM_UPLOAD_PATH_PREFIX):
+            limit = limits.for_bucket(
+                path[len(STREAM_UPLOAD_PATH_PREFIX) :].split("/")[0]
+            )
+        elif path.startswith(BATCH_UPLOAD_PATH_PREFIX):
+            limit = limits.batch_max_bytes
+        else:
+            limit = limits.max_bytes
+        if UploadSizeLimitMiddleware.__header(scope, b"content-type").startswith(
+            b"multipart/"
+        ):
+            limit += MULTIPART_OVERHEAD_BYTES
+        return limit
+
+    @staticmethod
+    def __content_length(scope: Scope) -> Optional[int]:
+        content_length = UploadSizeLimitMiddleware.__header(scope, b"content-length")
+        return int(content_length) if content_length.isdigit() else None
+
+    @staticmethod
+    def __header(scope: Scope, name: bytes) -> bytes:
+        for header_name, value in scope["headers"]:
+            if header_name.lower() == name:
+                return value
+        return b""
+
+    @staticmethod
+    def __error() -> S3ProxyServiceException:
+        return S3ProxyServiceException(
+            UploadError.FILE_TOO_LARGE,
+            status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            headers={"Connection": "close"},
+        )
+
+    async def __reject(self, scope: Scope, receive: Receive, send: Send):
+        response = await ExceptionHandler.handle(None, self.__error())
+        await response(scope, receive, send)
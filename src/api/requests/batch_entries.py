@@ -0,0 +1,177 @@
+import functools
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from typing import BinaryIO, Callable, Iterator, List
+
+from multipart.multipart import (
+    MultipartParser,
+    MultipartState,
+    parse_options_header,
+)
+from starlette.status import HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+from src.core.exceptions.error_codes import UploadError
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.models.upload.batch_entry import BatchEntry
+
+READ_SIZE: int = 64 * 1024
+ZIP_SPOOL_MAX_BYTES: int = 16 * 1024 * 1024
+TAR_CONTENT_TYPES: tuple = (
+    b"application/x-tar",
+    b"application/tar",
+    b"application/x-gtar",
+    b"application/gzip",
+    b"application/x-gzip",
+    b"application/x-compressed-tar",
+)
+ZIP_CONTENT_TYPES: tuple = (b"application/zip", b"application/x-zip-compressed")
+
+
+def multipart_entries(
+    data: BinaryIO, max_file_bytes: int, boundary: bytes
+) -> Iterator[BatchEntry]:
+    """
+    Reads every file part of a multipart/form-data body as it arrives, the
+    file name is the object name. Parts without a file name are skipped.
+    :param data: readable request body
+    :param max_file_bytes: size limit of a file, larger files are not kept in memory
+    :param boundary: multipart boundary
+    :return: entries in body order
+    """
+    entries: List[BatchEntry] = []
+    part = {}
+
+    def on_part_begin():
+        part.clear()
+        part.update(headers={}, field=b"", value=b"", chunks=[], size=0)
+
+    def on_header_field(chunk: bytes, start: int, end: int):
+        part["field"] += chunk[start:end]
+
+    def on_header_value(chunk: bytes, start: int, end: int):
+        part["value"] += chunk[start:end]
+
+    def on_header_end():
+        part["headers"][part["field"].lower()] = part["value"]
+        part["field"] = part["value"] = b""
+
+    def on_part_data(chunk: bytes, start: int, end: int):
+        part["size"] += end - start
+        if part["size"] <= max_file_bytes:
+            part["chunks"].append(bytes(chunk[start:end]))
+        else:
+            part["chunks"] = None
+
+    def on_part_end():
+        _, options = parse_options_header(
+            part["headers"].get(b"content-disposition", b"")
+        )
+        filename = options.get(b"filename")
+        if not filename:
+            return
+        content_type = part["headers"].get(b"content-type", b"").decode("latin-1")
+        chunks = part["chunks"]
+        entries.append(
+            BatchEntry.checked(
+                object_name=filename.decode("utf-8", "replace"),
+                content_type=content_type,
+                data=b"".join(chunks) if chunks is not None else None,
+                size=part["size"],
+                max_file_bytes=max_file_bytes,
+            )
+        )
+
+    parser = MultipartParser(
+        boundary,
+        callbacks={
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+    while True:
+        chunk = data.read(READ_SIZE)
+        if not chunk:
+            break
+        parser.write(chunk)
+        yield from entries
+        entries.clear()
+    if parser.state != MultipartState.END:
+        raise S3ProxyServiceException(UploadError.INCOMPLETE_FILE)
+
+
+def tar_entries(data: BinaryIO, max_file_bytes: int) -> Iterator[BatchEntry]:
+    """
+    Unpacks a tar stream, optionally gzip/bz2/xz compressed, as it arrives.
+    Member paths are object names, only regular files are uploaded.
+    :param data: readable request body
+    :param max_file_bytes: size limit of a file, larger files are not read
+    :return: entries in archive order
+    """
+    try:
+        with tarfile.open(fileobj=data, mode="r|*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                content = None
+                if member.size <= max_file_bytes:
+                    content = archive.extractfile(member).read()
+                yield BatchEntry.checked(
+                    member.name, None, content, member.size, max_file_bytes
+                )
+    except (tarfile.TarError, EOFError):
+        raise S3ProxyServiceException(UploadError.INVALID_ARCHIVE)
+
+
+def zip_entries(data: BinaryIO, max_file_bytes: int) -> Iterator[BatchEntry]:
+    """
+    Unpacks a zip archive. Its directory is at the end of the archive, so the
+    body is spooled to a temporary file first.
+    Member paths are object names, directories are skipped.
+    :param data: readable request body
+    :param max_file_bytes: size limit of a file, larger files are not read
+    :return: entries in archive order
+    """
+    with tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_BYTES) as spool:
+        shutil.copyfileobj(data, spool, READ_SIZE)
+        spool.seek(0)
+        try:
+            with zipfile.ZipFile(spool) as archive:
+                for member in archive.infolist():
+                    if member.is_dir():
+                        continue
+                    content = None
+                    if member.file_size <= max_file_bytes:
+                        content = archive.read(member)
+                    yield BatchEntry.checked(
+                        member.filename, None, content, member.file_size, max_file_bytes
+                    )
+        except (zipfile.BadZipFile, EOFError):
+            raise S3ProxyServiceException(UploadError.INVALID_ARCHIVE)
+
+
+def batch_reader(
+    content_type_header: str,
+) -> Callable[[BinaryIO, int], Iterator[BatchEntry]]:
+    """
+    Chooses the reader of a batch upload body by its content type
+    :param content_type_header: Content-Type header of the request
+    :return: reader taking the body and the size limit of a file
+    :raise S3ProxyServiceException: 415 if the body type is not supported
+    """
+    content_type, params = parse_options_header(content_type_header)
+    if content_type == b"multipart/form-data" and params.get(b"boundary"):
+        return functools.partial(multipart_entries, boundary=params[b"boundary"])
+    if content_type in TAR_CONTENT_TYPES:
+        return tar_entries
+    if content_type in ZIP_CONTENT_TYPES:
+        return zip_entries
+    raise S3ProxyServiceException(
+        UploadError.UNSUPPORTED_BATCH_TYPE,
+        status_code=HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+    )
@@ -0,0 +1,126 @@
+from typing import AsyncIterator, Dict, List, Optional
+
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+from src.core.exceptions.error_codes import UploadError
+from src.core.exceptions.exception import S3ProxyServiceException
+
+DEFAULT_CONTENT_TYPE: str = "application/octet-stream"
+
+
+class MultipartFileStream:
+    """
+    Reads the file of an upload request while the body arrives, without spooling
+    it anywhere. A multipart/form-data body is parsed incrementally and only the
+    part named field_name is passed on; any other body is taken as the file itself.
+    """
+
+    def __init__(self, request: Request, field_name: str = "file"):
+        """
+        :param request: upload request
+        :param field_name: form field of the file
+        """
+        self.request = request
+        self.field_name = field_name.encode()
+        self.content_type: Optional[str] = None
+        self._body = request.stream().__aiter__()
+        self._parser: Optional[MultipartParser] = None
+        self._pending: List[bytes] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._in_file = False
+        self._file_found = False
+        self._file_done = False
+
+        content_type, params = parse_options_header(
+            request.headers.get("Content-Type", "")
+        )
+        if content_type == b"multipart/form-data" and params.get(b"boundary"):
+            self._parser = MultipartParser(
+                params[b"boundary"],
+                callbacks={
+                    "on_part_begin": self.__on_part_begin,
+                    "on_header_field": self.__on_header_field,
+                    "on_header_value": self.__on_header_value,
+                    "on_header_end": self.__on_header_end,
+                    "on_headers_finished": self.__on_headers_finished,
+                    "on_part_data": self.__on_part_data,
+                    "on_part_end": self.__on_part_end,
+                },
+            )
+        else:
+            self.content_type = content_type.decode("latin-1") or DEFAULT_CONTENT_TYPE
+
+    async def open(self) -> str:
+        """
+        Reads the body up to the start of the file
+        :return: content type of the file
+        """
+        while self._parser is not None and not self._file_found:
+            chunk = await self.__next_body_chunk()
+            if chunk is None:
+                raise S3ProxyServiceException(UploadError.FILE_MISSING)
+            self._parser.write(chunk)
+        return self.content_type
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """
+        :return: file data as it is received
+        """
+        while True:
+            while self._pending:
+                yield self._pending.pop(0)
+            if self._file_done:
+                return
+            chunk = await self.__next_body_chunk()
+            if chunk is None:
+                if self._parser is not None:
+                    raise S3ProxyServiceException(UploadError.INCOMPLETE_FILE)
+                return
+            if self._parser is not None:
+                self._parser.write(chunk)
+            elif chunk:
+                self._pending.append(chunk)
+
+    async def __next_body_chunk(self) -> Optional[bytes]:
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            return None
+        return chunk
+
+    def __on_part_begin(self):
+        self._headers = {}
+
+    def __on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def __on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def __on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def __on_headers_finished(self):
+        _, options = parse_options_header(
+            self._headers.get(b"content-disposition", b"")
+        )
+        if self._file_found or options.get(b"name") != self.field_name:
+            return
+        self._in_file = True
+        self._file_found = True
+        content_type = self._headers.get(b"content-type", b"").decode("latin-1")
+        self.content_type = content_type or DEFAULT_CONTENT_TYPE
+
+    def __on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file and start < end:
+            self._pending.append(bytes(data[start:end]))
+
+    def __on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self._file_done = True
@@ -0,0 +1,53 @@
+from typing import Union
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from src.core.common.s3_executor import S3Executor
+from src.service.archive_stream import ArchiveStream
+from src.service.cached_file_stream import CachedFileStream
+from src.service.coalesced_download import CoalescedStream
+from src.service.multipart_range_stream import MultipartRangeStream
+from src.service.object_list_stream import ObjectListStream
+from src.service.object_stream import ObjectStream
+from src.service.parallel_range_stream import ParallelRangeStream
+
+
+class ObjectStreamResponse(StreamingResponse):
+    """
+    Streaming response over minio object. Chunks are read in S3Executor and
+    upstream connection is released when the body is fully sent, when sending
+    fails and when the client disconnects.
+    Validators of the upstream response take precedence over cached ones.
+    """
+
+    def __init__(
+        self,
+        object_stream: Union[
+            ObjectStream,
+            ParallelRangeStream,
+            CoalescedStream,
+            MultipartRangeStream,
+            ArchiveStream,
+            ObjectListStream,
+            CachedFileStream,
+        ],
+        **kwargs
+    ):
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.update(object_stream.validators)
+        if object_stream.content_length is not None:
+            headers.setdefault("Content-Length", str(object_stream.content_length))
+        super().__init__(
+            content=S3Executor().iterate(object_stream),
+            media_type=kwargs.pop("media_type", None) or object_stream.content_type,
+            headers=headers,
+            **kwargs,
+        )
+        self.object_stream = object_stream
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.object_stream.close()
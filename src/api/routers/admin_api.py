@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Query
+from starlette.status import HTTP_202_ACCEPTED, HTTP_403_FORBIDDEN, HTTP_409_CONFLICT
+
+from src.core.cache.metadata_cache import MetadataCache
+from src.core.cache.object_cache import ObjectCache
+from src.core.exceptions.error_codes import ProfilerError
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.profiling.sampling_profiler import SamplingProfiler
+from src.core.tracing.tracer import Tracer
+from src.service.coalesced_download import DownloadCoalescer
+from src.service.s3_client_provider import S3ClientProvider
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Size and hit/miss/eviction counters of in-process caches
+    """
+    return {"metadata": MetadataCache().stats(), "objects": ObjectCache().stats()}
+
+
+@router.get("/coalescing/stats")
+async def coalescing_stats():
+    """
+    Counters of downloads sharing one upstream request, total and per object
+    """
+    return DownloadCoalescer().stats()
+
+
+@router.get("/traces")
+async def recent_traces():
+    """
+    Spans of recently traced requests, newest first
+    """
+    tracer = Tracer()
+    return {"enabled": tracer.enabled, "traces": tracer.recent()}
+
+
+@router.post("/profile", status_code=HTTP_202_ACCEPTED)
+async def start_profile(seconds: float = Query(default=30, gt=0)):
+    """
+    Starts capturing a sampling profile of the process in the background,
+    written as collapsed stacks for flamegraph tools
+    """
+    profiler = SamplingProfiler()
+    if not profiler.enabled:
+        raise S3ProxyServiceException(
+            ProfilerError.DISABLED, status_code=HTTP_403_FORBIDDEN
+        )
+    path = profiler.start(seconds)
+    if path is None:
+        raise S3ProxyServiceException(
+            ProfilerError.RUNNING, status_code=HTTP_409_CONFLICT
+        )
+    return {"path": path, "seconds": min(seconds, profiler.MAX_SECONDS)}
+
+
+@router.get("/backends")
+async def s3_backends():
+    """
+    S3 backends and the rules routing buckets to them, without credentials
+    """
+    return S3ClientProvider().routing.table.describe()
+
+
+@router.post("/backends/reload")
+async def reload_s3_backends():
+    """
+    Loads S3_BACKENDS_FILE again in this worker, other workers load it once
+    they notice the change
+    """
+    return {"reloaded": S3ClientProvider().routing.reload(force=True)}
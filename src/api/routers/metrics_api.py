@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.core.metrics.metrics import Metrics
+
+router = APIRouter(tags=["admin"])
+
+PROMETHEUS_CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Request counts, in-flight requests, body bytes and latency histograms per
+    route and per processing stage, in the Prometheus text format
+    """
+    return PlainTextResponse(
+        Metrics().render(), headers={"Content-Type": PROMETHEUS_CONTENT_TYPE}
+    )
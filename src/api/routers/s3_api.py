@@ -1,17 +1,78 @@
+import asyncio
 import logging
 import os
-from typing import Optional, Union
+from typing import AsyncIterator, BinaryIO, Iterable, List, Optional, Union
 
-from fastapi import APIRouter, Path, Response, Depends
+from fastapi import APIRouter, Body, Path, Depends, Header, Query, Request, Response
 from fastapi import UploadFile, File, Form, HTTPException
 from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.status import (
+    HTTP_204_NO_CONTENT,
+    HTTP_206_PARTIAL_CONTENT,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_403_FORBIDDEN,
+    HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+)
 from typing_extensions import Annotated
 
+from src.api.requests.batch_entries import batch_reader
+from src.api.requests.multipart_file_stream import MultipartFileStream
+from src.api.responses.object_stream_response import ObjectStreamResponse
+from src.core.cache.object_cache import CachedObject
+from src.core.common.s3_executor import S3Executor
+from src.core.config.cache_control import CacheControlPolicy
+from src.core.config.compression_policy import CompressionPolicy
+from src.core.config.presign_policy import PresignPolicy
+from src.core.config.upload_size_limits import UploadSizeLimits
+from src.core.exceptions.error_codes import PresignError, UploadError
 from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.metrics.metrics import Metrics
+from src.models.base_s3_request import validate_bucket_name
+from src.models.download.archive_request import ArchiveRequest
+from src.models.download.byte_range import (
+    ByteRange,
+    if_range_matches,
+    parse_range_header,
+)
+from src.models.download.conditional_request import is_not_modified
 from src.models.download.download_request import DownloadRequest
+from src.models.download.list_request import ListRequest
+from src.models.download.object_info import ObjectInfo
+from src.models.download.object_listing import ObjectListing
+from src.models.presign.presign_request import (
+    CompleteMultipartRequest,
+    PresignUploadRequest,
+)
+from src.models.presign.presigned_url import (
+    MultipartUploadPlan,
+    PresignedPost,
+    PresignedUrl,
+)
+from src.models.upload.batch_entry import BatchEntry
+from src.models.upload.batch_upload_result import BatchUploadResult
+from src.models.upload.stream_upload_request import StreamUploadRequest
 from src.models.upload.upload_request import UploadRequest
 from src.models.upload.upload_result import UploadResult
+from src.models.upload.upload_session import SessionPart, UploadSession
+from src.models.upload.upload_session_request import UploadSessionRequest
+from src.service.archive_stream import ArchiveStream
+from src.service.cached_file_stream import CachedFileStream
+from src.service.multipart_range_stream import MultipartRangeStream
+from src.service.coalesced_download import CoalescedStream
+from src.service.compression import (
+    Codec,
+    Operation,
+    TranscodedStream,
+    compressor,
+    decompressor,
+    transcode,
+)
+from src.service.object_list_stream import ObjectListStream
+from src.service.object_stream import ObjectStream
+from src.service.resumable_upload import ResumableUploads
 from src.service.s3_service import S3Service
+from src.service.upload_pipe import UploadPipe
 
 
 class S3APIService:
@@ -29,6 +90,88 @@ class S3APIService:
         """
         return self.s3_service.upload_file(upload_request)
 
+    def upload_stream_to_bucket(
+        self, upload_request: StreamUploadRequest, data: BinaryIO, content_type: str
+    ) -> UploadResult:
+        """
+        Upload file to minio s3 bucket while it is received
+        :param upload_request: info about bucket/object names
+        :param data: readable file data
+        :param content_type: file content type
+        :return: upload result
+        """
+        return self.s3_service.upload_stream(
+            bucket_name=upload_request.bucket_name,
+            object_name=upload_request.object_name,
+            data=data,
+            content_type=content_type,
+        )
+
+    def upload_batch_to_bucket(
+        self, bucket_name: str, entries: Iterable[BatchEntry]
+    ) -> BatchUploadResult:
+        """
+        Upload many files to minio s3 bucket
+        :param bucket_name: validated bucket name
+        :param entries: files read from the request body
+        :return: result per file
+        """
+        return self.s3_service.upload_batch(bucket_name=bucket_name, entries=entries)
+
+    def create_upload_session(
+        self, session_request: UploadSessionRequest
+    ) -> UploadSession:
+        """
+        Start resumable upload of a file to minio s3 bucket
+        :param session_request: info about bucket/object names and file size
+        :return: upload session
+        """
+        return ResumableUploads().create(
+            bucket_name=session_request.bucket_name,
+            object_name=session_request.object_name,
+            size=session_request.size,
+            content_type=session_request.content_type,
+            max_bytes=UploadSizeLimits().for_bucket(session_request.bucket_name),
+        )
+
+    def get_upload_session(self, session_id: str) -> UploadSession:
+        """
+        Read state of resumable upload
+        :param session_id: upload session id
+        :return: upload session with the received parts
+        """
+        return ResumableUploads().get(session_id)
+
+    def upload_part_to_session(
+        self, session: UploadSession, part_number: int, data: bytes
+    ) -> SessionPart:
+        """
+        Upload one part of resumable upload
+        :param session: upload session
+        :param part_number: part number, starting at 1
+        :param data: part bytes
+        :return: received part
+        """
+        return ResumableUploads().upload_part(session, part_number, data)
+
+    def complete_upload_session(self, session_id: str) -> UploadResult:
+        """
+        Complete resumable upload all parts were received for
+        :param session_id: upload session id
+        :return: upload result
+        """
+        session = ResumableUploads().get(session_id)
+        return ResumableUploads().complete(
+            session, UploadSizeLimits().for_bucket(session.bucket_name)
+        )
+
+    def abort_upload_session(self, session_id: str):
+        """
+        Abort resumable upload, minio drops the received parts
+        :param session_id: upload session id
+        """
+        ResumableUploads().abort(session_id)
+
     def download_file_from_bucket(self, download_request: DownloadRequest) -> bytes:
         """
         Download file from minio s3 bucket
@@ -40,13 +183,208 @@ class S3APIService:
             object_name=download_request.object_name,
         )
 
+    def stat_file_from_bucket(self, download_request: DownloadRequest) -> ObjectInfo:
+        """
+        Read file metadata from minio s3 bucket
+        :param download_request: info about bucket/object names
+        :return: object info
+        """
+        return self.s3_service.stat_file(
+            bucket_name=download_request.bucket_name,
+            object_name=download_request.object_name,
+        )
+
+    def cached_file_from_bucket(
+        self, object_info: ObjectInfo
+    ) -> Optional[CachedObject]:
+        """
+        Look up file in the local object cache
+        :param object_info: current file metadata
+        :return: cached file, None if not cached
+        """
+        return self.s3_service.cached_file(object_info)
+
+    def stream_file_from_bucket(
+        self,
+        download_request: DownloadRequest,
+        byte_range: Optional[ByteRange] = None,
+        object_info: Optional[ObjectInfo] = None,
+    ) -> Union[ObjectStream, CoalescedStream]:
+        """
+        Open file from minio s3 bucket for streaming download
+        :param download_request: info about bucket/object names
+        :param byte_range: part of the file to download, whole file by default
+        :param object_info: file metadata, enables the object cache and coalescing
+        :return: object stream
+        """
+        return self.s3_service.stream_file(
+            bucket_name=download_request.bucket_name,
+            object_name=download_request.object_name,
+            byte_range=byte_range,
+            object_info=object_info,
+        )
+
+    def stream_ranges_from_bucket(
+        self,
+        download_request: DownloadRequest,
+        object_info: ObjectInfo,
+        ranges: List[ByteRange],
+    ) -> MultipartRangeStream:
+        """
+        Prepare multipart/byteranges stream over several parts of the file.
+        Nothing is fetched until the stream is iterated.
+        :param download_request: info about bucket/object names
+        :param object_info: file metadata
+        :param ranges: parts of the file to download
+        :return: multipart range stream
+        """
+        return MultipartRangeStream(
+            ranges=ranges,
+            size=object_info.size,
+            content_type=object_info.content_type,
+            open_range=lambda byte_range: self.stream_file_from_bucket(
+                download_request, byte_range=byte_range
+            ),
+        )
+
+    def stream_archive_from_bucket(
+        self, archive_request: ArchiveRequest
+    ) -> ArchiveStream:
+        """
+        Open archive of many files of minio s3 bucket for streaming download
+        :param archive_request: bucket name, prefix or object names and format
+        :return: archive stream
+        """
+        return self.s3_service.stream_archive(
+            bucket_name=archive_request.bucket_name,
+            archive_format=archive_request.archive_format,
+            prefix=archive_request.prefix,
+            object_names=archive_request.object_names,
+        )
+
+    def list_objects_of_bucket(self, list_request: ListRequest) -> ObjectListing:
+        """
+        List one page of files of minio s3 bucket
+        :param list_request: bucket name, prefix, delimiter and page position
+        :return: page of the listing
+        """
+        return self.s3_service.list_objects(
+            bucket_name=list_request.bucket_name,
+            prefix=list_request.prefix,
+            delimiter=list_request.delimiter,
+            start_after=list_request.start_after,
+            continuation_token=list_request.continuation_token,
+            max_keys=list_request.max_keys,
+        )
+
+    def stream_object_list_of_bucket(
+        self, list_request: ListRequest
+    ) -> ObjectListStream:
+        """
+        Open whole listing of minio s3 bucket for streaming as NDJSON
+        :param list_request: bucket name, prefix, delimiter and start position
+        :return: listing stream
+        """
+        return self.s3_service.stream_object_list(
+            bucket_name=list_request.bucket_name,
+            prefix=list_request.prefix,
+            delimiter=list_request.delimiter,
+            start_after=list_request.start_after,
+            continuation_token=list_request.continuation_token,
+        )
+
+    def presign_download_from_bucket(
+        self, download_request: DownloadRequest
+    ) -> PresignedUrl:
+        """
+        Sign url to download file directly from minio s3 bucket
+        :param download_request: info about bucket/object names
+        :return: presigned GET url
+        """
+        return self.s3_service.presign_download(
+            bucket_name=download_request.bucket_name,
+            object_name=download_request.object_name,
+        )
+
+    def presign_upload_to_bucket(
+        self, upload_request: PresignUploadRequest
+    ) -> PresignedPost:
+        """
+        Sign form to upload file directly to minio s3 bucket
+        :param upload_request: info about bucket/object names and file size
+        :return: presigned POST form accepting files up to the requested size
+        """
+        return self.s3_service.presign_upload(
+            bucket_name=upload_request.bucket_name,
+            object_name=upload_request.object_name,
+            size=upload_request.size,
+            content_type=upload_request.content_type,
+        )
+
+    def presign_multipart_upload_to_bucket(
+        self, upload_request: PresignUploadRequest
+    ) -> MultipartUploadPlan:
+        """
+        Start multipart upload with presigned part urls, kept as an upload
+        session until it is completed or aborted
+        :param upload_request: info about bucket/object names and file size
+        :return: multipart upload plan
+        """
+        upload_plan = self.s3_service.presign_multipart_upload(
+            bucket_name=upload_request.bucket_name,
+            object_name=upload_request.object_name,
+            size=upload_request.size,
+            content_type=upload_request.content_type,
+        )
+        ResumableUploads().track_presigned(
+            upload_plan, upload_request.size, upload_request.content_type
+        )
+        return upload_plan
+
+    def complete_multipart_upload_to_bucket(
+        self, complete_request: CompleteMultipartRequest
+    ) -> UploadResult:
+        """
+        Complete multipart upload whose parts were sent to minio directly
+        :param complete_request: info about bucket/object names and upload id
+        :return: upload result
+        """
+        try:
+            upload_result = self.s3_service.complete_multipart_upload(
+                bucket_name=complete_request.bucket_name,
+                object_name=complete_request.object_name,
+                upload_id=complete_request.upload_id,
+                max_bytes=UploadSizeLimits().for_bucket(complete_request.bucket_name),
+            )
+        except S3ProxyServiceException as e:
+            if e.key == UploadError.FILE_TOO_LARGE:
+                # the multipart upload was aborted
+                ResumableUploads().untrack_presigned(complete_request.upload_id)
+            raise
+        ResumableUploads().untrack_presigned(complete_request.upload_id)
+        return upload_result
+
+    def abort_multipart_upload_to_bucket(
+        self, complete_request: CompleteMultipartRequest
+    ):
+        """
+        Abort multipart upload whose parts were sent to minio directly
+        :param complete_request: info about bucket/object names and upload id
+        """
+        ResumableUploads().untrack_presigned(complete_request.upload_id)
+        self.s3_service.abort_multipart_upload(
+            bucket_name=complete_request.bucket_name,
+            object_name=complete_request.object_name,
+            upload_id=complete_request.upload_id,
+        )
+
 
 router = APIRouter(
     prefix="/api", tags=["s3_api"], responses={404: {"description": "Not found"}}
 )
 
-MAX_UPLOAD_SIZE: str = os.getenv("MAX_UPLOAD_FILE_SIZE_MB", "100")
-KB_IN_MB: int = 1024
+KB: int = 1024
+DEFAULT_UPLOAD_STREAM_BUFFER_KB: str = "1024"
 
 
 @router.get(
@@ -93,25 +431,404 @@ KB_IN_MB: int = 1024
 async def download_file_from_bucket(
     bucket_name: Annotated[Union[Optional[str]], Path(min_length=1)],
     object_name: Annotated[Union[Optional[str]], Path(min_length=1)],
+    range_header: Annotated[Optional[str], Header(alias="Range")] = None,
+    if_range: Annotated[Optional[str], Header()] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    if_modified_since: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None,
     s3_api_service: S3APIService = Depends(S3APIService),
 ):
     """
-    API method to download file from minio s3 bucket
+    API method to download file from minio s3 bucket.
+    Sends ETag/Last-Modified/Cache-Control and answers If-None-Match and
+    If-Modified-Since with 304 Not Modified.
+    Supports partial downloads with Range/If-Range headers, several ranges
+    are returned as multipart/byteranges.
+    Whole file downloads of compressible files are compressed with an encoding
+    of Accept-Encoding if compression is enabled. Files stored compressed are
+    sent as stored to clients accepting their encoding and decompressed for
+    the others.
     """
     s3_api_service.logger.debug(
         f"Received file download request (bucket_name={bucket_name}, object_name={object_name}."
     )
+    download_request = DownloadRequest(bucket_name=bucket_name, object_name=object_name)
+    object_info = await S3Executor().run(
+        s3_api_service.stat_file_from_bucket, download_request=download_request
+    )
+    headers = _object_headers(object_info)
+    codec = _download_codec(object_info, accept_encoding, range_header, headers)
+    if is_not_modified(object_info, if_none_match, if_modified_since):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+    if "Content-Encoding" in headers:
+        Metrics().encoded_downloads.inc(
+            (
+                headers["Content-Encoding"],
+                "stored" if codec is None else "compressed",
+            )
+        )
+
+    if codec is None and range_header and if_range_matches(if_range, object_info):
+        ranges = parse_range_header(range_header, object_info.size)
+        if ranges is not None:
+            return await _partial_content_response(
+                s3_api_service, download_request, object_info, ranges, headers
+            )
+
+    cached_object = await S3Executor().run(
+        s3_api_service.cached_file_from_bucket, object_info
+    )
+    if cached_object is not None and (codec is None or cached_object.data):
+        if codec is not None:
+            cached_object = CachedObject(
+                cached_object.object_info,
+                data=await S3Executor().run(transcode, cached_object.data, codec),
+            )
+        return _cached_object_response(cached_object, headers)
+    if cached_object is not None:
+        cached_object.close()
+
+    object_stream = await S3Executor().run(
+        s3_api_service.stream_file_from_bucket,
+        download_request=download_request,
+        object_info=object_info,
+    )
+    if codec is not None:
+        object_stream = TranscodedStream(object_stream, codec)
+    return ObjectStreamResponse(object_stream=object_stream, headers=headers)
+
+
+ARCHIVE_RESPONSES: dict = {
+    200: {
+        "description": "Archive of the files, streamed while it is written",
+        "content": {
+            "application/x-tar": {"example": "The tar archive will be downloaded."},
+            "application/zip": {"example": "The zip archive will be downloaded."},
+        },
+    },
+    400: {
+        "description": "Incorrect bucket or object names, or nothing to archive",
+        "content": {
+            "application/json": {
+                "example": {
+                    "message": "Archive request needs a prefix or a list of object names."
+                }
+            }
+        },
+    },
+    404: {
+        "description": "Bucket doesn't exist",
+        "content": {
+            "application/json": {
+                "example": {
+                    "message": "S3 operation failed; code: NoSuchBucket, message: "
+                    "The specified bucket does not exist"
+                }
+            }
+        },
+    },
+}
+
+
+@router.get("/archive/{bucket_name}", tags=["download"], responses=ARCHIVE_RESPONSES)
+async def download_archive(
+    bucket_name: Annotated[str, Path(min_length=1)],
+    prefix: Annotated[Optional[str], Query()] = None,
+    object_name: Annotated[Optional[List[str]], Query()] = None,
+    archive_format: Annotated[str, Query(alias="format")] = "tar",
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Downloads all files with the prefix, or the files listed by repeated
+    object_name parameters, as one tar or zip archive. The archive is streamed
+    while files are fetched, a few of them ahead at the same time.
+    """
+    return await _archive_response(
+        s3_api_service, bucket_name, prefix, object_name, archive_format
+    )
+
+
+@router.post("/archive/{bucket_name}", tags=["download"], responses=ARCHIVE_RESPONSES)
+async def download_archive_of_objects(
+    bucket_name: Annotated[str, Path(min_length=1)],
+    prefix: Annotated[Optional[str], Body()] = None,
+    object_names: Annotated[Optional[List[str]], Body()] = None,
+    archive_format: Annotated[str, Body(alias="format")] = "tar",
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Same as GET /archive/{bucket_name} for object name lists too long for a URL,
+    e.g. {"object_names": ["a.txt", "b/c.txt"], "format": "zip"}
+    """
+    return await _archive_response(
+        s3_api_service, bucket_name, prefix, object_names, archive_format
+    )
+
+
+async def _archive_response(
+    s3_api_service: S3APIService,
+    bucket_name: str,
+    prefix: Optional[str],
+    object_names: Optional[List[str]],
+    archive_format: str,
+) -> ObjectStreamResponse:
+    """
+    Builds streaming archive response
+    :param s3_api_service: s3 api service
+    :param bucket_name: minio s3 bucket name
+    :param prefix: archive files whose name starts with it
+    :param object_names: archive these files
+    :param archive_format: "tar" or "zip"
+    :return: streaming response
+    """
+    s3_api_service.logger.debug(
+        f"Received archive download request (bucket_name={bucket_name}, prefix={prefix})."
+    )
     try:
-        download_request = DownloadRequest(
-            bucket_name=bucket_name, object_name=object_name
+        archive_request = ArchiveRequest(
+            bucket_name=bucket_name,
+            prefix=prefix,
+            object_names=object_names,
+            format=archive_format,
         )
-        file_bytes = s3_api_service.download_file_from_bucket(
-            download_request=download_request
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    archive_stream = await S3Executor().run(
+        s3_api_service.stream_archive_from_bucket, archive_request
+    )
+    return ObjectStreamResponse(
+        object_stream=archive_stream,
+        headers={
+            "Content-Disposition": f'attachment; filename="{archive_request.file_name}"'
+        },
+    )
+
+
+@router.get(
+    "/list/{bucket_name}",
+    tags=["list"],
+    responses={
+        200: {
+            "description": "Page of the listing, or the whole listing as NDJSON",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "bucket_name": "bucket-name",
+                        "objects": [
+                            {
+                                "object_name": "logs/a.txt",
+                                "size": 12,
+                                "etag": "5d41402abc4b2a76b9719d911017c592",
+                                "last_modified": "2024-09-20T10:00:00+00:00",
+                            }
+                        ],
+                        "prefixes": ["logs/2024/"],
+                        "is_truncated": True,
+                        "next_continuation_token": "1QMoxbWluaW8...",
+                    }
+                },
+                "application/x-ndjson": {
+                    "example": '{"object_name": "logs/a.txt", "size": 12, ...}\n'
+                    '{"prefix": "logs/2024/"}\n'
+                },
+            },
+        },
+        400: {
+            "description": "Incorrect bucket name or listing parameters",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "message": "Incorrect value provided for bucket name. Please, verify minio bucket name rules."
+                    }
+                }
+            },
+        },
+        404: {
+            "description": "Bucket doesn't exist",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "message": "S3 operation failed; code: NoSuchBucket, message: "
+                        "The specified bucket does not exist"
+                    }
+                }
+            },
+        },
+    },
+)
+async def list_bucket(
+    bucket_name: Annotated[str, Path(min_length=1)],
+    prefix: Annotated[Optional[str], Query()] = None,
+    delimiter: Annotated[Optional[str], Query()] = None,
+    start_after: Annotated[Optional[str], Query(alias="start-after")] = None,
+    continuation_token: Annotated[
+        Optional[str], Query(alias="continuation-token")
+    ] = None,
+    max_keys: Annotated[int, Query(alias="max-keys")] = 1000,
+    list_format: Annotated[str, Query(alias="format")] = "json",
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Lists files of the bucket whose name starts with prefix, after start-after.
+    With a delimiter, names are rolled up to common prefixes at its first
+    occurrence after the prefix, e.g. delimiter=/ lists one "folder".
+    format=json returns a page of up to max-keys entries (at most 1000); the
+    next page is requested with its next_continuation_token.
+    format=ndjson streams the whole listing, one line per file or common
+    prefix, fetched from minio page by page while it is sent.
+    """
+    s3_api_service.logger.debug(
+        f"Received list request (bucket_name={bucket_name}, prefix={prefix})."
+    )
+    try:
+        list_request = ListRequest(
+            bucket_name=bucket_name,
+            prefix=prefix,
+            delimiter=delimiter,
+            start_after=start_after,
+            continuation_token=continuation_token,
+            max_keys=max_keys,
+            format=list_format,
         )
-        return Response(content=file_bytes)
     except ValidationError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    if list_request.list_format == "ndjson":
+        object_list_stream = await S3Executor().run(
+            s3_api_service.stream_object_list_of_bucket, list_request
+        )
+        return ObjectStreamResponse(object_stream=object_list_stream)
+
+    object_listing = await S3Executor().run(
+        s3_api_service.list_objects_of_bucket, list_request
+    )
+    return object_listing.to_response()
+
+
+def _object_headers(object_info: ObjectInfo) -> dict:
+    """
+    Validators and caching headers sent with the file
+    :param object_info: file metadata
+    :return: headers
+    """
+    headers = {"Accept-Ranges": "bytes"}
+    if object_info.http_etag:
+        headers["ETag"] = object_info.http_etag
+    if object_info.http_last_modified:
+        headers["Last-Modified"] = object_info.http_last_modified
+    cache_control = CacheControlPolicy().for_bucket(object_info.bucket_name)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def _download_codec(
+    object_info: ObjectInfo,
+    accept_encoding: Optional[str],
+    range_header: Optional[str],
+    headers: dict,
+) -> Optional[Codec]:
+    """
+    Picks how the file is encoded for the client and sets the headers for it.
+    A file stored compressed is sent as stored if the client accepts its
+    encoding, ranges included, and decompressed whole otherwise. A file stored
+    with a coding that can't be decompressed is sent as stored with its
+    Content-Encoding. Other files are compressed if they are compressible,
+    the client accepts an enabled encoding and no range is requested.
+    :param object_info: file metadata
+    :param accept_encoding: Accept-Encoding header value
+    :param range_header: Range header value
+    :param headers: headers sent with the file, updated
+    :return: codec the file is sent through, None to send it as stored
+    """
+    policy = CompressionPolicy()
+    stored_encoding = object_info.content_encoding
+    if stored_encoding and not policy.supports(stored_encoding):
+        headers["Content-Encoding"] = stored_encoding
+        return None
+    if stored_encoding:
+        headers["Vary"] = "Accept-Encoding"
+        if policy.accepts(accept_encoding, stored_encoding):
+            headers["Content-Encoding"] = stored_encoding
+            return None
+        codec = decompressor(stored_encoding, Operation.DECOMPRESS_DOWNLOAD)
+    else:
+        if not policy.enabled or not policy.is_compressible(
+            object_info.content_type, object_info.size
+        ):
+            return None
+        headers["Vary"] = "Accept-Encoding"
+        encoding = policy.negotiate(accept_encoding)
+        if encoding is None or range_header:
+            return None
+        headers["Content-Encoding"] = encoding
+        codec = compressor(encoding, Operation.COMPRESS_DOWNLOAD)
+    headers["Accept-Ranges"] = "none"
+    if object_info.http_etag:
+        headers["ETag"] = f"W/{object_info.http_etag}"
+    return codec
+
+
+def _cached_object_response(cached_object: CachedObject, headers: dict) -> Response:
+    """
+    Builds response from the local object cache, disk tier is streamed from
+    the file opened by the cache hit
+    :param cached_object: cached file
+    :param headers: headers sent with the file
+    :return: response
+    """
+    media_type = cached_object.object_info.content_type
+    if cached_object.data is not None:
+        return Response(
+            content=cached_object.data, media_type=media_type, headers=headers
+        )
+    return ObjectStreamResponse(
+        object_stream=CachedFileStream(cached_object),
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+async def _partial_content_response(
+    s3_api_service: S3APIService,
+    download_request: DownloadRequest,
+    object_info: ObjectInfo,
+    ranges: List[ByteRange],
+    headers: dict,
+) -> ObjectStreamResponse:
+    """
+    Builds 206 response, only requested ranges are fetched from minio
+    :param s3_api_service: s3 api service
+    :param download_request: info about bucket/object names
+    :param object_info: file metadata
+    :param ranges: satisfiable ranges of the file
+    :param headers: headers sent with the file
+    :return: streaming response
+    """
+    if len(ranges) == 1:
+        object_stream = await S3Executor().run(
+            s3_api_service.stream_file_from_bucket,
+            download_request=download_request,
+            byte_range=ranges[0],
+        )
+        return ObjectStreamResponse(
+            object_stream=object_stream,
+            status_code=HTTP_206_PARTIAL_CONTENT,
+            headers={
+                **headers,
+                "Content-Range": ranges[0].content_range(object_info.size),
+            },
+        )
+
+    return ObjectStreamResponse(
+        object_stream=s3_api_service.stream_ranges_from_bucket(
+            download_request, object_info, ranges
+        ),
+        status_code=HTTP_206_PARTIAL_CONTENT,
+        headers=headers,
+    )
+
 
 @router.post(
     "/upload",
@@ -171,12 +888,773 @@ async def upload_file(
             bucket_name=bucket_name, object_name=object_name, file=file
         )
 
-        if file.size.real / KB_IN_MB > int(MAX_UPLOAD_SIZE):
+        if file.size > UploadSizeLimits().for_bucket(upload_request.bucket_name):
             raise S3ProxyServiceException(
-                f"Upload file size can't be more then {MAX_UPLOAD_SIZE} MB(s)."
+                UploadError.FILE_TOO_LARGE,
+                status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             )
 
-        return s3_api_service.upload_file_to_bucket(upload_request).to_response()
+        upload_result = await S3Executor().run(
+            s3_api_service.upload_file_to_bucket, upload_request
+        )
+        return upload_result.to_response()
+
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
+@router.post(
+    "/upload/stream/{bucket_name}/{object_name}",
+    tags=["upload"],
+    responses={
+        200: {
+            "description": "Upload success",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "bucket_name": "new-bucket",
+                        "object_name": "picture.jpg",
+                    }
+                }
+            },
+        },
+        400: {
+            "description": "Incorrect bucket name or no file in the request body",
+            "content": {
+                "application/json": {
+                    "example": {"message": "Request body doesn't contain a file."}
+                }
+            },
+        },
+        413: {
+            "description": "File is too large",
+            "content": {
+                "application/json": {
+                    "example": {"message": "Upload file is larger than allowed."}
+                }
+            },
+        },
+    },
+)
+async def upload_file_stream(
+    request: Request,
+    bucket_name: Annotated[str, Path(min_length=1)],
+    object_name: Annotated[str, Path(min_length=1)],
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Uploads file to minio s3 bucket while the request body is received,
+    without spooling it to disk. Accepts multipart/form-data with a "file"
+    field or the file itself as the request body.
+    """
+    s3_api_service.logger.debug(
+        f"Received streaming upload request (bucket_name={bucket_name}, object_name={object_name})."
+    )
+    try:
+        upload_request = StreamUploadRequest(
+            bucket_name=bucket_name, object_name=object_name
+        )
     except ValidationError as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+    file_stream = MultipartFileStream(request)
+    content_type = await file_stream.open()
+    pipe = _upload_pipe()
+    upload_result = await _feed_upload(
+        S3Executor().run(
+            s3_api_service.upload_stream_to_bucket, upload_request, pipe, content_type
+        ),
+        pipe,
+        file_stream.chunks(),
+        UploadSizeLimits().for_bucket(upload_request.bucket_name),
+    )
+    return upload_result.to_response()
+
+
+@router.post(
+    "/upload/batch/{bucket_name}",
+    tags=["upload"],
+    responses={
+        200: {
+            "description": "Batch processed, files that failed are listed with the error",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "bucket_name": "new-bucket",
+                        "uploaded": 1,
+                        "failed": 1,
+                        "results": [
+                            {
+                                "object_name": "images/picture.jpg",
+                                "etag": "9b2cf535f27731c974343645a3985328",
+                            },
+                            {
+                                "object_name": "images/large.jpg",
+                                "error": "Upload file is larger than allowed.",
+                            },
+                        ],
+                    }
+                }
+            },
+        },
+        400: {
+            "description": "Incorrect bucket name or invalid archive",
+            "content": {
+                "application/json": {
+                    "example": {"message": "Request body is not a valid archive."}
+                }
+            },
+        },
+        413: {
+            "description": "Batch is too large",
+            "content": {
+                "application/json": {
+                    "example": {"message": "Upload file is larger than allowed."}
+                }
+            },
+        },
+        415: {
+            "description": "Unsupported request body",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "message": "Batch upload accepts multipart/form-data, tar or zip request body."
+                    }
+                }
+            },
+        },
+    },
+)
+async def upload_batch(
+    request: Request,
+    bucket_name: Annotated[str, Path(min_length=1)],
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Uploads many small files to minio s3 bucket in one request. The body is
+    multipart/form-data with one part per file, named by its file name, or a
+    tar (optionally compressed) or zip archive, named by member paths.
+    Multipart and tar bodies are unpacked while they are received.
+    """
+    s3_api_service.logger.debug(
+        f"Received batch upload request (bucket_name={bucket_name})."
+    )
+    validate_bucket_name(bucket_name)
+    read_entries = batch_reader(request.headers.get("Content-Type", ""))
+    limits = UploadSizeLimits()
+    pipe = _upload_pipe()
+    upload_result = await _feed_upload(
+        S3Executor().run(
+            s3_api_service.upload_batch_to_bucket,
+            bucket_name,
+            read_entries(pipe, limits.for_batch_file(bucket_name)),
+        ),
+        pipe,
+        request.stream(),
+        limits.batch_max_bytes,
+    )
+    return upload_result.to_response()
+
+
+UPLOAD_SESSION_EXAMPLE: dict = {
+    "session_id": "dGhpcyBpcyBhbiB1cGxvYWQgc2Vzc2lvbg",
+    "bucket_name": "new-bucket",
+    "object_name": "video.mp4",
+    "size": 20971520,
+    "part_size": 8388608,
+    "part_count": 3,
+    "received_bytes": 8388608,
+    "parts": [
+        {"part_number": 1, "etag": "9b2cf535f27731c974343645a3985328", "size": 8388608}
+    ],
+    "missing_parts": [2, 3],
+    "expires_at": "2024-06-02T12:00:00+00:00",
+}
+
+UPLOAD_SESSION_NOT_FOUND_RESPONSE: dict = {
+    "description": "Session does not exist",
+    "content": {
+        "application/json": {
+            "example": {
+                "message": "Upload session does not exist, it was completed, aborted or expired."
+            }
+        }
+    },
+}
+
+
+@router.post(
+    "/upload/sessions",
+    tags=["upload"],
+    responses={
+        200: {
+            "description": "Started upload session",
+            "content": {
+                "application/json": {
+                    "example": {
+                        **UPLOAD_SESSION_EXAMPLE,
+                        "received_bytes": 0,
+                        "parts": [],
+                        "missing_parts": [1, 2, 3],
+                    }
+                }
+            },
+        },
+        400: {
+            "description": "Incorrect bucket or object name",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "message": "Incorrect value provided for bucket name. Please, verify minio bucket name rules."
+                    }
+                }
+            },
+        },
+        413: {
+            "description": "File is too large",
+            "content": {
+                "application/json": {
+                    "example": {"message": "Upload file is larger than allowed."}
+                }
+            },
+        },
+    },
+)
+async def create_upload_session(
+    bucket_name: Annotated[str, Body()],
+    object_name: Annotated[str, Body()],
+    size: Annotated[int, Body()],
+    content_type: Annotated[Optional[str], Body()] = None,
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Starts a resumable upload of a file of the given size, e.g.
+    {"bucket_name": "new-bucket", "object_name": "video.mp4", "size": 20971520}.
+    The client sends the parts of the file with
+    PUT /upload/sessions/{session_id}/parts/{part_number}, in any order and
+    again if one failed, and completes the upload with
+    POST /upload/sessions/{session_id}/complete. After a dropped connection
+    GET /upload/sessions/{session_id} tells which parts are still missing.
+    """
+    s3_api_service.logger.debug(
+        f"Received upload session request (bucket_name={bucket_name}, object_name={object_name})."
+    )
+    try:
+        session_request = UploadSessionRequest(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            size=size,
+            content_type=content_type,
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    session = await S3Executor().run(
+        s3_api_service.create_upload_session, session_request
+    )
+    return session.to_response()
+
+
+@router.get(
+    "/upload/sessions/{session_id}",
+    tags=["upload"],
+    responses={
+        200: {
+            "description": "Parts received so far",
+            "content": {"application/json": {"example": UPLOAD_SESSION_EXAMPLE}},
+        },
+        404: UPLOAD_SESSION_NOT_FOUND_RESPONSE,
+    },
+)
+async def get_upload_session(
+    session_id: str,
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Returns the parts of a resumable upload received so far and the missing ones
+    """
+    session = await S3Executor().run(s3_api_service.get_upload_session, session_id)
+    return session.to_response()
+
+
+@router.put(
+    "/upload/sessions/{session_id}/parts/{part_number}",
+    tags=["upload"],
+    responses={
+        200: {
+            "description": "Part received",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "part_number": 2,
+                        "etag": "9b2cf535f27731c974343645a3985328",
+                        "size": 8388608,
+                    }
+                }
+            },
+        },
+        400: {
+            "description": "Part number or size does not match the session",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "message": "Part number or size does not match the upload session."
+                    }
+                }
+            },
+        },
+        404: UPLOAD_SESSION_NOT_FOUND_RESPONSE,
+    },
+)
+async def upload_session_part(
+    request: Request,
+    session_id: str,
+    part_number: int,
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Uploads one part of a resumable upload, the request body holds bytes
+    [(part_number - 1) * part_size, part_number * part_size) of the file.
+    A part sent again replaces the earlier one. The body is received into a
+    buffer of the part size, which is sent to minio without another copy.
+    """
+    session = await S3Executor().run(s3_api_service.get_upload_session, session_id)
+    part_size = session.expected_part_size(part_number)
+    content_length = request.headers.get("Content-Length")
+    if part_size is None or (
+        content_length is not None and content_length != str(part_size)
+    ):
+        raise S3ProxyServiceException(UploadError.INVALID_PART)
+
+    data = bytearray(part_size)
+    received = 0
+    try:
+        async for chunk in request.stream():
+            if received + len(chunk) > part_size:
+                raise S3ProxyServiceException(UploadError.INVALID_PART)
+            data[received : received + len(chunk)] = chunk
+            received += len(chunk)
+    except ClientDisconnect:
+        raise S3ProxyServiceException(UploadError.INCOMPLETE_FILE)
+    if received != part_size:
+        raise S3ProxyServiceException(UploadError.INVALID_PART)
+    part = await S3Executor().run(
+        s3_api_service.upload_part_to_session, session, part_number, data
+    )
+    return part.to_response()
+
+
+@router.post(
+    "/upload/sessions/{session_id}/complete",
+    tags=["upload"],
+    responses={
+        200: {
+            "description": "Upload success",
+            "content": {
+                "application/json": {
+                    "example": {"bucket_name": "new-bucket", "object_name": "video.mp4"}
+                }
+            },
+        },
+        404: UPLOAD_SESSION_NOT_FOUND_RESPONSE,
+        409: {
+            "description": "Parts are missing",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "message": "Upload session is missing parts, upload every part before completing it."
+                    }
+                }
+            },
+        },
+    },
+)
+async def complete_upload_session(
+    session_id: str,
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Completes a resumable upload once every part was received
+    """
+    upload_result = await S3Executor().run(
+        s3_api_service.complete_upload_session, session_id
+    )
+    return upload_result.to_response()
+
+
+@router.delete(
+    "/upload/sessions/{session_id}",
+    tags=["upload"],
+    status_code=HTTP_204_NO_CONTENT,
+    responses={404: UPLOAD_SESSION_NOT_FOUND_RESPONSE},
+)
+async def abort_upload_session(
+    session_id: str,
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Aborts a resumable upload, minio drops the parts received so far
+    """
+    await S3Executor().run(s3_api_service.abort_upload_session, session_id)
+    return Response(status_code=HTTP_204_NO_CONTENT)
+
+
+def _upload_pipe() -> UploadPipe:
+    """
+    :return: pipe buffering UPLOAD_STREAM_BUFFER_KB of the request body
+    """
+    return UploadPipe(
+        max_buffered_bytes=int(
+            os.getenv("UPLOAD_STREAM_BUFFER_KB", DEFAULT_UPLOAD_STREAM_BUFFER_KB)
+        )
+        * KB
+    )
+
+
+async def _feed_upload(
+    upload_call, pipe: UploadPipe, chunks: AsyncIterator[bytes], max_upload_bytes: int
+):
+    """
+    Passes the received body to the upload reading the pipe in the executor
+    :param upload_call: coroutine of the upload
+    :param pipe: pipe the upload reads from
+    :param chunks: received body
+    :param max_upload_bytes: body size limit
+    :return: upload result
+    """
+    upload = asyncio.ensure_future(upload_call)
+    upload.add_done_callback(lambda _: pipe.abort())
+    try:
+        async for chunk in chunks:
+            if pipe.bytes_written + len(chunk) > max_upload_bytes:
+                raise S3ProxyServiceException(
+                    UploadError.FILE_TOO_LARGE,
+                    status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+            if not await pipe.write(chunk):
+                break
+        pipe.close()
+    except BaseException as e:
+        pipe.fail(e)
+        upload.add_done_callback(_discard_result)
+        raise
+
+    return await upload
+
+
+def _discard_result(task: asyncio.Future):
+    """
+    Retrieves the result of a task nobody awaits any more
+    :param task: finished task
+    """
+    if not task.cancelled():
+        task.exception()
+
+
+PRESIGN_RESPONSES: dict = {
+    400: {
+        "description": "Incorrect bucket or object name",
+        "content": {
+            "application/json": {
+                "example": {
+                    "message": "Incorrect value provided for bucket name. Please, verify minio bucket name rules."
+                }
+            }
+        },
+    },
+    403: {
+        "description": "Presigned URLs of this kind are not enabled for the bucket",
+        "content": {
+            "application/json": {
+                "example": {
+                    "message": "Presigned URLs of this kind are not issued for the bucket."
+                }
+            }
+        },
+    },
+}
+
+PRESIGNED_URL_EXAMPLE: dict = {
+    "method": "PUT",
+    "url": "http://localhost:9000/new-bucket/picture.jpg?X-Amz-Algorithm=AWS4-HMAC-SHA256&...",
+    "expires_at": "2024-06-01T12:15:00+00:00",
+}
+
+PRESIGNED_POST_EXAMPLE: dict = {
+    "method": "POST",
+    "url": "http://localhost:9000/new-bucket",
+    "fields": {
+        "key": "picture.jpg",
+        "x-amz-algorithm": "AWS4-HMAC-SHA256",
+        "x-amz-credential": "...",
+        "x-amz-date": "20240601T120000Z",
+        "policy": "...",
+        "x-amz-signature": "...",
+    },
+    "expires_at": "2024-06-01T12:15:00+00:00",
+}
+
+
+@router.get(
+    "/presign/download/{bucket_name}/{object_name}",
+    tags=["presign"],
+    responses={
+        **PRESIGN_RESPONSES,
+        200: {
+            "description": "URL to download the file from MinIO with",
+            "content": {
+                "application/json": {
+                    "example": {**PRESIGNED_URL_EXAMPLE, "method": "GET"}
+                }
+            },
+        },
+    },
+)
+async def presign_download(
+    bucket_name: Annotated[str, Path(min_length=1)],
+    object_name: Annotated[str, Path(min_length=1)],
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Returns presigned GET url of an existing file, the client downloads the
+    file from minio directly
+    """
+    s3_api_service.logger.debug(
+        f"Received presign download request (bucket_name={bucket_name}, object_name={object_name})."
+    )
+    download_request = _presign_request(
+        DownloadRequest,
+        PresignPolicy.DOWNLOAD,
+        bucket_name=bucket_name,
+        object_name=object_name,
+    )
+    presigned_url = await S3Executor().run(
+        s3_api_service.presign_download_from_bucket, download_request
+    )
+    return presigned_url.to_response()
+
+
+@router.post(
+    "/presign/upload/{bucket_name}/{object_name}",
+    tags=["presign"],
+    responses={
+        **PRESIGN_RESPONSES,
+        200: {
+            "description": "Form to upload the file to MinIO with",
+            "content": {"application/json": {"example": PRESIGNED_POST_EXAMPLE}},
+        },
+        413: {
+            "description": "File is too large",
+            "content": {
+                "application/json": {
+                    "example": {"message": "Upload file is larger than allowed."}
+                }
+            },
+        },
+    },
+)
+async def presign_upload(
+    bucket_name: Annotated[str, Path(min_length=1)],
+    object_name: Annotated[str, Path(min_length=1)],
+    size: Annotated[int, Body(embed=True)],
+    content_type: Annotated[Optional[str], Body(embed=True)] = None,
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Returns presigned POST form for a file of at most the given size, e.g.
+    {"size": 1024, "content_type": "text/plain"}, the client uploads the file
+    to minio directly by posting the fields and then the file as the "file"
+    field to the url. MinIO rejects larger files, so the size limits hold.
+    Files larger than a few hundred MB are better sent with a multipart
+    upload plan.
+    """
+    s3_api_service.logger.debug(
+        f"Received presign upload request (bucket_name={bucket_name}, object_name={object_name})."
+    )
+    upload_request = _presign_request(
+        PresignUploadRequest,
+        PresignPolicy.UPLOAD,
+        bucket_name=bucket_name,
+        object_name=object_name,
+        size=size,
+        content_type=content_type,
+    )
+    _check_upload_size(upload_request)
+    presigned_post = await S3Executor().run(
+        s3_api_service.presign_upload_to_bucket, upload_request
+    )
+    return presigned_post.to_response()
+
+
+@router.post(
+    "/presign/multipart/{bucket_name}/{object_name}",
+    tags=["presign"],
+    responses={
+        **PRESIGN_RESPONSES,
+        200: {
+            "description": "Started multipart upload with a URL per part",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "bucket_name": "new-bucket",
+                        "object_name": "video.mp4",
+                        "upload_id": "b7d1c2a4-...",
+                        "part_size": 8388608,
+                        "parts": [{"part_number": 1, **PRESIGNED_URL_EXAMPLE}],
+                    }
+                }
+            },
+        },
+        413: {
+            "description": "File is too large",
+            "content": {
+                "application/json": {
+                    "example": {"message": "Upload file is larger than allowed."}
+                }
+            },
+        },
+    },
+)
+async def presign_multipart_upload(
+    bucket_name: Annotated[str, Path(min_length=1)],
+    object_name: Annotated[str, Path(min_length=1)],
+    size: Annotated[int, Body()],
+    content_type: Annotated[Optional[str], Body()] = None,
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Starts a multipart upload of a file of the given size, e.g.
+    {"size": 1073741824, "content_type": "video/mp4"}. The client sends each
+    part to minio with its presigned PUT url, several at the same time if it
+    likes, then completes the upload with
+    POST /presign/multipart/{bucket_name}/{object_name}/complete.
+    """
+    s3_api_service.logger.debug(
+        f"Received presign multipart upload request (bucket_name={bucket_name}, object_name={object_name})."
+    )
+    upload_request = _presign_request(
+        PresignUploadRequest,
+        PresignPolicy.MULTIPART,
+        bucket_name=bucket_name,
+        object_name=object_name,
+        size=size,
+        content_type=content_type,
+    )
+    _check_upload_size(upload_request)
+    upload_plan = await S3Executor().run(
+        s3_api_service.presign_multipart_upload_to_bucket, upload_request
+    )
+    return upload_plan.to_response()
+
+
+@router.post(
+    "/presign/multipart/{bucket_name}/{object_name}/complete",
+    tags=["presign"],
+    responses={
+        **PRESIGN_RESPONSES,
+        200: {
+            "description": "Upload success",
+            "content": {
+                "application/json": {
+                    "example": {"bucket_name": "new-bucket", "object_name": "video.mp4"}
+                }
+            },
+        },
+        413: {
+            "description": "Uploaded parts are larger than allowed, the upload is aborted",
+            "content": {
+                "application/json": {
+                    "example": {"message": "Upload file is larger than allowed."}
+                }
+            },
+        },
+    },
+)
+async def complete_multipart_upload(
+    bucket_name: Annotated[str, Path(min_length=1)],
+    object_name: Annotated[str, Path(min_length=1)],
+    upload_id: Annotated[str, Body(embed=True)],
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Completes a presigned multipart upload, e.g. {"upload_id": "..."}, with
+    the parts minio received. The size limit of the bucket is checked again
+    against the uploaded parts.
+    """
+    s3_api_service.logger.debug(
+        f"Received complete multipart upload request (bucket_name={bucket_name}, object_name={object_name})."
+    )
+    complete_request = _presign_request(
+        CompleteMultipartRequest,
+        PresignPolicy.MULTIPART,
+        bucket_name=bucket_name,
+        object_name=object_name,
+        upload_id=upload_id,
+    )
+    upload_result = await S3Executor().run(
+        s3_api_service.complete_multipart_upload_to_bucket, complete_request
+    )
+    return upload_result.to_response()
+
+
+@router.delete(
+    "/presign/multipart/{bucket_name}/{object_name}",
+    tags=["presign"],
+    status_code=HTTP_204_NO_CONTENT,
+    responses=PRESIGN_RESPONSES,
+)
+async def abort_multipart_upload(
+    bucket_name: Annotated[str, Path(min_length=1)],
+    object_name: Annotated[str, Path(min_length=1)],
+    upload_id: Annotated[str, Query(min_length=1)],
+    s3_api_service: S3APIService = Depends(S3APIService),
+):
+    """
+    Aborts a presigned multipart upload, minio drops the parts received so far
+    """
+    s3_api_service.logger.debug(
+        f"Received abort multipart upload request (bucket_name={bucket_name}, object_name={object_name})."
+    )
+    complete_request = _presign_request(
+        CompleteMultipartRequest,
+        PresignPolicy.MULTIPART,
+        bucket_name=bucket_name,
+        object_name=object_name,
+        upload_id=upload_id,
+    )
+    await S3Executor().run(
+        s3_api_service.abort_multipart_upload_to_bucket, complete_request
+    )
+    return Response(status_code=HTTP_204_NO_CONTENT)
+
+
+def _presign_request(request_type: type, route: str, **fields):
+    """
+    Validates presign request and checks presigned URLs of the route are
+    enabled for the bucket
+    :param request_type: request model
+    :param route: "download", "upload" or "multipart"
+    :param fields: request fields
+    :return: validated request
+    """
+    try:
+        request = request_type(**fields)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not PresignPolicy().is_enabled(request.bucket_name, route):
+        raise S3ProxyServiceException(
+            PresignError.ROUTE_DISABLED, status_code=HTTP_403_FORBIDDEN
+        )
+    return request
+
+
+def _check_upload_size(upload_request: PresignUploadRequest):
+    """
+    Rejects presigned upload of a file larger than the bucket allows
+    :param upload_request: info about bucket/object names and file size
+    """
+    if upload_request.size > UploadSizeLimits().for_bucket(upload_request.bucket_name):
+        raise S3ProxyServiceException(
+            UploadError.FILE_TOO_LARGE,
+            status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
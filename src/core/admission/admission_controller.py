@@ -0,0 +1,275 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from starlette.status import (
+    HTTP_429_TOO_MANY_REQUESTS,
+    HTTP_503_SERVICE_UNAVAILABLE,
+)
+
+from src.core.common.singleton import Singleton
+from src.core.config.admission_limits import AdmissionLimits, RateLimit
+from src.core.exceptions.error_codes import AdmissionError
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.metrics.metrics import Metrics
+
+
+class RequestKind:
+    UPLOAD = "upload"
+    DOWNLOAD = "download"
+    OTHER = "other"
+
+
+class RejectReason:
+    IP_RATE = "ip_rate"
+    API_KEY_RATE = "api_key_rate"
+    BUCKET_RATE = "bucket_rate"
+    UPLOAD_CONCURRENCY = "upload_concurrency"
+    DOWNLOAD_CONCURRENCY = "download_concurrency"
+    UPLOAD_BYTES_IN_FLIGHT = "upload_bytes_in_flight"
+
+
+class RateLimiter:
+    """
+    Token bucket per client key. Only the RATE_LIMIT_MAX_CLIENTS most recently
+    seen keys are kept; a dropped key starts again with a full bucket, so the
+    bound can only make the limit more lenient.
+    """
+
+    def __init__(self, rate_limit: RateLimit, max_keys: int):
+        self.per_second = rate_limit.per_second
+        self.burst = rate_limit.burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, now: float) -> float:
+        """
+        Takes a token of the key
+        :param key: client key
+        :param now: monotonic time
+        :return: 0 if the request is admitted, else seconds until a token is available
+        """
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.burst, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(
+                    self.burst, bucket[0] + (now - bucket[1]) * self.per_second
+                )
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / self.per_second
+
+
+class Admission:
+    """
+    Slot of an admitted request, released once the request is done
+    """
+
+    __slots__ = ("controller", "kind", "reserved_bytes", "received_bytes")
+
+    def __init__(
+        self, controller: "AdmissionController", kind: str, reserved_bytes: int
+    ):
+        self.controller = controller
+        self.kind = kind
+        self.reserved_bytes = reserved_bytes
+        self.received_bytes = 0
+
+    def receive(self, size: int):
+        """
+        Counts request body bytes, bodies longer than announced grow the reservation
+        :param size: bytes received
+        """
+        self.received_bytes += size
+        if self.received_bytes > self.reserved_bytes:
+            self.controller.reserve_bytes(self.received_bytes - self.reserved_bytes)
+            self.reserved_bytes = self.received_bytes
+
+    def release(self):
+        self.controller.release(self)
+
+
+class AdmissionController(metaclass=Singleton):
+    """
+    Decides whether a request is processed or rejected right away: 429 Too
+    Many Requests when the client, API key or bucket exceeds its rate limit,
+    503 Service Unavailable when the uploads or downloads in flight or the
+    upload bytes in flight are at their limit. Both come with Retry-After.
+    Rejecting is cheap and bounded, unlike queueing, so a burst of large
+    uploads can't exhaust memory, temp disk and the MinIO connections the
+    other clients need.
+    An upload larger than the bytes in flight budget is still admitted when no
+    other upload is in flight, so it can't be rejected forever.
+    """
+
+    def __init__(self):
+        self.limits = AdmissionLimits()
+        self.rate_limiters: List[Tuple[str, str, RateLimiter]] = [
+            (key_name, reason, RateLimiter(rate_limit, self.limits.max_clients))
+            for key_name, reason, rate_limit in (
+                ("ip", RejectReason.IP_RATE, self.limits.ip_rate),
+                ("api_key", RejectReason.API_KEY_RATE, self.limits.api_key_rate),
+                ("bucket", RejectReason.BUCKET_RATE, self.limits.bucket_rate),
+            )
+            if rate_limit is not None
+        ]
+        self.in_flight: Dict[str, int] = {
+            RequestKind.UPLOAD: 0,
+            RequestKind.DOWNLOAD: 0,
+        }
+        self.max_in_flight: Dict[str, int] = {
+            RequestKind.UPLOAD: self.limits.max_uploads,
+            RequestKind.DOWNLOAD: self.limits.max_downloads,
+        }
+        self.upload_bytes_in_flight = 0
+        self._lock = threading.Lock()
+        self.__publish_limits()
+
+    @property
+    def rate_limited_keys(self) -> List[str]:
+        """
+        :return: client keys rate limits are applied by, e.g. "ip"
+        """
+        return [key_name for key_name, _, _ in self.rate_limiters]
+
+    def admit(
+        self,
+        kind: str,
+        client_keys: Dict[str, Optional[str]],
+        content_length: Optional[int] = None,
+    ) -> Admission:
+        """
+        :param kind: upload, download or other request
+        :param client_keys: client address, API key and bucket of the request,
+        None where the request has none
+        :param content_length: announced request body size
+        :return: admission to release once the request is done
+        """
+        now = time.monotonic()
+        for key_name, reason, rate_limiter in self.rate_limiters:
+            key = client_keys.get(key_name)
+            if key is None:
+                continue
+            wait_seconds = rate_limiter.acquire(key, now)
+            if wait_seconds:
+                raise self.__reject(
+                    reason,
+                    HTTP_429_TOO_MANY_REQUESTS,
+                    max(1, math.ceil(wait_seconds)),
+                    kind,
+                )
+
+        if kind == RequestKind.OTHER:
+            return Admission(self, kind, 0)
+        reserved_bytes = (content_length or 0) if kind == RequestKind.UPLOAD else 0
+        with self._lock:
+            max_in_flight = self.max_in_flight[kind]
+            if max_in_flight and self.in_flight[kind] >= max_in_flight:
+                reason = (
+                    RejectReason.UPLOAD_CONCURRENCY
+                    if kind == RequestKind.UPLOAD
+                    else RejectReason.DOWNLOAD_CONCURRENCY
+                )
+            elif (
+                reserved_bytes
+                and self.limits.max_upload_bytes_in_flight
+                and self.upload_bytes_in_flight
+                and self.upload_bytes_in_flight + reserved_bytes
+                > self.limits.max_upload_bytes_in_flight
+            ):
+                reason = RejectReason.UPLOAD_BYTES_IN_FLIGHT
+            else:
+                reason = None
+                self.in_flight[kind] += 1
+                self.upload_bytes_in_flight += reserved_bytes
+        if reason is not None:
+            raise self.__reject(
+                reason,
+                HTTP_503_SERVICE_UNAVAILABLE,
+                self.limits.retry_after_seconds,
+                kind,
+            )
+        metrics = Metrics()
+        metrics.admission_in_flight.inc((kind,))
+        if reserved_bytes:
+            metrics.upload_bytes_in_flight.inc((), reserved_bytes)
+        return Admission(self, kind, reserved_bytes)
+
+    def reserve_bytes(self, size: int):
+        """
+        :param size: upload body bytes received beyond the announced size
+        """
+        with self._lock:
+            self.upload_bytes_in_flight += size
+        Metrics().upload_bytes_in_flight.inc((), size)
+
+    def release(self, admission: Admission):
+        if admission.kind == RequestKind.OTHER:
+            return
+        with self._lock:
+            self.in_flight[admission.kind] -= 1
+            self.upload_bytes_in_flight -= admission.reserved_bytes
+        metrics = Metrics()
+        metrics.admission_in_flight.dec((admission.kind,))
+        if admission.reserved_bytes:
+            metrics.upload_bytes_in_flight.dec((), admission.reserved_bytes)
+
+    @staticmethod
+    def __reject(
+        reason: str, status_code: int, retry_after_seconds: int, kind: str
+    ) -> S3ProxyServiceException:
+        """
+        :param reason: why the request is rejected, metrics label
+        :param status_code: 429 or 503
+        :param retry_after_seconds: Retry-After header value
+        :param kind: upload, download or other request
+        :return: exception rejecting the request
+        """
+        Metrics().admission_rejections.inc((reason,))
+        headers = {"Retry-After": str(retry_after_seconds)}
+        if kind == RequestKind.UPLOAD:
+            # the body is not read, the connection can't be reused
+            headers["Connection"] = "close"
+        return S3ProxyServiceException(
+            (
+                AdmissionError.RATE_LIMITED
+                if status_code == HTTP_429_TOO_MANY_REQUESTS
+                else AdmissionError.OVERLOADED
+            ),
+            status_code=status_code,
+            headers=headers,
+        )
+
+    def __publish_limits(self):
+        """
+        Exposes the configured limits as metrics, 0 where unlimited
+        """
+        limit = Metrics().admission_limit
+        limit.set(("max_concurrent_uploads",), self.limits.max_uploads)
+        limit.set(("max_concurrent_downloads",), self.limits.max_downloads)
+        limit.set(
+            ("max_upload_bytes_in_flight",), self.limits.max_upload_bytes_in_flight
+        )
+        for key_name, rate_limit in (
+            ("ip", self.limits.ip_rate),
+            ("api_key", self.limits.api_key_rate),
+            ("bucket", self.limits.bucket_rate),
+        ):
+            limit.set(
+                (f"{key_name}_rate_per_second",),
+                rate_limit.per_second if rate_limit else 0,
+            )
+            limit.set(
+                (f"{key_name}_rate_burst",), rate_limit.burst if rate_limit else 0
+            )
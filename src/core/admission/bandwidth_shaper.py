@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.core.common.singleton import Singleton
+from src.core.config.bandwidth_limits import BandwidthLimits
+from src.core.metrics.metrics import Metrics
+
+MAX_IDLE_LIMITERS: int = 10000
+
+
+class Direction:
+    DOWNLOAD = "download"
+    UPLOAD = "upload"
+
+
+class ByteRateLimiter:
+    """
+    Caps a byte rate with the generic cell rate algorithm: every chunk
+    reserves its transmission time after the ones reserved before it and
+    waits until that time is less than burst_bytes worth of time ahead.
+    Reservations are served first come first served, and as a stream only
+    reserves its next chunk once the previous one is sent, the streams sharing
+    a limiter take turns chunk by chunk and each gets a fair share of the
+    rate, the unused share of idle streams going to the busy ones.
+    """
+
+    def __init__(self, bytes_per_second: int, burst_bytes: int):
+        self.bytes_per_second = bytes_per_second
+        self.burst_seconds = burst_bytes / bytes_per_second
+        self.streams = 0
+        self._theoretical_arrival = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, size: int, now: float, since: Optional[float] = None) -> float:
+        """
+        :param size: bytes about to be sent or received
+        :param now: monotonic time
+        :param since: monotonic time the bytes have been waiting since, now if
+        None. Capacity left unused meanwhile may be taken.
+        :return: seconds to wait before moving the bytes
+        """
+        with self._lock:
+            self._theoretical_arrival = (
+                max(self._theoretical_arrival, now if since is None else since)
+                + size / self.bytes_per_second
+            )
+            return max(0.0, self._theoretical_arrival - self.burst_seconds - now)
+
+    def delay(self, size: int, now: float, since: Optional[float] = None) -> float:
+        """
+        :return: seconds reserve would wait, without reserving
+        """
+        arrival = max(self._theoretical_arrival, now if since is None else since)
+        return max(
+            0.0, arrival + size / self.bytes_per_second - self.burst_seconds - now
+        )
+
+    def idle(self, now: float) -> bool:
+        return self.streams == 0 and self._theoretical_arrival <= now
+
+
+class ShapedStream:
+    """
+    Request or response body paced by every cap that applies to it
+    """
+
+    def __init__(
+        self, shaper: "BandwidthShaper", direction: str, limiters: List[ByteRateLimiter]
+    ):
+        self.shaper = shaper
+        self.direction = direction
+        self.limiters = limiters
+
+    async def throttle(self, size: int):
+        """
+        Waits until the bytes fit in all caps. The caller holds the chunk
+        meanwhile and doesn't pull the next one, which is how the wait reaches
+        the client socket or the MinIO read, nothing is buffered ahead.
+        Caps are reserved one at a time, the strictest first, and the others
+        once its wait is over: reserving them all up front would hold their
+        capacity for bytes that are not moving yet.
+        :param size: bytes about to be sent or received
+        """
+        started = now = time.monotonic()
+        pending = list(self.limiters)
+        while pending:
+            limiter = max(
+                pending,
+                key=lambda pending_limiter: pending_limiter.delay(size, now, started),
+            )
+            pending.remove(limiter)
+            wait_seconds = limiter.reserve(size, now, started)
+            if wait_seconds > 0:
+                Metrics().throttled_seconds.inc((self.direction,), wait_seconds)
+                await asyncio.sleep(wait_seconds)
+                now = max(time.monotonic(), now + wait_seconds)
+
+    def close(self):
+        self.shaper.release(self)
+
+
+class BandwidthShaper(metaclass=Singleton):
+    """
+    Keeps a byte rate limiter per cap in use, see BandwidthLimits: one per
+    direction for the worker wide cap and one per direction and tenant, bucket
+    or route for the others. Limiters without streams are dropped once their
+    reservations are over and more than MAX_IDLE_LIMITERS are kept.
+    """
+
+    def __init__(self):
+        self.limits = BandwidthLimits()
+        self._limiters: Dict[Tuple[str, str, str], ByteRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def open(
+        self,
+        direction: str,
+        tenant: Optional[str],
+        bucket_name: Optional[str],
+        route: str,
+    ) -> Optional[ShapedStream]:
+        """
+        :param direction: download or upload
+        :param tenant: tenant of the request, None if unknown
+        :param bucket_name: bucket of the request, None if it has none
+        :param route: path template of the route
+        :return: stream to close once the body is done, None when no cap applies
+        """
+        caps = self.__caps(direction, tenant, bucket_name, route)
+        if not caps:
+            return None
+        with self._lock:
+            if len(self._limiters) > MAX_IDLE_LIMITERS:
+                self.__prune(time.monotonic())
+            limiters = []
+            for key, bytes_per_second in caps:
+                limiter = self._limiters.get(key)
+                if limiter is None:
+                    limiter = ByteRateLimiter(bytes_per_second, self.limits.burst_bytes)
+                    self._limiters[key] = limiter
+                limiter.streams += 1
+                limiters.append(limiter)
+        Metrics().shaped_streams.inc((direction,))
+        return ShapedStream(self, direction, limiters)
+
+    def release(self, stream: ShapedStream):
+        with self._lock:
+            for limiter in stream.limiters:
+                limiter.streams -= 1
+        Metrics().shaped_streams.dec((stream.direction,))
+
+    def __caps(
+        self,
+        direction: str,
+        tenant: Optional[str],
+        bucket_name: Optional[str],
+        route: str,
+    ) -> List[Tuple[Tuple[str, str, str], int]]:
+        """
+        :return: limiter keys and byte rates of the caps applying to the stream
+        """
+        limits = self.limits
+        caps = []
+        global_bytes_per_second = (
+            limits.download_bytes_per_second
+            if direction == Direction.DOWNLOAD
+            else limits.upload_bytes_per_second
+        )
+        if global_bytes_per_second:
+            caps.append((("global", "", direction), global_bytes_per_second))
+        if tenant and limits.tenant_bytes_per_second:
+            caps.append((("tenant", tenant, direction), limits.tenant_bytes_per_second))
+        if bucket_name and bucket_name in limits.bucket_bytes_per_second:
+            caps.append(
+                (
+                    ("bucket", bucket_name, direction),
+                    limits.bucket_bytes_per_second[bucket_name],
+                )
+            )
+        if route in limits.route_bytes_per_second:
+            caps.append(
+                (("route", route, direction), limits.route_bytes_per_second[route])
+            )
+        return caps
+
+    def __prune(self, now: float):
+        for key in [
+            key for key, limiter in self._limiters.items() if limiter.idle(now)
+        ]:
+            del self._limiters[key]
@@ -0,0 +1,77 @@
+import os
+from typing import Optional
+
+from src.core.cache.ttl_cache import TTLCache
+from src.core.common.singleton import Singleton
+from src.models.download.object_info import ObjectInfo
+
+
+class MetadataCache(metaclass=Singleton):
+    """
+    In-process cache of bucket existence and object stat results.
+    Entries are dropped on expiry and by the proxy's own writes.
+    """
+
+    DEFAULT_TTL_SECONDS: str = "30"
+    DEFAULT_MAX_ENTRIES: str = "10000"
+
+    def __init__(self):
+        self.enabled = os.getenv("METADATA_CACHE_ENABLED", "True").lower() == "true"
+        ttl_seconds = float(
+            os.getenv("METADATA_CACHE_TTL_SECONDS", self.DEFAULT_TTL_SECONDS)
+        )
+        max_entries = int(
+            os.getenv("METADATA_CACHE_MAX_ENTRIES", self.DEFAULT_MAX_ENTRIES)
+        )
+        self.buckets = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.objects = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def get_bucket_exists(self, bucket_name: str) -> Optional[bool]:
+        """
+        :param bucket_name: minio s3 bucket name
+        :return: cached existence of the bucket, None if unknown
+        """
+        if not self.enabled:
+            return None
+        bucket_exists = self.buckets.get(bucket_name)
+        return None if bucket_exists is TTLCache.MISSING else bucket_exists
+
+    def put_bucket_exists(self, bucket_name: str, bucket_exists: bool):
+        if self.enabled:
+            self.buckets.put(bucket_name, bucket_exists)
+
+    def invalidate_bucket(self, bucket_name: str):
+        self.buckets.invalidate(bucket_name)
+
+    def get_object_info(
+        self, bucket_name: str, object_name: str
+    ) -> Optional[ObjectInfo]:
+        """
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :return: cached object info, None if unknown
+        """
+        if not self.enabled:
+            return None
+        object_info = self.objects.get((bucket_name, object_name))
+        return None if object_info is TTLCache.MISSING else object_info
+
+    def put_object_info(self, object_info: ObjectInfo):
+        if self.enabled:
+            self.objects.put(
+                (object_info.bucket_name, object_info.object_name), object_info
+            )
+
+    def invalidate_object(self, bucket_name: str, object_name: str):
+        self.objects.invalidate((bucket_name, object_name))
+
+    def clear(self):
+        self.buckets.clear()
+        self.objects.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "buckets": self.buckets.stats(),
+            "objects": self.objects.stats(),
+        }
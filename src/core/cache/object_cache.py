@@ -0,0 +1,317 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Optional, Tuple
+
+from src.core.common.singleton import Singleton
+from src.models.download.object_info import ObjectInfo
+
+MB: int = 1024 * 1024
+
+
+class CachedObject:
+
+    def __init__(
+        self,
+        object_info: ObjectInfo,
+        data: Optional[bytes] = None,
+        path: Optional[str] = None,
+        file: Optional[BinaryIO] = None,
+    ):
+        """
+        Object served from the local cache, kept either in memory or on disk
+        :param object_info: metadata of the cached object version
+        :param data: object bytes of the memory tier
+        :param path: object file of the disk tier
+        :param file: object file opened by a cache hit, it stays readable when
+        the entry is evicted meanwhile
+        """
+        self.object_info = object_info
+        self.data = data
+        self.path = path
+        self.file = file
+
+    def read(self) -> bytes:
+        if self.data is not None:
+            return self.data
+        if self.file is not None:
+            try:
+                return self.file.read()
+            finally:
+                self.close()
+        with open(self.path, "rb") as file:
+            return file.read()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class ObjectCacheWriter:
+    """
+    Collects object chunks while it is downloaded and stores the object in the
+    cache once it is complete. Partially received objects are dropped.
+    """
+
+    def __init__(self, cache: "ObjectCache", object_info: ObjectInfo, on_disk: bool):
+        self.cache = cache
+        self.object_info = object_info
+        self.on_disk = on_disk
+        self.size = 0
+        self._buffer = bytearray()
+        self._file = None
+        if on_disk:
+            self._file = tempfile.NamedTemporaryFile(
+                dir=cache.disk_dir, suffix=".tmp", delete=False
+            )
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer.extend(chunk)
+
+    def commit(self, etag: Optional[str]):
+        """
+        Stores the object if all of its bytes were received and they are of the
+        version it is cached as, which stale metadata may not be
+        :param etag: ETag header of the upstream response
+        """
+        if (
+            self.size != self.object_info.size
+            or (etag or "").strip('"') != self.object_info.etag
+        ):
+            return self.abort()
+        if self._file is None:
+            return self.cache.put_memory(self.object_info, bytes(self._buffer))
+        self._file.close()
+        self.cache.put_disk(self.object_info, self._file.name)
+        self._file = None
+
+    def abort(self):
+        self._buffer = bytearray()
+        if self._file is not None:
+            self._file.close()
+            os.unlink(self._file.name)
+            self._file = None
+
+
+class ObjectCache(metaclass=Singleton):
+    """
+    Read-through cache of frequently downloaded objects: a size-bounded memory
+    LRU for small objects and a disk LRU for larger ones. Entries are keyed by
+    bucket/object/ETag, so a changed object is a miss as soon as its stat is.
+    An object is admitted after OBJECT_CACHE_MIN_HITS requests.
+    The disk tier lives in a directory of its own per process, as every
+    worker keeps its own index of it, and is removed on shutdown.
+    """
+
+    DEFAULT_MEMORY_MAX_MB: str = "64"
+    DEFAULT_MEMORY_MAX_OBJECT_KB: str = "256"
+    DEFAULT_DISK_MAX_MB: str = "1024"
+    DEFAULT_DISK_MAX_OBJECT_MB: str = "64"
+    DEFAULT_MIN_HITS: str = "2"
+    MAX_TRACKED_KEYS: int = 10000
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.enabled = os.getenv("OBJECT_CACHE_ENABLED", "False").lower() == "true"
+        self.memory_max_bytes = (
+            int(os.getenv("OBJECT_CACHE_MEMORY_MAX_MB", self.DEFAULT_MEMORY_MAX_MB))
+            * MB
+        )
+        self.memory_max_object_bytes = (
+            int(
+                os.getenv(
+                    "OBJECT_CACHE_MEMORY_MAX_OBJECT_KB",
+                    self.DEFAULT_MEMORY_MAX_OBJECT_KB,
+                )
+            )
+            * 1024
+        )
+        self.disk_max_bytes = (
+            int(os.getenv("OBJECT_CACHE_DISK_MAX_MB", self.DEFAULT_DISK_MAX_MB)) * MB
+        )
+        self.disk_max_object_bytes = (
+            int(
+                os.getenv(
+                    "OBJECT_CACHE_DISK_MAX_OBJECT_MB", self.DEFAULT_DISK_MAX_OBJECT_MB
+                )
+            )
+            * MB
+        )
+        self.min_hits = int(os.getenv("OBJECT_CACHE_MIN_HITS", self.DEFAULT_MIN_HITS))
+        self.disk_dir: Optional[str] = None
+
+        self._memory: "OrderedDict[Tuple, CachedObject]" = OrderedDict()
+        self._disk: "OrderedDict[Tuple, CachedObject]" = OrderedDict()
+        self._requests: "OrderedDict[Tuple, int]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "admissions": 0,
+            "rejections": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+        if self.enabled and self.disk_max_bytes > 0:
+            parent_dir = os.getenv("OBJECT_CACHE_DISK_DIR") or tempfile.gettempdir()
+            os.makedirs(parent_dir, exist_ok=True)
+            self.disk_dir = tempfile.mkdtemp(
+                prefix="s3-proxy-object-cache-", dir=parent_dir
+            )
+
+    @staticmethod
+    def __key(object_info: ObjectInfo) -> Tuple:
+        return object_info.bucket_name, object_info.object_name, object_info.etag
+
+    def get(self, object_info: ObjectInfo) -> Optional[CachedObject]:
+        """
+        :param object_info: current metadata of the object
+        :return: cached object of the same version, None on a miss. A disk
+        hit comes with its file open, it has to be closed once sent
+        """
+        if not self.enabled or not object_info.etag:
+            return None
+        key = self.__key(object_info)
+        with self._lock:
+            cached_object = self._memory.get(key)
+            if cached_object is not None:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return cached_object
+            cached_object = self._disk.get(key)
+            if cached_object is not None:
+                # opened under the lock, an eviction can't remove it before
+                self._disk.move_to_end(key)
+                self.counters["disk_hits"] += 1
+                return CachedObject(
+                    object_info,
+                    path=cached_object.path,
+                    file=open(cached_object.path, "rb"),
+                )
+            self.counters["misses"] += 1
+            return None
+
+    def writer(self, object_info: ObjectInfo) -> Optional[ObjectCacheWriter]:
+        """
+        Applies admission policy to the object being downloaded
+        :param object_info: metadata of the object being downloaded
+        :return: writer to fill the cache with, None if the object is not admitted
+        """
+        if not self.enabled or not object_info.etag:
+            return None
+        if (
+            0 < self.memory_max_bytes
+            and object_info.size <= self.memory_max_object_bytes
+        ):
+            on_disk = False
+        elif 0 < self.disk_max_bytes and object_info.size <= self.disk_max_object_bytes:
+            on_disk = True
+        else:
+            with self._lock:
+                self.counters["rejections"] += 1
+            return None
+
+        key = self.__key(object_info)
+        with self._lock:
+            requests = self._requests.pop(key, 0) + 1
+            if requests < self.min_hits:
+                self._requests[key] = requests
+                if len(self._requests) > self.MAX_TRACKED_KEYS:
+                    self._requests.popitem(last=False)
+                return None
+            self.counters["admissions"] += 1
+        return ObjectCacheWriter(self, object_info, on_disk)
+
+    def put_memory(self, object_info: ObjectInfo, data: bytes):
+        key = self.__key(object_info)
+        with self._lock:
+            self.__remove(key)
+            self._memory[key] = CachedObject(object_info, data=data)
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.memory_max_bytes and self._memory:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.data)
+                self.counters["memory_evictions"] += 1
+
+    def put_disk(self, object_info: ObjectInfo, temporary_path: str):
+        key = self.__key(object_info)
+        path = os.path.join(
+            self.disk_dir, hashlib.sha256(repr(key).encode()).hexdigest()
+        )
+        os.replace(temporary_path, path)
+        with self._lock:
+            self.__remove(key, keep_file=True)
+            self._disk[key] = CachedObject(object_info, path=path)
+            self._disk_bytes += object_info.size
+            while self._disk_bytes > self.disk_max_bytes and self._disk:
+                _, evicted = self._disk.popitem(last=False)
+                self._disk_bytes -= evicted.object_info.size
+                self.counters["disk_evictions"] += 1
+                self.__unlink(evicted.path)
+
+    def invalidate(self, bucket_name: str, object_name: str):
+        """
+        Drops all cached versions of the object
+        """
+        with self._lock:
+            for tier in (self._memory, self._disk):
+                for key in [k for k in tier if k[:2] == (bucket_name, object_name)]:
+                    self.__remove(key)
+
+    def __remove(self, key: Tuple, keep_file: bool = False):
+        cached_object = self._memory.pop(key, None)
+        if cached_object is not None:
+            self._memory_bytes -= len(cached_object.data)
+        cached_object = self._disk.pop(key, None)
+        if cached_object is not None:
+            self._disk_bytes -= cached_object.object_info.size
+            if not keep_file:
+                self.__unlink(cached_object.path)
+
+    def __unlink(self, path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            self.logger.debug(f"Cached file {path} was already removed.")
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._memory) + list(self._disk):
+                self.__remove(key)
+            self._requests.clear()
+
+    def close(self):
+        """
+        Drops the cache and removes the disk tier directory
+        """
+        self.clear()
+        if self.disk_dir is not None:
+            shutil.rmtree(self.disk_dir, ignore_errors=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "memory": {
+                "entries": len(self._memory),
+                "bytes": self._memory_bytes,
+                "max_bytes": self.memory_max_bytes,
+            },
+            "disk": {
+                "entries": len(self._disk),
+                "bytes": self._disk_bytes,
+                "max_bytes": self.disk_max_bytes,
+            },
+            **self.counters,
+        }
@@ -0,0 +1,130 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable, Optional, TypeVar
+
+import anyio
+
+from src.core.common.singleton import Singleton
+
+T = TypeVar("T")
+
+
+class S3Executor(metaclass=Singleton):
+    """
+    Bounded thread pool all blocking minio/urllib3 calls are offloaded to,
+    so a slow S3 call never blocks the event loop of the worker.
+    """
+
+    DEFAULT_MAX_WORKERS: str = "32"
+    MAX_WORKERS_ENV: str = "S3_EXECUTOR_MAX_WORKERS"
+    THREAD_NAME_PREFIX: str = "s3-io"
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_workers = int(
+            os.getenv(self.MAX_WORKERS_ENV, self.DEFAULT_MAX_WORKERS)
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self.logger.debug(
+                    f"Starting S3 executor with {self.max_workers} worker(s)."
+                )
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.THREAD_NAME_PREFIX,
+                )
+            return self._executor
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs blocking function in the executor.
+        Once started the call is waited for even if the caller gets cancelled,
+        so resources it uses are never released from under a running thread.
+        :param func: blocking function
+        :return: function result
+        """
+        context = contextvars.copy_context()
+        future = asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(context.run, func, *args, **kwargs)
+        )
+        with anyio.CancelScope(shield=True):
+            await asyncio.wait([future])
+        return future.result()
+
+    def submit(self, func: Callable[..., T], *args, **kwargs) -> Future:
+        """
+        Submits blocking function to the executor, running it in a copy of the
+        caller's context so the current trace span carries over
+        :param func: blocking function
+        :return: future of the function result
+        """
+        context = contextvars.copy_context()
+        return self.executor.submit(context.run, func, *args, **kwargs)
+
+    async def iterate(self, iterable: Iterable[T]) -> AsyncIterator[T]:
+        """
+        Iterates blocking iterable in the executor. Iterables that are
+        iterated on the event loop themselves, e.g. coalesced downloads, are
+        iterated that way.
+        :param iterable: blocking iterable, e.g. object stream
+        :return: async iterator over the same items
+        """
+        if hasattr(iterable, "__aiter__"):
+            async for item in iterable:
+                yield item
+            return
+        iterator = iter(iterable)
+        sentinel = object()
+        while True:
+            item = await self.run(next, iterator, sentinel)
+            if item is sentinel:
+                break
+            yield item
+
+    def shutdown(self):
+        """
+        Waits for running calls and stops executor threads.
+        Executor is started again on the next call.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            self.logger.debug("Shutting down S3 executor.")
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+class S3PartExecutor(S3Executor):
+    """
+    Thread pool for minio calls made on behalf of a call running in S3Executor:
+    multipart upload parts, parallel download ranges and objects of archives.
+    Kept apart from S3Executor because those calls wait for their parts, which
+    would deadlock a shared pool once all of its threads are waiting. Calls
+    running in it never wait for other calls of it.
+    """
+
+    DEFAULT_MAX_WORKERS: str = "32"
+    MAX_WORKERS_ENV: str = "S3_PART_EXECUTOR_MAX_WORKERS"
+    THREAD_NAME_PREFIX: str = "s3-part"
+
+
+class S3BatchExecutor(S3Executor):
+    """
+    Thread pool files of batch uploads are written from. A large file is
+    uploaded in parts it waits for in S3PartExecutor, so the files can run in
+    neither S3Executor, which runs the batch waiting for them, nor
+    S3PartExecutor.
+    """
+
+    DEFAULT_MAX_WORKERS: str = "32"
+    MAX_WORKERS_ENV: str = "S3_BATCH_EXECUTOR_MAX_WORKERS"
+    THREAD_NAME_PREFIX: str = "s3-batch"
@@ -0,0 +1,69 @@
+import os
+from typing import Optional
+
+from src.core.common.singleton import Singleton
+
+MB: int = 1024 * 1024
+
+
+class RateLimit:
+
+    def __init__(self, per_second: float, burst: float):
+        """
+        Token bucket refilled with per_second tokens up to burst, a request
+        takes one token
+        :param per_second: sustained requests per second
+        :param burst: requests admitted at once after an idle period
+        """
+        self.per_second = per_second
+        self.burst = burst
+
+
+class AdmissionLimits(metaclass=Singleton):
+    """
+    Limits on the work admitted into the service, 0 disables a limit.
+    RATE_LIMIT_{IP,API_KEY,BUCKET}_PER_SECOND and _BURST configure a token
+    bucket per client address, per API key sent in RATE_LIMIT_API_KEY_HEADER
+    and per bucket of the path. MAX_CONCURRENT_UPLOADS and
+    MAX_CONCURRENT_DOWNLOADS cap the requests processed at the same time and
+    MAX_UPLOAD_BYTES_IN_FLIGHT_MB the request bodies of the uploads being
+    processed.
+    """
+
+    DEFAULT_API_KEY_HEADER: str = "X-API-Key"
+    DEFAULT_MAX_CLIENTS: str = "100000"
+    DEFAULT_RETRY_AFTER_SECONDS: str = "1"
+
+    def __init__(self):
+        self.ip_rate: Optional[RateLimit] = self.__rate_limit("IP")
+        self.api_key_rate: Optional[RateLimit] = self.__rate_limit("API_KEY")
+        self.bucket_rate: Optional[RateLimit] = self.__rate_limit("BUCKET")
+        self.api_key_header: str = (
+            os.getenv("RATE_LIMIT_API_KEY_HEADER") or self.DEFAULT_API_KEY_HEADER
+        )
+        self.trust_forwarded_for: bool = (
+            os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "False").lower() == "true"
+        )
+        self.max_clients: int = int(
+            os.getenv("RATE_LIMIT_MAX_CLIENTS", self.DEFAULT_MAX_CLIENTS)
+        )
+        self.max_uploads: int = int(os.getenv("MAX_CONCURRENT_UPLOADS", "0"))
+        self.max_downloads: int = int(os.getenv("MAX_CONCURRENT_DOWNLOADS", "0"))
+        self.max_upload_bytes_in_flight: int = int(
+            float(os.getenv("MAX_UPLOAD_BYTES_IN_FLIGHT_MB", "0")) * MB
+        )
+        self.retry_after_seconds: int = int(
+            os.getenv("ADMISSION_RETRY_AFTER_SECONDS", self.DEFAULT_RETRY_AFTER_SECONDS)
+        )
+
+    @staticmethod
+    def __rate_limit(name: str) -> Optional[RateLimit]:
+        """
+        :param name: client identity the limit is keyed by, e.g. "IP"
+        :return: rate limit, None if disabled
+        """
+        per_second = float(os.getenv(f"RATE_LIMIT_{name}_PER_SECOND", "0"))
+        if per_second <= 0:
+            return None
+        burst = float(os.getenv(f"RATE_LIMIT_{name}_BURST", "0"))
+        return RateLimit(per_second, max(burst or per_second, 1))
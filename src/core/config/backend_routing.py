@@ -0,0 +1,274 @@
+import bisect
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class Backend:
+    """
+    S3 endpoint with the credentials used for it
+    """
+
+    __slots__ = (
+        "name",
+        "host",
+        "access_key",
+        "secret_key",
+        "secure",
+        "region",
+        "presign_endpoint",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        host: str,
+        access_key: Optional[str],
+        secret_key: Optional[str],
+        secure: bool = False,
+        region: Optional[str] = None,
+        presign_endpoint: Optional[str] = None,
+    ):
+        """
+        :param name: backend name used by routing rules
+        :param host: host[:port] of the S3 endpoint
+        :param access_key: access key
+        :param secret_key: secret key
+        :param secure: whether the endpoint is reached over https
+        :param region: region of the endpoint, looked up by minio when not set
+        :param presign_endpoint: URL clients reach the endpoint at
+        """
+        self.name = name
+        self.host = host
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.secure = secure
+        self.region = region
+        self.presign_endpoint = presign_endpoint
+
+    @property
+    def settings(self) -> tuple:
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Backend) and self.settings == other.settings
+
+    def __hash__(self) -> int:
+        return hash(self.settings)
+
+    def describe(self) -> dict:
+        """
+        :return: backend settings without credentials
+        """
+        return {
+            "host": self.host,
+            "secure": self.secure,
+            "region": self.region,
+            "presign_endpoint": self.presign_endpoint,
+        }
+
+
+class HashRing:
+    """
+    Consistent hash ring of backend names, adding or removing a backend only
+    moves the buckets of its share of the ring
+    """
+
+    REPLICAS: int = 128
+
+    def __init__(self, names: List[str]):
+        self.points: List[Tuple[int, str]] = sorted(
+            (self.__hash(f"{name}#{replica}"), name)
+            for name in names
+            for replica in range(self.REPLICAS)
+        )
+        self.hashes: List[int] = [point for point, _ in self.points]
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        :param key: bucket name
+        :return: name of the backend owning the key, None for an empty ring
+        """
+        if not self.points:
+            return None
+        index = bisect.bisect(self.hashes, self.__hash(key)) % len(self.points)
+        return self.points[index][1]
+
+    @staticmethod
+    def __hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class RoutingTable:
+    """
+    Buckets routed by exact name, then by the longest matching prefix, then by
+    the hash ring when one is configured and otherwise to the default backend
+    """
+
+    def __init__(
+        self,
+        backends: Dict[str, Backend],
+        buckets: Dict[str, str],
+        prefixes: Dict[str, str],
+        hashed: List[str],
+    ):
+        names = [*buckets.values(), *prefixes.values(), *hashed]
+        unknown = sorted(set(names) - set(backends))
+        if unknown:
+            raise ValueError(f"Unknown S3 backends: {', '.join(unknown)}")
+        self.backends = backends
+        self.buckets = buckets
+        self.prefixes: List[Tuple[str, str]] = sorted(
+            prefixes.items(), key=lambda prefix: len(prefix[0]), reverse=True
+        )
+        self.hashed = hashed
+        self.ring: Optional[HashRing] = HashRing(hashed) if hashed else None
+
+    def backend_name(self, bucket_name: str) -> str:
+        """
+        :param bucket_name: minio s3 bucket name
+        :return: name of the backend the bucket is stored in
+        """
+        name = self.buckets.get(bucket_name)
+        if name is not None:
+            return name
+        for prefix, name in self.prefixes:
+            if bucket_name.startswith(prefix):
+                return name
+        if self.ring is not None:
+            return self.ring.get(bucket_name)
+        return BackendRouting.DEFAULT_BACKEND
+
+    def describe(self) -> dict:
+        return {
+            "backends": {
+                name: backend.describe() for name, backend in self.backends.items()
+            },
+            "buckets": self.buckets,
+            "prefixes": dict(self.prefixes),
+            "hash": self.hashed,
+        }
+
+
+class BackendRouting:
+    """
+    Maps buckets to S3 backends. Without S3_BACKENDS_FILE every bucket is
+    stored in the "default" backend configured by MINIO_HOST, MINIO_ACCESS_KEY
+    and MINIO_SECRET_KEY. S3_BACKENDS_FILE is a JSON file of:
+    - "backends": backend name to {"host", "access_key", "secret_key", "secure",
+      "region", "presign_endpoint"}, settings left out are taken from the
+      default backend; a "default" entry overrides it
+    - "buckets": bucket name to backend name
+    - "prefixes": bucket name prefix to backend name, the longest prefix wins
+    - "hash": backend names other buckets are spread across by consistent
+      hashing, instead of storing them in the default backend
+    The file is read again when it changes, checked at most every
+    S3_BACKENDS_RELOAD_SECONDS, so routes change without restarting workers.
+    A file that fails to load keeps the previous table.
+    """
+
+    DEFAULT_BACKEND: str = "default"
+    DEFAULT_RELOAD_SECONDS: str = "5"
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.path: Optional[str] = os.getenv("S3_BACKENDS_FILE") or None
+        self.reload_seconds = float(
+            os.getenv("S3_BACKENDS_RELOAD_SECONDS", self.DEFAULT_RELOAD_SECONDS)
+        )
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._modified_at: Optional[float] = self.__modified_at()
+        self.table: RoutingTable = self.__load()
+
+    def backend(self, bucket_name: str) -> Backend:
+        """
+        :param bucket_name: minio s3 bucket name
+        :return: backend the bucket is stored in
+        """
+        if (
+            self.path is not None
+            and time.monotonic() - self._checked_at >= self.reload_seconds
+        ):
+            self.reload()
+        table = self.table
+        return table.backends[table.backend_name(bucket_name)]
+
+    def default_backend(self) -> Backend:
+        return self.table.backends[self.DEFAULT_BACKEND]
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Loads the routing table again if the file changed
+        :param force: load even if the file looks unchanged
+        :return: True if a new table was loaded
+        """
+        if self.path is None:
+            return False
+        with self._lock:
+            self._checked_at = time.monotonic()
+            modified_at = self.__modified_at()
+            if not force and modified_at == self._modified_at:
+                return False
+            try:
+                table = self.__load()
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                self.logger.error(f"Keeping S3 backends, {self.path} not loaded: {e}")
+                return False
+            self.table, self._modified_at = table, modified_at
+        self.logger.info(f"Loaded S3 backends from {self.path}.")
+        return True
+
+    def __modified_at(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime if self.path is not None else None
+        except OSError:
+            return None
+
+    def __load(self) -> RoutingTable:
+        """
+        :return: routing table of the file, or of the default backend only
+        """
+        config = {}
+        if self.path is not None:
+            with open(self.path) as config_file:
+                config = json.load(config_file)
+
+        default = self.__env_backend()
+        backend_configs = config.get("backends", {})
+        backends = {
+            name: Backend(
+                name=name,
+                host=backend.get("host", default.host),
+                access_key=backend.get("access_key", default.access_key),
+                secret_key=backend.get("secret_key", default.secret_key),
+                secure=bool(backend.get("secure", default.secure)),
+                region=backend.get("region", default.region),
+                presign_endpoint=backend.get(
+                    "presign_endpoint",
+                    default.presign_endpoint if "host" not in backend else None,
+                ),
+            )
+            for name, backend in backend_configs.items()
+        }
+        backends.setdefault(self.DEFAULT_BACKEND, default)
+        return RoutingTable(
+            backends=backends,
+            buckets=config.get("buckets", {}),
+            prefixes=config.get("prefixes", {}),
+            hashed=config.get("hash", []),
+        )
+
+    def __env_backend(self) -> Backend:
+        return Backend(
+            name=self.DEFAULT_BACKEND,
+            host=os.getenv("MINIO_HOST"),
+            access_key=os.getenv("MINIO_ACCESS_KEY"),
+            secret_key=os.getenv("MINIO_SECRET_KEY"),
+            region=os.getenv("MINIO_REGION") or None,
+            presign_endpoint=os.getenv("PRESIGN_ENDPOINT") or None,
+        )
@@ -0,0 +1,75 @@
+import json
+import os
+from typing import Dict, Optional
+
+from src.core.common.singleton import Singleton
+
+KB: int = 1024
+MB: int = 1024 * 1024
+
+
+class BandwidthLimits(metaclass=Singleton):
+    """
+    Byte rate caps of streamed request and response bodies in MB per second,
+    each applied to downloads and uploads separately, 0 or missing disables a
+    cap. BANDWIDTH_DOWNLOAD_MB_PER_SECOND and BANDWIDTH_UPLOAD_MB_PER_SECOND
+    cap the whole worker, BANDWIDTH_TENANT_MB_PER_SECOND each tenant (the
+    BANDWIDTH_TENANT_HEADER value, or the client address without it), and
+    BANDWIDTH_BUCKET_LIMITS_MB_PER_SECOND and BANDWIDTH_ROUTE_LIMITS_MB_PER_SECOND
+    are JSON objects capping buckets and route path templates.
+    """
+
+    DEFAULT_TENANT_HEADER: str = "X-API-Key"
+    DEFAULT_BURST_KB: str = "256"
+
+    def __init__(self):
+        self.download_bytes_per_second: int = self.__bytes_per_second(
+            os.getenv("BANDWIDTH_DOWNLOAD_MB_PER_SECOND")
+        )
+        self.upload_bytes_per_second: int = self.__bytes_per_second(
+            os.getenv("BANDWIDTH_UPLOAD_MB_PER_SECOND")
+        )
+        self.tenant_bytes_per_second: int = self.__bytes_per_second(
+            os.getenv("BANDWIDTH_TENANT_MB_PER_SECOND")
+        )
+        self.tenant_header: str = (
+            os.getenv("BANDWIDTH_TENANT_HEADER") or self.DEFAULT_TENANT_HEADER
+        )
+        self.bucket_bytes_per_second: Dict[str, int] = self.__limits(
+            os.getenv("BANDWIDTH_BUCKET_LIMITS_MB_PER_SECOND")
+        )
+        self.route_bytes_per_second: Dict[str, int] = self.__limits(
+            os.getenv("BANDWIDTH_ROUTE_LIMITS_MB_PER_SECOND")
+        )
+        self.burst_bytes: int = (
+            int(os.getenv("BANDWIDTH_BURST_KB", self.DEFAULT_BURST_KB)) * KB
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(
+            self.download_bytes_per_second
+            or self.upload_bytes_per_second
+            or self.tenant_bytes_per_second
+            or self.bucket_bytes_per_second
+            or self.route_bytes_per_second
+        )
+
+    @staticmethod
+    def __bytes_per_second(mb_per_second: Optional[str]) -> int:
+        return int(float(mb_per_second or "0") * MB)
+
+    @classmethod
+    def __limits(cls, limits: Optional[str]) -> Dict[str, int]:
+        """
+        :param limits: JSON object of name to MB per second
+        :return: enabled caps in bytes per second
+        """
+        return {
+            name: bytes_per_second
+            for name, bytes_per_second in (
+                (name, cls.__bytes_per_second(str(limit)))
+                for name, limit in json.loads(limits or "{}").items()
+            )
+            if bytes_per_second > 0
+        }
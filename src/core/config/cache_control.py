@@ -0,0 +1,27 @@
+import json
+import os
+from typing import Dict, Optional
+
+from src.core.common.singleton import Singleton
+
+
+class CacheControlPolicy(metaclass=Singleton):
+    """
+    Cache-Control header of downloads, configured per bucket so a CDN in front
+    of the proxy can cache objects.
+    CACHE_CONTROL_BUCKET_POLICIES is a JSON object of bucket name to header value,
+    buckets without a policy get CACHE_CONTROL_DEFAULT.
+    """
+
+    def __init__(self):
+        self.default: Optional[str] = os.getenv("CACHE_CONTROL_DEFAULT") or None
+        self.bucket_policies: Dict[str, str] = json.loads(
+            os.getenv("CACHE_CONTROL_BUCKET_POLICIES") or "{}"
+        )
+
+    def for_bucket(self, bucket_name: str) -> Optional[str]:
+        """
+        :param bucket_name: minio s3 bucket name
+        :return: Cache-Control header value, None if no header must be sent
+        """
+        return self.bucket_policies.get(bucket_name, self.default)
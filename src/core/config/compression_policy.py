@@ -0,0 +1,162 @@
+import json
+import os
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from src.core.common.singleton import Singleton
+
+KB: int = 1024
+
+
+class CompressionPolicy(metaclass=Singleton):
+    """
+    Which downloads are compressed on the fly and which uploads are stored
+    compressed.
+    With COMPRESSION_ENABLED, a whole file download of an object whose content
+    type matches COMPRESSION_CONTENT_TYPES (a comma separated list of types,
+    "type/*" matches every subtype) and whose size is at least
+    COMPRESSION_MIN_SIZE_KB is compressed with the first of
+    COMPRESSION_ENCODINGS the client accepts by its Accept-Encoding header.
+    COMPRESSION_BUCKET_AT_REST is a JSON object of bucket name to the encoding
+    uploads of such content types to the bucket are stored with, recorded as
+    the Content-Encoding of the object.
+    """
+
+    GZIP: str = "gzip"
+    BROTLI: str = "br"
+    ZSTD: str = "zstd"
+    ENCODINGS: FrozenSet[str] = frozenset((GZIP, BROTLI, ZSTD))
+    DEFAULT_ENCODINGS: str = "zstd,br,gzip"
+    DEFAULT_CONTENT_TYPES: str = (
+        "text/*,application/json,application/x-ndjson,application/xml,"
+        "application/javascript,image/svg+xml"
+    )
+    DEFAULT_MIN_SIZE_KB: str = "1"
+
+    def __init__(self):
+        self.enabled: bool = os.getenv("COMPRESSION_ENABLED", "False").lower() == "true"
+        self.encodings: List[str] = self.__encodings(
+            (os.getenv("COMPRESSION_ENCODINGS") or self.DEFAULT_ENCODINGS).split(",")
+        )
+        content_types = [
+            content_type.strip().lower()
+            for content_type in (
+                os.getenv("COMPRESSION_CONTENT_TYPES") or self.DEFAULT_CONTENT_TYPES
+            ).split(",")
+            if content_type.strip()
+        ]
+        self.content_types: FrozenSet[str] = frozenset(
+            content_type for content_type in content_types if "*" not in content_type
+        )
+        self.content_type_prefixes: Tuple[str, ...] = tuple(
+            content_type[:-1]
+            for content_type in content_types
+            if content_type.endswith("/*")
+        )
+        self.min_size: int = (
+            int(os.getenv("COMPRESSION_MIN_SIZE_KB", self.DEFAULT_MIN_SIZE_KB)) * KB
+        )
+        self.bucket_encodings: Dict[str, str] = {
+            bucket_name: self.__encodings([encoding])[0]
+            for bucket_name, encoding in json.loads(
+                os.getenv("COMPRESSION_BUCKET_AT_REST") or "{}"
+            ).items()
+        }
+
+    def is_compressible(self, content_type: Optional[str], size: int) -> bool:
+        """
+        :param content_type: content type of the file
+        :param size: file size, negative if unknown
+        :return: True if files of the type and size are worth compressing
+        """
+        if not content_type or 0 <= size < self.min_size:
+            return False
+        content_type = content_type.split(";", 1)[0].strip().lower()
+        return content_type in self.content_types or content_type.startswith(
+            self.content_type_prefixes
+        )
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """
+        :param accept_encoding: Accept-Encoding header value
+        :return: encoding downloads are compressed with, None to send them as is
+        """
+        if not self.enabled or not accept_encoding:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0)
+        best, best_quality = None, 0.0
+        for encoding in self.encodings:
+            quality = accepted.get(encoding, wildcard)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    @classmethod
+    def supports(cls, encoding: Optional[str]) -> bool:
+        """
+        :param encoding: content coding
+        :return: True if files of the coding can be compressed and decompressed
+        """
+        return encoding in cls.ENCODINGS
+
+    @staticmethod
+    def accepts(accept_encoding: Optional[str], encoding: str) -> bool:
+        """
+        :param accept_encoding: Accept-Encoding header value
+        :param encoding: content coding
+        :return: True if the client takes the encoding
+        """
+        if not accept_encoding:
+            return False
+        accepted = parse_accept_encoding(accept_encoding)
+        return accepted.get(encoding, accepted.get("*", 0)) > 0
+
+    def at_rest_encoding(
+        self, bucket_name: str, content_type: Optional[str], size: int
+    ) -> Optional[str]:
+        """
+        :param bucket_name: minio s3 bucket name
+        :param content_type: content type of the uploaded file
+        :param size: file size, negative if unknown
+        :return: encoding the file is stored with, None to store it as is
+        """
+        encoding = self.bucket_encodings.get(bucket_name)
+        if encoding is None or not self.is_compressible(content_type, size):
+            return None
+        return encoding
+
+    @classmethod
+    def __encodings(cls, encodings) -> List[str]:
+        """
+        :param encodings: configured encoding names
+        :return: encoding names in order, blanks dropped
+        """
+        encodings = [encoding.strip() for encoding in encodings if encoding.strip()]
+        unknown = set(encodings) - cls.ENCODINGS
+        if unknown:
+            raise ValueError(
+                f"Unknown compression encodings: {', '.join(sorted(unknown))}"
+            )
+        return encodings
+
+
+def parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    """
+    :param accept_encoding: Accept-Encoding header value, e.g. "gzip;q=0.8, br"
+    :return: quality value of every listed coding, lower case
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = parameters.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
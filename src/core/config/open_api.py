@@ -7,4 +7,12 @@ tags_metadata = [
         "name": "upload",
         "description": "Upload file operation.",
     },
+    {
+        "name": "presign",
+        "description": "Presigned URLs to move file data between client and MinIO directly.",
+    },
+    {
+        "name": "admin",
+        "description": "Service state and statistics.",
+    },
 ]
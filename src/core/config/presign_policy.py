@@ -0,0 +1,60 @@
+import json
+import os
+from typing import Dict, FrozenSet
+
+from src.core.common.singleton import Singleton
+
+
+class PresignPolicy(metaclass=Singleton):
+    """
+    Routes presigned URLs are issued for, configured per bucket so only buckets
+    of trusted clients hand out direct MinIO access.
+    PRESIGN_BUCKET_ROUTES is a JSON object of bucket name to list of routes,
+    buckets without an entry get PRESIGN_DEFAULT_ROUTES, a comma separated list.
+    Routes are "download", "upload" and "multipart", none is enabled by default.
+    """
+
+    DOWNLOAD: str = "download"
+    UPLOAD: str = "upload"
+    MULTIPART: str = "multipart"
+    ROUTES: FrozenSet[str] = frozenset((DOWNLOAD, UPLOAD, MULTIPART))
+    DEFAULT_EXPIRY_SECONDS: str = "900"
+    MAX_EXPIRY_SECONDS: int = 7 * 24 * 3600
+
+    def __init__(self):
+        self.default_routes: FrozenSet[str] = self.__routes(
+            (os.getenv("PRESIGN_DEFAULT_ROUTES") or "").split(",")
+        )
+        self.bucket_routes: Dict[str, FrozenSet[str]] = {
+            bucket_name: self.__routes(routes)
+            for bucket_name, routes in json.loads(
+                os.getenv("PRESIGN_BUCKET_ROUTES") or "{}"
+            ).items()
+        }
+        self.expiry_seconds: int = min(
+            max(
+                int(os.getenv("PRESIGN_EXPIRY_SECONDS", self.DEFAULT_EXPIRY_SECONDS)),
+                1,
+            ),
+            self.MAX_EXPIRY_SECONDS,
+        )
+
+    def is_enabled(self, bucket_name: str, route: str) -> bool:
+        """
+        :param bucket_name: minio s3 bucket name
+        :param route: "download", "upload" or "multipart"
+        :return: True if presigned URLs of the route are issued for the bucket
+        """
+        return route in self.bucket_routes.get(bucket_name, self.default_routes)
+
+    @classmethod
+    def __routes(cls, routes) -> FrozenSet[str]:
+        """
+        :param routes: configured route names
+        :return: route names, blanks dropped
+        """
+        routes = frozenset(route.strip() for route in routes if route.strip())
+        unknown = routes - cls.ROUTES
+        if unknown:
+            raise ValueError(f"Unknown presign routes: {', '.join(sorted(unknown))}")
+        return routes
@@ -0,0 +1,75 @@
+import json
+import os
+from typing import Dict
+
+from src.core.common.singleton import Singleton
+
+MB: int = 1024 * 1024
+
+
+class UploadSizeLimits(metaclass=Singleton):
+    """
+    Maximal upload file size per bucket.
+    MAX_UPLOAD_FILE_SIZE_BUCKET_LIMITS_MB is a JSON object of bucket name to limit
+    in MB, buckets without a limit get MAX_UPLOAD_FILE_SIZE_MB.
+    Batch uploads are limited by MAX_UPLOAD_BATCH_SIZE_MB as a whole and by
+    MAX_UPLOAD_BATCH_FILE_SIZE_MB per file, as their files are held in memory.
+    """
+
+    DEFAULT_MAX_UPLOAD_FILE_SIZE_MB: str = "100"
+    DEFAULT_MAX_UPLOAD_BATCH_SIZE_MB: str = "1024"
+    DEFAULT_MAX_UPLOAD_BATCH_FILE_SIZE_MB: str = "16"
+
+    def __init__(self):
+        self.default_bytes: int = (
+            int(
+                os.getenv(
+                    "MAX_UPLOAD_FILE_SIZE_MB", self.DEFAULT_MAX_UPLOAD_FILE_SIZE_MB
+                )
+            )
+            * MB
+        )
+        self.bucket_limits_bytes: Dict[str, int] = {
+            bucket_name: int(limit_mb) * MB
+            for bucket_name, limit_mb in json.loads(
+                os.getenv("MAX_UPLOAD_FILE_SIZE_BUCKET_LIMITS_MB") or "{}"
+            ).items()
+        }
+        self.batch_max_bytes: int = (
+            int(
+                os.getenv(
+                    "MAX_UPLOAD_BATCH_SIZE_MB", self.DEFAULT_MAX_UPLOAD_BATCH_SIZE_MB
+                )
+            )
+            * MB
+        )
+        self.batch_file_max_bytes: int = (
+            int(
+                os.getenv(
+                    "MAX_UPLOAD_BATCH_FILE_SIZE_MB",
+                    self.DEFAULT_MAX_UPLOAD_BATCH_FILE_SIZE_MB,
+                )
+            )
+            * MB
+        )
+
+    def for_bucket(self, bucket_name: str) -> int:
+        """
+        :param bucket_name: minio s3 bucket name
+        :return: maximal upload file size in bytes
+        """
+        return self.bucket_limits_bytes.get(bucket_name, self.default_bytes)
+
+    def for_batch_file(self, bucket_name: str) -> int:
+        """
+        :param bucket_name: minio s3 bucket name
+        :return: maximal size in bytes of a file of a batch upload
+        """
+        return min(self.batch_file_max_bytes, self.for_bucket(bucket_name))
+
+    @property
+    def max_bytes(self) -> int:
+        """
+        :return: largest limit of all buckets, used when the bucket is not known yet
+        """
+        return max([self.default_bytes, *self.bucket_limits_bytes.values()])
@@ -5,6 +5,38 @@ class MinioError(metaclass=Singleton):
     CONNECTION_ERROR = "errors.minio.connection_error"
     INCORRECT_BUCKET_NAME = "errors.minio.incorrect_bucket_name"
     INCORRECT_OBJECT_NAME = "errors.minio.incorrect_object_name"
+    BUCKET_MISSING = "errors.minio.bucket_missing"
+
+
+class DownloadError(metaclass=Singleton):
+    RANGE_NOT_SATISFIABLE = "errors.download.range_not_satisfiable"
+    ARCHIVE_CONTENT_MISSING = "errors.download.archive_content_missing"
+
+
+class UploadError(metaclass=Singleton):
+    FILE_MISSING = "errors.upload.file_missing"
+    INCOMPLETE_FILE = "errors.upload.incomplete_file"
+    FILE_TOO_LARGE = "errors.upload.file_too_large"
+    INVALID_ARCHIVE = "errors.upload.invalid_archive"
+    UNSUPPORTED_BATCH_TYPE = "errors.upload.unsupported_batch_type"
+    SESSION_NOT_FOUND = "errors.upload.session_not_found"
+    SESSION_INCOMPLETE = "errors.upload.session_incomplete"
+    INVALID_PART = "errors.upload.invalid_part"
+
+
+class PresignError(metaclass=Singleton):
+    ROUTE_DISABLED = "errors.presign.route_disabled"
+    PARTS_MISSING = "errors.presign.parts_missing"
+
+
+class ProfilerError(metaclass=Singleton):
+    DISABLED = "errors.profiler.disabled"
+    RUNNING = "errors.profiler.running"
+
+
+class AdmissionError(metaclass=Singleton):
+    RATE_LIMITED = "errors.admission.rate_limited"
+    OVERLOADED = "errors.admission.overloaded"
 
 
 class GenericError(Singleton):
@@ -1,14 +1,27 @@
+from typing import Optional
+
+from starlette.status import HTTP_400_BAD_REQUEST
+
 from src.core.translation.translation_manager import TranslationManager
 
 
 class S3ProxyServiceException(Exception):
-    def __init__(self, key: str):
+    def __init__(
+        self,
+        key: str,
+        status_code: int = HTTP_400_BAD_REQUEST,
+        headers: Optional[dict] = None,
+    ):
         """
         Basic application exception
         :param key: error key
+        :param status_code: http status code of the error response
+        :param headers: additional headers of the error response
         """
         self.translation_manager = TranslationManager()
         self.key = key
+        self.status_code = status_code
+        self.headers = headers
 
     def get_message(self):
         return self.translation_manager.translate(self.key)
@@ -8,14 +8,17 @@ from starlette.status import (
     HTTP_400_BAD_REQUEST,
 )
 
-from src.core.exceptions.error_codes import GenericError
+from src.core.exceptions.error_codes import GenericError, MinioError
 from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.metrics.metrics import Metrics
+from src.core.tracing.tracer import Tracer
 from src.core.translation.translation_manager import TranslationManager
 from src.core.common.singleton import Singleton
 
 
 class ExceptionHandler(metaclass=Singleton):
     translation_manager = TranslationManager()
+    CONNECTION_ERROR_CODE: str = "ConnectionError"
 
     @staticmethod
     async def handle(request: Request, exc: Exception) -> Response:
@@ -25,30 +28,58 @@ class ExceptionHandler(metaclass=Singleton):
         :param exc: exception
         :return: response
         """
+        with Tracer().span("ExceptionHandler.handle") as span:
+            if span is not None:
+                span.set_error(exc)
+            return ExceptionHandler.__response(exc)
+
+    @staticmethod
+    def __response(exc: Exception) -> Response:
+        """
+        :param exc: exception
+        :return: error response of the exception
+        """
+        status_code = ExceptionHandler.status_code(exc)
         if isinstance(exc, S3ProxyServiceException):
+            if exc.key == MinioError.CONNECTION_ERROR:
+                Metrics().minio_errors.inc((ExceptionHandler.CONNECTION_ERROR_CODE,))
             return JSONResponse(
-                status_code=HTTP_400_BAD_REQUEST, content={"message": exc.get_message()}
+                status_code=status_code,
+                content={"message": exc.get_message()},
+                headers=exc.headers,
             )
 
         if isinstance(exc, S3Error):
-            status_code = (
-                HTTP_404_NOT_FOUND
-                if exc.code in ["NoSuchBucket", "NoSuchKey"]
-                else HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            Metrics().minio_errors.inc((exc.code,))
             return JSONResponse(
                 status_code=status_code, content={"message": exc.args[0]}
             )
 
         if isinstance(exc, ValidationError) or isinstance(exc, ValueError):
             return JSONResponse(
-                status_code=HTTP_400_BAD_REQUEST, content={"message": exc.args[0]}
+                status_code=status_code, content={"message": exc.args[0]}
             )
 
         unknown_error_message = ExceptionHandler.translation_manager.translate(
             GenericError.UNKNOWN_ERROR
         )
         return JSONResponse(
-            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status_code,
             content={"message": unknown_error_message},
         )
+
+    @staticmethod
+    def status_code(exc: Exception) -> int:
+        """
+        :param exc: exception
+        :return: http status code of the error response
+        """
+        if isinstance(exc, S3ProxyServiceException):
+            return exc.status_code
+        if isinstance(exc, S3Error):
+            if exc.code in ["NoSuchBucket", "NoSuchKey", "NoSuchUpload"]:
+                return HTTP_404_NOT_FOUND
+            return HTTP_500_INTERNAL_SERVER_ERROR
+        if isinstance(exc, ValidationError) or isinstance(exc, ValueError):
+            return HTTP_400_BAD_REQUEST
+        return HTTP_500_INTERNAL_SERVER_ERROR
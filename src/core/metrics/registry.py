@@ -0,0 +1,168 @@
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    """
+    Metric with a fixed set of label names, one series per label values.
+    Rendered in the Prometheus text exposition format.
+    """
+
+    type_name: str = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]):
+        """
+        :param name: metric name
+        :param documentation: HELP line of the metric
+        :param label_names: names of the labels, values are passed in this order
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _labels(self, label_values: LabelValues, extra: str = "") -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"'
+            for name, value in zip(self.label_names, label_values)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """
+        :return: exposition lines of the series
+        """
+
+    def render(self) -> List[str]:
+        """
+        :return: exposition lines of the metric
+        """
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self._samples(),
+        ]
+
+
+class Counter(Metric):
+    type_name: str = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, label_values: LabelValues = (), amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, label_values: LabelValues = ()) -> float:
+        return self._values.get(label_values, 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{self._labels(labels)} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+
+class Gauge(Counter):
+    type_name: str = "gauge"
+
+    def dec(self, label_values: LabelValues = (), amount: float = 1):
+        self.inc(label_values, -amount)
+
+    def set(self, label_values: LabelValues = (), value: float = 0):
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(Metric):
+    """
+    Cumulative histogram of observed values with fixed upper bounds
+    """
+
+    type_name: str = "histogram"
+    DEFAULT_BUCKETS: Tuple[float, ...] = (
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+        30,
+        60,
+    )
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        :param buckets: upper bounds of the buckets, +Inf is added
+        """
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, label_values: LabelValues, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, label_values: LabelValues = ()) -> int:
+        series = self._series.get(label_values)
+        return sum(series[:-1]) if series is not None else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series_items = sorted(
+                (labels, list(series)) for labels, series in self._series.items()
+            )
+        samples = []
+        for labels, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                samples.append(
+                    f"{self.name}_bucket{self._labels(labels, le)} {cumulative}"
+                )
+            samples.append(
+                f"{self.name}_sum{self._labels(labels)} {_format_value(series[-1])}"
+            )
+            samples.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return samples
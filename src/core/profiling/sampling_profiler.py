@@ -0,0 +1,142 @@
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from src.core.common.singleton import Singleton
+
+
+class SamplingProfiler(metaclass=Singleton):
+    """
+    Opt-in sampling profiler enabled with PROFILER_ENABLED=true.
+    A capture samples the stacks of all threads every PROFILER_INTERVAL_MS for
+    a number of seconds and writes them to PROFILER_OUTPUT_DIR in the collapsed
+    stack format read by flamegraph.pl, speedscope and inferno.
+    Captures are started from /admin/profile or by sending PROFILER_SIGNAL to
+    the process.
+    """
+
+    DEFAULT_INTERVAL_MS: str = "5"
+    DEFAULT_OUTPUT_DIR: str = "profiles"
+    DEFAULT_SIGNAL: str = "SIGUSR2"
+    DEFAULT_SIGNAL_SECONDS: str = "30"
+    MAX_SECONDS: float = 600
+    THREAD_NAME: str = "sampling-profiler"
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.enabled: bool = os.getenv("PROFILER_ENABLED", "False").lower() == "true"
+        self.interval = (
+            float(os.getenv("PROFILER_INTERVAL_MS", self.DEFAULT_INTERVAL_MS)) / 1000
+        )
+        self.output_dir = os.getenv("PROFILER_OUTPUT_DIR", self.DEFAULT_OUTPUT_DIR)
+        self.signal_name = os.getenv("PROFILER_SIGNAL", self.DEFAULT_SIGNAL)
+        self.signal_seconds = float(
+            os.getenv("PROFILER_SIGNAL_SECONDS", self.DEFAULT_SIGNAL_SECONDS)
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(self, seconds: float) -> Optional[str]:
+        """
+        Starts a capture in a background thread
+        :param seconds: capture length, at most MAX_SECONDS
+        :return: path the profile is written to, None if a capture is running
+        """
+        seconds = min(seconds, self.MAX_SECONDS)
+        with self._lock:
+            if self.running:
+                return None
+            path = os.path.join(
+                self.output_dir,
+                f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.folded",
+            )
+            self._thread = threading.Thread(
+                target=self.capture,
+                args=(seconds, path),
+                name=self.THREAD_NAME,
+                daemon=True,
+            )
+            self._thread.start()
+        self.logger.info(f"Profiling for {seconds:g} s into {path}.")
+        return path
+
+    def capture(self, seconds: float, path: str) -> int:
+        """
+        Samples all threads except the profiler and writes the collapsed stacks
+        :param seconds: capture length
+        :param path: output file path
+        :return: number of samples taken
+        """
+        own_thread_id = threading.get_ident()
+        stacks: Counter = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            thread_names = {
+                thread.ident: thread.name for thread in threading.enumerate()
+            }
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                stacks[self.__collapse(thread_names.get(thread_id), frame)] += 1
+            samples += 1
+            time.sleep(self.interval)
+
+        self.__write(path, stacks)
+        self.logger.info(f"Wrote {samples} sample(s) to {path}.")
+        return samples
+
+    def install_signal_handler(self):
+        """
+        Starts a capture of PROFILER_SIGNAL_SECONDS when the process receives
+        PROFILER_SIGNAL. Signal handlers are set from the main thread only, the
+        capture is started from another thread as the handler may interrupt
+        the main thread while it holds the lock.
+        """
+        if not self.enabled:
+            return
+        try:
+            signal.signal(
+                getattr(signal, self.signal_name),
+                lambda signum, frame: threading.Thread(
+                    target=self.start, args=(self.signal_seconds,), daemon=True
+                ).start(),
+            )
+        except (AttributeError, ValueError) as e:
+            self.logger.warning(f"Profiler signal {self.signal_name} not set: {e}")
+
+    @staticmethod
+    def __collapse(thread_name: Optional[str], frame) -> str:
+        """
+        :param thread_name: name of the sampled thread
+        :param frame: innermost frame of the thread
+        :return: frames from the outermost one joined by ';'
+        """
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                f"{code.co_firstlineno})".replace(";", ":")
+            )
+            frame = frame.f_back
+        frames.append((thread_name or "thread").replace(";", ":"))
+        return ";".join(reversed(frames))
+
+    @staticmethod
+    def __write(path: str, stacks: Dict[str, int]):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.tmp", "w") as output:
+            for stack, count in sorted(stacks.items()):
+                output.write(f"{stack} {count}\n")
+        os.replace(f"{path}.tmp", path)
@@ -0,0 +1,229 @@
+import copy
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from src.models.upload.upload_session import SessionPart, UploadSession
+
+
+class UploadSessionStore(ABC):
+    """
+    Keeps the state of resumable uploads: the minio multipart upload of every
+    session and the parts received for it. Every method is atomic, so parts
+    of one session may arrive at the same time.
+    """
+
+    @abstractmethod
+    def add(self, session: UploadSession):
+        """
+        :param session: new session without parts
+        """
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[UploadSession]:
+        """
+        :param session_id: session id
+        :return: session with its received parts, None if there is none
+        """
+
+    @abstractmethod
+    def add_part(self, session_id: str, part: SessionPart, expires_at: float) -> bool:
+        """
+        Records a received part, replacing an earlier one of the same number
+        :param session_id: session id
+        :param part: received part
+        :param expires_at: new expiry time of the session
+        :return: False if the session is gone
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """
+        :param session_id: session id
+        :return: True if this call removed the session, so of several callers
+        only one acts on its removal
+        """
+
+    @abstractmethod
+    def expired(self, now: float) -> List[UploadSession]:
+        """
+        :param now: unix time
+        :return: sessions which expiry time passed
+        """
+
+    def close(self):
+        """
+        Releases the resources of the store
+        """
+
+
+class MemoryUploadSessionStore(UploadSessionStore):
+    """
+    Sessions of this worker process kept in memory, lost on restart and not
+    seen by other workers
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, UploadSession] = {}
+        self._lock = threading.Lock()
+
+    def add(self, session: UploadSession):
+        with self._lock:
+            self._sessions[session.session_id] = copy.deepcopy(session)
+
+    def get(self, session_id: str) -> Optional[UploadSession]:
+        with self._lock:
+            return copy.deepcopy(self._sessions.get(session_id))
+
+    def add_part(self, session_id: str, part: SessionPart, expires_at: float) -> bool:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return False
+            session.parts[part.part_number] = copy.copy(part)
+            session.expires_at = expires_at
+            return True
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def expired(self, now: float) -> List[UploadSession]:
+        with self._lock:
+            return [
+                copy.deepcopy(session)
+                for session in self._sessions.values()
+                if session.expires_at <= now
+            ]
+
+
+class SqliteUploadSessionStore(UploadSessionStore):
+    """
+    Sessions kept in a SQLite database file, shared by the workers of the host
+    and kept across restarts
+    """
+
+    SCHEMA: str = """
+        CREATE TABLE IF NOT EXISTS upload_sessions (
+            session_id TEXT PRIMARY KEY,
+            bucket_name TEXT NOT NULL,
+            object_name TEXT NOT NULL,
+            upload_id TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            part_size INTEGER NOT NULL,
+            content_type TEXT,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS upload_sessions_expires_at
+            ON upload_sessions (expires_at);
+        CREATE TABLE IF NOT EXISTS upload_session_parts (
+            session_id TEXT NOT NULL,
+            part_number INTEGER NOT NULL,
+            etag TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            PRIMARY KEY (session_id, part_number)
+        );
+    """
+    SESSION_COLUMNS: str = (
+        "session_id, bucket_name, object_name, upload_id, size, part_size, "
+        "content_type, created_at, expires_at"
+    )
+    BUSY_TIMEOUT_SECONDS: float = 30
+
+    def __init__(self, path: str):
+        """
+        :param path: database file, created with its directory if missing
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(
+            path, timeout=self.BUSY_TIMEOUT_SECONDS, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(self.SCHEMA)
+
+    def add(self, session: UploadSession):
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT INTO upload_sessions ({self.SESSION_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session.session_id,
+                    session.bucket_name,
+                    session.object_name,
+                    session.upload_id,
+                    session.size,
+                    session.part_size,
+                    session.content_type,
+                    session.created_at,
+                    session.expires_at,
+                ),
+            )
+
+    def get(self, session_id: str) -> Optional[UploadSession]:
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {self.SESSION_COLUMNS} FROM upload_sessions "
+                "WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            parts = self._connection.execute(
+                "SELECT part_number, etag, size FROM upload_session_parts "
+                "WHERE session_id = ?",
+                (session_id,),
+            ).fetchall()
+        return UploadSession(
+            *row,
+            parts={
+                part_number: SessionPart(part_number, etag, size)
+                for part_number, etag, size in parts
+            },
+        )
+
+    def add_part(self, session_id: str, part: SessionPart, expires_at: float) -> bool:
+        with self._lock, self._connection:
+            updated = self._connection.execute(
+                "UPDATE upload_sessions SET expires_at = ? WHERE session_id = ?",
+                (expires_at, session_id),
+            ).rowcount
+            if not updated:
+                return False
+            self._connection.execute(
+                "INSERT OR REPLACE INTO upload_session_parts "
+                "(session_id, part_number, etag, size) VALUES (?, ?, ?, ?)",
+                (session_id, part.part_number, part.etag, part.size),
+            )
+            return True
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM upload_session_parts WHERE session_id = ?",
+                (session_id,),
+            )
+            return bool(
+                self._connection.execute(
+                    "DELETE FROM upload_sessions WHERE session_id = ?",
+                    (session_id,),
+                ).rowcount
+            )
+
+    def expired(self, now: float) -> List[UploadSession]:
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {self.SESSION_COLUMNS} FROM upload_sessions "
+                "WHERE expires_at <= ?",
+                (now,),
+            ).fetchall()
+        return [UploadSession(*row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
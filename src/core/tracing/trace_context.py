@@ -0,0 +1,73 @@
+import re
+import secrets
+from typing import Optional
+
+TRACEPARENT_HEADER: str = "traceparent"
+TRACEPARENT_PATTERN = re.compile(
+    r"^(?P<version>[0-9a-f]{2})-(?P<trace_id>[0-9a-f]{32})-"
+    r"(?P<parent_id>[0-9a-f]{16})-(?P<flags>[0-9a-f]{2})(?:-.*)?$"
+)
+SAMPLED_FLAG: int = 0x01
+INVALID_VERSION: str = "ff"
+INVALID_TRACE_ID: str = "0" * 32
+INVALID_SPAN_ID: str = "0" * 16
+
+
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+def new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+class TraceContext:
+    """
+    W3C trace context carried by the traceparent header,
+    see https://www.w3.org/TR/trace-context/
+    """
+
+    __slots__ = ("trace_id", "parent_id", "sampled")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], sampled: bool):
+        """
+        :param trace_id: 32 hex digits id of the whole trace
+        :param parent_id: 16 hex digits id of the caller span, if any
+        :param sampled: whether the caller records the trace
+        """
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.sampled = sampled
+
+    @staticmethod
+    def parse(traceparent: Optional[str]) -> Optional["TraceContext"]:
+        """
+        :param traceparent: traceparent header value
+        :return: trace context, None for a missing or invalid header
+        """
+        if not traceparent:
+            return None
+        match = TRACEPARENT_PATTERN.match(traceparent.strip().lower())
+        if (
+            match is None
+            or match["version"] == INVALID_VERSION
+            or match["trace_id"] == INVALID_TRACE_ID
+            or match["parent_id"] == INVALID_SPAN_ID
+            or (match["version"] == "00" and len(traceparent.strip()) != 55)
+        ):
+            return None
+        return TraceContext(
+            match["trace_id"],
+            match["parent_id"],
+            bool(int(match["flags"], 16) & SAMPLED_FLAG),
+        )
+
+    @staticmethod
+    def format(trace_id: str, span_id: str, sampled: bool) -> str:
+        """
+        :param trace_id: trace id
+        :param span_id: id of the span the receiver is called from
+        :param sampled: whether the trace is recorded
+        :return: traceparent header value
+        """
+        return f"00-{trace_id}-{span_id}-{SAMPLED_FLAG if sampled else 0:02x}"
@@ -0,0 +1,259 @@
+import functools
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Callable, List, Optional, TypeVar
+
+from src.core.common.singleton import Singleton
+from src.core.tracing.trace_context import TraceContext, new_span_id, new_trace_id
+
+T = TypeVar("T")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Trace:
+    """
+    Spans recorded for one request
+    """
+
+    __slots__ = ("trace_id", "started_at", "started", "spans", "dropped_spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.spans: List["Span"] = []
+        self.dropped_spans = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "started_at": self.started_at,
+            "dropped_spans": self.dropped_spans,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+class Span:
+    """
+    Timed operation of a trace, child of the span it was started in
+    """
+
+    __slots__ = (
+        "trace",
+        "name",
+        "span_id",
+        "parent_id",
+        "started",
+        "duration",
+        "attributes",
+    )
+
+    def __init__(
+        self, trace: Trace, name: str, parent_id: Optional[str], attributes: dict
+    ):
+        self.trace = trace
+        self.name = name
+        self.span_id = new_span_id()
+        self.parent_id = parent_id
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.attributes = attributes
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_error(self, exc: BaseException):
+        """
+        Marks the span failed by the exception leaving it
+        :param exc: exception
+        """
+        self.attributes["error"] = type(exc).__name__
+        code = getattr(exc, "code", None) or getattr(exc, "key", None)
+        if isinstance(code, str):
+            self.attributes["error.code"] = code
+
+    @property
+    def traceparent(self) -> str:
+        return TraceContext.format(self.trace.trace_id, self.span_id, True)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": round((self.started - self.trace.started) * 1000, 3),
+            "duration_ms": (
+                round(self.duration * 1000, 3) if self.duration is not None else None
+            ),
+            "attributes": self.attributes,
+        }
+
+
+class SpanScope:
+    """
+    Context manager making the span the current one while it runs
+    """
+
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.span.duration = time.perf_counter() - self.span.started
+        if exc_value is not None:
+            self.span.set_error(exc_value)
+        _current_span.reset(self.token)
+        if self.span.trace.spans[0] is self.span:
+            self.tracer.record(self.span.trace)
+
+
+class _NoSpanScope:
+    """
+    Context manager used when nothing is traced
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+NO_SPAN = _NoSpanScope()
+
+
+class Tracer(metaclass=Singleton):
+    """
+    Opt-in per-request span timing enabled with TRACING_ENABLED=true.
+    The trace of a request continues the W3C traceparent sent by the client and
+    is passed on to MinIO. Finished traces are kept in memory for
+    /admin/traces and the ones slower than TRACING_SLOW_REQUEST_MS are logged.
+    """
+
+    DEFAULT_SAMPLE_RATIO: str = "1"
+    DEFAULT_MAX_TRACES: str = "100"
+    DEFAULT_MAX_SPANS: str = "1000"
+    DEFAULT_SLOW_REQUEST_MS: str = "1000"
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.enabled: bool = os.getenv("TRACING_ENABLED", "False").lower() == "true"
+        self.sample_ratio = float(
+            os.getenv("TRACING_SAMPLE_RATIO", self.DEFAULT_SAMPLE_RATIO)
+        )
+        self.max_spans = int(os.getenv("TRACING_MAX_SPANS", self.DEFAULT_MAX_SPANS))
+        self.slow_request_seconds = (
+            float(os.getenv("TRACING_SLOW_REQUEST_MS", self.DEFAULT_SLOW_REQUEST_MS))
+            / 1000
+        )
+        self._traces: deque = deque(
+            maxlen=int(os.getenv("TRACING_MAX_TRACES", self.DEFAULT_MAX_TRACES))
+        )
+
+    def trace(self, name: str, traceparent: Optional[str] = None, **attributes):
+        """
+        Starts the trace of a request. Requests continuing a trace are recorded
+        when the caller records it, others are sampled by TRACING_SAMPLE_RATIO.
+        :param name: name of the root span
+        :param traceparent: traceparent header sent by the client
+        :param attributes: attributes of the root span
+        :return: context manager of the root span, yielding None when not traced
+        """
+        if not self.enabled:
+            return NO_SPAN
+        context = TraceContext.parse(traceparent)
+        if context is not None:
+            if not context.sampled:
+                return NO_SPAN
+            trace = Trace(context.trace_id)
+        elif random.random() < self.sample_ratio:
+            trace = Trace(new_trace_id())
+        else:
+            return NO_SPAN
+        span = Span(trace, name, context and context.parent_id, attributes)
+        trace.spans.append(span)
+        return SpanScope(self, span)
+
+    def span(self, name: str, **attributes):
+        """
+        :param name: span name
+        :param attributes: span attributes
+        :return: context manager of a child of the current span,
+        yielding None outside of a trace
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return NO_SPAN
+        trace = parent.trace
+        if len(trace.spans) >= self.max_spans:
+            trace.dropped_spans += 1
+            return NO_SPAN
+        span = Span(trace, name, parent.span_id, attributes)
+        trace.spans.append(span)
+        return SpanScope(self, span)
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    @staticmethod
+    def traceparent() -> Optional[str]:
+        """
+        :return: traceparent header for calls made from the current span
+        """
+        span = _current_span.get()
+        return span.traceparent if span is not None else None
+
+    def record(self, trace: Trace):
+        """
+        Keeps the finished trace and logs it when the request was slow
+        :param trace: finished trace
+        """
+        self._traces.append(trace)
+        duration = trace.spans[0].duration or 0
+        if duration >= self.slow_request_seconds:
+            self.logger.warning(
+                f"Slow request took {duration * 1000:.1f} ms: "
+                f"{json.dumps(trace.to_dict())}"
+            )
+
+    def recent(self) -> List[dict]:
+        """
+        :return: recently finished traces, newest first
+        """
+        return [trace.to_dict() for trace in reversed(list(self._traces))]
+
+
+def traced(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Decorator recording calls made within a trace as spans
+    :param name: span name
+    :return: decorator
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> T:
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with Tracer().span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,11 +1,80 @@
+import functools
 import re
 
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 
 from src.core.exceptions.error_codes import MinioError
 from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.metrics.metrics import Metrics, Stage
 
-BUCKET_NAME_PATTERN = r"(?!(^((2(5[0-5]|[0-4][0-9])|[01]?[0-9]{1,2})\.){3}(2(5[0-5]|[0-4][0-9])|[01]?[0-9]{1,2})$|^xn--|.+-s3alias$))^[a-z0-9][a-z0-9.-]{1,61}[a-z0-9]$"
+VALIDATED_BUCKET_NAMES_MAX: int = 4096
+BUCKET_NAME_CHARACTERS = re.compile(r"[a-z0-9][a-z0-9.-]{1,61}[a-z0-9]")
+OBJECT_NAME_CHARACTERS = re.compile(r"[a-zA-Z0-9!\-_.*'()/]+")
+
+
+def is_ip_address(bucket_name: str) -> bool:
+    """
+    :param bucket_name: bucket name
+    :return: whether the name is formatted as an IPv4 address, octets may have
+    leading zeros
+    """
+    octets = bucket_name.split(".")
+    return len(octets) == 4 and all(
+        octet.isdigit()
+        and len(octet) <= 3
+        and (len(octet) < 3 or octet[0] in "01" or (octet[0] == "2" and octet <= "255"))
+        for octet in octets
+    )
+
+
+def is_valid_bucket_name(bucket_name: str) -> bool:
+    """
+    Checks bucket name against minio rules in a single pass over the name:
+    3 to 63 lowercase letters, digits, periods and hyphens, starting and ending
+    with a letter or digit, no adjacent periods/hyphens (which rules out the
+    xn-- prefix), not formatted as an IP address and no -s3alias suffix
+    :param bucket_name: minio s3 bucket
+    :return: whether the name is valid
+    """
+    return (
+        BUCKET_NAME_CHARACTERS.fullmatch(bucket_name) is not None
+        and ".." not in bucket_name
+        and "--" not in bucket_name
+        and ".-" not in bucket_name
+        and "-." not in bucket_name
+        and not bucket_name.endswith("-s3alias")
+        and not (bucket_name[-1].isdigit() and is_ip_address(bucket_name))
+    )
+
+
+@functools.lru_cache(maxsize=VALIDATED_BUCKET_NAMES_MAX)
+def validate_bucket_name(bucket_name: str) -> str:
+    """
+    Validates bucket name according to minio rules.
+    Valid names are kept in a bounded LRU, as requests mostly use a few
+    buckets; invalid ones raise and are not kept.
+    :param bucket_name: minio s3 bucket
+    :return: bucket name
+    """
+    if not is_valid_bucket_name(bucket_name):
+        raise S3ProxyServiceException(MinioError.INCORRECT_BUCKET_NAME)
+
+    return bucket_name
+
+
+def validate_object_name(object_name: str) -> str:
+    """
+    Validates object name according to minio rules
+
+    :param object_name: minio s3 object
+    :return: object name
+    """
+    if not (1 <= len(object_name) <= 1024) or (
+        OBJECT_NAME_CHARACTERS.fullmatch(object_name) is None
+    ):
+        raise S3ProxyServiceException(MinioError.INCORRECT_OBJECT_NAME)
+
+    return object_name
 
 
 class BaseRequest(BaseModel):
@@ -13,31 +82,18 @@ class BaseRequest(BaseModel):
     bucket_name: str = Field()
     object_name: str = Field()
 
-    @field_validator("bucket_name")
-    def validate_bucket_name(cls, bucket_name):
+    @model_validator(mode="wrap")
+    def measure_validation(cls, data, handler):
         """
-        Validates bucket name according to minio rules
-        :param bucket_name: minio s3 bucket
-        :return: bucket name
+        Times validation of the request as the validation stage
         """
-        pattern_match = bool(re.fullmatch(BUCKET_NAME_PATTERN, bucket_name))
-        contains_consecutive_dots = bool(re.search(r"[!_\-.*\'()/]{2,}", bucket_name))
-        if (not pattern_match) or contains_consecutive_dots:
-            raise S3ProxyServiceException(MinioError.INCORRECT_BUCKET_NAME)
+        with Metrics().stage(Stage.VALIDATION):
+            return handler(data)
 
-        return bucket_name
+    @field_validator("bucket_name")
+    def validate_bucket_name(cls, bucket_name):
+        return validate_bucket_name(bucket_name)
 
     @field_validator("object_name")
     def validate_object_name(cls, object_name):
-        """
-        Validates object name according to minio rules
-
-        :param object_name: minio s3 object
-        :return: object name
-        """
-        if not (1 <= len(object_name) <= 1024) or (
-            not re.fullmatch(r"^[a-zA-Z0-9!\-_.*\'()/]+$", object_name)
-        ):
-            raise S3ProxyServiceException(MinioError.INCORRECT_OBJECT_NAME)
-
-        return object_name
+        return validate_object_name(object_name)
@@ -0,0 +1,57 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from src.core.exceptions.error_codes import DownloadError
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.models.base_s3_request import validate_bucket_name, validate_object_name
+
+
+class ArchiveRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, populate_by_name=True)
+    bucket_name: str = Field()
+    prefix: Optional[str] = Field(default=None)
+    object_names: Optional[List[str]] = Field(default=None)
+    archive_format: Literal["tar", "zip"] = Field(default="tar", alias="format")
+
+    @field_validator("bucket_name")
+    def validate_bucket_name(cls, bucket_name):
+        return validate_bucket_name(bucket_name)
+
+    @field_validator("prefix")
+    def validate_prefix(cls, prefix):
+        """
+        Validates prefix with the object name rules
+        :param prefix: object name prefix
+        :return: prefix
+        """
+        return validate_object_name(prefix) if prefix is not None else None
+
+    @field_validator("object_names")
+    def validate_object_names(cls, object_names):
+        """
+        Validates every object name according to minio rules
+        :param object_names: minio s3 objects
+        :return: object names
+        """
+        if object_names is None:
+            return None
+        return [validate_object_name(object_name) for object_name in object_names]
+
+    @model_validator(mode="after")
+    def validate_content(self):
+        """
+        Archive needs a prefix or a list of objects
+        :return: request
+        """
+        if self.prefix is None and not self.object_names:
+            raise S3ProxyServiceException(DownloadError.ARCHIVE_CONTENT_MISSING)
+        return self
+
+    @property
+    def file_name(self) -> str:
+        """
+        :return: archive file name, last segment of the prefix or bucket name
+        """
+        name = (self.prefix or "").strip("/").split("/")[-1] or self.bucket_name
+        return f"{name}.{self.archive_format}"
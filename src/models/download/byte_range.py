@@ -0,0 +1,115 @@
+import re
+from typing import List, Optional
+
+from starlette.status import HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+
+from src.core.exceptions.error_codes import DownloadError
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.models.download.object_info import ObjectInfo
+
+RANGE_SPEC_PATTERN = re.compile(r"^(\d*)-(\d*)$")
+MAX_RANGES: int = 16
+
+
+class ByteRange:
+
+    def __init__(self, start: int, end: int):
+        """
+        Inclusive byte range of an object
+        :param start: first byte position
+        :param end: last byte position
+        """
+        self.start = start
+        self.end = end
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+    def content_range(self, size: int) -> str:
+        """
+        :param size: full object size
+        :return: value of the Content-Range header
+        """
+        return f"bytes {self.start}-{self.end}/{size}"
+
+    def __eq__(self, o: object) -> bool:
+        if isinstance(o, ByteRange):
+            return (self.start, self.end) == (o.start, o.end)
+        return False
+
+    def __repr__(self) -> str:
+        return f"ByteRange({self.start}, {self.end})"
+
+
+def parse_range_header(range_header: str, size: int) -> Optional[List[ByteRange]]:
+    """
+    Parses value of the Range header (RFC 9110, bytes unit only).
+    Overlapping and adjacent ranges are coalesced.
+    :param range_header: Range header value, e.g. "bytes=0-99,-100"
+    :param size: full object size
+    :return: satisfiable ranges, None if the header must be ignored
+    :raise S3ProxyServiceException: 416 if none of the ranges is satisfiable
+    """
+    unit, _, range_set = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not range_set.strip():
+        return None
+
+    range_specs = [spec.strip() for spec in range_set.split(",") if spec.strip()]
+    if not range_specs or len(range_specs) > MAX_RANGES:
+        return None
+
+    ranges: List[ByteRange] = []
+    for spec in range_specs:
+        spec_match = RANGE_SPEC_PATTERN.fullmatch(spec)
+        if spec_match is None:
+            return None
+        first, last = spec_match.groups()
+        if not first:
+            if not last:
+                return None
+            suffix_length = int(last)
+            if suffix_length > 0 and size > 0:
+                ranges.append(ByteRange(max(size - suffix_length, 0), size - 1))
+            continue
+        start = int(first)
+        end = int(last) if last else size - 1
+        if end < start:
+            return None
+        if start < size:
+            ranges.append(ByteRange(start, min(end, size - 1)))
+
+    if not ranges:
+        raise S3ProxyServiceException(
+            DownloadError.RANGE_NOT_SATISFIABLE,
+            status_code=HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+    ranges.sort(key=lambda byte_range: byte_range.start)
+    coalesced = [ranges[0]]
+    for byte_range in ranges[1:]:
+        if byte_range.start <= coalesced[-1].end + 1:
+            coalesced[-1] = ByteRange(
+                coalesced[-1].start, max(coalesced[-1].end, byte_range.end)
+            )
+        else:
+            coalesced.append(byte_range)
+    return coalesced
+
+
+def if_range_matches(if_range_header: Optional[str], object_info: ObjectInfo) -> bool:
+    """
+    Evaluates If-Range precondition, weak etags never match
+    :param if_range_header: If-Range header value
+    :param object_info: current object info
+    :return: True if the Range header has to be applied
+    """
+    if not if_range_header:
+        return True
+    if_range_header = if_range_header.strip()
+    if if_range_header.startswith("W/"):
+        return False
+    if if_range_header.startswith('"'):
+        return object_info.http_etag == if_range_header
+    return object_info.http_last_modified == if_range_header
@@ -0,0 +1,50 @@
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from src.models.download.object_info import ObjectInfo
+
+
+def etag_matches(if_none_match: str, object_info: ObjectInfo) -> bool:
+    """
+    Weak comparison of If-None-Match entity tags with the object etag
+    :param if_none_match: If-None-Match header value
+    :param object_info: current object info
+    :return: True if any of the tags matches
+    """
+    if if_none_match.strip() == "*":
+        return True
+    if not object_info.etag:
+        return False
+    for entity_tag in if_none_match.split(","):
+        entity_tag = entity_tag.strip()
+        if entity_tag.startswith("W/"):
+            entity_tag = entity_tag[2:]
+        if entity_tag == object_info.http_etag:
+            return True
+    return False
+
+
+def is_not_modified(
+    object_info: ObjectInfo,
+    if_none_match: Optional[str] = None,
+    if_modified_since: Optional[str] = None,
+) -> bool:
+    """
+    Evaluates GET preconditions (RFC 9110 13.2.2), If-Modified-Since is
+    ignored when If-None-Match is present
+    :param object_info: current object info
+    :param if_none_match: If-None-Match header value
+    :param if_modified_since: If-Modified-Since header value
+    :return: True if 304 Not Modified has to be returned
+    """
+    if if_none_match:
+        return etag_matches(if_none_match, object_info)
+    if not if_modified_since or object_info.last_modified is None:
+        return False
+    try:
+        modified_since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if modified_since.tzinfo is None:
+        return False
+    return object_info.last_modified.replace(microsecond=0) <= modified_since
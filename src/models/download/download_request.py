@@ -1,5 +1,22 @@
-from src.models.base_s3_request import BaseRequest
+from src.core.metrics.metrics import Metrics, Stage
+from src.models.base_s3_request import validate_bucket_name, validate_object_name
 
 
-class DownloadRequest(BaseRequest):
-    pass
+class DownloadRequest:
+    """
+    Bucket and object names of a download.
+    A plain class rather than a pydantic model: downloads only check two path
+    strings, which costs less than building the model around them. Names are
+    stripped and validated like BaseRequest does.
+    """
+
+    __slots__ = ("bucket_name", "object_name")
+
+    def __init__(self, bucket_name: str, object_name: str):
+        """
+        :param bucket_name: minio s3 bucket
+        :param object_name: minio s3 object
+        """
+        with Metrics().stage(Stage.VALIDATION):
+            self.bucket_name: str = validate_bucket_name(bucket_name.strip())
+            self.object_name: str = validate_object_name(object_name.strip())
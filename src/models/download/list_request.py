@@ -0,0 +1,30 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from src.models.base_s3_request import validate_bucket_name, validate_object_name
+
+
+class ListRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, populate_by_name=True)
+    bucket_name: str = Field()
+    prefix: Optional[str] = Field(default=None)
+    delimiter: Optional[str] = Field(default=None, max_length=16)
+    start_after: Optional[str] = Field(default=None)
+    continuation_token: Optional[str] = Field(default=None, max_length=1024)
+    max_keys: int = Field(default=1000, ge=1, le=1000)
+    list_format: Literal["json", "ndjson"] = Field(default="json", alias="format")
+
+    @field_validator("bucket_name")
+    def validate_bucket_name(cls, bucket_name):
+        return validate_bucket_name(bucket_name)
+
+    @field_validator("prefix", "delimiter", "start_after")
+    def validate_name_part(cls, value):
+        """
+        Validates prefix, delimiter and start-after with the object name rules,
+        empty values are dropped
+        :param value: part of an object name
+        :return: value
+        """
+        return validate_object_name(value) if value else None
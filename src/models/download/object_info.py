@@ -0,0 +1,61 @@
+from datetime import datetime
+from email.utils import format_datetime
+from typing import Optional
+
+
+class ObjectInfo:
+
+    def __init__(
+        self,
+        bucket_name: str,
+        object_name: str,
+        size: int,
+        etag: Optional[str] = None,
+        content_type: Optional[str] = None,
+        last_modified: Optional[datetime] = None,
+        content_encoding: Optional[str] = None,
+    ):
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+        self.size = size
+        self.etag = etag
+        self.content_type = content_type
+        self.last_modified = last_modified
+        self.content_encoding = content_encoding
+
+    @property
+    def http_etag(self) -> Optional[str]:
+        """
+        :return: etag quoted as in the ETag header
+        """
+        return f'"{self.etag}"' if self.etag else None
+
+    @property
+    def http_last_modified(self) -> Optional[str]:
+        """
+        :return: last modification date formatted as in the Last-Modified header
+        """
+        if self.last_modified is None:
+            return None
+        return format_datetime(self.last_modified, usegmt=True)
+
+    def __eq__(self, o: object) -> bool:
+        if isinstance(o, ObjectInfo):
+            return (
+                self.bucket_name,
+                self.object_name,
+                self.size,
+                self.etag,
+                self.content_type,
+                self.last_modified,
+                self.content_encoding,
+            ) == (
+                o.bucket_name,
+                o.object_name,
+                o.size,
+                o.etag,
+                o.content_type,
+                o.last_modified,
+                o.content_encoding,
+            )
+        return False
@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import List, Optional
+
+from minio.datatypes import Object
+
+
+class ListedObject:
+    __slots__ = ("object_name", "size", "etag", "last_modified", "is_prefix")
+
+    def __init__(
+        self,
+        object_name: str,
+        size: Optional[int] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[datetime] = None,
+        is_prefix: bool = False,
+    ):
+        """
+        File or common prefix of a listing
+        :param object_name: minio s3 object name, or the prefix rolled up by the delimiter
+        :param size: file size
+        :param etag: file etag
+        :param last_modified: time the file was written
+        :param is_prefix: True for a common prefix
+        """
+        self.object_name = object_name
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.is_prefix = is_prefix
+
+    @classmethod
+    def from_minio(cls, listed_object: Object) -> "ListedObject":
+        """
+        :param listed_object: entry of a minio listing, common prefixes come
+        without size as they are not files
+        :return: listed object
+        """
+        return cls(
+            object_name=listed_object.object_name,
+            size=listed_object.size,
+            etag=listed_object.etag,
+            last_modified=listed_object.last_modified,
+            is_prefix=listed_object.size is None,
+        )
+
+    def to_response(self):
+        if self.is_prefix:
+            return {"prefix": self.object_name}
+        return {
+            "object_name": self.object_name,
+            "size": self.size,
+            "etag": self.etag,
+            "last_modified": (
+                self.last_modified.isoformat() if self.last_modified else None
+            ),
+        }
+
+
+class ObjectListing:
+
+    def __init__(
+        self,
+        bucket_name: str,
+        objects: List[ListedObject],
+        next_continuation_token: Optional[str] = None,
+    ):
+        """
+        One page of a listing
+        :param bucket_name: minio s3 bucket name
+        :param objects: files and common prefixes of the page
+        :param next_continuation_token: token of the next page, None on the last one
+        """
+        self.bucket_name = bucket_name
+        self.objects = objects
+        self.next_continuation_token = next_continuation_token
+
+    @property
+    def is_truncated(self) -> bool:
+        return self.next_continuation_token is not None
+
+    def to_response(self):
+        return {
+            "bucket_name": self.bucket_name,
+            "objects": [
+                listed_object.to_response()
+                for listed_object in self.objects
+                if not listed_object.is_prefix
+            ],
+            "prefixes": [
+                listed_object.object_name
+                for listed_object in self.objects
+                if listed_object.is_prefix
+            ],
+            "is_truncated": self.is_truncated,
+            "next_continuation_token": self.next_continuation_token,
+        }
@@ -0,0 +1,14 @@
+from typing import Optional
+
+from pydantic import Field
+
+from src.models.base_s3_request import BaseRequest
+
+
+class PresignUploadRequest(BaseRequest):
+    size: int = Field(ge=0)
+    content_type: Optional[str] = Field(default=None)
+
+
+class CompleteMultipartRequest(BaseRequest):
+    upload_id: str = Field(min_length=1)
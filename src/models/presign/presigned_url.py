@@ -0,0 +1,86 @@
+from datetime import datetime
+from typing import Dict, List
+
+
+class PresignedUrl:
+
+    def __init__(self, method: str, url: str, expires_at: datetime):
+        """
+        URL the client sends one request to MinIO with
+        :param method: http method of the request
+        :param url: presigned url
+        :param expires_at: time the url stops being accepted
+        """
+        self.method = method
+        self.url = url
+        self.expires_at = expires_at
+
+    def to_response(self):
+        return {
+            "method": self.method,
+            "url": self.url,
+            "expires_at": self.expires_at.isoformat(),
+        }
+
+
+class PresignedPost:
+
+    def __init__(self, url: str, fields: Dict[str, str], expires_at: datetime):
+        """
+        Form the client uploads one file to MinIO with, a multipart/form-data
+        POST of the fields followed by the file as the "file" field. The signed
+        policy binds the object name and the file size.
+        :param url: bucket url the form is posted to
+        :param fields: form fields, sent as they are
+        :param expires_at: time the form stops being accepted
+        """
+        self.url = url
+        self.fields = fields
+        self.expires_at = expires_at
+
+    def to_response(self):
+        return {
+            "method": "POST",
+            "url": self.url,
+            "fields": self.fields,
+            "expires_at": self.expires_at.isoformat(),
+        }
+
+
+class MultipartUploadPlan:
+
+    def __init__(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        part_size: int,
+        parts: List[PresignedUrl],
+    ):
+        """
+        Multipart upload started for the client. Part N holds bytes
+        [(N - 1) * part_size, N * part_size) of the file and is sent with the
+        N-th url, then the upload is completed through the proxy.
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :param upload_id: minio multipart upload id
+        :param part_size: size of every part but the last one
+        :param parts: presigned url per part, in part number order
+        """
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+        self.upload_id = upload_id
+        self.part_size = part_size
+        self.parts = parts
+
+    def to_response(self):
+        return {
+            "bucket_name": self.bucket_name,
+            "object_name": self.object_name,
+            "upload_id": self.upload_id,
+            "part_size": self.part_size,
+            "parts": [
+                {"part_number": part_number, **part.to_response()}
+                for part_number, part in enumerate(self.parts, start=1)
+            ],
+        }
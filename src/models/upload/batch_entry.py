@@ -0,0 +1,60 @@
+import mimetypes
+from typing import Optional
+
+from src.core.exceptions.error_codes import UploadError
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.models.base_s3_request import validate_object_name
+
+DEFAULT_CONTENT_TYPE: str = "application/octet-stream"
+
+
+class BatchEntry:
+    """
+    One file of a batch upload, data is None if the file is rejected
+    """
+
+    def __init__(
+        self,
+        object_name: str,
+        content_type: Optional[str],
+        data: Optional[bytes],
+        error: Optional[str] = None,
+    ):
+        """
+        :param object_name: minio s3 object name
+        :param content_type: file content type
+        :param data: file content
+        :param error: error key the file is rejected with
+        """
+        self.object_name = object_name
+        self.content_type = (
+            content_type or mimetypes.guess_type(object_name)[0] or DEFAULT_CONTENT_TYPE
+        )
+        self.data = data
+        self.error = error
+
+    @classmethod
+    def checked(
+        cls,
+        object_name: str,
+        content_type: Optional[str],
+        data: Optional[bytes],
+        size: int,
+        max_file_bytes: int,
+    ) -> "BatchEntry":
+        """
+        Creates entry, rejecting files with invalid names or over the size limit
+        :param object_name: minio s3 object name
+        :param content_type: file content type
+        :param data: file content, None if it was not kept
+        :param size: file size
+        :param max_file_bytes: size limit of a file
+        :return: entry
+        """
+        try:
+            validate_object_name(object_name)
+        except S3ProxyServiceException as e:
+            return cls(object_name, content_type, None, e.key)
+        if size > max_file_bytes or data is None:
+            return cls(object_name, content_type, None, UploadError.FILE_TOO_LARGE)
+        return cls(object_name, content_type, data)
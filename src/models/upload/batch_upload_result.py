@@ -0,0 +1,60 @@
+from typing import List, Optional
+
+
+class BatchObjectResult:
+
+    def __init__(
+        self,
+        object_name: str,
+        etag: Optional[str] = None,
+        error: Optional[str] = None,
+    ):
+        """
+        Result of one file of a batch upload
+        :param object_name: minio s3 object name
+        :param etag: etag of the uploaded object
+        :param error: error message if the file was not uploaded
+        """
+        self.object_name = object_name
+        self.etag = etag
+        self.error = error
+
+    def to_response(self):
+        if self.error is not None:
+            return {"object_name": self.object_name, "error": self.error}
+        return {"object_name": self.object_name, "etag": self.etag}
+
+    def __eq__(self, o: object) -> bool:
+        if isinstance(o, BatchObjectResult):
+            return (self.object_name, self.etag, self.error) == (
+                o.object_name,
+                o.etag,
+                o.error,
+            )
+        return False
+
+    def __repr__(self) -> str:
+        return f"BatchObjectResult({self.object_name!r}, {self.etag!r}, {self.error!r})"
+
+
+class BatchUploadResult:
+
+    def __init__(self, bucket_name: str, results: List[BatchObjectResult]):
+        """
+        :param bucket_name: minio s3 bucket name
+        :param results: results per file in request order
+        """
+        self.bucket_name = bucket_name
+        self.results = results
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for result in self.results if result.error is not None)
+
+    def to_response(self):
+        return {
+            "bucket_name": self.bucket_name,
+            "uploaded": len(self.results) - self.failed,
+            "failed": self.failed,
+            "results": [result.to_response() for result in self.results],
+        }
@@ -0,0 +1,5 @@
+from src.models.base_s3_request import BaseRequest
+
+
+class StreamUploadRequest(BaseRequest):
+    pass
@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+
+class SessionPart:
+
+    def __init__(self, part_number: int, etag: str, size: int):
+        """
+        Part of a resumable upload minio received
+        :param part_number: part number, starting at 1
+        :param etag: ETag minio returned for the part
+        :param size: part size in bytes
+        """
+        self.part_number = part_number
+        self.etag = etag
+        self.size = size
+
+    def to_response(self):
+        return {"part_number": self.part_number, "etag": self.etag, "size": self.size}
+
+
+class UploadSession:
+
+    def __init__(
+        self,
+        session_id: str,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        size: int,
+        part_size: int,
+        content_type: Optional[str],
+        created_at: float,
+        expires_at: float,
+        parts: Optional[Dict[int, SessionPart]] = None,
+    ):
+        """
+        Resumable upload of a file of known size sent in numbered parts. Part N
+        holds bytes [(N - 1) * part_size, N * part_size) of the file.
+        :param session_id: id the client refers to the session with
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :param upload_id: minio multipart upload id
+        :param size: file size in bytes
+        :param part_size: size of every part but the last one
+        :param content_type: file content type
+        :param created_at: unix time the session was created at
+        :param expires_at: unix time the session is aborted at unless a part
+        arrives before
+        :param parts: received parts by part number
+        """
+        self.session_id = session_id
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+        self.upload_id = upload_id
+        self.size = size
+        self.part_size = part_size
+        self.content_type = content_type
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.parts: Dict[int, SessionPart] = parts or {}
+
+    @property
+    def part_count(self) -> int:
+        return max(-(-self.size // self.part_size), 1)
+
+    def expected_part_size(self, part_number: int) -> Optional[int]:
+        """
+        :param part_number: part number
+        :return: size the part must have, None if the file has no such part
+        """
+        if not 1 <= part_number <= self.part_count:
+            return None
+        if part_number < self.part_count:
+            return self.part_size
+        return self.size - (self.part_count - 1) * self.part_size
+
+    @property
+    def missing_parts(self) -> List[int]:
+        return [
+            part_number
+            for part_number in range(1, self.part_count + 1)
+            if part_number not in self.parts
+        ]
+
+    @property
+    def received_bytes(self) -> int:
+        return sum(part.size for part in self.parts.values())
+
+    def to_response(self):
+        return {
+            "session_id": self.session_id,
+            "bucket_name": self.bucket_name,
+            "object_name": self.object_name,
+            "size": self.size,
+            "part_size": self.part_size,
+            "part_count": self.part_count,
+            "received_bytes": self.received_bytes,
+            "parts": [
+                self.parts[part_number].to_response()
+                for part_number in sorted(self.parts)
+            ],
+            "missing_parts": self.missing_parts,
+            "expires_at": datetime.fromtimestamp(
+                self.expires_at, timezone.utc
+            ).isoformat(),
+        }
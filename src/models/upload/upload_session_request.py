@@ -0,0 +1,10 @@
+from typing import Optional
+
+from pydantic import Field
+
+from src.models.base_s3_request import BaseRequest
+
+
+class UploadSessionRequest(BaseRequest):
+    size: int = Field(ge=0)
+    content_type: Optional[str] = Field(default=None)
@@ -0,0 +1,370 @@
+import io
+import logging
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+from typing import BinaryIO, Deque, Dict, Iterable, Iterator, List, Optional, Union
+
+from minio import Minio, S3Error
+from urllib3.exceptions import HTTPError
+
+from src.core.common.s3_executor import S3PartExecutor
+from src.core.exceptions.error_codes import MinioError
+from src.core.config.compression_policy import CompressionPolicy
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.service.compression import Operation, decompressor
+from src.service.object_stream import ObjectStream
+
+TAR_BLOCK_SIZE: int = 512
+ZIP_MIN_TIMESTAMP: float = 315532800.0
+
+
+class SpooledObject:
+    """
+    Object decompressed to a temporary file before it is archived, as archive
+    entries need their size up front and objects stored compressed only tell
+    their stored size
+    """
+
+    def __init__(self, file: BinaryIO, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            while True:
+                chunk = self.file.read(self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        self.file.close()
+
+
+class ArchiveItem:
+    """
+    Object fetched ahead for an archive. Small objects are read whole,
+    larger ones keep their response open and are streamed in their turn.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        size: int,
+        mtime: float,
+        data: Optional[bytes] = None,
+        stream: Optional[Union[ObjectStream, SpooledObject]] = None,
+    ):
+        self.name = name
+        self.size = size
+        self.mtime = mtime
+        self.data = data
+        self.stream = stream
+
+    def chunks(self) -> Iterable[bytes]:
+        return self.stream if self.stream is not None else [self.data]
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+
+
+class TarArchiveWriter:
+    """
+    Writes tar members one after another, sizes are known before the data
+    """
+
+    content_type: str = "application/x-tar"
+    extension: str = "tar"
+
+    def add(self, item: ArchiveItem) -> Iterator[bytes]:
+        info = tarfile.TarInfo(item.name)
+        info.size = item.size
+        info.mtime = int(item.mtime)
+        info.mode = 0o644
+        yield info.tobuf(format=tarfile.PAX_FORMAT)
+        written = 0
+        for chunk in item.chunks():
+            written += len(chunk)
+            yield chunk
+        if written != item.size:
+            raise S3ProxyServiceException(MinioError.CONNECTION_ERROR)
+        if item.size % TAR_BLOCK_SIZE:
+            yield tarfile.NUL * (TAR_BLOCK_SIZE - item.size % TAR_BLOCK_SIZE)
+
+    def finish(self) -> bytes:
+        return tarfile.NUL * (2 * TAR_BLOCK_SIZE)
+
+
+class _ArchiveSink(io.RawIOBase):
+    """
+    Unseekable file collecting what zipfile writes until it is drained
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipArchiveWriter:
+    """
+    Writes zip entries stored without compression. The output is not seekable,
+    so sizes and checksums follow each entry in a data descriptor.
+    """
+
+    content_type: str = "application/zip"
+    extension: str = "zip"
+
+    def __init__(self):
+        self._sink = _ArchiveSink()
+        self._zip = zipfile.ZipFile(
+            self._sink, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True
+        )
+
+    def add(self, item: ArchiveItem) -> Iterator[bytes]:
+        info = zipfile.ZipInfo(
+            item.name,
+            date_time=time.gmtime(max(item.mtime, ZIP_MIN_TIMESTAMP))[:6],
+        )
+        info.file_size = item.size
+        info.external_attr = 0o644 << 16
+        with self._zip.open(info, mode="w") as entry:
+            for chunk in item.chunks():
+                entry.write(chunk)
+                data = self._sink.drain()
+                if data:
+                    yield data
+        yield self._sink.drain()
+
+    def finish(self) -> bytes:
+        self._zip.close()
+        return self._sink.drain()
+
+
+ARCHIVE_WRITERS: Dict[str, type] = {
+    TarArchiveWriter.extension: TarArchiveWriter,
+    ZipArchiveWriter.extension: ZipArchiveWriter,
+}
+
+
+class ArchiveStream:
+    """
+    tar or zip archive of many objects of a bucket, written while the objects
+    arrive. Up to prefetch objects are fetched ahead at the same time: objects
+    up to max_buffered_bytes are read whole, larger ones only opened and
+    streamed in their turn, so memory stays bounded whatever the archive size.
+    Objects deleted after they were listed are left out. Objects stored
+    compressed are archived decompressed, spooled to a temporary file when
+    they are larger than max_buffered_bytes. Objects stored with a coding
+    that can't be decompressed are archived as stored.
+    """
+
+    def __init__(
+        self,
+        client: Minio,
+        bucket_name: str,
+        object_names: Iterable[str],
+        archive_format: str,
+        prefetch: int,
+        max_buffered_bytes: int,
+        chunk_size: int,
+    ):
+        """
+        :param client: minio client
+        :param bucket_name: minio s3 bucket name
+        :param object_names: names of the objects in archive order, may be lazy
+        :param archive_format: "tar" or "zip"
+        :param prefetch: objects fetched ahead
+        :param max_buffered_bytes: largest object read ahead whole
+        :param chunk_size: size of the chunks larger objects are read in
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.client = client
+        self.bucket_name = bucket_name
+        self.object_names = iter(object_names)
+        self.writer = ARCHIVE_WRITERS[archive_format]()
+        self.prefetch = max(prefetch, 1)
+        self.max_buffered_bytes = max_buffered_bytes
+        self.chunk_size = chunk_size
+        self._pending: Deque[Future] = deque()
+        self._names_done = False
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def content_type(self) -> str:
+        return self.writer.content_type
+
+    @property
+    def content_length(self) -> Optional[int]:
+        return None
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        return {}
+
+    def open(self) -> "ArchiveStream":
+        """
+        Starts fetching the first objects and waits for the first one, so a
+        missing bucket fails before the response is sent
+        :return: this stream
+        """
+        try:
+            self.__fill()
+            if self._pending:
+                self._pending[0].result()
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            while True:
+                self.__fill()
+                with self._lock:
+                    if not self._pending:
+                        break
+                    future = self._pending.popleft()
+                item = future.result()
+                if item is None:
+                    continue
+                try:
+                    yield from self.writer.add(item)
+                finally:
+                    item.close()
+            yield self.writer.finish()
+        finally:
+            self.close()
+
+    def __fill(self):
+        """
+        Submits objects until prefetch objects are fetched or waiting to be sent
+        """
+        while True:
+            with self._lock:
+                if (
+                    self._closed
+                    or self._names_done
+                    or len(self._pending) >= self.prefetch
+                ):
+                    return
+            object_name = next(self.object_names, None)
+            with self._lock:
+                if object_name is None:
+                    self._names_done = True
+                    return
+                if self._closed:
+                    return
+                self._pending.append(S3PartExecutor().submit(self.__fetch, object_name))
+
+    def __fetch(self, object_name: str) -> Optional[ArchiveItem]:
+        """
+        Opens one object and reads it whole if it is small
+        :param object_name: minio s3 object name
+        :return: archive item, None if the object no longer exists
+        """
+        name = "/".join(
+            part for part in object_name.split("/") if part not in ("", ".", "..")
+        )
+        if not name:
+            return None
+        try:
+            response = self.client.get_object(
+                bucket_name=self.bucket_name, object_name=object_name
+            )
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                self.logger.warning(f"Object {object_name} left out of the archive.")
+                return None
+            raise e
+        except HTTPError:
+            raise S3ProxyServiceException(MinioError.CONNECTION_ERROR)
+
+        size = int(response.headers.get("Content-Length", 0))
+        last_modified = response.headers.get("Last-Modified")
+        mtime = (
+            parsedate_to_datetime(last_modified).timestamp()
+            if last_modified
+            else time.time()
+        )
+        stream = ObjectStream(response=response, chunk_size=self.chunk_size)
+        encoding = response.headers.get("Content-Encoding")
+        if CompressionPolicy.supports(encoding):
+            return self.__decompress(name, mtime, stream, encoding)
+        if size > self.max_buffered_bytes:
+            return ArchiveItem(name, size, mtime, stream=stream)
+        return ArchiveItem(name, size, mtime, data=b"".join(stream))
+
+    def __decompress(
+        self, name: str, mtime: float, stream: ObjectStream, encoding: str
+    ) -> ArchiveItem:
+        """
+        Decompresses an object stored compressed with the codecs of downloads
+        :param name: name of the object in the archive
+        :param mtime: last modification time
+        :param stream: stored object
+        :param encoding: Content-Encoding the object is stored with
+        :return: archive item of the decompressed object
+        """
+        file = tempfile.SpooledTemporaryFile(max_size=self.max_buffered_bytes)
+        try:
+            codec = decompressor(encoding, Operation.DECOMPRESS_DOWNLOAD)
+            for chunk in stream:
+                file.write(codec.process(chunk))
+            file.write(codec.finish())
+            size = file.tell()
+            file.seek(0)
+            if size > self.max_buffered_bytes:
+                return ArchiveItem(
+                    name, size, mtime, stream=SpooledObject(file, self.chunk_size)
+                )
+            data = file.read()
+        except BaseException:
+            stream.close()
+            file.close()
+            raise
+        file.close()
+        return ArchiveItem(name, size, mtime, data=data)
+
+    def close(self):
+        """
+        Cancels objects not fetched yet and closes the ones fetched ahead.
+        Safe to call several times and from different threads.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            pending, self._pending = self._pending, deque()
+        for future in pending:
+            if not future.cancel():
+                future.add_done_callback(_close_item)
+
+
+def _close_item(future: Future):
+    """
+    Closes the object of a fetch that finished after the archive was closed
+    """
+    if not future.cancelled() and future.exception() is None and future.result():
+        future.result().close()
@@ -0,0 +1,42 @@
+from typing import Dict, Iterator, Optional
+
+from src.core.cache.object_cache import CachedObject
+
+CHUNK_SIZE: int = 64 * 1024
+
+
+class CachedFileStream:
+    """
+    Object of the disk cache tier streamed from the file opened by the cache
+    hit rather than by its path, which an eviction may remove while the
+    response is being sent
+    """
+
+    def __init__(self, cached_object: CachedObject):
+        self.cached_object = cached_object
+
+    @property
+    def content_type(self) -> Optional[str]:
+        return self.cached_object.object_info.content_type
+
+    @property
+    def content_length(self) -> Optional[int]:
+        return self.cached_object.object_info.size
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        return {}
+
+    def __iter__(self) -> Iterator[bytes]:
+        file = self.cached_object.file
+        try:
+            while file is not None:
+                chunk = file.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        self.cached_object.close()
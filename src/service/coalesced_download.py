@@ -0,0 +1,318 @@
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import (
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from src.core.common.s3_executor import S3Executor
+from src.core.common.singleton import Singleton
+from src.models.download.object_info import ObjectInfo
+from src.service.object_stream import ObjectStream
+
+
+class SharedDownload:
+    """
+    One upstream download of an object version read by several subscribers.
+    Chunks are kept in a window of at most max_buffered_chunks and dropped once
+    every subscriber has read them, so the slowest subscriber holds back the
+    others instead of the whole object being buffered. Whichever subscriber
+    needs the next chunk reads it from upstream in S3Executor.
+    Subscribers wait for the window on the event loop, never in an executor
+    thread: a full window of fast subscribers waiting there could take every
+    thread and leave none for the read the slowest subscriber needs.
+    """
+
+    def __init__(self, max_buffered_chunks: int, on_finished: Callable):
+        """
+        :param max_buffered_chunks: window size in chunks
+        :param on_finished: called once the last subscriber leaves
+        """
+        self.max_buffered_chunks = max_buffered_chunks
+        self.on_finished = on_finished
+        self.stream: Optional[ObjectStream] = None
+        self._upstream: Optional[Iterator[bytes]] = None
+        self._chunks: Deque[bytes] = deque()
+        self._first_index = 0
+        self._positions: Dict[int, int] = {}
+        self._next_subscriber = 0
+        self._fetching = False
+        self._done = False
+        self._finished = False
+        self._error: Optional[BaseException] = None
+        self._opened = threading.Event()
+        self._lock = threading.Lock()
+        self._changed: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self) -> Optional[int]:
+        """
+        :return: subscriber id, None if the download already moved past its start
+        """
+        with self._lock:
+            if self._finished or self._error is not None or self._first_index:
+                return None
+            subscriber = self._next_subscriber
+            self._next_subscriber += 1
+            self._positions[subscriber] = 0
+            return subscriber
+
+    def open(self, open_stream: Callable[[], ObjectStream]):
+        """
+        Opens upstream stream, called by the subscriber that started the download
+        :param open_stream: opens object stream over the whole object
+        """
+        try:
+            self.stream = open_stream()
+            self._upstream = iter(self.stream)
+        except BaseException as e:
+            with self._lock:
+                self._error = e
+            raise
+        finally:
+            self._opened.set()
+
+    def wait_opened(self) -> ObjectStream:
+        """
+        :return: upstream stream once opened by the subscriber that started the download
+        """
+        self._opened.wait()
+        if self.stream is None:
+            raise self._error
+        return self.stream
+
+    async def next_chunk(self, subscriber: int) -> Optional[bytes]:
+        """
+        :param subscriber: subscriber id
+        :return: next chunk for the subscriber, None once the object is complete
+        """
+        while True:
+            with self._lock:
+                position = self._positions[subscriber]
+                if position < self._first_index + len(self._chunks):
+                    chunk = self._chunks[position - self._first_index]
+                    self._positions[subscriber] = position + 1
+                    self.__trim()
+                    return chunk
+                if self._error is not None:
+                    raise self._error
+                if self._done:
+                    return None
+                fetch = (
+                    not self._fetching and len(self._chunks) < self.max_buffered_chunks
+                )
+                if fetch:
+                    self._fetching = True
+                else:
+                    if self._changed is None:
+                        self._changed = asyncio.Event()
+                        self._loop = asyncio.get_running_loop()
+                    changed = self._changed
+
+            if not fetch:
+                await changed.wait()
+                continue
+            try:
+                chunk = await S3Executor().run(next, self._upstream, None)
+            except BaseException as e:
+                with self._lock:
+                    self._error = e
+                    self._fetching = False
+                    self.__notify()
+                raise
+            with self._lock:
+                self._fetching = False
+                if chunk is None:
+                    self._done = True
+                else:
+                    self._chunks.append(chunk)
+                self.__notify()
+
+    def unsubscribe(self, subscriber: int):
+        """
+        Removes subscriber, upstream is closed when the last one leaves
+        :param subscriber: subscriber id
+        """
+        with self._lock:
+            if self._positions.pop(subscriber, None) is None:
+                return
+            self.__trim()
+            self.__notify()
+            if self._positions:
+                return
+            self._finished = True
+        if self.stream is not None:
+            self.stream.close()
+        self.on_finished(self)
+
+    def __trim(self):
+        if not self._positions:
+            return
+        slowest = min(self._positions.values())
+        while self._chunks and self._first_index < slowest:
+            self._chunks.popleft()
+            self._first_index += 1
+            self.__notify()
+
+    def __notify(self):
+        """
+        Wakes the subscribers waiting for a change, called with the lock held
+        """
+        changed, self._changed = self._changed, None
+        if changed is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            changed.set()
+        else:
+            self._loop.call_soon_threadsafe(changed.set)
+
+
+class CoalescedStream:
+    """
+    Object stream of a single subscriber of a shared download, iterated on the
+    event loop
+    """
+
+    def __init__(self, download: SharedDownload, subscriber: int):
+        self.download = download
+        self.subscriber = subscriber
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def content_type(self) -> Optional[str]:
+        return self.download.stream.content_type
+
+    @property
+    def content_length(self) -> Optional[int]:
+        return self.download.stream.content_length
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        return self.download.stream.validators
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                chunk = await self.download.next_chunk(self.subscriber)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Leaves the shared download. Safe to call several times.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.download.unsubscribe(self.subscriber)
+
+
+class DownloadCoalescer(metaclass=Singleton):
+    """
+    Single-flight for whole-object downloads: concurrent downloads of the same
+    bucket/object/ETag share one upstream get_object and the chunks are fanned out
+    to all of them as they arrive. A download can only be joined before its first
+    chunk has been released from the window.
+    """
+
+    DEFAULT_BUFFER_CHUNKS: str = "16"
+    MAX_TRACKED_KEYS: int = 1000
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.enabled = (
+            os.getenv("DOWNLOAD_COALESCING_ENABLED", "True").lower() == "true"
+        )
+        self.max_buffered_chunks = int(
+            os.getenv("DOWNLOAD_COALESCING_BUFFER_CHUNKS", self.DEFAULT_BUFFER_CHUNKS)
+        )
+        self._downloads: Dict[Tuple, SharedDownload] = {}
+        self._keys: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"downloads": 0, "coalesced": 0}
+
+    def stream(
+        self, object_info: ObjectInfo, open_stream: Callable[[], ObjectStream]
+    ) -> Union[ObjectStream, CoalescedStream]:
+        """
+        Joins running download of the object version or starts a new one
+        :param object_info: metadata of the downloaded object
+        :param open_stream: opens object stream over the whole object
+        :return: object stream of this request
+        """
+        if not self.enabled or not object_info.etag:
+            return open_stream()
+
+        key = (object_info.bucket_name, object_info.object_name, object_info.etag)
+        with self._lock:
+            download = self._downloads.get(key)
+            subscriber = download.subscribe() if download is not None else None
+            leader = subscriber is None
+            if leader:
+                download = SharedDownload(
+                    self.max_buffered_chunks,
+                    on_finished=lambda finished: self.__remove(key, finished),
+                )
+                subscriber = download.subscribe()
+                self._downloads[key] = download
+            self.__count(key, leader)
+
+        if leader:
+            try:
+                download.open(open_stream)
+            except BaseException:
+                download.unsubscribe(subscriber)
+                raise
+        else:
+            try:
+                download.wait_opened()
+            except BaseException:
+                download.unsubscribe(subscriber)
+                raise
+        return CoalescedStream(download, subscriber)
+
+    def __remove(self, key: Tuple, download: SharedDownload):
+        with self._lock:
+            if self._downloads.get(key) is download:
+                del self._downloads[key]
+
+    def __count(self, key: Tuple, leader: bool):
+        counter = "downloads" if leader else "coalesced"
+        self.counters[counter] += 1
+        name = f"{key[0]}/{key[1]}"
+        key_counters = self._keys.pop(name, None) or {"downloads": 0, "coalesced": 0}
+        key_counters[counter] += 1
+        self._keys[name] = key_counters
+        if len(self._keys) > self.MAX_TRACKED_KEYS:
+            self._keys.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": len(self._downloads),
+                **self.counters,
+                "objects": {
+                    name: dict(key_counters)
+                    for name, key_counters in self._keys.items()
+                    if key_counters["coalesced"]
+                },
+            }
@@ -0,0 +1,230 @@
+import time
+import zlib
+from typing import AsyncIterator, BinaryIO, Callable, Dict, Iterator, Optional, Union
+
+import brotli
+import zstandard
+
+from src.core.common.s3_executor import S3Executor
+from src.core.config.compression_policy import CompressionPolicy
+from src.core.metrics.metrics import Metrics
+from src.service.coalesced_download import CoalescedStream
+from src.service.object_stream import ObjectStream
+from src.service.parallel_range_stream import ParallelRangeStream
+
+GZIP_LEVEL: int = 6
+BROTLI_QUALITY: int = 4
+ZSTD_LEVEL: int = 3
+GZIP_WBITS: int = 16 + zlib.MAX_WBITS
+
+
+class Operation:
+    COMPRESS_DOWNLOAD = "compress_download"
+    DECOMPRESS_DOWNLOAD = "decompress_download"
+    COMPRESS_UPLOAD = "compress_upload"
+
+
+class Codec:
+    """
+    Incremental compressor or decompressor of one content coding. Counts the
+    bytes it was given and returned and the CPU time of the calling thread
+    spent in it, reported to the metrics once it is finished.
+    """
+
+    def __init__(
+        self,
+        operation: str,
+        encoding: str,
+        process: Callable[[bytes], bytes],
+        finish: Callable[[], bytes],
+    ):
+        self.operation = operation
+        self.encoding = encoding
+        self._process = process
+        self._finish = finish
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+        self.finished = False
+        self._reported = False
+
+    def process(self, data: bytes) -> bytes:
+        started = time.thread_time()
+        output = self._process(data)
+        self.cpu_seconds += time.thread_time() - started
+        self.bytes_in += len(data)
+        self.bytes_out += len(output)
+        return output
+
+    def finish(self) -> bytes:
+        """
+        :return: rest of the output, the codec can't be used afterwards
+        """
+        started = time.thread_time()
+        output = self._finish()
+        self.cpu_seconds += time.thread_time() - started
+        self.bytes_out += len(output)
+        self.finished = True
+        self.report()
+        return output
+
+    def report(self):
+        """
+        Reports bytes and CPU time to the metrics, once
+        """
+        if self._reported:
+            return
+        self._reported = True
+        Metrics().observe_compression(
+            self.operation,
+            self.encoding,
+            self.bytes_in,
+            self.bytes_out,
+            self.cpu_seconds,
+        )
+
+
+def compressor(encoding: str, operation: str) -> Codec:
+    """
+    :param encoding: "gzip", "br" or "zstd"
+    :param operation: operation reported to the metrics
+    :return: codec compressing data
+    """
+    if encoding == CompressionPolicy.GZIP:
+        gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+        return Codec(operation, encoding, gzip.compress, gzip.flush)
+    if encoding == CompressionPolicy.BROTLI:
+        br = brotli.Compressor(quality=BROTLI_QUALITY)
+        return Codec(operation, encoding, br.process, br.finish)
+    if encoding == CompressionPolicy.ZSTD:
+        zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        return Codec(operation, encoding, zstd.compress, zstd.flush)
+    raise ValueError(f"Unknown compression encoding: {encoding}")
+
+
+def decompressor(encoding: str, operation: str) -> Codec:
+    """
+    :param encoding: "gzip", "br" or "zstd"
+    :param operation: operation reported to the metrics
+    :return: codec decompressing data
+    """
+    if encoding == CompressionPolicy.GZIP:
+        gzip = zlib.decompressobj(GZIP_WBITS)
+        return Codec(operation, encoding, gzip.decompress, gzip.flush)
+    if encoding == CompressionPolicy.BROTLI:
+        br = brotli.Decompressor()
+        return Codec(operation, encoding, br.process, lambda: b"")
+    if encoding == CompressionPolicy.ZSTD:
+        zstd = zstandard.ZstdDecompressor().decompressobj()
+        return Codec(operation, encoding, zstd.decompress, lambda: b"")
+    raise ValueError(f"Unknown compression encoding: {encoding}")
+
+
+def transcode(data: bytes, codec: Codec) -> bytes:
+    """
+    :param data: whole input
+    :param codec: fresh codec
+    :return: whole output
+    """
+    return codec.process(data) + codec.finish()
+
+
+class TranscodedStream:
+    """
+    Object stream compressed or decompressed while it is read. Its length is
+    not known up front and its ETag is sent as a weak one, as the bytes differ
+    from the stored object while the content is the same.
+    """
+
+    def __init__(
+        self,
+        object_stream: Union[ObjectStream, ParallelRangeStream, CoalescedStream],
+        codec: Codec,
+    ):
+        self.object_stream = object_stream
+        self.codec = codec
+
+    @property
+    def content_type(self) -> Optional[str]:
+        return self.object_stream.content_type
+
+    @property
+    def content_length(self) -> Optional[int]:
+        return None
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        validators = dict(self.object_stream.validators)
+        etag = validators.get("ETag")
+        if etag and not etag.startswith("W/"):
+            validators["ETag"] = f"W/{etag}"
+        return validators
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            for chunk in self.object_stream:
+                output = self.codec.process(chunk)
+                if output:
+                    yield output
+            output = self.codec.finish()
+            if output:
+                yield output
+        finally:
+            self.close()
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        """
+        Streams iterated on the event loop are transcoded chunk by chunk in
+        S3Executor, the others are transcoded while read in S3Executor
+        """
+        if not hasattr(self.object_stream, "__aiter__"):
+            return S3Executor().iterate(iter(self))
+        return self.__transcode()
+
+    async def __transcode(self) -> AsyncIterator[bytes]:
+        executor = S3Executor()
+        try:
+            async for chunk in self.object_stream:
+                output = await executor.run(self.codec.process, chunk)
+                if output:
+                    yield output
+            output = await executor.run(self.codec.finish)
+            if output:
+                yield output
+        finally:
+            self.close()
+
+    def close(self):
+        self.object_stream.close()
+        self.codec.report()
+
+
+class CompressingReader:
+    """
+    Reader returning the compressed bytes of the data it wraps
+    """
+
+    def __init__(self, data: BinaryIO, codec: Codec, chunk_size: int = 64 * 1024):
+        """
+        :param data: readable data
+        :param codec: fresh compressing codec
+        :param chunk_size: bytes read from data at once
+        """
+        self.data = data
+        self.codec = codec
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        while (size < 0 or len(self._buffer) < size) and not self.codec.finished:
+            chunk = self.data.read(self.chunk_size)
+            if chunk:
+                self._buffer += self.codec.process(chunk)
+            else:
+                self._buffer += self.codec.finish()
+        if size < 0 or size >= len(self._buffer):
+            output, self._buffer = bytes(self._buffer), bytearray()
+        else:
+            output = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return output
@@ -0,0 +1,85 @@
+import threading
+import uuid
+from typing import Callable, Dict, Iterator, List, Optional
+
+from src.models.download.byte_range import ByteRange
+from src.service.object_stream import ObjectStream
+
+
+class MultipartRangeStream:
+    """
+    multipart/byteranges body over several ranges of one object.
+    Ranges are fetched one after another, each only when the previous one is sent,
+    so at most one upstream response is open at a time.
+    """
+
+    def __init__(
+        self,
+        ranges: List[ByteRange],
+        size: int,
+        content_type: Optional[str],
+        open_range: Callable[[ByteRange], ObjectStream],
+    ):
+        """
+        :param ranges: ranges to send
+        :param size: full object size
+        :param content_type: object content type
+        :param open_range: opens object stream over a single range
+        """
+        self.ranges = ranges
+        self.size = size
+        self.part_content_type = content_type or "application/octet-stream"
+        self.open_range = open_range
+        self.boundary = uuid.uuid4().hex
+        self._current: Optional[ObjectStream] = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/byteranges; boundary={self.boundary}"
+
+    @property
+    def content_length(self) -> int:
+        return sum(
+            len(self.__part_header(byte_range)) + byte_range.length + 2
+            for byte_range in self.ranges
+        ) + len(self.__closing_boundary())
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        return {}
+
+    def __part_header(self, byte_range: ByteRange) -> bytes:
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {self.part_content_type}\r\n"
+            f"Content-Range: {byte_range.content_range(self.size)}\r\n\r\n"
+        ).encode("latin-1")
+
+    def __closing_boundary(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode("latin-1")
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            for byte_range in self.ranges:
+                yield self.__part_header(byte_range)
+                with self._lock:
+                    if self._closed:
+                        return
+                    self._current = self.open_range(byte_range)
+                yield from self._current
+                yield b"\r\n"
+            yield self.__closing_boundary()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Closes currently open range stream, safe to call several times
+        """
+        with self._lock:
+            self._closed = True
+            current, self._current = self._current, None
+        if current is not None:
+            current.close()
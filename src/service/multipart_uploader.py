@@ -0,0 +1,270 @@
+import functools
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import BinaryIO, Dict, List, Optional
+
+from minio import Minio, S3Error
+from minio.datatypes import Part
+from minio.error import ServerError
+from minio.helpers import ObjectWriteResult, read_part_data
+from urllib3.exceptions import HTTPError
+
+from src.core.common.s3_executor import S3PartExecutor
+
+MB: int = 1024 * 1024
+
+
+class MultipartUploader:
+    """
+    Uploads objects with a single PUT below UPLOAD_MULTIPART_THRESHOLD_MB and with
+    a multipart upload above it. The part size is derived from the object length,
+    up to UPLOAD_PART_CONCURRENCY parts are sent at the same time and a failed
+    part is retried on its own. Memory used is bounded by concurrency * part size.
+    """
+
+    MIN_PART_SIZE: int = 5 * MB
+    MAX_PART_SIZE: int = 5 * 1024 * MB
+    MAX_PARTS: int = 10000
+    RETRYABLE_ERROR_CODES: tuple = ("InternalError", "SlowDown", "RequestTimeout")
+    DEFAULT_THRESHOLD_MB: str = "16"
+    DEFAULT_MIN_PART_SIZE_MB: str = "8"
+    DEFAULT_CONCURRENCY: str = "4"
+    DEFAULT_PART_RETRIES: str = "3"
+    DEFAULT_RETRY_BACKOFF_SECONDS: str = "0.5"
+
+    def __init__(self, client: Minio):
+        """
+        :param client: minio client
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.client = client
+        self.threshold = max(
+            int(os.getenv("UPLOAD_MULTIPART_THRESHOLD_MB", self.DEFAULT_THRESHOLD_MB))
+            * MB,
+            self.MIN_PART_SIZE,
+        )
+        self.min_part_size = max(
+            int(os.getenv("UPLOAD_MIN_PART_SIZE_MB", self.DEFAULT_MIN_PART_SIZE_MB))
+            * MB,
+            self.MIN_PART_SIZE,
+        )
+        self.concurrency = max(
+            int(os.getenv("UPLOAD_PART_CONCURRENCY", self.DEFAULT_CONCURRENCY)), 1
+        )
+        self.part_retries = int(
+            os.getenv("UPLOAD_PART_RETRIES", self.DEFAULT_PART_RETRIES)
+        )
+        self.retry_backoff = float(
+            os.getenv(
+                "UPLOAD_PART_RETRY_BACKOFF_SECONDS", self.DEFAULT_RETRY_BACKOFF_SECONDS
+            )
+        )
+
+    def part_size(self, length: int) -> int:
+        """
+        Chooses part size so the object fits into MAX_PARTS parts
+        :param length: object length, negative if unknown
+        :return: part size rounded up to whole MB
+        """
+        if length < 0:
+            return self.min_part_size
+        part_size = max(self.min_part_size, -(-length // self.MAX_PARTS))
+        return min(-(-part_size // MB) * MB, self.MAX_PART_SIZE)
+
+    def upload(
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: BinaryIO,
+        content_type: Optional[str],
+        length: int = -1,
+        part_size: Optional[int] = None,
+        metadata: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Uploads object
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :param data: readable object data
+        :param content_type: object content type
+        :param length: object length, negative if unknown
+        :param part_size: multipart upload part size, derived from length by default
+        :param metadata: additional object headers, e.g. Content-Encoding
+        :return: write result of the uploaded object
+        """
+        headers = {
+            **(metadata or {}),
+            "Content-Type": content_type or "application/octet-stream",
+        }
+        if 0 <= length <= self.threshold:
+            return self.__put(bucket_name, object_name, data, headers, length)
+        if length < 0:
+            head = read_part_data(data, self.threshold + 1)
+            if len(head) <= self.threshold:
+                return self.__put(
+                    bucket_name, object_name, io.BytesIO(head), headers, len(head)
+                )
+            data = _PrefixedReader(head, data)
+
+        return self.__multipart_upload(
+            bucket_name,
+            object_name,
+            data,
+            headers,
+            length,
+            max(part_size or self.part_size(length), self.MIN_PART_SIZE),
+        )
+
+    def __put(
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: BinaryIO,
+        headers: Dict[str, str],
+        length: int,
+    ) -> ObjectWriteResult:
+        metadata = dict(headers)
+        return self.client.put_object(
+            bucket_name=bucket_name,
+            data=data,
+            object_name=object_name,
+            content_type=metadata.pop("Content-Type"),
+            part_size=self.threshold,
+            length=length,
+            metadata=metadata or None,
+        )
+
+    def __multipart_upload(
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: BinaryIO,
+        headers: Dict[str, str],
+        length: int,
+        part_size: int,
+    ) -> ObjectWriteResult:
+        upload_id = self.client._create_multipart_upload(
+            bucket_name, object_name, headers
+        )
+        self.logger.debug(
+            f"Started multipart upload of {object_name} to {bucket_name} "
+            f"with {part_size // MB} MB parts."
+        )
+        slots = threading.BoundedSemaphore(self.concurrency)
+        futures: List[Future] = []
+        failed = threading.Event()
+        uploaded = 0
+        try:
+            while True:
+                slots.acquire()
+                part = b"" if failed.is_set() else read_part_data(data, part_size)
+                if not part:
+                    slots.release()
+                    break
+                if len(futures) == self.MAX_PARTS:
+                    raise ValueError(f"Object has more than {self.MAX_PARTS} parts.")
+                uploaded += len(part)
+                future = S3PartExecutor().submit(
+                    self.upload_part,
+                    bucket_name,
+                    object_name,
+                    upload_id,
+                    len(futures) + 1,
+                    part,
+                )
+                future.add_done_callback(
+                    functools.partial(_release_part, slots=slots, failed=failed)
+                )
+                futures.append(future)
+                if len(part) < part_size:
+                    break
+
+            parts = [
+                Part(part_number, future.result())
+                for part_number, future in enumerate(futures, start=1)
+            ]
+            if 0 <= length != uploaded:
+                raise IOError(f"Expected {length} bytes of data, got {uploaded}.")
+            return self.client._complete_multipart_upload(
+                bucket_name, object_name, upload_id, parts
+            )
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            self.__abort(bucket_name, object_name, upload_id)
+            raise
+
+    def upload_part(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        part: bytes,
+    ) -> str:
+        """
+        Uploads one part, retrying transient failures with exponential backoff
+        :return: part ETag
+        """
+        attempt = 0
+        while True:
+            try:
+                return self.client._upload_part(
+                    bucket_name, object_name, part, None, upload_id, part_number
+                )
+            except (HTTPError, ServerError, S3Error) as e:
+                if attempt >= self.part_retries or not self.__retryable(e):
+                    raise
+                delay = self.retry_backoff * 2**attempt
+                attempt += 1
+                self.logger.warning(
+                    f"Retrying part {part_number} of {object_name} in {delay}s "
+                    f"(attempt {attempt}/{self.part_retries}): {e}"
+                )
+                time.sleep(delay)
+
+    def __retryable(self, error: Exception) -> bool:
+        if isinstance(error, S3Error):
+            return error.code in self.RETRYABLE_ERROR_CODES
+        return True
+
+    def __abort(self, bucket_name: str, object_name: str, upload_id: str):
+        try:
+            self.client._abort_multipart_upload(bucket_name, object_name, upload_id)
+        except Exception as e:
+            self.logger.error(f"Failed to abort multipart upload {upload_id}: {e}")
+
+
+def _release_part(
+    future: Future, slots: threading.BoundedSemaphore, failed: threading.Event
+):
+    """
+    Frees the slot of a finished part upload and flags the upload on failure
+    """
+    if future.cancelled() or future.exception() is not None:
+        failed.set()
+    slots.release()
+
+
+class _PrefixedReader:
+    """
+    Reader returning already read bytes before the rest of the data
+    """
+
+    def __init__(self, prefix: bytes, data: BinaryIO):
+        self.prefix = memoryview(prefix)
+        self.data = data
+
+    def read(self, size: int = -1) -> bytes:
+        if not self.prefix:
+            return self.data.read(size)
+        if size < 0 or size >= len(self.prefix):
+            chunk, self.prefix = bytes(self.prefix), memoryview(b"")
+        else:
+            chunk, self.prefix = bytes(self.prefix[:size]), self.prefix[size:]
+        return chunk
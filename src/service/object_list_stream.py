@@ -0,0 +1,57 @@
+import json
+from typing import Callable, Dict, Iterator, Optional
+
+from src.models.download.object_listing import ObjectListing
+
+
+class ObjectListStream:
+    """
+    Listing of a bucket streamed as NDJSON, one line per file or common
+    prefix. Pages are fetched from minio while the previous one is sent, so
+    only one page is held at a time however many keys the bucket has.
+    """
+
+    content_type: str = "application/x-ndjson"
+
+    def __init__(self, list_page: Callable[[Optional[str]], ObjectListing]):
+        """
+        :param list_page: fetches the page of a continuation token, the first
+        page for None
+        """
+        self.list_page = list_page
+        self._page: Optional[ObjectListing] = None
+        self._closed = False
+
+    @property
+    def content_length(self) -> Optional[int]:
+        return None
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        return {}
+
+    def open(self) -> "ObjectListStream":
+        """
+        Fetches the first page, so a missing bucket fails before the response
+        is started
+        :return: stream
+        """
+        self._page = self.list_page(None)
+        return self
+
+    def __iter__(self) -> Iterator[bytes]:
+        page = self._page
+        self._page = None
+        while page is not None and not self._closed:
+            if page.objects:
+                yield "".join(
+                    json.dumps(listed_object.to_response()) + "\n"
+                    for listed_object in page.objects
+                ).encode()
+            if not page.is_truncated:
+                return
+            page = self.list_page(page.next_continuation_token)
+
+    def close(self):
+        self._closed = True
+        self._page = None
@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+from urllib3 import BaseHTTPResponse
+from urllib3.exceptions import HTTPError
+
+from src.core.cache.object_cache import ObjectCacheWriter
+from src.core.exceptions.error_codes import MinioError
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.metrics.metrics import Metrics, Stage
+
+
+class ObjectStream:
+    """
+    Iterable over a minio object response that reads it in fixed-size chunks
+    and releases the upstream connection once the stream is exhausted or closed.
+    Chunks are copied to the cache writer if one is given.
+    If started_at (time.perf_counter() when the object was requested) is given,
+    the whole download is timed as the get_object stage once the stream closes.
+    """
+
+    def __init__(
+        self,
+        response: BaseHTTPResponse,
+        chunk_size: int,
+        cache_writer: Optional[ObjectCacheWriter] = None,
+        started_at: Optional[float] = None,
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.response = response
+        self.chunk_size = chunk_size
+        self.cache_writer = cache_writer
+        self.started_at = started_at
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def content_type(self) -> Optional[str]:
+        return self.response.headers.get("Content-Type")
+
+    @property
+    def content_length(self) -> Optional[int]:
+        content_length = self.response.headers.get("Content-Length")
+        return int(content_length) if content_length is not None else None
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """
+        :return: ETag and Last-Modified headers of the upstream response
+        """
+        return {
+            name: self.response.headers[name]
+            for name in ("ETag", "Last-Modified")
+            if self.response.headers.get(name)
+        }
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            for chunk in self.response.stream(self.chunk_size):
+                if self.cache_writer is not None:
+                    self.cache_writer.write(chunk)
+                yield chunk
+            if self.cache_writer is not None:
+                self.cache_writer.commit(self.response.headers.get("ETag"))
+                self.cache_writer = None
+        except HTTPError:
+            raise S3ProxyServiceException(MinioError.CONNECTION_ERROR)
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Closes minio response and returns its connection to the pool.
+        Safe to call several times and from different threads.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            cache_writer, self.cache_writer = self.cache_writer, None
+        if cache_writer is not None:
+            cache_writer.abort()
+        self.response.close()
+        self.response.release_conn()
+        if self.started_at is not None:
+            Metrics().observe_stage(
+                Stage.GET_OBJECT, time.perf_counter() - self.started_at
+            )
@@ -0,0 +1,169 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Deque, Dict, Iterator, List, Optional
+
+from minio import Minio
+from urllib3.exceptions import HTTPError
+
+from src.core.cache.object_cache import ObjectCacheWriter
+from src.core.common.s3_executor import S3PartExecutor
+from src.core.exceptions.error_codes import MinioError
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.models.download.byte_range import ByteRange
+from src.models.download.object_info import ObjectInfo
+
+
+class ParallelRangeStream:
+    """
+    Whole-object stream fetched as consecutive byte ranges over several pooled
+    connections at the same time and sent in order. At most max_ranges ranges
+    are fetched or waiting to be sent, so memory used is bounded by
+    max_ranges * range_size whatever the object size. Every range is requested
+    with If-Match, so a download never mixes two versions of the object.
+    Chunks are copied to the cache writer if one is given.
+    """
+
+    def __init__(
+        self,
+        client: Minio,
+        object_info: ObjectInfo,
+        range_size: int,
+        max_ranges: int,
+        chunk_size: int,
+        cache_writer: Optional[ObjectCacheWriter] = None,
+    ):
+        """
+        :param client: minio client
+        :param object_info: metadata of the object version to download
+        :param range_size: bytes fetched by one request
+        :param max_ranges: ranges fetched at the same time
+        :param chunk_size: size of the chunks a range is read in
+        :param cache_writer: object cache writer
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.client = client
+        self.object_info = object_info
+        self.chunk_size = chunk_size
+        self.max_ranges = max(max_ranges, 1)
+        self.cache_writer = cache_writer
+        self.ranges: List[ByteRange] = [
+            ByteRange(start, min(start + range_size, object_info.size) - 1)
+            for start in range(0, object_info.size, max(range_size, 1))
+        ]
+        self._next_range = 0
+        self._pending: Deque[Future] = deque()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def content_type(self) -> Optional[str]:
+        return self.object_info.content_type
+
+    @property
+    def content_length(self) -> int:
+        return self.object_info.size
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        validators = {}
+        if self.object_info.http_etag:
+            validators["ETag"] = self.object_info.http_etag
+        if self.object_info.http_last_modified:
+            validators["Last-Modified"] = self.object_info.http_last_modified
+        return validators
+
+    def open(self) -> "ParallelRangeStream":
+        """
+        Starts fetching the first ranges and waits for the first one, so a
+        missing or changed object fails before the response is sent
+        :return: this stream
+        """
+        self.__fill()
+        if self._pending:
+            try:
+                self._pending[0].result()
+            except BaseException:
+                self.close()
+                raise
+        return self
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            while True:
+                self.__fill()
+                with self._lock:
+                    if not self._pending:
+                        break
+                    future = self._pending.popleft()
+                for chunk in future.result():
+                    if self.cache_writer is not None:
+                        self.cache_writer.write(chunk)
+                    yield chunk
+            if self.cache_writer is not None:
+                # every range was requested with If-Match on this ETag
+                self.cache_writer.commit(self.object_info.http_etag)
+                self.cache_writer = None
+        finally:
+            self.close()
+
+    def __fill(self):
+        """
+        Submits ranges until max_ranges are in flight or waiting to be sent
+        """
+        with self._lock:
+            while (
+                not self._closed
+                and len(self._pending) < self.max_ranges
+                and self._next_range < len(self.ranges)
+            ):
+                byte_range = self.ranges[self._next_range]
+                self._next_range += 1
+                self._pending.append(S3PartExecutor().submit(self.__fetch, byte_range))
+
+    def __fetch(self, byte_range: ByteRange) -> List[bytes]:
+        """
+        Reads one range of the object
+        :param byte_range: range to read
+        :return: range data in chunks of chunk_size
+        """
+        response = None
+        try:
+            response = self.client.get_object(
+                bucket_name=self.object_info.bucket_name,
+                object_name=self.object_info.object_name,
+                offset=byte_range.start,
+                length=byte_range.length,
+                request_headers=(
+                    {"If-Match": self.object_info.http_etag}
+                    if self.object_info.etag
+                    else None
+                ),
+            )
+            chunks = list(response.stream(self.chunk_size))
+        except HTTPError:
+            raise S3ProxyServiceException(MinioError.CONNECTION_ERROR)
+        finally:
+            if response is not None:
+                response.close()
+                response.release_conn()
+        if sum(len(chunk) for chunk in chunks) != byte_range.length:
+            raise S3ProxyServiceException(MinioError.CONNECTION_ERROR)
+        return chunks
+
+    def close(self):
+        """
+        Cancels ranges not started yet, drops fetched ones and aborts the cache
+        writer. Safe to call several times and from different threads.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            pending, self._pending = self._pending, deque()
+            cache_writer, self.cache_writer = self.cache_writer, None
+        for future in pending:
+            future.cancel()
+        if cache_writer is not None:
+            cache_writer.abort()
@@ -0,0 +1,283 @@
+import logging
+import os
+import secrets
+import threading
+import time
+from typing import Optional
+
+from minio.datatypes import Part
+from starlette.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_404_NOT_FOUND,
+    HTTP_409_CONFLICT,
+    HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+)
+
+from src.core.common.singleton import Singleton
+from src.core.exceptions.error_codes import UploadError
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.sessions.upload_session_store import (
+    MemoryUploadSessionStore,
+    SqliteUploadSessionStore,
+    UploadSessionStore,
+)
+from src.models.presign.presigned_url import MultipartUploadPlan
+from src.models.upload.upload_result import UploadResult
+from src.models.upload.upload_session import SessionPart, UploadSession
+from src.service.s3_service import S3Service
+
+
+class ResumableUploads(metaclass=Singleton):
+    """
+    Uploads a file in numbered parts over as many requests as the client needs:
+    a session is created for the file size, parts are sent in any order and
+    sent again if they failed, and the session is completed once all of them
+    arrived. Every part is sent to minio once it is received, so a dropped
+    connection only costs the part in flight. The state of sessions is kept in
+    the store chosen by UPLOAD_SESSION_STORE: "memory" for one worker, or
+    "sqlite" in UPLOAD_SESSION_DB, shared by the workers of the host and kept
+    across restarts. A session no part arrived for in UPLOAD_SESSION_TTL_SECONDS
+    is aborted by a janitor thread, so minio drops its parts.
+    Presigned multipart uploads, whose parts go to minio directly, are kept
+    as sessions too, so the janitor aborts them once they are abandoned.
+    """
+
+    MEMORY_STORE: str = "memory"
+    SQLITE_STORE: str = "sqlite"
+    DEFAULT_STORE: str = MEMORY_STORE
+    DEFAULT_DB: str = "upload_sessions.sqlite3"
+    DEFAULT_TTL_SECONDS: str = "86400"
+    DEFAULT_JANITOR_SECONDS: str = "60"
+    PRESIGNED_SESSION_PREFIX: str = "presigned:"
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        store = os.getenv("UPLOAD_SESSION_STORE") or self.DEFAULT_STORE
+        if store == self.SQLITE_STORE:
+            self.store: UploadSessionStore = SqliteUploadSessionStore(
+                os.getenv("UPLOAD_SESSION_DB") or self.DEFAULT_DB
+            )
+        elif store == self.MEMORY_STORE:
+            self.store = MemoryUploadSessionStore()
+        else:
+            raise ValueError(f"Unknown upload session store: {store}")
+        self.ttl_seconds = float(
+            os.getenv("UPLOAD_SESSION_TTL_SECONDS", self.DEFAULT_TTL_SECONDS)
+        )
+        self.janitor_seconds = float(
+            os.getenv("UPLOAD_SESSION_JANITOR_SECONDS", self.DEFAULT_JANITOR_SECONDS)
+        )
+        self._janitor: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def create(
+        self,
+        bucket_name: str,
+        object_name: str,
+        size: int,
+        content_type: Optional[str],
+        max_bytes: int,
+    ) -> UploadSession:
+        """
+        Starts a multipart upload and a session for it
+        :param bucket_name: minio s3 bucket name, created if configured to
+        :param object_name: minio s3 object name
+        :param size: file size in bytes
+        :param content_type: file content type
+        :param max_bytes: upload size limit of the bucket
+        :return: new session
+        """
+        if size > max_bytes:
+            raise S3ProxyServiceException(
+                UploadError.FILE_TOO_LARGE,
+                status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        upload_id, part_size = S3Service().create_multipart_upload(
+            bucket_name, object_name, size, content_type
+        )
+        now = time.time()
+        session = UploadSession(
+            session_id=secrets.token_urlsafe(24),
+            bucket_name=bucket_name,
+            object_name=object_name,
+            upload_id=upload_id,
+            size=size,
+            part_size=part_size,
+            content_type=content_type,
+            created_at=now,
+            expires_at=now + self.ttl_seconds,
+        )
+        self.store.add(session)
+        return session
+
+    def get(self, session_id: str) -> UploadSession:
+        """
+        :param session_id: session id
+        :return: session with the parts received so far
+        """
+        session = (
+            None
+            if session_id.startswith(self.PRESIGNED_SESSION_PREFIX)
+            else self.store.get(session_id)
+        )
+        if session is None:
+            raise S3ProxyServiceException(
+                UploadError.SESSION_NOT_FOUND, status_code=HTTP_404_NOT_FOUND
+            )
+        return session
+
+    def track_presigned(
+        self, upload_plan: MultipartUploadPlan, size: int, content_type: Optional[str]
+    ):
+        """
+        Keeps a presigned multipart upload as a session aborted unless it is
+        completed or aborted UPLOAD_SESSION_TTL_SECONDS after its part urls
+        expire. Its parts are not recorded, they are listed from minio on
+        completion.
+        :param upload_plan: multipart upload started for the client
+        :param size: file size in bytes
+        :param content_type: file content type
+        """
+        urls_expire_at = max(part.expires_at.timestamp() for part in upload_plan.parts)
+        self.store.add(
+            UploadSession(
+                session_id=self.PRESIGNED_SESSION_PREFIX + upload_plan.upload_id,
+                bucket_name=upload_plan.bucket_name,
+                object_name=upload_plan.object_name,
+                upload_id=upload_plan.upload_id,
+                size=size,
+                part_size=upload_plan.part_size,
+                content_type=content_type,
+                created_at=time.time(),
+                expires_at=urls_expire_at + self.ttl_seconds,
+            )
+        )
+
+    def untrack_presigned(self, upload_id: str):
+        """
+        Stops keeping a presigned multipart upload once it is completed or
+        aborted by the client
+        :param upload_id: minio multipart upload id
+        """
+        self.store.delete(self.PRESIGNED_SESSION_PREFIX + upload_id)
+
+    def upload_part(
+        self, session: UploadSession, part_number: int, data: bytes
+    ) -> SessionPart:
+        """
+        Sends one part to minio and records it, a part sent again replaces the
+        earlier one
+        :param session: session the part belongs to
+        :param part_number: part number, starting at 1
+        :param data: part bytes, exactly the size of the part
+        :return: received part
+        """
+        if len(data) != session.expected_part_size(part_number):
+            raise S3ProxyServiceException(
+                UploadError.INVALID_PART, status_code=HTTP_400_BAD_REQUEST
+            )
+        etag = S3Service().upload_part(
+            session.bucket_name,
+            session.object_name,
+            session.upload_id,
+            part_number,
+            data,
+        )
+        part = SessionPart(part_number, etag, len(data))
+        if not self.store.add_part(
+            session.session_id, part, time.time() + self.ttl_seconds
+        ):
+            raise S3ProxyServiceException(
+                UploadError.SESSION_NOT_FOUND, status_code=HTTP_404_NOT_FOUND
+            )
+        return part
+
+    def complete(self, session: UploadSession, max_bytes: int) -> UploadResult:
+        """
+        Completes the multipart upload of a session all parts were received
+        for, with the ETags recorded for them
+        :param session: session to complete
+        :param max_bytes: upload size limit of the bucket
+        :return: upload result
+        """
+        if session.missing_parts:
+            raise S3ProxyServiceException(
+                UploadError.SESSION_INCOMPLETE, status_code=HTTP_409_CONFLICT
+            )
+        try:
+            upload_result = S3Service().complete_multipart_upload(
+                session.bucket_name,
+                session.object_name,
+                session.upload_id,
+                max_bytes,
+                parts=[
+                    Part(part.part_number, part.etag, size=part.size)
+                    for _, part in sorted(session.parts.items())
+                ],
+            )
+        except S3ProxyServiceException as e:
+            if e.key == UploadError.FILE_TOO_LARGE:
+                # the multipart upload was aborted
+                self.store.delete(session.session_id)
+            raise
+        self.store.delete(session.session_id)
+        return upload_result
+
+    def abort(self, session_id: str):
+        """
+        Aborts the multipart upload of a session, minio drops its parts
+        :param session_id: session id
+        """
+        session = self.get(session_id)
+        if self.store.delete(session_id):
+            self.__abort(session)
+
+    def expire(self) -> int:
+        """
+        Aborts sessions no part arrived for in time
+        :return: number of aborted sessions
+        """
+        aborted = 0
+        for session in self.store.expired(time.time()):
+            if self.store.delete(session.session_id):
+                self.__abort(session)
+                aborted += 1
+        if aborted:
+            self.logger.info(f"Aborted {aborted} expired upload session(s).")
+        return aborted
+
+    def start_janitor(self):
+        """
+        Starts the thread aborting expired sessions every
+        UPLOAD_SESSION_JANITOR_SECONDS
+        """
+        if self._janitor is not None or self.janitor_seconds <= 0:
+            return
+        self._stopped.clear()
+        self._janitor = threading.Thread(
+            target=self.__run_janitor, name="upload-session-janitor", daemon=True
+        )
+        self._janitor.start()
+
+    def stop_janitor(self):
+        janitor, self._janitor = self._janitor, None
+        if janitor is not None:
+            self._stopped.set()
+            janitor.join()
+
+    def __run_janitor(self):
+        while not self._stopped.wait(self.janitor_seconds):
+            try:
+                self.expire()
+            except Exception as e:
+                self.logger.error(f"Failed to expire upload sessions: {e}")
+
+    def __abort(self, session: UploadSession):
+        try:
+            S3Service().abort_multipart_upload(
+                session.bucket_name, session.object_name, session.upload_id
+            )
+        except Exception as e:
+            self.logger.error(
+                f"Failed to abort multipart upload {session.upload_id}: {e}"
+            )
@@ -0,0 +1,213 @@
+import logging
+import os
+import socket
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import urllib3
+from minio import Minio
+from urllib3.connection import HTTPConnection
+from urllib3.util import Retry, Timeout
+
+from src.core.common.singleton import Singleton
+from src.core.config.backend_routing import Backend, BackendRouting
+from src.core.tracing.trace_context import TRACEPARENT_HEADER
+from src.core.tracing.tracer import Tracer
+
+
+class TracingPoolManager(urllib3.PoolManager):
+    """
+    Pool manager adding the traceparent of the current span to requests,
+    so MinIO calls made within a trace carry its context
+    """
+
+    def urlopen(self, method, url, redirect=True, **kw):
+        traceparent = Tracer.traceparent()
+        if traceparent is not None:
+            headers = urllib3.HTTPHeaderDict(kw.get("headers") or {})
+            headers[TRACEPARENT_HEADER] = traceparent
+            kw["headers"] = headers
+        return super().urlopen(method, url, redirect, **kw)
+
+
+class S3ClientProvider(metaclass=Singleton):
+    """
+    Holds a minio client and its urllib3 connection pool per S3 backend,
+    buckets are routed to backends by BackendRouting.
+    Created at application startup and closed at shutdown.
+    Second clients, which never send requests, sign presigned URLs for the
+    endpoints clients reach the backends at.
+    """
+
+    DEFAULT_MAX_CONNECTIONS: str = "32"
+    DEFAULT_CONNECT_TIMEOUT_SECONDS: str = "5"
+    DEFAULT_READ_TIMEOUT_SECONDS: str = "300"
+    DEFAULT_RETRIES: str = "5"
+    DEFAULT_RETRY_BACKOFF_SECONDS: str = "0.2"
+    RETRY_STATUS_CODES: list = [500, 502, 503, 504]
+    DEFAULT_REGION: str = "us-east-1"
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._routing: Optional[BackendRouting] = None
+        self._clients: Dict[str, Tuple[Backend, Minio, urllib3.PoolManager]] = {}
+        self._presign_clients: Dict[str, Tuple[Backend, Minio]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def routing(self) -> BackendRouting:
+        with self._lock:
+            if self._routing is None:
+                self._routing = BackendRouting()
+            return self._routing
+
+    @property
+    def client(self) -> Minio:
+        """
+        Client of the default backend
+        """
+        return self.__client(self.routing.default_backend())
+
+    def client_for(self, bucket_name: str) -> Minio:
+        """
+        :param bucket_name: minio s3 bucket name
+        :return: client of the backend the bucket is stored in
+        """
+        return self.__client(self.routing.backend(bucket_name))
+
+    @property
+    def presign_client(self) -> Minio:
+        """
+        Client signing URLs for the default backend
+        """
+        return self.__presign_client(self.routing.default_backend())
+
+    def presign_client_for(self, bucket_name: str) -> Minio:
+        """
+        :param bucket_name: minio s3 bucket name
+        :return: client signing URLs for the backend the bucket is stored in
+        """
+        return self.__presign_client(self.routing.backend(bucket_name))
+
+    @property
+    def _http_client(self) -> Optional[urllib3.PoolManager]:
+        entry = self._clients.get(BackendRouting.DEFAULT_BACKEND)
+        return entry[2] if entry is not None else None
+
+    def start(self):
+        """
+        Creates shared minio client of the default backend
+        """
+        self.logger.debug("Starting shared minio client.")
+        _ = self.client
+
+    def close(self):
+        """
+        Closes all pooled connections of the shared minio clients.
+        New clients are created on the next access.
+        """
+        with self._lock:
+            entries, self._clients = list(self._clients.values()), {}
+            self._presign_clients = {}
+            self._routing = None
+        if entries:
+            self.logger.debug("Closing shared minio client connections.")
+        for _, _, http_client in entries:
+            http_client.clear()
+
+    def __client(self, backend: Backend) -> Minio:
+        """
+        Client of the backend, created on first use and again when the settings
+        of the backend were reloaded. Replaced clients are not closed, calls
+        still running on them finish and their connections are dropped with them.
+        :param backend: S3 backend
+        :return: minio client
+        """
+        entry = self._clients.get(backend.name)
+        if entry is not None and entry[0] is backend:
+            return entry[1]
+        with self._lock:
+            entry = self._clients.get(backend.name)
+            if entry is not None and entry[0] == backend:
+                entry = (backend, entry[1], entry[2])
+            else:
+                self.logger.debug(f"Starting minio client of backend {backend.name}.")
+                http_client = self.__create_http_client()
+                client = Minio(
+                    endpoint=backend.host,
+                    access_key=backend.access_key,
+                    secret_key=backend.secret_key,
+                    secure=backend.secure,
+                    region=backend.region,
+                    http_client=http_client,
+                )
+                entry = (backend, client, http_client)
+            self._clients[backend.name] = entry
+            return entry[1]
+
+    def __presign_client(self, backend: Backend) -> Minio:
+        """
+        Client signing URLs for the presign endpoint of the backend (its host by
+        default). The region is configured, so signing needs no request.
+        :param backend: S3 backend
+        :return: minio client
+        """
+        with self._lock:
+            entry = self._presign_clients.get(backend.name)
+            if entry is None or entry[0] != backend:
+                endpoint = urlsplit(
+                    backend.presign_endpoint
+                    or f"{'https' if backend.secure else 'http'}://{backend.host}"
+                )
+                client = Minio(
+                    endpoint=endpoint.netloc,
+                    access_key=backend.access_key,
+                    secret_key=backend.secret_key,
+                    secure=endpoint.scheme == "https",
+                    region=backend.region or self.DEFAULT_REGION,
+                )
+                entry = self._presign_clients[backend.name] = (backend, client)
+            return entry[1]
+
+    @classmethod
+    def __create_http_client(cls) -> urllib3.PoolManager:
+        """
+        Builds connection pool configured from environment
+        :return: urllib3 pool manager, tracing one when tracing is enabled
+        """
+        pool_manager_class = (
+            TracingPoolManager if Tracer().enabled else urllib3.PoolManager
+        )
+        socket_options = list(HTTPConnection.default_socket_options)
+        if os.getenv("MINIO_TCP_KEEPALIVE", "True").lower() == "true":
+            socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+
+        return pool_manager_class(
+            maxsize=int(
+                os.getenv("MINIO_MAX_CONNECTIONS", cls.DEFAULT_MAX_CONNECTIONS)
+            ),
+            timeout=Timeout(
+                connect=float(
+                    os.getenv(
+                        "MINIO_CONNECT_TIMEOUT_SECONDS",
+                        cls.DEFAULT_CONNECT_TIMEOUT_SECONDS,
+                    )
+                ),
+                read=float(
+                    os.getenv(
+                        "MINIO_READ_TIMEOUT_SECONDS", cls.DEFAULT_READ_TIMEOUT_SECONDS
+                    )
+                ),
+            ),
+            retries=Retry(
+                total=int(os.getenv("MINIO_RETRIES", cls.DEFAULT_RETRIES)),
+                backoff_factor=float(
+                    os.getenv(
+                        "MINIO_RETRY_BACKOFF_SECONDS", cls.DEFAULT_RETRY_BACKOFF_SECONDS
+                    )
+                ),
+                status_forcelist=cls.RETRY_STATUS_CODES,
+            ),
+            socket_options=socket_options,
+        )
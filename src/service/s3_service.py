@@ -1,45 +1,418 @@
+import io
 import logging
 import os
+import threading
+import time
+from concurrent.futures import Future, wait
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from minio import Minio
+from minio import Minio, S3Error
+from minio.datatypes import Part, PostPolicy, parse_list_objects
+from minio.helpers import ObjectWriteResult
+from starlette.status import HTTP_404_NOT_FOUND, HTTP_413_REQUEST_ENTITY_TOO_LARGE
 from urllib3.exceptions import HTTPError
 
+from src.core.cache.metadata_cache import MetadataCache
+from src.core.cache.object_cache import CachedObject, ObjectCache, ObjectCacheWriter
+from src.core.common.s3_executor import S3BatchExecutor
+from src.core.config.compression_policy import CompressionPolicy
+from src.core.config.presign_policy import PresignPolicy
+from src.core.exceptions.error_codes import MinioError, PresignError, UploadError
 from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.metrics.metrics import Metrics, Stage
+from src.core.tracing.tracer import traced
+from src.core.translation.translation_manager import TranslationManager
+from src.models.download.byte_range import ByteRange
+from src.models.download.object_info import ObjectInfo
+from src.models.download.object_listing import ListedObject, ObjectListing
+from src.models.presign.presigned_url import (
+    MultipartUploadPlan,
+    PresignedPost,
+    PresignedUrl,
+)
+from src.models.upload.batch_entry import BatchEntry
+from src.models.upload.batch_upload_result import BatchObjectResult, BatchUploadResult
 from src.models.upload.upload_request import UploadRequest
 from src.models.upload.upload_result import UploadResult
+from src.service.archive_stream import ArchiveStream
+from src.service.coalesced_download import CoalescedStream, DownloadCoalescer
+from src.service.compression import CompressingReader, Operation, compressor
+from src.service.multipart_uploader import MultipartUploader
+from src.service.object_list_stream import ObjectListStream
+from src.service.object_stream import ObjectStream
+from src.service.parallel_range_stream import ParallelRangeStream
+from src.service.s3_client_provider import S3ClientProvider
+
+MB: int = 1024 * 1024
 
 
 class S3Service:
     UNKNOWN_OBJECT_LENGTH: int = -1
-    DEFAULT_PART_SIZE: int = 10 * 1024 * 1024
+    DEFAULT_STREAM_PART_SIZE_MB: str = "10"
+    DEFAULT_DOWNLOAD_CHUNK_SIZE_KB: str = "64"
+    DEFAULT_PARALLEL_DOWNLOAD_THRESHOLD_MB: str = "64"
+    DEFAULT_PARALLEL_DOWNLOAD_RANGES: str = "4"
+    DEFAULT_PARALLEL_DOWNLOAD_RANGE_SIZE_MB: str = "8"
+    DEFAULT_UPLOAD_BATCH_CONCURRENCY: str = "16"
+    DEFAULT_ARCHIVE_PREFETCH_OBJECTS: str = "8"
+    DEFAULT_ARCHIVE_PREFETCH_MAX_OBJECT_KB: str = "1024"
+    LIST_PAGE_SIZE: int = 1000
 
-    def __init__(self):
+    def __init__(self, client: Optional[Minio] = None):
+        """
+        :param client: minio client used for every bucket, by default each
+        bucket uses the shared client of the backend it is routed to
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.client: Minio = Minio(
-            endpoint=os.getenv("MINIO_HOST"),
-            access_key=os.getenv("MINIO_ACCESS_KEY"),
-            secret_key=os.getenv("MINIO_SECRET_KEY"),
-            secure=False,
-        )
+        self._client: Optional[Minio] = client
+        self.metadata_cache: MetadataCache = MetadataCache()
+        self.object_cache: ObjectCache = ObjectCache()
+        self.download_coalescer: DownloadCoalescer = DownloadCoalescer()
+
+    @property
+    def client(self) -> Minio:
+        """
+        Client given to the service, or the shared client of the default backend
+        """
+        return self._client if self._client is not None else S3ClientProvider().client
+
+    @client.setter
+    def client(self, client: Minio):
+        self._client = client
+
+    def __client(self, bucket_name: str) -> Minio:
+        """
+        :param bucket_name: minio s3 bucket name
+        :return: client given to the service, or the shared client of the
+        backend the bucket is routed to
+        """
+        if self._client is not None:
+            return self._client
+        return S3ClientProvider().client_for(bucket_name)
 
+    @traced("S3Service.download_file")
     def download_file(self, bucket_name: str, object_name: str):
         """
-        Downloads file from minio s3 bucket
+        Downloads file from minio s3 bucket, read through the object cache if enabled
         :param bucket_name: minio s3 bucket name
         :param object_name: minio s3 object name
         :return: file bytes
         """
+        object_info = None
+        if self.object_cache.enabled:
+            object_info = self.stat_file(bucket_name, object_name)
+            cached_object = self.object_cache.get(object_info)
+            if cached_object is not None:
+                return cached_object.read()
         try:
             self.logger.debug(
                 f"Start downloading file {object_name} from {bucket_name}."
             )
-            result = self.client.get_object(
+            with Metrics().stage(Stage.GET_OBJECT):
+                with Metrics().stage(Stage.GET_OBJECT_FIRST_BYTE):
+                    result = self.__client(bucket_name).get_object(
+                        bucket_name=bucket_name, object_name=object_name
+                    )
+                data = result.data
+        except HTTPError:
+            raise S3ProxyServiceException("errors.minio.connection_error")
+
+        cache_writer = self.object_cache.writer(object_info) if object_info else None
+        if cache_writer is not None:
+            cache_writer.write(data)
+            cache_writer.commit(result.headers.get("ETag"))
+        return data
+
+    def cached_file(self, object_info: ObjectInfo) -> Optional[CachedObject]:
+        """
+        Looks up file in the local object cache
+        :param object_info: current file metadata
+        :return: cached file of the same version, None if not cached
+        """
+        return self.object_cache.get(object_info)
+
+    @traced("S3Service.stat_file")
+    def stat_file(self, bucket_name: str, object_name: str) -> ObjectInfo:
+        """
+        Reads file metadata from minio s3 bucket without downloading it
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :return: object info
+        """
+        object_info = self.metadata_cache.get_object_info(bucket_name, object_name)
+        if object_info is not None:
+            return object_info
+
+        try:
+            self.logger.debug(f"Start stat of file {object_name} in {bucket_name}.")
+            result = self.__client(bucket_name).stat_object(
                 bucket_name=bucket_name, object_name=object_name
             )
-            return result.data
         except HTTPError:
             raise S3ProxyServiceException("errors.minio.connection_error")
 
+        object_info = ObjectInfo(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            size=result.size,
+            etag=result.etag,
+            content_type=result.content_type,
+            last_modified=result.last_modified,
+            content_encoding=result.metadata.get("Content-Encoding") or None,
+        )
+        self.metadata_cache.put_object_info(object_info)
+        return object_info
+
+    @traced("S3Service.stream_file")
+    def stream_file(
+        self,
+        bucket_name: str,
+        object_name: str,
+        byte_range: Optional[ByteRange] = None,
+        object_info: Optional[ObjectInfo] = None,
+    ) -> Union[ObjectStream, ParallelRangeStream, CoalescedStream]:
+        """
+        Opens file from minio s3 bucket for streaming download
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :param byte_range: part of the file to download, whole file by default
+        :param object_info: file metadata, whole file admitted to the object cache
+        is stored in it while streamed, concurrent whole file downloads of the same
+        version share one upstream request and files of PARALLEL_DOWNLOAD_THRESHOLD_MB
+        and above are fetched as parallel ranges if enabled, or in one request if
+        the object changed since its metadata was read
+        :return: object stream reading file in chunks of DOWNLOAD_CHUNK_SIZE_KB
+        """
+        if object_info is not None and byte_range is None:
+            return self.download_coalescer.stream(
+                object_info,
+                lambda: self.__open_stream(
+                    bucket_name,
+                    object_name,
+                    cache_writer=self.object_cache.writer(object_info),
+                    object_info=object_info,
+                ),
+            )
+        return self.__open_stream(bucket_name, object_name, byte_range)
+
+    @traced("S3Service.open_stream")
+    def __open_stream(
+        self,
+        bucket_name: str,
+        object_name: str,
+        byte_range: Optional[ByteRange] = None,
+        cache_writer: Optional[ObjectCacheWriter] = None,
+        object_info: Optional[ObjectInfo] = None,
+    ) -> Union[ObjectStream, ParallelRangeStream]:
+        chunk_size_kb = os.getenv(
+            "DOWNLOAD_CHUNK_SIZE_KB", self.DEFAULT_DOWNLOAD_CHUNK_SIZE_KB
+        )
+        if object_info is not None and self.__parallel_download(object_info):
+            self.logger.debug(
+                f"Start parallel ranged download of {object_name} from {bucket_name}."
+            )
+            range_size_mb = os.getenv(
+                "PARALLEL_DOWNLOAD_RANGE_SIZE_MB",
+                self.DEFAULT_PARALLEL_DOWNLOAD_RANGE_SIZE_MB,
+            )
+            ranges = os.getenv(
+                "PARALLEL_DOWNLOAD_RANGES", self.DEFAULT_PARALLEL_DOWNLOAD_RANGES
+            )
+            try:
+                return ParallelRangeStream(
+                    client=self.__client(bucket_name),
+                    object_info=object_info,
+                    range_size=int(range_size_mb) * MB,
+                    max_ranges=int(ranges),
+                    chunk_size=int(chunk_size_kb) * 1024,
+                    cache_writer=cache_writer,
+                ).open()
+            except S3Error as e:
+                if e.code != "PreconditionFailed":
+                    raise e
+                # metadata cached by this worker is stale, the object was
+                # overwritten elsewhere: its current version is read whole
+                self.logger.info(
+                    f"{object_name} in {bucket_name} changed since it was stat, "
+                    f"downloading it in one request."
+                )
+                self.metadata_cache.invalidate_object(bucket_name, object_name)
+                self.object_cache.invalidate(bucket_name, object_name)
+                cache_writer = None
+
+        started_at = time.perf_counter() if Metrics().enabled else None
+        try:
+            self.logger.debug(f"Start streaming file {object_name} from {bucket_name}.")
+            if byte_range is None:
+                result = self.__client(bucket_name).get_object(
+                    bucket_name=bucket_name, object_name=object_name
+                )
+            else:
+                result = self.__client(bucket_name).get_object(
+                    bucket_name=bucket_name,
+                    object_name=object_name,
+                    offset=byte_range.start,
+                    length=byte_range.length,
+                )
+        except HTTPError:
+            raise S3ProxyServiceException("errors.minio.connection_error")
+        if started_at is not None:
+            Metrics().observe_stage(
+                Stage.GET_OBJECT_FIRST_BYTE, time.perf_counter() - started_at
+            )
+
+        return ObjectStream(
+            response=result,
+            chunk_size=int(chunk_size_kb) * 1024,
+            cache_writer=cache_writer,
+            started_at=started_at,
+        )
+
+    @traced("S3Service.stream_archive")
+    def stream_archive(
+        self,
+        bucket_name: str,
+        archive_format: str,
+        prefix: Optional[str] = None,
+        object_names: Optional[List[str]] = None,
+    ) -> ArchiveStream:
+        """
+        Opens tar or zip archive of many files of minio s3 bucket for streaming
+        download, up to ARCHIVE_PREFETCH_OBJECTS files are fetched ahead
+        :param bucket_name: minio s3 bucket name
+        :param archive_format: "tar" or "zip"
+        :param prefix: archive all files whose name starts with it
+        :param object_names: archive these files, in this order
+        :return: archive stream
+        """
+        self.logger.debug(f"Start streaming {archive_format} archive of {bucket_name}.")
+        chunk_size_kb = os.getenv(
+            "DOWNLOAD_CHUNK_SIZE_KB", self.DEFAULT_DOWNLOAD_CHUNK_SIZE_KB
+        )
+        prefetch = os.getenv(
+            "ARCHIVE_PREFETCH_OBJECTS", self.DEFAULT_ARCHIVE_PREFETCH_OBJECTS
+        )
+        max_object_kb = os.getenv(
+            "ARCHIVE_PREFETCH_MAX_OBJECT_KB",
+            self.DEFAULT_ARCHIVE_PREFETCH_MAX_OBJECT_KB,
+        )
+        return ArchiveStream(
+            client=self.__client(bucket_name),
+            bucket_name=bucket_name,
+            object_names=(
+                object_names
+                if object_names is not None
+                else self.__list_object_names(bucket_name, prefix or "")
+            ),
+            archive_format=archive_format,
+            prefetch=int(prefetch),
+            max_buffered_bytes=int(max_object_kb) * 1024,
+            chunk_size=int(chunk_size_kb) * 1024,
+        ).open()
+
+    @traced("S3Service.list_objects")
+    def list_objects(
+        self,
+        bucket_name: str,
+        prefix: Optional[str] = None,
+        delimiter: Optional[str] = None,
+        start_after: Optional[str] = None,
+        continuation_token: Optional[str] = None,
+        max_keys: int = LIST_PAGE_SIZE,
+    ) -> ObjectListing:
+        """
+        Lists one page of files of minio s3 bucket with ListObjectsV2
+        :param bucket_name: minio s3 bucket name
+        :param prefix: list files whose name starts with it
+        :param delimiter: names are rolled up to common prefixes at it
+        :param start_after: list files after this name
+        :param continuation_token: token of the page returned with the previous one
+        :param max_keys: files and common prefixes in the page
+        :return: page of the listing
+        """
+        query = {
+            "list-type": "2",
+            "delimiter": delimiter or "",
+            "encoding-type": "url",
+            "max-keys": str(max_keys),
+            "prefix": prefix or "",
+        }
+        if continuation_token:
+            query["continuation-token"] = continuation_token
+        if start_after:
+            query["start-after"] = start_after
+        try:
+            response = self.__client(bucket_name)._execute(
+                "GET", bucket_name, query_params=query
+            )
+        except HTTPError:
+            raise S3ProxyServiceException(MinioError.CONNECTION_ERROR)
+        objects, is_truncated, next_continuation_token, _ = parse_list_objects(response)
+        return ObjectListing(
+            bucket_name=bucket_name,
+            objects=[ListedObject.from_minio(listed) for listed in objects],
+            next_continuation_token=(next_continuation_token if is_truncated else None),
+        )
+
+    def stream_object_list(
+        self,
+        bucket_name: str,
+        prefix: Optional[str] = None,
+        delimiter: Optional[str] = None,
+        start_after: Optional[str] = None,
+        continuation_token: Optional[str] = None,
+    ) -> ObjectListStream:
+        """
+        Opens the whole listing of minio s3 bucket for streaming as NDJSON,
+        page by page while it is sent
+        :param bucket_name: minio s3 bucket name
+        :param prefix: list files whose name starts with it
+        :param delimiter: names are rolled up to common prefixes at it
+        :param start_after: list files after this name
+        :param continuation_token: continue a listing from this token
+        :return: listing stream
+        """
+        return ObjectListStream(
+            lambda token: self.list_objects(
+                bucket_name,
+                prefix=prefix,
+                delimiter=delimiter,
+                start_after=start_after,
+                continuation_token=token or continuation_token,
+            )
+        ).open()
+
+    def __list_object_names(self, bucket_name: str, prefix: str) -> Iterator[str]:
+        """
+        Lists files page by page while they are consumed
+        :param bucket_name: minio s3 bucket name
+        :param prefix: object name prefix
+        :return: names of the files, folders excluded
+        """
+        try:
+            for listed_object in self.__client(bucket_name).list_objects(
+                bucket_name=bucket_name, prefix=prefix, recursive=True
+            ):
+                if not listed_object.is_dir:
+                    yield listed_object.object_name
+        except HTTPError:
+            raise S3ProxyServiceException("errors.minio.connection_error")
+
+    def __parallel_download(self, object_info: ObjectInfo) -> bool:
+        """
+        :param object_info: metadata of the file being downloaded
+        :return: True if the file is large enough to be fetched as parallel ranges
+        """
+        if os.getenv("PARALLEL_DOWNLOAD_ENABLED", "False").lower() != "true":
+            return False
+        threshold_mb = os.getenv(
+            "PARALLEL_DOWNLOAD_THRESHOLD_MB",
+            self.DEFAULT_PARALLEL_DOWNLOAD_THRESHOLD_MB,
+        )
+        return object_info.size >= int(threshold_mb) * MB
+
+    @traced("S3Service.upload_file")
     def upload_file(self, upload_request: UploadRequest) -> UploadResult:
         """
         Uploads file to minio s3
@@ -48,26 +421,488 @@ class S3Service:
         self.logger.debug(
             f"Start uploading file {upload_request.object_name} to {upload_request.bucket_name}."
         )
-        bucket_name = upload_request.bucket_name
-        if not self.__bucket_exist(bucket_name):
-            if os.getenv("CREATE_BUCKET_ON_FILE_UPLOAD", "False").lower() == "true":
-                self.__create_bucket(bucket_name=bucket_name)
+        size = upload_request.file.size
+        self.__put_object(
+            bucket_name=upload_request.bucket_name,
+            object_name=upload_request.object_name,
+            data=upload_request.file.file,
+            content_type=upload_request.file.content_type,
+            length=size if isinstance(size, int) else self.UNKNOWN_OBJECT_LENGTH,
+        )
+        return UploadResult(
+            bucket_name=upload_request.bucket_name,
+            object_name=upload_request.object_name,
+        )
+
+    @traced("S3Service.upload_stream")
+    def upload_stream(
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: BinaryIO,
+        content_type: str,
+    ) -> UploadResult:
+        """
+        Uploads file to minio s3 while it is read from data, each part of
+        UPLOAD_STREAM_PART_SIZE_MB is sent as soon as it is read
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :param data: readable file data of unknown length
+        :param content_type: file content type
+        :return: upload result
+        """
+        self.logger.debug(f"Start streaming upload of {object_name} to {bucket_name}.")
+        part_size_mb = os.getenv(
+            "UPLOAD_STREAM_PART_SIZE_MB", self.DEFAULT_STREAM_PART_SIZE_MB
+        )
+        self.__put_object(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            data=data,
+            content_type=content_type,
+            length=self.UNKNOWN_OBJECT_LENGTH,
+            part_size=int(part_size_mb) * MB,
+        )
+        return UploadResult(bucket_name=bucket_name, object_name=object_name)
+
+    @traced("S3Service.upload_batch")
+    def upload_batch(
+        self, bucket_name: str, entries: Iterable[BatchEntry]
+    ) -> BatchUploadResult:
+        """
+        Uploads many files to one minio s3 bucket. The bucket is checked once and
+        up to UPLOAD_BATCH_CONCURRENCY files are written at the same time while
+        entries are still being read. A failed file does not stop the batch,
+        a missing bucket does.
+        :param bucket_name: minio s3 bucket name
+        :param entries: files to upload, rejected ones are reported as failed
+        :return: result per file in entries order
+        """
+        self.logger.debug(f"Start batch upload to {bucket_name}.")
+        self.__prepare_bucket(bucket_name)
+        concurrency = int(
+            os.getenv("UPLOAD_BATCH_CONCURRENCY", self.DEFAULT_UPLOAD_BATCH_CONCURRENCY)
+        )
+        slots = threading.BoundedSemaphore(max(concurrency, 1))
+        bucket_missing = threading.Event()
+        results: List[Union[BatchObjectResult, Future]] = []
+        try:
+            for entry in entries:
+                if entry.error is not None:
+                    message = TranslationManager().translate(entry.error)
+                    results.append(BatchObjectResult(entry.object_name, error=message))
+                    continue
+                slots.acquire()
+                if bucket_missing.is_set():
+                    slots.release()
+                    break
+                future = S3BatchExecutor().submit(
+                    self.__upload_batch_entry, bucket_name, entry, bucket_missing
+                )
+                future.add_done_callback(lambda _: slots.release())
+                results.append(future)
+        except BaseException:
+            for result in results:
+                if isinstance(result, Future):
+                    result.cancel()
+            raise
+        finally:
+            wait([result for result in results if isinstance(result, Future)])
+
+        return BatchUploadResult(
+            bucket_name=bucket_name,
+            results=[
+                result.result() if isinstance(result, Future) else result
+                for result in results
+            ],
+        )
+
+    @traced("S3Service.upload_batch_entry")
+    def __upload_batch_entry(
+        self, bucket_name: str, entry: BatchEntry, bucket_missing: threading.Event
+    ) -> BatchObjectResult:
+        """
+        Uploads one file of a batch
+        :param bucket_name: minio s3 bucket name
+        :param entry: file to upload
+        :param bucket_missing: set when the bucket turns out not to exist
+        :return: object result, errors other than a missing bucket are reported in it
+        """
         try:
-            self.client.put_object(
+            result = self.__write_object(
                 bucket_name=bucket_name,
-                data=upload_request.file.file,
-                object_name=upload_request.object_name,
-                content_type=upload_request.file.content_type,
-                part_size=self.DEFAULT_PART_SIZE,
-                length=self.UNKNOWN_OBJECT_LENGTH,
+                object_name=entry.object_name,
+                data=io.BytesIO(entry.data),
+                content_type=entry.content_type,
+                length=len(entry.data),
+            )
+        except S3Error as e:
+            if e.code == "NoSuchBucket":
+                bucket_missing.set()
+                raise e
+            return BatchObjectResult(entry.object_name, error=e.args[0])
+        except S3ProxyServiceException as e:
+            return BatchObjectResult(entry.object_name, error=e.get_message())
+        return BatchObjectResult(entry.object_name, etag=result.etag)
+
+    @traced("S3Service.presign_download")
+    def presign_download(self, bucket_name: str, object_name: str) -> PresignedUrl:
+        """
+        Signs a GET url the client downloads the file from minio with directly
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name, the file must exist
+        :return: presigned url valid for PRESIGN_EXPIRY_SECONDS
+        """
+        self.stat_file(bucket_name, object_name)
+        return self.__presign("GET", bucket_name, object_name)
+
+    @traced("S3Service.presign_upload")
+    def presign_upload(
+        self,
+        bucket_name: str,
+        object_name: str,
+        size: int,
+        content_type: Optional[str] = None,
+    ) -> PresignedPost:
+        """
+        Signs a POST policy the client uploads the file to minio with directly.
+        Unlike a presigned PUT url, the policy limits the file size, which MinIO
+        enforces however large the client says the file is.
+        :param bucket_name: minio s3 bucket name, created if configured to
+        :param object_name: minio s3 object name
+        :param size: largest file accepted, the size the client asked for
+        :param content_type: content type the file is stored with
+        :return: presigned form valid for PRESIGN_EXPIRY_SECONDS
+        """
+        self.__require_bucket(bucket_name)
+        expires_at = datetime.now(timezone.utc) + timedelta(
+            seconds=PresignPolicy().expiry_seconds
+        )
+        policy = PostPolicy(bucket_name, expires_at)
+        policy.add_equals_condition("key", object_name)
+        policy.add_content_length_range_condition(0, size)
+        fields = {"key": object_name}
+        if content_type:
+            policy.add_equals_condition("Content-Type", content_type)
+            fields["Content-Type"] = content_type
+        presign_client = S3ClientProvider().presign_client_for(bucket_name)
+        fields.update(presign_client.presigned_post_policy(policy))
+        url = presign_client._base_url.build(
+            "POST", presign_client._get_region(bucket_name), bucket_name=bucket_name
+        ).geturl()
+        return PresignedPost(url=url, fields=fields, expires_at=expires_at)
+
+    @traced("S3Service.presign_multipart_upload")
+    def presign_multipart_upload(
+        self,
+        bucket_name: str,
+        object_name: str,
+        size: int,
+        content_type: Optional[str] = None,
+    ) -> MultipartUploadPlan:
+        """
+        Starts a multipart upload and signs a PUT url per part. The part size is
+        chosen for the file size the same way as for uploads through the proxy.
+        :param bucket_name: minio s3 bucket name, created if configured to
+        :param object_name: minio s3 object name
+        :param size: file size in bytes
+        :param content_type: file content type
+        :return: multipart upload plan
+        """
+        upload_id, part_size = self.create_multipart_upload(
+            bucket_name, object_name, size, content_type
+        )
+        parts = [
+            self.__presign(
+                "PUT",
+                bucket_name,
+                object_name,
+                {"partNumber": str(part_number), "uploadId": upload_id},
+            )
+            for part_number in range(1, max(-(-size // part_size), 1) + 1)
+        ]
+        return MultipartUploadPlan(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            upload_id=upload_id,
+            part_size=part_size,
+            parts=parts,
+        )
+
+    @traced("S3Service.create_multipart_upload")
+    def create_multipart_upload(
+        self,
+        bucket_name: str,
+        object_name: str,
+        size: int,
+        content_type: Optional[str] = None,
+    ) -> Tuple[str, int]:
+        """
+        Starts a multipart upload whose parts are sent by the client. The part
+        size is chosen for the file size the same way as for uploads through
+        the proxy.
+        :param bucket_name: minio s3 bucket name, created if configured to
+        :param object_name: minio s3 object name
+        :param size: file size in bytes
+        :param content_type: file content type
+        :return: minio multipart upload id and part size
+        """
+        self.__require_bucket(bucket_name)
+        part_size = MultipartUploader(self.__client(bucket_name)).part_size(size)
+        try:
+            upload_id = self.__client(bucket_name)._create_multipart_upload(
+                bucket_name,
+                object_name,
+                {"Content-Type": content_type or "application/octet-stream"},
             )
         except HTTPError:
-            raise S3ProxyServiceException("errors.minio.connection_error")
+            raise S3ProxyServiceException(MinioError.CONNECTION_ERROR)
+        self.logger.debug(
+            f"Started multipart upload {upload_id} of {object_name} to {bucket_name}."
+        )
+        return upload_id, part_size
 
-        return UploadResult(
-            bucket_name=bucket_name, object_name=upload_request.object_name
+    @traced("S3Service.upload_part")
+    def upload_part(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+    ) -> str:
+        """
+        Uploads one part of a multipart upload, retrying transient failures
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :param upload_id: minio multipart upload id
+        :param part_number: part number, starting at 1
+        :param data: part bytes
+        :return: part ETag
+        """
+        try:
+            return MultipartUploader(self.__client(bucket_name)).upload_part(
+                bucket_name, object_name, upload_id, part_number, data
+            )
+        except HTTPError:
+            raise S3ProxyServiceException(MinioError.CONNECTION_ERROR)
+
+    @traced("S3Service.complete_multipart_upload")
+    def complete_multipart_upload(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        max_bytes: int,
+        parts: Optional[List[Part]] = None,
+    ) -> UploadResult:
+        """
+        Completes a multipart upload with the parts minio received.
+        An upload larger than max_bytes is aborted.
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :param upload_id: minio multipart upload id
+        :param max_bytes: upload size limit of the bucket
+        :param parts: parts with their ETags and sizes if known, listed from
+        minio by default
+        :return: upload result
+        """
+        if parts is None:
+            parts = self.__list_parts(bucket_name, object_name, upload_id)
+        if not parts or [part.part_number for part in parts] != list(
+            range(1, len(parts) + 1)
+        ):
+            raise S3ProxyServiceException(PresignError.PARTS_MISSING)
+        if sum(part.size or 0 for part in parts) > max_bytes:
+            self.abort_multipart_upload(bucket_name, object_name, upload_id)
+            raise S3ProxyServiceException(
+                UploadError.FILE_TOO_LARGE,
+                status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        try:
+            self.__client(bucket_name)._complete_multipart_upload(
+                bucket_name, object_name, upload_id, parts
+            )
+        except HTTPError:
+            raise S3ProxyServiceException(MinioError.CONNECTION_ERROR)
+        finally:
+            self.metadata_cache.invalidate_object(bucket_name, object_name)
+            self.object_cache.invalidate(bucket_name, object_name)
+        return UploadResult(bucket_name=bucket_name, object_name=object_name)
+
+    @traced("S3Service.abort_multipart_upload")
+    def abort_multipart_upload(
+        self, bucket_name: str, object_name: str, upload_id: str
+    ):
+        """
+        Aborts a multipart upload, minio drops the received parts
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :param upload_id: minio multipart upload id
+        """
+        try:
+            self.__client(bucket_name)._abort_multipart_upload(
+                bucket_name, object_name, upload_id
+            )
+        except HTTPError:
+            raise S3ProxyServiceException(MinioError.CONNECTION_ERROR)
+
+    @traced("S3Service.list_parts")
+    def __list_parts(
+        self, bucket_name: str, object_name: str, upload_id: str
+    ) -> List[Part]:
+        """
+        Lists all parts minio received for a multipart upload
+        :return: parts in part number order
+        """
+        parts: List[Part] = []
+        part_number_marker = None
+        try:
+            while True:
+                result = self.__client(bucket_name)._list_parts(
+                    bucket_name,
+                    object_name,
+                    upload_id,
+                    part_number_marker=part_number_marker,
+                )
+                parts.extend(result.parts)
+                if not result.is_truncated:
+                    return parts
+                part_number_marker = str(result.next_part_number_marker)
+        except HTTPError:
+            raise S3ProxyServiceException(MinioError.CONNECTION_ERROR)
+
+    @traced("S3Service.presign")
+    def __presign(
+        self,
+        method: str,
+        bucket_name: str,
+        object_name: str,
+        query_params: Optional[Dict[str, str]] = None,
+    ) -> PresignedUrl:
+        """
+        Signs url of one request to minio, no request is sent
+        :param method: http method of the request
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :param query_params: additional query parameters of the request
+        :return: presigned url valid for PRESIGN_EXPIRY_SECONDS
+        """
+        signed_at = datetime.now(timezone.utc)
+        expires = timedelta(seconds=PresignPolicy().expiry_seconds)
+        url = (
+            S3ClientProvider()
+            .presign_client_for(bucket_name)
+            .get_presigned_url(
+                method,
+                bucket_name,
+                object_name,
+                expires=expires,
+                request_date=signed_at,
+                extra_query_params=query_params,
+            )
+        )
+        return PresignedUrl(method=method, url=url, expires_at=signed_at + expires)
+
+    @traced("S3Service.require_bucket")
+    def __require_bucket(self, bucket_name: str):
+        """
+        Creates the bucket if configured to and fails if it does not exist
+        :param bucket_name: minio s3 bucket name
+        """
+        self.__prepare_bucket(bucket_name)
+        if not self.__bucket_exist(bucket_name):
+            raise S3ProxyServiceException(
+                MinioError.BUCKET_MISSING, status_code=HTTP_404_NOT_FOUND
+            )
+
+    @traced("S3Service.put_object")
+    def __put_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: BinaryIO,
+        content_type: str,
+        length: int,
+        part_size: Optional[int] = None,
+    ):
+        """
+        Uploads data, creating the bucket if configured to
+        :param bucket_name: minio s3 bucket name
+        :param object_name: minio s3 object name
+        :param data: readable file data
+        :param content_type: file content type
+        :param length: data length, UNKNOWN_OBJECT_LENGTH if not known
+        :param part_size: multipart upload part size, derived from length by default
+        """
+        self.__prepare_bucket(bucket_name)
+        self.__write_object(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            data=data,
+            content_type=content_type,
+            length=length,
+            part_size=part_size,
+        )
+
+    @traced("S3Service.prepare_bucket")
+    def __prepare_bucket(self, bucket_name: str):
+        """
+        Creates the bucket if it does not exist and the service is configured to
+        :param bucket_name: minio s3 bucket name
+        """
+        if not self.__bucket_exist(bucket_name):
+            if os.getenv("CREATE_BUCKET_ON_FILE_UPLOAD", "False").lower() == "true":
+                self.__create_bucket(bucket_name=bucket_name)
+
+    @traced("S3Service.write_object")
+    def __write_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: BinaryIO,
+        content_type: str,
+        length: int,
+        part_size: Optional[int] = None,
+    ) -> ObjectWriteResult:
+        """
+        Uploads data and drops cached metadata and content of the object.
+        Data is stored compressed if the bucket is configured to, with the
+        encoding recorded as Content-Encoding of the object.
+        :return: write result of the uploaded object
+        """
+        metadata = None
+        encoding = CompressionPolicy().at_rest_encoding(
+            bucket_name, content_type, length
         )
+        if encoding is not None:
+            data = CompressingReader(
+                data, compressor(encoding, Operation.COMPRESS_UPLOAD)
+            )
+            length = self.UNKNOWN_OBJECT_LENGTH
+            metadata = {"Content-Encoding": encoding}
+        try:
+            with Metrics().stage(Stage.PUT_OBJECT):
+                return MultipartUploader(self.__client(bucket_name)).upload(
+                    bucket_name=bucket_name,
+                    object_name=object_name,
+                    data=data,
+                    content_type=content_type,
+                    length=length,
+                    part_size=part_size,
+                    metadata=metadata,
+                )
+        except S3Error as e:
+            if e.code == "NoSuchBucket":
+                self.metadata_cache.invalidate_bucket(bucket_name)
+            raise e
+        except HTTPError:
+            raise S3ProxyServiceException("errors.minio.connection_error")
+        finally:
+            self.metadata_cache.invalidate_object(bucket_name, object_name)
+            self.object_cache.invalidate(bucket_name, object_name)
 
+    @traced("S3Service.create_bucket")
     def __create_bucket(self, bucket_name: str, object_lock: bool = True):
         """
         Creates bucket on minio s3 instance
@@ -75,19 +910,31 @@ class S3Service:
         :param object_lock: locking object (see minio spec)
         """
         try:
-            self.client.make_bucket(bucket_name=bucket_name, object_lock=object_lock)
+            self.__client(bucket_name).make_bucket(
+                bucket_name=bucket_name, object_lock=object_lock
+            )
         except HTTPError:
             raise S3ProxyServiceException("errors.minio.connection_error")
+        self.metadata_cache.put_bucket_exists(bucket_name, True)
 
+    @traced("S3Service.bucket_exist")
     def __bucket_exist(self, bucket_name: str):
         """
         Verifies existence of the bucket by bucket name
         :param bucket_name: name of the bucket to be verified
         :return: existence result True/False
         """
+        bucket_exists = self.metadata_cache.get_bucket_exists(bucket_name)
+        if bucket_exists is not None:
+            return bucket_exists
         try:
-            bucket_exists = self.client.bucket_exists(bucket_name=bucket_name)
-            return True if bucket_exists else False
+            with Metrics().stage(Stage.BUCKET_EXISTS):
+                bucket_exists = self.__client(bucket_name).bucket_exists(
+                    bucket_name=bucket_name
+                )
+            bucket_exists = True if bucket_exists else False
+            self.metadata_cache.put_bucket_exists(bucket_name, bucket_exists)
+            return bucket_exists
         except Exception as e:
             self.logger.error(f"Error in S3Service: {e}")
             raise e
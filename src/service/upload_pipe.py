@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, Optional
+
+
+class UploadPipe:
+    """
+    Bounded byte pipe between the event loop receiving a request body and the
+    executor thread uploading it to minio. The writer waits without blocking the
+    event loop while max_buffered_bytes are not yet read; the reader blocks its
+    thread until data arrives.
+    """
+
+    def __init__(self, max_buffered_bytes: int):
+        """
+        :param max_buffered_bytes: bytes received ahead of the upload
+        """
+        self.max_buffered_bytes = max_buffered_bytes
+        self.bytes_written = 0
+        self._chunks: Deque[memoryview] = deque()
+        self._buffered = 0
+        self._eof = False
+        self._aborted = False
+        self._error: Optional[BaseException] = None
+        self._condition = threading.Condition()
+        self._loop = asyncio.get_running_loop()
+        self._space = asyncio.Event()
+
+    async def write(self, data: bytes) -> bool:
+        """
+        Passes data to the reader, waiting while the buffer is full
+        :param data: received bytes
+        :return: False if the reader is gone and no more data is needed
+        """
+        while True:
+            with self._condition:
+                if self._aborted:
+                    return False
+                if self._buffered < self.max_buffered_bytes:
+                    self._chunks.append(memoryview(data))
+                    self._buffered += len(data)
+                    self.bytes_written += len(data)
+                    self._condition.notify_all()
+                    return True
+                self._space.clear()
+            await self._space.wait()
+
+    def close(self):
+        """
+        Marks the end of data
+        """
+        with self._condition:
+            self._eof = True
+            self._condition.notify_all()
+
+    def fail(self, error: BaseException):
+        """
+        Stops the reader with the error, e.g. when the request body is rejected
+        :param error: error raised to the reader
+        """
+        with self._condition:
+            self._error = error
+            self._condition.notify_all()
+
+    def abort(self):
+        """
+        Stops the writer once the reader does not need more data
+        """
+        with self._condition:
+            self._aborted = True
+        self._space.set()
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Reads up to size bytes, blocking until some are available
+        :param size: maximal number of bytes, all buffered bytes if negative
+        :return: data, empty bytes at the end of data
+        """
+        with self._condition:
+            while not self._chunks and not self._eof and self._error is None:
+                self._condition.wait()
+            if self._error is not None:
+                raise self._error
+            if not self._chunks:
+                return b""
+            parts = []
+            remaining = size if size >= 0 else self._buffered
+            while self._chunks and remaining > 0:
+                chunk = self._chunks[0]
+                if len(chunk) <= remaining:
+                    self._chunks.popleft()
+                else:
+                    self._chunks[0] = chunk[remaining:]
+                    chunk = chunk[:remaining]
+                parts.append(chunk)
+                remaining -= len(chunk)
+                self._buffered -= len(chunk)
+        self._loop.call_soon_threadsafe(self._space.set)
+        return b"".join(parts)
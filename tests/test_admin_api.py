@@ -0,0 +1,31 @@
+import unittest
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.core.cache.metadata_cache import MetadataCache
+
+client = TestClient(app)
+
+
+class TestAdminAPI(unittest.TestCase):
+
+    def setUp(self):
+        MetadataCache().clear()
+
+    def test_cache_stats(self):
+        MetadataCache().put_bucket_exists("bucket-name", True)
+        MetadataCache().get_bucket_exists("bucket-name")
+
+        response = client.get("/admin/cache/stats")
+
+        self.assertEqual(200, response.status_code)
+        bucket_stats = response.json()["metadata"]["buckets"]
+        self.assertEqual(1, bucket_stats["size"])
+        self.assertGreaterEqual(bucket_stats["hits"], 1)
+
+    def test_coalescing_stats(self):
+        response = client.get("/admin/coalescing/stats")
+
+        self.assertEqual(200, response.status_code)
+        self.assertIn("coalesced", response.json())
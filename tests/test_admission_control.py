@@ -0,0 +1,177 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.core.admission.admission_controller import (
+    AdmissionController,
+    RateLimiter,
+    RequestKind,
+)
+from src.core.common.singleton import Singleton
+from src.core.config.admission_limits import AdmissionLimits, RateLimit
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.metrics.metrics import Metrics
+
+client = TestClient(app, raise_server_exceptions=False)
+
+MB: int = 1024 * 1024
+
+
+def reset_admission_control():
+    for singleton in (AdmissionController, AdmissionLimits):
+        Singleton._instances.pop(singleton, None)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_token_bucket(self):
+        rate_limiter = RateLimiter(RateLimit(per_second=2, burst=3), max_keys=10)
+
+        self.assertEqual(
+            [0, 0, 0], [rate_limiter.acquire("client", 100) for _ in range(3)]
+        )
+        self.assertAlmostEqual(0.5, rate_limiter.acquire("client", 100))
+        self.assertEqual(0, rate_limiter.acquire("other", 100))
+        self.assertEqual(0, rate_limiter.acquire("client", 100.5))
+        self.assertAlmostEqual(0.5, rate_limiter.acquire("client", 100.5))
+
+    def test_least_recently_seen_keys_dropped(self):
+        rate_limiter = RateLimiter(RateLimit(per_second=1, burst=1), max_keys=2)
+        for key in ("a", "b", "c"):
+            rate_limiter.acquire(key, 100)
+
+        self.assertEqual(0, rate_limiter.acquire("a", 100))
+        self.assertGreater(rate_limiter.acquire("c", 100), 0)
+
+
+class TestAdmissionController(unittest.TestCase):
+
+    def tearDown(self):
+        reset_admission_control()
+
+    def controller(self, **env) -> AdmissionController:
+        reset_admission_control()
+        with patch.dict(os.environ, env):
+            return AdmissionController()
+
+    def assertRejected(self, status_code, reason, admit):
+        rejections = Metrics().admission_rejections
+        before = rejections.value((reason,))
+        with self.assertRaises(S3ProxyServiceException) as context:
+            admit()
+        self.assertEqual(status_code, context.exception.status_code)
+        self.assertIn("Retry-After", context.exception.headers)
+        self.assertEqual(before + 1, rejections.value((reason,)))
+
+    def test_concurrency_caps(self):
+        controller = self.controller(
+            MAX_CONCURRENT_UPLOADS="1", MAX_CONCURRENT_DOWNLOADS="2"
+        )
+        upload = controller.admit(RequestKind.UPLOAD, {})
+        downloads = [controller.admit(RequestKind.DOWNLOAD, {}) for _ in range(2)]
+
+        self.assertRejected(
+            503,
+            "upload_concurrency",
+            lambda: controller.admit(RequestKind.UPLOAD, {}),
+        )
+        self.assertRejected(
+            503,
+            "download_concurrency",
+            lambda: controller.admit(RequestKind.DOWNLOAD, {}),
+        )
+        controller.admit(RequestKind.OTHER, {}).release()
+
+        upload.release()
+        downloads[0].release()
+        controller.admit(RequestKind.UPLOAD, {})
+        controller.admit(RequestKind.DOWNLOAD, {})
+
+    def test_upload_bytes_in_flight(self):
+        controller = self.controller(MAX_UPLOAD_BYTES_IN_FLIGHT_MB="10")
+        large = controller.admit(RequestKind.UPLOAD, {}, 20 * MB)
+
+        self.assertRejected(
+            503,
+            "upload_bytes_in_flight",
+            lambda: controller.admit(RequestKind.UPLOAD, {}, 1),
+        )
+        large.release()
+        small = controller.admit(RequestKind.UPLOAD, {}, 4 * MB)
+        chunked = controller.admit(RequestKind.UPLOAD, {})
+        chunked.receive(5 * MB)
+        self.assertEqual(9 * MB, controller.upload_bytes_in_flight)
+        self.assertRejected(
+            503,
+            "upload_bytes_in_flight",
+            lambda: controller.admit(RequestKind.UPLOAD, {}, 2 * MB),
+        )
+        small.release()
+        chunked.release()
+        self.assertEqual(0, controller.upload_bytes_in_flight)
+
+    def test_rate_limits_by_key(self):
+        controller = self.controller(
+            RATE_LIMIT_API_KEY_PER_SECOND="0.1", RATE_LIMIT_API_KEY_BURST="1"
+        )
+
+        controller.admit(RequestKind.OTHER, {"api_key": "key-1"})
+        controller.admit(RequestKind.OTHER, {"api_key": "key-2"})
+        controller.admit(RequestKind.OTHER, {"api_key": None})
+        with self.assertRaises(S3ProxyServiceException) as context:
+            controller.admit(RequestKind.OTHER, {"api_key": "key-1"})
+        self.assertEqual(429, context.exception.status_code)
+        self.assertEqual("10", context.exception.headers["Retry-After"])
+
+
+class TestAdmissionControlMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        self.env = patch.dict(
+            os.environ,
+            {
+                "RATE_LIMIT_BUCKET_PER_SECOND": "0.5",
+                "RATE_LIMIT_BUCKET_BURST": "1",
+                "MAX_CONCURRENT_UPLOADS": "1",
+            },
+        )
+        self.env.start()
+        reset_admission_control()
+
+    def tearDown(self):
+        self.env.stop()
+        reset_admission_control()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_bucket_rate_limited(self, mock_s3_service):
+        mock_s3_service.return_value.presign_download.side_effect = ValueError()
+
+        client.get("/api/presign/download/bucket-name/a.txt")
+        response = client.get("/api/presign/download/bucket-name/a.txt")
+
+        self.assertEqual(429, response.status_code)
+        self.assertEqual("2", response.headers["Retry-After"])
+        self.assertIn("message", response.json())
+        self.assertNotEqual(
+            429, client.get("/api/presign/download/other-bucket/a.txt").status_code
+        )
+        self.assertEqual(200, client.get("/metrics").status_code)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_upload_rejected_when_uploads_at_limit(self, mock_s3_service):
+        admission = AdmissionController().admit(RequestKind.UPLOAD, {})
+
+        response = client.post("/api/upload/stream/bucket-name/a.txt", content=b"a")
+
+        self.assertEqual(503, response.status_code)
+        self.assertEqual("1", response.headers["Retry-After"])
+        self.assertEqual("close", response.headers["Connection"])
+        mock_s3_service.return_value.upload_stream.assert_not_called()
+        admission.release()
+        self.assertIn(
+            's3_proxy_admission_limit{limit="max_concurrent_uploads"} 1',
+            client.get("/metrics").text,
+        )
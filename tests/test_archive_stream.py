@@ -0,0 +1,160 @@
+import io
+import tarfile
+import threading
+import unittest
+import zipfile
+from unittest.mock import MagicMock
+
+from minio import S3Error
+
+from src.core.config.compression_policy import CompressionPolicy
+from src.service.archive_stream import ArchiveStream
+from src.service.compression import Operation, compressor, transcode
+
+OBJECTS = {
+    "folder/a.txt": b"Hola!",
+    "folder/b.bin": b"x" * 3000,
+    "folder/sub/c.txt": b"",
+}
+
+
+class FakeArchiveClient:
+    """
+    Minio client serving OBJECTS, optionally holding requests until released
+    and storing some objects compressed
+    """
+
+    def __init__(self, hold: bool = False, encodings: dict = None):
+        self.encodings = encodings or {}
+        self.in_flight = 0
+        self.responses = []
+        self.released = threading.Event()
+        if not hold:
+            self.released.set()
+        self._lock = threading.Lock()
+
+    def get_object(self, bucket_name, object_name):
+        if object_name not in OBJECTS:
+            raise S3Error("NoSuchKey", "missing", object_name, "", "", None)
+        with self._lock:
+            self.in_flight += 1
+        self.released.wait(5)
+        with self._lock:
+            self.in_flight -= 1
+        data = OBJECTS[object_name]
+        response = MagicMock()
+        response.headers = {
+            "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT",
+        }
+        encoding = self.encodings.get(object_name)
+        if encoding:
+            if encoding in CompressionPolicy.ENCODINGS:
+                codec = compressor(encoding, Operation.COMPRESS_UPLOAD)
+                data = transcode(data, codec)
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Content-Length"] = str(len(data))
+        response.stream.side_effect = lambda size: (
+            data[start : start + size] for start in range(0, len(data), size)
+        )
+        self.responses.append(response)
+        return response
+
+
+def archive_stream(client, archive_format, object_names=OBJECTS, **kwargs):
+    options = {"prefetch": 2, "max_buffered_bytes": 1024, "chunk_size": 1000}
+    options.update(kwargs)
+    return ArchiveStream(
+        client, "bucket-name", object_names, archive_format, **options
+    ).open()
+
+
+class TestArchiveStream(unittest.TestCase):
+
+    def test_tar_archive(self):
+        data = b"".join(archive_stream(FakeArchiveClient(), "tar"))
+
+        with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+            files = {
+                member.name: archive.extractfile(member).read() for member in archive
+            }
+            self.assertEqual(1445412480, archive.getmember("folder/a.txt").mtime)
+        self.assertEqual(OBJECTS, files)
+        self.assertEqual(0, len(data) % 512)
+
+    def test_zip_archive(self):
+        stream = archive_stream(FakeArchiveClient(), "zip")
+
+        data = b"".join(stream)
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertIsNone(archive.testzip())
+            files = {name: archive.read(name) for name in archive.namelist()}
+        self.assertEqual(OBJECTS, files)
+        self.assertEqual("application/zip", stream.content_type)
+        self.assertIsNone(stream.content_length)
+
+    def test_compressed_objects_archived_decompressed(self):
+        client = FakeArchiveClient(
+            encodings={"folder/a.txt": "gzip", "folder/b.bin": "zstd"}
+        )
+        for max_buffered_bytes in (0, 1024, 4096):
+            with self.subTest(max_buffered_bytes=max_buffered_bytes):
+                data = b"".join(
+                    archive_stream(client, "tar", max_buffered_bytes=max_buffered_bytes)
+                )
+
+                with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+                    files = {
+                        member.name: archive.extractfile(member).read()
+                        for member in archive
+                    }
+                self.assertEqual(OBJECTS, files)
+
+    def test_unknown_encodings_archived_as_stored(self):
+        client = FakeArchiveClient(encodings={"folder/b.bin": "deflate"})
+
+        data = b"".join(archive_stream(client, "tar", max_buffered_bytes=0))
+
+        with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+            files = {
+                member.name: archive.extractfile(member).read() for member in archive
+            }
+        self.assertEqual(OBJECTS, files)
+
+    def test_missing_objects_and_unsafe_names_left_out(self):
+        data = b"".join(
+            archive_stream(
+                FakeArchiveClient(), "tar", ["missing.txt", "folder/a.txt", "../.."]
+            )
+        )
+
+        with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+            self.assertEqual(["folder/a.txt"], archive.getnames())
+
+    def test_objects_fetched_ahead_bounded(self):
+        client = FakeArchiveClient(hold=True)
+        opened = threading.Thread(
+            target=archive_stream, args=(client, "tar"), kwargs={"prefetch": 2}
+        )
+        opened.start()
+        while client.in_flight < 2:
+            threading.Event().wait(0.01)
+        threading.Event().wait(0.05)
+
+        self.assertEqual(2, client.in_flight)
+        client.released.set()
+        opened.join(5)
+
+    def test_closed_archive_closes_streamed_objects(self):
+        client = FakeArchiveClient()
+        stream = archive_stream(
+            client, "tar", ["folder/b.bin", "folder/a.txt"], max_buffered_bytes=0
+        )
+
+        next(iter(stream))
+        stream.close()
+        stream.close()
+
+        for response in client.responses:
+            response.close.assert_called_once()
+            response.release_conn.assert_called_once()
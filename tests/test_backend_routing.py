@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.core.cache.metadata_cache import MetadataCache
+from src.core.common.singleton import Singleton
+from src.core.config.backend_routing import BackendRouting, HashRing
+from src.service.s3_client_provider import S3ClientProvider
+from src.service.s3_service import S3Service
+
+client = TestClient(app)
+
+
+class TestBackendRouting(unittest.TestCase):
+    ENV: dict = {
+        "MINIO_HOST": "minio-a:9000",
+        "MINIO_ACCESS_KEY": "access-key",
+        "MINIO_SECRET_KEY": "secret-key",
+        "S3_BACKENDS_RELOAD_SECONDS": "0",
+    }
+    CONFIG: dict = {
+        "backends": {
+            "b": {"host": "minio-b:9000", "access_key": "key-b", "secret_key": "b"},
+            "c": {"host": "minio-c:9000"},
+        },
+        "buckets": {"backups": "b"},
+        "prefixes": {"logs-": "b", "logs-eu-": "c"},
+    }
+
+    def setUp(self):
+        Singleton._instances.pop(S3ClientProvider, None)
+        self.config_file = tempfile.NamedTemporaryFile("w", suffix=".json")
+        self.write_config(self.CONFIG)
+        self.env = patch.dict(
+            os.environ, {**self.ENV, "S3_BACKENDS_FILE": self.config_file.name}
+        )
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        S3ClientProvider().close()
+        Singleton._instances.pop(S3ClientProvider, None)
+        self.config_file.close()
+
+    def write_config(self, config: dict):
+        self.config_file.seek(0)
+        self.config_file.truncate()
+        json.dump(config, self.config_file)
+        self.config_file.flush()
+
+    def test_buckets_routed_by_name_then_longest_prefix(self):
+        routing = BackendRouting()
+
+        self.assertEqual("b", routing.backend("backups").name)
+        self.assertEqual("b", routing.backend("logs-us").name)
+        self.assertEqual("c", routing.backend("logs-eu-west").name)
+        self.assertEqual("default", routing.backend("photos").name)
+        self.assertEqual("minio-a:9000", routing.backend("photos").host)
+        self.assertEqual("access-key", routing.backend("logs-eu-west").access_key)
+
+    def test_without_file_every_bucket_uses_default_backend(self):
+        with patch.dict(os.environ, {"S3_BACKENDS_FILE": ""}):
+            routing = BackendRouting()
+
+        self.assertEqual(["default"], list(routing.table.backends))
+        self.assertEqual("minio-a:9000", routing.backend("backups").host)
+
+    def test_unknown_backend_rejected(self):
+        self.write_config({"buckets": {"backups": "missing"}})
+
+        with self.assertRaises(ValueError):
+            BackendRouting()
+
+    def test_hash_ring_spreads_buckets_consistently(self):
+        buckets = [f"bucket-{index}" for index in range(3000)]
+        two = HashRing(["a", "b"])
+        three = HashRing(["a", "b", "c"])
+
+        owners = [two.get(bucket) for bucket in buckets]
+        moved = [two.get(bucket) != three.get(bucket) for bucket in buckets]
+        self.assertAlmostEqual(0.5, owners.count("a") / len(buckets), delta=0.1)
+        self.assertAlmostEqual(1 / 3, sum(moved) / len(buckets), delta=0.1)
+        self.assertTrue(
+            all(three.get(bucket) == "c" for bucket, m in zip(buckets, moved) if m)
+        )
+
+    def test_file_reloaded_when_changed(self):
+        routing = BackendRouting()
+        self.write_config({**self.CONFIG, "buckets": {"backups": "c"}})
+        os.utime(self.config_file.name, (0, 1))
+
+        self.assertEqual("c", routing.backend("backups").name)
+
+        self.write_config({"buckets": "not an object"})
+        os.utime(self.config_file.name, (0, 2))
+        with self.assertLogs("BackendRouting", "ERROR"):
+            self.assertEqual("c", routing.backend("backups").name)
+
+    def test_client_per_backend_kept_over_reloads(self):
+        provider = S3ClientProvider()
+        default_client = provider.client_for("photos")
+        backups_client = provider.client_for("backups")
+        self.write_config({**self.CONFIG, "backends": {**self.CONFIG["backends"]}})
+        os.utime(self.config_file.name, (0, 1))
+
+        self.assertIs(default_client, provider.client)
+        self.assertIsNot(default_client, backups_client)
+        self.assertEqual("minio-b:9000", backups_client._base_url.host)
+        self.assertIs(backups_client, provider.client_for("logs-us"))
+        self.assertIs(backups_client, provider.client_for("backups"))
+
+        self.write_config(
+            {**self.CONFIG, "backends": {"b": {"host": "minio-d:9000"}, "c": {}}}
+        )
+        os.utime(self.config_file.name, (0, 2))
+        self.assertEqual("minio-d:9000", provider.client_for("backups")._base_url.host)
+        self.assertEqual(
+            "minio-d:9000",
+            provider.presign_client_for("backups")._base_url.host,
+        )
+
+    def test_service_calls_backend_of_bucket(self):
+        MetadataCache().clear()
+        mock_client_for = MagicMock()
+        with patch.object(S3ClientProvider, "client_for", mock_client_for):
+            S3Service().stat_file("backups", "a.txt")
+
+        mock_client_for.assert_called_with("backups")
+        mock_client_for.return_value.stat_object.assert_called_once()
+
+    def test_admin_backends(self):
+        response = client.get("/admin/backends")
+        reload_response = client.post("/admin/backends/reload")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({"backups": "b"}, response.json()["buckets"])
+        self.assertNotIn("secret_key", json.dumps(response.json()))
+        self.assertTrue(reload_response.json()["reloaded"])
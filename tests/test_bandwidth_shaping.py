@@ -0,0 +1,224 @@
+import asyncio
+import os
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from src.api.middleware.bandwidth_shaping import BandwidthShapingMiddleware
+from src.core.admission.bandwidth_shaper import (
+    BandwidthShaper,
+    ByteRateLimiter,
+    Direction,
+)
+from src.core.common.singleton import Singleton
+from src.core.config.bandwidth_limits import BandwidthLimits
+from src.core.metrics.metrics import Metrics
+
+KB: int = 1024
+MB: int = 1024 * 1024
+
+
+def reset_bandwidth_shaping():
+    for singleton in (BandwidthShaper, BandwidthLimits):
+        Singleton._instances.pop(singleton, None)
+
+
+class TestByteRateLimiter(unittest.TestCase):
+
+    def test_burst_then_paced(self):
+        limiter = ByteRateLimiter(bytes_per_second=100 * KB, burst_bytes=100 * KB)
+
+        self.assertEqual(0, limiter.reserve(50 * KB, 10))
+        self.assertEqual(0, limiter.reserve(50 * KB, 10))
+        self.assertAlmostEqual(0.5, limiter.reserve(50 * KB, 10))
+        self.assertAlmostEqual(0.5, limiter.reserve(50 * KB, 10.5))
+        self.assertEqual(0, limiter.reserve(50 * KB, 20))
+
+    def test_streams_take_turns(self):
+        limiter = ByteRateLimiter(bytes_per_second=100 * KB, burst_bytes=10 * KB)
+        limiter.reserve(10 * KB, 10)
+
+        waits = [limiter.reserve(10 * KB, 10) for _ in range(4)]
+
+        self.assertEqual([0.1, 0.2, 0.3, 0.4], [round(wait, 6) for wait in waits])
+        self.assertFalse(limiter.idle(10.4))
+        self.assertTrue(limiter.idle(10.5))
+
+
+class TestBandwidthShaper(unittest.TestCase):
+
+    def tearDown(self):
+        reset_bandwidth_shaping()
+
+    def shaper(self, **env) -> BandwidthShaper:
+        reset_bandwidth_shaping()
+        with patch.dict(os.environ, env):
+            return BandwidthShaper()
+
+    def test_caps_applying_to_stream(self):
+        shaper = self.shaper(
+            BANDWIDTH_DOWNLOAD_MB_PER_SECOND="10",
+            BANDWIDTH_TENANT_MB_PER_SECOND="2",
+            BANDWIDTH_BUCKET_LIMITS_MB_PER_SECOND='{"backups": 1, "logs": 0}',
+            BANDWIDTH_ROUTE_LIMITS_MB_PER_SECOND='{"/api/archive/{bucket_name}": 0.5}',
+        )
+
+        stream = shaper.open(
+            Direction.DOWNLOAD, "key-1", "backups", "/api/archive/{bucket_name}"
+        )
+        self.assertEqual(
+            [10 * MB, 2 * MB, MB, MB // 2],
+            [limiter.bytes_per_second for limiter in stream.limiters],
+        )
+        self.assertIsNone(shaper.open(Direction.UPLOAD, None, "logs", "/api/upload"))
+        other = shaper.open(Direction.DOWNLOAD, "key-2", "logs", "/api/download")
+        self.assertIs(stream.limiters[0], other.limiters[0])
+        self.assertEqual(2, stream.limiters[0].streams)
+        self.assertEqual(2, Metrics().shaped_streams.value((Direction.DOWNLOAD,)))
+
+        stream.close()
+        other.close()
+        self.assertEqual(0, stream.limiters[0].streams)
+        self.assertEqual(0, Metrics().shaped_streams.value((Direction.DOWNLOAD,)))
+
+    def test_throttle_waits_for_slowest_cap(self):
+        shaper = self.shaper(
+            BANDWIDTH_UPLOAD_MB_PER_SECOND="1",
+            BANDWIDTH_TENANT_MB_PER_SECOND="0.5",
+            BANDWIDTH_BURST_KB="0",
+        )
+        stream = shaper.open(Direction.UPLOAD, "key-1", None, "/api/upload")
+        throttled = Metrics().throttled_seconds.value((Direction.UPLOAD,))
+
+        with patch(
+            "src.core.admission.bandwidth_shaper.asyncio.sleep", new=AsyncMock()
+        ) as mock_sleep:
+            asyncio.run(stream.throttle(MB // 4))
+
+        mock_sleep.assert_awaited_once()
+        self.assertAlmostEqual(0.5, mock_sleep.await_args.args[0], places=2)
+        self.assertGreater(
+            Metrics().throttled_seconds.value((Direction.UPLOAD,)), throttled
+        )
+        stream.close()
+
+    def test_looser_cap_reserved_after_strictest_wait(self):
+        shaper = self.shaper(
+            BANDWIDTH_UPLOAD_MB_PER_SECOND="1",
+            BANDWIDTH_TENANT_MB_PER_SECOND="0.5",
+            BANDWIDTH_BURST_KB="0",
+        )
+        stream = shaper.open(Direction.UPLOAD, "key-1", None, "/api/upload")
+        other = shaper.open(Direction.UPLOAD, "key-2", None, "/api/upload")
+        waits, other_waits = [], []
+
+        async def sleep(seconds):
+            # another tenant sends while the first one waits for its own cap
+            if not waits:
+                other_waits.append(other.limiters[0].reserve(MB // 4, time.monotonic()))
+            waits.append(seconds)
+
+        with patch("src.core.admission.bandwidth_shaper.asyncio.sleep", new=sleep):
+            asyncio.run(stream.throttle(MB // 4))
+
+        self.assertAlmostEqual(0.5, waits[0], places=2)
+        self.assertAlmostEqual(0.25, other_waits[0], places=2)
+        self.assertAlmostEqual(0.5, sum(waits), places=2)
+        stream.close()
+        other.close()
+
+
+class TestBandwidthShapingMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        self.env = patch.dict(
+            os.environ,
+            {
+                "BANDWIDTH_DOWNLOAD_MB_PER_SECOND": "1",
+                "BANDWIDTH_UPLOAD_MB_PER_SECOND": "1",
+                "BANDWIDTH_BURST_KB": "64",
+            },
+        )
+        self.env.start()
+        reset_bandwidth_shaping()
+
+    def tearDown(self):
+        self.env.stop()
+        reset_bandwidth_shaping()
+
+    @staticmethod
+    def scope(method: str, path: str) -> dict:
+        return {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "headers": [],
+            "client": ("127.0.0.1", 1234),
+        }
+
+    def run_app(self, app, scope, request_chunks):
+        sent = []
+        pending = [
+            {"type": "http.request", "body": chunk, "more_body": True}
+            for chunk in request_chunks
+        ]
+
+        async def receive():
+            return pending.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        with patch(
+            "src.core.admission.bandwidth_shaper.asyncio.sleep", new=AsyncMock()
+        ) as mock_sleep:
+            asyncio.run(BandwidthShapingMiddleware(app)(scope, receive, send))
+        return sent, [call.args[0] for call in mock_sleep.await_args_list]
+
+    def test_download_body_paced(self):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            for _ in range(4):
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": b"a" * 64 * KB,
+                        "more_body": True,
+                    }
+                )
+            await send({"type": "http.response.body", "body": b""})
+
+        sent, waits = self.run_app(
+            app, self.scope("GET", "/api/download/bucket-name/a.txt"), []
+        )
+
+        self.assertEqual(6, len(sent))
+        self.assertEqual(3, len(waits))
+        self.assertAlmostEqual(0.0625, waits[0], places=2)
+        self.assertEqual(0, Metrics().shaped_streams.value((Direction.DOWNLOAD,)))
+
+    def test_upload_body_paced(self):
+        async def app(scope, receive, send):
+            for _ in range(3):
+                await receive()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        _, waits = self.run_app(
+            app,
+            self.scope("PUT", "/api/upload/stream/bucket-name/a.txt"),
+            [b"a" * 128 * KB] * 3,
+        )
+
+        # the sleeps are mocked, each chunk waits for the ones before it
+        for expected, wait in zip([0.0625, 0.1875, 0.3125], waits, strict=True):
+            self.assertAlmostEqual(expected, wait, delta=0.01)
+
+    def test_other_routes_not_paced(self):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"a" * MB})
+
+        _, waits = self.run_app(app, self.scope("GET", "/metrics"), [])
+
+        self.assertEqual([], waits)
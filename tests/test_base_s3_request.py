@@ -1,7 +1,14 @@
+import random
+import re
 import unittest
 
 from src.core.exceptions.exception import S3ProxyServiceException
-from src.models.base_s3_request import BaseRequest
+from src.models.base_s3_request import (
+    BaseRequest,
+    is_valid_bucket_name,
+    validate_bucket_name,
+)
+from src.models.download.download_request import DownloadRequest
 
 
 class TestBaseRequest(unittest.TestCase):
@@ -95,3 +102,49 @@ class TestBaseRequest(unittest.TestCase):
             BaseRequest(bucket_name="valid-bucket", object_name="object_name")
         except S3ProxyServiceException:
             self.fail("Unexpected validation exception raised.")
+
+    def test_bucket_name_checker_matches_minio_pattern(self):
+        minio_pattern = (
+            r"(?!(^((2(5[0-5]|[0-4][0-9])|[01]?[0-9]{1,2})\.){3}"
+            r"(2(5[0-5]|[0-4][0-9])|[01]?[0-9]{1,2})$|^xn--|.+-s3alias$))"
+            r"^[a-z0-9][a-z0-9.-]{1,61}[a-z0-9]$"
+        )
+        rng = random.Random(1)
+        names = [
+            "".join(rng.choice("ab19.-_A") for _ in range(rng.randint(0, 66)))
+            for _ in range(20000)
+        ]
+        names += [
+            ".".join(
+                str(rng.randint(0, 300)).zfill(rng.randint(1, 3)) for _ in range(4)
+            )
+            for _ in range(2000)
+        ]
+        names += ["xn--ab", "a-s3alias", "1.2.3", "1.2.3.4.5", "01.002.255.199"]
+
+        for name in names:
+            expected = bool(re.fullmatch(minio_pattern, name)) and not re.search(
+                r"[!_\-.*\'()/]{2,}", name
+            )
+            self.assertEqual(expected, is_valid_bucket_name(name), name)
+
+    def test_valid_bucket_names_cached(self):
+        validate_bucket_name.cache_clear()
+        validate_bucket_name("bucket-name")
+        validate_bucket_name("bucket-name")
+        with self.assertRaises(S3ProxyServiceException):
+            validate_bucket_name("Bucket")
+
+        cache_info = validate_bucket_name.cache_info()
+        self.assertEqual(1, cache_info.hits)
+        self.assertEqual(1, cache_info.currsize)
+
+    def test_download_request_validated_without_pydantic(self):
+        request = DownloadRequest(bucket_name=" bucket-name ", object_name="a/b.txt")
+
+        self.assertEqual("bucket-name", request.bucket_name)
+        self.assertEqual("a/b.txt", request.object_name)
+        with self.assertRaises(S3ProxyServiceException):
+            DownloadRequest(bucket_name="bucket-name", object_name="a b")
+        with self.assertRaises(S3ProxyServiceException):
+            DownloadRequest(bucket_name="bucket..name", object_name="a.txt")
@@ -0,0 +1,73 @@
+import unittest
+from datetime import datetime, timezone
+
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.models.download.byte_range import (
+    ByteRange,
+    if_range_matches,
+    parse_range_header,
+)
+from src.models.download.object_info import ObjectInfo
+
+
+class TestParseRangeHeader(unittest.TestCase):
+
+    def test_single_range(self):
+        self.assertEqual([ByteRange(0, 99)], parse_range_header("bytes=0-99", 1000))
+
+    def test_open_ended_range(self):
+        self.assertEqual([ByteRange(900, 999)], parse_range_header("bytes=900-", 1000))
+
+    def test_suffix_range(self):
+        self.assertEqual([ByteRange(800, 999)], parse_range_header("bytes=-200", 1000))
+
+    def test_suffix_range_longer_than_object(self):
+        self.assertEqual([ByteRange(0, 9)], parse_range_header("bytes=-200", 10))
+
+    def test_range_end_clamped_to_size(self):
+        self.assertEqual([ByteRange(5, 9)], parse_range_header("bytes=5-500", 10))
+
+    def test_several_ranges_sorted_and_coalesced(self):
+        self.assertEqual(
+            [ByteRange(0, 20), ByteRange(50, 59)],
+            parse_range_header("bytes=50-59, 0-10, 5-20", 100),
+        )
+
+    def test_invalid_header_ignored(self):
+        self.assertIsNone(parse_range_header("items=0-10", 100))
+        self.assertIsNone(parse_range_header("bytes=10-5", 100))
+        self.assertIsNone(parse_range_header("bytes=a-b", 100))
+        self.assertIsNone(parse_range_header("bytes=-", 100))
+
+    def test_unsatisfiable_range(self):
+        with self.assertRaises(S3ProxyServiceException) as context:
+            parse_range_header("bytes=100-200", 100)
+
+        self.assertEqual(416, context.exception.status_code)
+        self.assertEqual({"Content-Range": "bytes */100"}, context.exception.headers)
+
+
+class TestIfRangeMatches(unittest.TestCase):
+    OBJECT_INFO = ObjectInfo(
+        bucket_name="bucket-name",
+        object_name="object-name",
+        size=100,
+        etag="abc",
+        last_modified=datetime(2024, 9, 20, 16, 17, 53, tzinfo=timezone.utc),
+    )
+
+    def test_no_if_range(self):
+        self.assertTrue(if_range_matches(None, self.OBJECT_INFO))
+
+    def test_etag(self):
+        self.assertTrue(if_range_matches('"abc"', self.OBJECT_INFO))
+        self.assertFalse(if_range_matches('"other"', self.OBJECT_INFO))
+        self.assertFalse(if_range_matches('W/"abc"', self.OBJECT_INFO))
+
+    def test_last_modified(self):
+        self.assertTrue(
+            if_range_matches("Fri, 20 Sep 2024 16:17:53 GMT", self.OBJECT_INFO)
+        )
+        self.assertFalse(
+            if_range_matches("Fri, 20 Sep 2024 16:17:52 GMT", self.OBJECT_INFO)
+        )
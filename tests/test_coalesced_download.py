@@ -0,0 +1,154 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.core.common.s3_executor import S3Executor
+from src.core.common.singleton import Singleton
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.models.download.object_info import ObjectInfo
+from src.service.coalesced_download import DownloadCoalescer
+from src.service.object_stream import ObjectStream
+
+OBJECT_INFO = ObjectInfo(
+    bucket_name="bucket-name", object_name="object-name", size=6, etag="abc"
+)
+
+
+def object_stream(chunks) -> ObjectStream:
+    response = MagicMock()
+    response.headers = {"Content-Length": "6", "Content-Type": "text/plain"}
+    response.stream.return_value = iter(chunks)
+    return ObjectStream(response=response, chunk_size=2)
+
+
+async def collect(stream, delay: float = 0) -> bytes:
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+        await asyncio.sleep(delay)
+    return b"".join(chunks)
+
+
+class TestDownloadCoalescer(unittest.TestCase):
+
+    def setUp(self):
+        Singleton._instances.pop(DownloadCoalescer, None)
+        self.coalescer = DownloadCoalescer()
+        self.open_stream = MagicMock(
+            side_effect=lambda: object_stream([b"ab", b"cd", b"ef"])
+        )
+
+    def tearDown(self):
+        Singleton._instances.pop(DownloadCoalescer, None)
+
+    @staticmethod
+    async def gather(*reads):
+        return await asyncio.wait_for(asyncio.gather(*reads), timeout=10)
+
+    def test_concurrent_downloads_share_upstream(self):
+        first = self.coalescer.stream(OBJECT_INFO, self.open_stream)
+        second = self.coalescer.stream(OBJECT_INFO, self.open_stream)
+
+        self.assertEqual(6, second.content_length)
+        self.assertEqual(
+            [b"abcdef", b"abcdef"],
+            asyncio.run(self.gather(collect(first), collect(second))),
+        )
+        self.assertEqual(1, self.open_stream.call_count)
+        stats = self.coalescer.stats()
+        self.assertEqual(1, stats["coalesced"])
+        self.assertEqual(
+            {"downloads": 1, "coalesced": 1},
+            stats["objects"]["bucket-name/object-name"],
+        )
+        self.assertEqual(0, stats["in_flight"])
+
+    def test_subscribers_read_in_parallel_with_bounded_window(self):
+        self.coalescer.max_buffered_chunks = 1
+        streams = [
+            self.coalescer.stream(OBJECT_INFO, self.open_stream) for _ in range(4)
+        ]
+
+        results = asyncio.run(self.gather(*(collect(stream) for stream in streams)))
+
+        self.assertEqual([b"abcdef"] * 4, results)
+        self.assertEqual(1, self.open_stream.call_count)
+
+    @patch.dict(os.environ, {"S3_EXECUTOR_MAX_WORKERS": "2"})
+    def test_more_subscribers_than_executor_threads(self):
+        Singleton._instances.pop(S3Executor, None)
+        self.coalescer.max_buffered_chunks = 2
+        chunks = [bytes([index]) * 2 for index in range(20)]
+        streams = [
+            self.coalescer.stream(OBJECT_INFO, lambda: object_stream(chunks))
+            for _ in range(8)
+        ]
+
+        # the fast subscribers wait on the window while the slow one reads
+        results = asyncio.run(
+            self.gather(
+                collect(streams[0], delay=0.01),
+                *(collect(stream) for stream in streams[1:]),
+            )
+        )
+
+        self.assertEqual([b"".join(chunks)] * 8, results)
+        S3Executor().shutdown()
+        Singleton._instances.pop(S3Executor, None)
+
+    def test_started_download_not_joined(self):
+        async def read_after_start():
+            first = aiter(self.coalescer.stream(OBJECT_INFO, self.open_stream))
+            await anext(first)
+            await anext(first)
+            second = self.coalescer.stream(OBJECT_INFO, self.open_stream)
+            result = await collect(second)
+            await first.aclose()
+            return result
+
+        self.assertEqual(b"abcdef", asyncio.run(read_after_start()))
+        self.assertEqual(2, self.open_stream.call_count)
+
+    def test_other_version_not_coalesced(self):
+        self.coalescer.stream(OBJECT_INFO, self.open_stream)
+        other_version = ObjectInfo("bucket-name", "object-name", 6, etag="def")
+
+        self.coalescer.stream(other_version, self.open_stream)
+
+        self.assertEqual(2, self.open_stream.call_count)
+
+    def test_upstream_closed_when_last_subscriber_leaves(self):
+        upstream = object_stream([b"ab", b"cd", b"ef"])
+        upstream.response.close = MagicMock()
+        first = self.coalescer.stream(OBJECT_INFO, lambda: upstream)
+        second = self.coalescer.stream(OBJECT_INFO, lambda: upstream)
+
+        first.close()
+        upstream.response.close.assert_not_called()
+        second.close()
+
+        upstream.response.close.assert_called_once()
+        self.assertEqual(0, self.coalescer.stats()["in_flight"])
+
+    def test_upstream_error_raised_to_all_subscribers(self):
+        response = MagicMock()
+        response.stream.side_effect = S3ProxyServiceException("errors.test")
+        first = self.coalescer.stream(
+            OBJECT_INFO, lambda: ObjectStream(response=response, chunk_size=2)
+        )
+        second = self.coalescer.stream(OBJECT_INFO, self.open_stream)
+
+        with self.assertRaises(S3ProxyServiceException):
+            asyncio.run(collect(first))
+        with self.assertRaises(S3ProxyServiceException):
+            asyncio.run(collect(second))
+
+    def test_disabled(self):
+        self.coalescer.enabled = False
+
+        first = self.coalescer.stream(OBJECT_INFO, self.open_stream)
+        self.coalescer.stream(OBJECT_INFO, self.open_stream)
+
+        self.assertIsInstance(first, ObjectStream)
+        self.assertEqual(2, self.open_stream.call_count)
@@ -0,0 +1,283 @@
+import gzip
+import io
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.core.common.singleton import Singleton
+from src.core.config.compression_policy import (
+    CompressionPolicy,
+    parse_accept_encoding,
+)
+from src.core.metrics.metrics import Metrics
+from src.models.download.object_info import ObjectInfo
+from src.service.compression import (
+    CompressingReader,
+    Operation,
+    TranscodedStream,
+    compressor,
+    decompressor,
+    transcode,
+)
+from src.service.object_stream import ObjectStream
+
+client = TestClient(app, raise_server_exceptions=False)
+
+DATA: bytes = b'{"message": "hello"}\n' * 200
+
+
+def object_stream(data: bytes, content_type: str) -> ObjectStream:
+    response = MagicMock()
+    response.headers = {
+        "Content-Length": str(len(data)),
+        "Content-Type": content_type,
+        "ETag": '"abc"',
+    }
+    response.stream.return_value = iter([data[:1000], data[1000:]])
+    return ObjectStream(response=response, chunk_size=1024)
+
+
+class TestCompressionPolicy(unittest.TestCase):
+
+    def tearDown(self):
+        Singleton._instances.pop(CompressionPolicy, None)
+
+    def policy(self, **env) -> CompressionPolicy:
+        Singleton._instances.pop(CompressionPolicy, None)
+        with patch.dict(os.environ, env):
+            return CompressionPolicy()
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(
+            {"gzip": 0.8, "br": 1.0, "zstd": 0.0, "*": 0.1},
+            parse_accept_encoding("gzip;q=0.8, BR ,zstd;q=x, *;q=0.1"),
+        )
+
+    def test_negotiate(self):
+        policy = self.policy(COMPRESSION_ENABLED="true")
+
+        self.assertEqual("zstd", policy.negotiate("gzip, br, zstd"))
+        self.assertEqual("br", policy.negotiate("gzip;q=0.5, br"))
+        self.assertEqual("gzip", policy.negotiate("gzip, zstd;q=0"))
+        self.assertEqual("zstd", policy.negotiate("*"))
+        self.assertIsNone(policy.negotiate("identity"))
+        self.assertIsNone(policy.negotiate(None))
+        self.assertIsNone(self.policy().negotiate("gzip"))
+
+    def test_compressible_content_types_and_sizes(self):
+        policy = self.policy(COMPRESSION_CONTENT_TYPES="text/*,application/json")
+
+        self.assertTrue(policy.is_compressible("text/csv; charset=utf-8", 2048))
+        self.assertTrue(policy.is_compressible("application/json", -1))
+        self.assertFalse(policy.is_compressible("application/json", 1023))
+        self.assertFalse(policy.is_compressible("image/png", 2048))
+        self.assertFalse(policy.is_compressible(None, 2048))
+
+    def test_at_rest_encoding(self):
+        policy = self.policy(COMPRESSION_BUCKET_AT_REST='{"logs": "zstd"}')
+
+        self.assertEqual("zstd", policy.at_rest_encoding("logs", "text/plain", -1))
+        self.assertIsNone(policy.at_rest_encoding("logs", "video/mp4", -1))
+        self.assertIsNone(policy.at_rest_encoding("videos", "text/plain", -1))
+
+    def test_unknown_encoding_rejected(self):
+        with self.assertRaises(ValueError):
+            self.policy(COMPRESSION_ENCODINGS="gzip,lzma")
+
+
+class TestCodecs(unittest.TestCase):
+
+    def test_round_trip(self):
+        for encoding in (
+            CompressionPolicy.GZIP,
+            CompressionPolicy.BROTLI,
+            CompressionPolicy.ZSTD,
+        ):
+            with self.subTest(encoding=encoding):
+                codec = compressor(encoding, Operation.COMPRESS_DOWNLOAD)
+                compressed = codec.process(DATA[:100]) + transcode(DATA[100:], codec)
+
+                self.assertEqual(len(DATA), codec.bytes_in)
+                self.assertEqual(len(compressed), codec.bytes_out)
+                self.assertLess(len(compressed), len(DATA))
+                self.assertEqual(
+                    DATA,
+                    transcode(
+                        compressed,
+                        decompressor(encoding, Operation.DECOMPRESS_DOWNLOAD),
+                    ),
+                )
+
+    def test_codec_reported_once(self):
+        metrics = Metrics()
+        labels = (Operation.COMPRESS_UPLOAD, "gzip", "in")
+        before = metrics.compression_bytes.value(labels)
+        codec = compressor("gzip", Operation.COMPRESS_UPLOAD)
+
+        transcode(DATA, codec)
+        codec.report()
+
+        self.assertEqual(before + len(DATA), metrics.compression_bytes.value(labels))
+
+    def test_compressing_reader(self):
+        reader = CompressingReader(
+            io.BytesIO(DATA), compressor("gzip", Operation.COMPRESS_UPLOAD), 100
+        )
+        compressed = b""
+        while True:
+            chunk = reader.read(7)
+            if not chunk:
+                break
+            self.assertLessEqual(len(chunk), 7)
+            compressed += chunk
+
+        self.assertEqual(DATA, gzip.decompress(compressed))
+
+    def test_transcoded_stream(self):
+        stream = TranscodedStream(
+            object_stream(DATA, "application/json"),
+            compressor("gzip", Operation.COMPRESS_DOWNLOAD),
+        )
+
+        self.assertIsNone(stream.content_length)
+        self.assertEqual('W/"abc"', stream.validators["ETag"])
+        self.assertEqual(DATA, gzip.decompress(b"".join(stream)))
+
+
+@patch("src.api.routers.s3_api.S3Service")
+class TestDownloadCompression(unittest.TestCase):
+    OBJECT_INFO = ObjectInfo(
+        bucket_name="bucket-name",
+        object_name="object-name",
+        size=len(DATA),
+        etag="abc",
+        content_type="application/json",
+    )
+
+    def setUp(self):
+        self.env = patch.dict(os.environ, {"COMPRESSION_ENABLED": "true"})
+        self.env.start()
+        Singleton._instances.pop(CompressionPolicy, None)
+
+    def tearDown(self):
+        self.env.stop()
+        Singleton._instances.pop(CompressionPolicy, None)
+
+    def mock_download(self, mock_s3_service, object_info: ObjectInfo, data: bytes):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = object_info
+        mock_s3_service.cached_file.return_value = None
+        mock_s3_service.stream_file.return_value = object_stream(
+            data, object_info.content_type
+        )
+        return mock_s3_service
+
+    def test_download_compressed(self, mock_s3_service):
+        self.mock_download(mock_s3_service, self.OBJECT_INFO, DATA)
+
+        with client.stream(
+            "GET",
+            "/api/download/bucket-name/object-name",
+            headers={"Accept-Encoding": "gzip"},
+        ) as response:
+            body = b"".join(response.iter_raw())
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("gzip", response.headers["Content-Encoding"])
+        self.assertEqual("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual('W/"abc"', response.headers["ETag"])
+        self.assertNotIn("Content-Length", response.headers)
+        self.assertEqual(DATA, gzip.decompress(body))
+
+    def test_range_and_incompressible_downloads_not_compressed(self, mock_s3_service):
+        for headers, object_info in (
+            ({"Range": "bytes=0-9"}, self.OBJECT_INFO),
+            ({}, ObjectInfo("bucket-name", "object-name", 100, "abc", "text/plain")),
+            ({}, ObjectInfo("bucket-name", "object-name", 9000, "abc", "image/png")),
+        ):
+            with self.subTest(headers=headers, content_type=object_info.content_type):
+                self.mock_download(mock_s3_service, object_info, DATA[:10])
+
+                response = client.get(
+                    "/api/download/bucket-name/object-name",
+                    headers={"Accept-Encoding": "gzip", **headers},
+                )
+
+                self.assertNotIn("Content-Encoding", response.headers)
+                self.assertEqual('"abc"', response.headers["ETag"])
+
+    def test_stored_compressed_sent_as_stored(self, mock_s3_service):
+        object_info = ObjectInfo(
+            "bucket-name", "object-name", 20, "abc", "text/plain", None, "zstd"
+        )
+        mock_s3_service = self.mock_download(mock_s3_service, object_info, b"x" * 20)
+
+        with client.stream(
+            "GET",
+            "/api/download/bucket-name/object-name",
+            headers={"Accept-Encoding": "zstd", "Range": "bytes=0-9"},
+        ) as response:
+            body = b"".join(response.iter_raw())
+
+        self.assertEqual(206, response.status_code)
+        self.assertEqual("zstd", response.headers["Content-Encoding"])
+        self.assertEqual('"abc"', response.headers["ETag"])
+        self.assertEqual(b"x" * 20, body)
+        byte_range = mock_s3_service.stream_file.call_args.kwargs["byte_range"]
+        self.assertEqual((0, 10), (byte_range.start, byte_range.length))
+
+    def test_stored_unknown_encoding_sent_as_stored(self, mock_s3_service):
+        for encoding in ("identity", "deflate"):
+            with self.subTest(encoding=encoding):
+                object_info = ObjectInfo(
+                    "bucket-name",
+                    "object-name",
+                    20,
+                    "abc",
+                    "text/plain",
+                    None,
+                    encoding,
+                )
+                mock_service = self.mock_download(
+                    mock_s3_service, object_info, b"x" * 20
+                )
+
+                with client.stream(
+                    "GET",
+                    "/api/download/bucket-name/object-name",
+                    headers={"Accept-Encoding": "gzip", "Range": "bytes=0-9"},
+                ) as response:
+                    body = b"".join(response.iter_raw())
+
+                self.assertEqual(206, response.status_code)
+                self.assertEqual(encoding, response.headers["Content-Encoding"])
+                self.assertEqual('"abc"', response.headers["ETag"])
+                self.assertEqual(b"x" * 20, body)
+                byte_range = mock_service.stream_file.call_args.kwargs["byte_range"]
+                self.assertEqual((0, 10), (byte_range.start, byte_range.length))
+
+    def test_stored_compressed_decompressed(self, mock_s3_service):
+        compressed = gzip.compress(DATA)
+        object_info = ObjectInfo(
+            "bucket-name",
+            "object-name",
+            len(compressed),
+            "abc",
+            "application/json",
+            None,
+            "gzip",
+        )
+        self.mock_download(mock_s3_service, object_info, compressed)
+
+        response = client.get(
+            "/api/download/bucket-name/object-name",
+            headers={"Accept-Encoding": "identity", "Range": "bytes=0-9"},
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual("none", response.headers["Accept-Ranges"])
+        self.assertEqual(DATA, response.content)
@@ -0,0 +1,49 @@
+import unittest
+from datetime import datetime, timezone
+
+from src.models.download.conditional_request import is_not_modified
+from src.models.download.object_info import ObjectInfo
+
+
+class TestIsNotModified(unittest.TestCase):
+    OBJECT_INFO = ObjectInfo(
+        bucket_name="bucket-name",
+        object_name="object-name",
+        size=10,
+        etag="abc",
+        last_modified=datetime(2024, 9, 20, 16, 17, 53, 500000, tzinfo=timezone.utc),
+    )
+
+    def test_no_preconditions(self):
+        self.assertFalse(is_not_modified(self.OBJECT_INFO))
+
+    def test_if_none_match(self):
+        self.assertTrue(is_not_modified(self.OBJECT_INFO, if_none_match='"abc"'))
+        self.assertTrue(is_not_modified(self.OBJECT_INFO, if_none_match="*"))
+        self.assertFalse(is_not_modified(self.OBJECT_INFO, if_none_match='"xyz"'))
+
+    def test_if_none_match_takes_precedence(self):
+        self.assertFalse(
+            is_not_modified(
+                self.OBJECT_INFO,
+                if_none_match='"xyz"',
+                if_modified_since="Fri, 20 Sep 2024 16:17:53 GMT",
+            )
+        )
+
+    def test_if_modified_since(self):
+        self.assertTrue(
+            is_not_modified(
+                self.OBJECT_INFO, if_modified_since="Fri, 20 Sep 2024 16:17:53 GMT"
+            )
+        )
+        self.assertFalse(
+            is_not_modified(
+                self.OBJECT_INFO, if_modified_since="Fri, 20 Sep 2024 16:17:52 GMT"
+            )
+        )
+
+    def test_invalid_if_modified_since_ignored(self):
+        self.assertFalse(
+            is_not_modified(self.OBJECT_INFO, if_modified_since="yesterday")
+        )
@@ -0,0 +1,186 @@
+import asyncio
+import io
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+from minio import S3Error
+
+from main import app
+from src.core.cache.metadata_cache import MetadataCache
+from src.core.common.singleton import Singleton
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.exceptions.exception_handler import ExceptionHandler
+from src.core.metrics.metrics import Metrics, Stage
+from src.core.metrics.registry import Counter, Histogram
+from src.models.download.download_request import DownloadRequest
+from src.models.upload.upload_result import UploadResult
+from src.service.s3_service import S3Service
+
+client = TestClient(app, raise_server_exceptions=False)
+
+STREAM_UPLOAD_ROUTE = "/api/upload/stream/{bucket_name}/{object_name}"
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_counter_rendered(self):
+        counter = Counter("requests_total", "Requests.", ("route", "status"))
+        counter.inc(("/a", "200"))
+        counter.inc(("/a", "200"), 2)
+        counter.inc(('/"b"\n', "500"))
+
+        self.assertEqual(
+            [
+                "# HELP requests_total Requests.",
+                "# TYPE requests_total counter",
+                'requests_total{route="/\\"b\\"\\n",status="500"} 1',
+                'requests_total{route="/a",status="200"} 3',
+            ],
+            counter.render(),
+        )
+
+    def test_histogram_buckets_cumulative(self):
+        histogram = Histogram("duration_seconds", "Duration.", ("stage",), (0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(("put",), value)
+
+        self.assertEqual(
+            [
+                'duration_seconds_bucket{stage="put",le="0.1"} 2',
+                'duration_seconds_bucket{stage="put",le="1"} 3',
+                'duration_seconds_bucket{stage="put",le="+Inf"} 4',
+                'duration_seconds_sum{stage="put"} 3.65',
+                'duration_seconds_count{stage="put"} 4',
+            ],
+            histogram.render()[2:],
+        )
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        Singleton._instances.pop(Metrics, None)
+
+    def tearDown(self):
+        Singleton._instances.pop(Metrics, None)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_requests_counted_by_route_and_bucket(self, mock_s3_service):
+        mock_s3_service.return_value.upload_stream.side_effect = (
+            lambda bucket_name, object_name, data, content_type: data.read()
+            and UploadResult(bucket_name, object_name)
+        )
+
+        client.post(
+            "/api/upload/stream/bucket-name/a.txt",
+            content=b"Hola!",
+            headers={"Content-Type": "text/plain"},
+        )
+        client.post("/api/upload/stream/bucket_name/a.txt", content=b"Hola!")
+        response = client.get("/metrics")
+
+        metrics = Metrics()
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+        self.assertEqual(
+            1, metrics.requests.value(("POST", STREAM_UPLOAD_ROUTE, "200"))
+        )
+        self.assertEqual(
+            1, metrics.requests.value(("POST", STREAM_UPLOAD_ROUTE, "400"))
+        )
+        self.assertEqual(
+            5, metrics.request_bytes.value((STREAM_UPLOAD_ROUTE, "bucket-name"))
+        )
+        self.assertEqual(0, metrics.request_bytes.value((STREAM_UPLOAD_ROUTE, "")))
+        self.assertGreater(
+            metrics.response_bytes.value((STREAM_UPLOAD_ROUTE, "bucket-name")), 0
+        )
+        self.assertEqual(0, metrics.requests_in_flight.value((STREAM_UPLOAD_ROUTE,)))
+        self.assertEqual(2, metrics.request_duration.count((STREAM_UPLOAD_ROUTE,)))
+        self.assertEqual(1, metrics.stage_duration.count((Stage.BODY_RECEIVE,)))
+        self.assertGreaterEqual(metrics.stage_duration.count((Stage.VALIDATION,)), 2)
+        self.assertIn(
+            's3_proxy_requests_total{method="POST",'
+            'route="/api/upload/stream/{bucket_name}/{object_name}",status="200"} 1',
+            response.text,
+        )
+
+    def test_unknown_route(self):
+        client.get("/not/a/route")
+
+        self.assertEqual(1, Metrics().requests.value(("GET", "unmatched", "404")))
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_minio_errors_counted(self, mock_s3_service):
+        mock_s3_service.return_value.stat_file.side_effect = S3Error(
+            "NoSuchKey", "missing", "resource", "", "", MagicMock()
+        )
+
+        response = client.get("/api/download/bucket-name/a.txt")
+
+        self.assertEqual(404, response.status_code)
+        self.assertEqual(1, Metrics().minio_errors.value(("NoSuchKey",)))
+        self.assertEqual(
+            1,
+            Metrics().requests.value(
+                ("GET", "/api/download/{bucket_name}/{object_name}", "404")
+            ),
+        )
+
+    def test_connection_errors_counted(self):
+        asyncio.run(
+            ExceptionHandler.handle(
+                None, S3ProxyServiceException("errors.minio.connection_error")
+            )
+        )
+
+        self.assertEqual(1, Metrics().minio_errors.value(("ConnectionError",)))
+
+    def test_validation_timed(self):
+        DownloadRequest(bucket_name="bucket-name", object_name="a.txt")
+
+        self.assertEqual(1, Metrics().stage_duration.count((Stage.VALIDATION,)))
+
+    def test_minio_calls_timed(self):
+        MetadataCache().clear()
+        mock_minio_client = MagicMock()
+        mock_minio_client.bucket_exists.return_value = True
+        mock_minio_client.get_object.return_value.stream.return_value = [b"Hola!"]
+        s3_service = S3Service(client=mock_minio_client)
+
+        s3_service.upload_stream("bucket-name", "a.txt", io.BytesIO(b"Hola!"), None)
+        stream = s3_service.stream_file("bucket-name", "a.txt")
+        b"".join(stream)
+
+        metrics = Metrics()
+        for stage in (
+            Stage.BUCKET_EXISTS,
+            Stage.PUT_OBJECT,
+            Stage.GET_OBJECT_FIRST_BYTE,
+            Stage.GET_OBJECT,
+        ):
+            self.assertEqual(1, metrics.stage_duration.count((stage,)), stage)
+
+    def test_stages_not_timed_when_disabled(self):
+        MetadataCache().clear()
+        with patch.dict(os.environ, {"METRICS_ENABLED": "false"}):
+            metrics = Metrics()
+        mock_minio_client = MagicMock()
+        mock_minio_client.bucket_exists.return_value = True
+        mock_minio_client.get_object.return_value.stream.return_value = [b"Hola!"]
+        s3_service = S3Service(client=mock_minio_client)
+
+        DownloadRequest(bucket_name="bucket-name", object_name="a.txt")
+        s3_service.upload_stream("bucket-name", "a.txt", io.BytesIO(b"Hola!"), None)
+        b"".join(s3_service.stream_file("bucket-name", "a.txt"))
+
+        for stage in (
+            Stage.VALIDATION,
+            Stage.BUCKET_EXISTS,
+            Stage.PUT_OBJECT,
+            Stage.GET_OBJECT_FIRST_BYTE,
+            Stage.GET_OBJECT,
+        ):
+            self.assertEqual(0, metrics.stage_duration.count((stage,)), stage)
@@ -0,0 +1,154 @@
+import io
+import os
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from minio.error import ServerError
+
+from src.service.multipart_uploader import MB, MultipartUploader
+
+
+class TestMultipartUploader(unittest.TestCase):
+
+    def setUp(self):
+        self.env = patch.dict(
+            os.environ,
+            {
+                "UPLOAD_MULTIPART_THRESHOLD_MB": "5",
+                "UPLOAD_MIN_PART_SIZE_MB": "5",
+                "UPLOAD_PART_CONCURRENCY": "2",
+                "UPLOAD_PART_RETRIES": "2",
+                "UPLOAD_PART_RETRY_BACKOFF_SECONDS": "0",
+            },
+        )
+        self.env.start()
+        self.client = MagicMock()
+        self.client._create_multipart_upload.return_value = "upload-id"
+        self.client._upload_part.side_effect = (
+            lambda bucket, name, data, headers, upload_id, number: f"etag-{number}"
+        )
+        self.uploader = MultipartUploader(self.client)
+
+    def tearDown(self):
+        self.env.stop()
+
+    def test_small_object_uploaded_with_single_put(self):
+        data = io.BytesIO(b"Hola!")
+
+        self.uploader.upload("bucket-name", "object-name", data, "text/plain", 5)
+
+        self.client.put_object.assert_called_once_with(
+            bucket_name="bucket-name",
+            data=data,
+            object_name="object-name",
+            content_type="text/plain",
+            part_size=5 * MB,
+            length=5,
+            metadata=None,
+        )
+        self.client._create_multipart_upload.assert_not_called()
+
+    def test_small_object_of_unknown_length_uploaded_with_single_put(self):
+        self.uploader.upload("bucket-name", "object-name", io.BytesIO(b"Hola!"), None)
+
+        put_kwargs = self.client.put_object.call_args.kwargs
+        self.assertEqual(b"Hola!", put_kwargs["data"].read())
+        self.assertEqual(5, put_kwargs["length"])
+        self.assertEqual("application/octet-stream", put_kwargs["content_type"])
+
+    def test_large_object_uploaded_in_parts(self):
+        data = b"x" * (12 * MB)
+
+        self.uploader.upload(
+            "bucket-name", "object-name", io.BytesIO(data), "text/plain", len(data)
+        )
+
+        sizes = [len(c.args[2]) for c in self.client._upload_part.call_args_list]
+        self.assertEqual([5 * MB, 5 * MB, 2 * MB], sorted(sizes, reverse=True))
+        bucket, name, upload_id, parts = (
+            self.client._complete_multipart_upload.call_args.args
+        )
+        self.assertEqual(
+            ("bucket-name", "object-name", "upload-id"), (bucket, name, upload_id)
+        )
+        self.assertEqual(
+            [(1, "etag-1"), (2, "etag-2"), (3, "etag-3")],
+            [(part.part_number, part.etag) for part in parts],
+        )
+
+    def test_unknown_length_uploaded_in_parts(self):
+        data = b"x" * (11 * MB)
+
+        self.uploader.upload("bucket-name", "object-name", io.BytesIO(data), None)
+
+        self.assertEqual(3, self.client._upload_part.call_count)
+        parts = self.client._complete_multipart_upload.call_args.args[3]
+        self.assertEqual([1, 2, 3], [part.part_number for part in parts])
+
+    def test_parts_uploaded_concurrently_up_to_limit(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def upload_part(bucket, name, data, headers, upload_id, number):
+            with lock:
+                running.append(number)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(number)
+            return f"etag-{number}"
+
+        self.client._upload_part.side_effect = upload_part
+        data = b"x" * (30 * MB)
+
+        self.uploader.upload("bucket-name", "object-name", io.BytesIO(data), None)
+
+        self.assertEqual(2, max(peak))
+        self.assertEqual(6, self.client._upload_part.call_count)
+
+    def test_failed_part_retried(self):
+        attempts = []
+
+        def upload_part(bucket, name, data, headers, upload_id, number):
+            attempts.append(number)
+            if number == 2 and attempts.count(2) == 1:
+                raise ServerError("Service Unavailable", 503)
+            return f"etag-{number}"
+
+        self.client._upload_part.side_effect = upload_part
+        data = b"x" * (12 * MB)
+
+        self.uploader.upload("bucket-name", "object-name", io.BytesIO(data), None)
+
+        self.assertEqual(2, attempts.count(2))
+        self.assertEqual(1, attempts.count(1))
+        self.client._complete_multipart_upload.assert_called_once()
+
+    def test_upload_aborted_when_part_keeps_failing(self):
+        self.client._upload_part.side_effect = ServerError("Service Unavailable", 503)
+        data = b"x" * (12 * MB)
+
+        with self.assertRaises(ServerError):
+            self.uploader.upload("bucket-name", "object-name", io.BytesIO(data), None)
+
+        self.client._abort_multipart_upload.assert_called_once_with(
+            "bucket-name", "object-name", "upload-id"
+        )
+        self.client._complete_multipart_upload.assert_not_called()
+
+    def test_short_data_aborted(self):
+        with self.assertRaises(IOError):
+            self.uploader.upload(
+                "bucket-name", "object-name", io.BytesIO(b"x" * (6 * MB)), None, 8 * MB
+            )
+
+        self.client._abort_multipart_upload.assert_called_once()
+
+    def test_part_size_grows_with_object(self):
+        self.assertEqual(5 * MB, self.uploader.part_size(100 * MB))
+        self.assertEqual(5 * MB, self.uploader.part_size(-1))
+        self.assertEqual(10 * MB, self.uploader.part_size(10000 * 10 * MB))
+        self.assertEqual(11 * MB, self.uploader.part_size(10000 * 10 * MB + 1))
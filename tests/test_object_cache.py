@@ -0,0 +1,186 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.core.cache.object_cache import ObjectCache
+from src.core.common.singleton import Singleton
+from src.models.download.object_info import ObjectInfo
+from src.service.object_stream import ObjectStream
+
+
+def object_info(size: int, etag: str = "abc", object_name: str = "object-name"):
+    return ObjectInfo(
+        bucket_name="bucket-name", object_name=object_name, size=size, etag=etag
+    )
+
+
+def fill(cache: ObjectCache, info: ObjectInfo, data: bytes):
+    writer = cache.writer(info)
+    writer.write(data)
+    writer.commit(info.http_etag)
+
+
+class TestObjectCache(unittest.TestCase):
+
+    def setUp(self):
+        self.disk_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(
+            os.environ,
+            {
+                "OBJECT_CACHE_ENABLED": "true",
+                "OBJECT_CACHE_MIN_HITS": "1",
+                "OBJECT_CACHE_MEMORY_MAX_MB": "1",
+                "OBJECT_CACHE_MEMORY_MAX_OBJECT_KB": "1",
+                "OBJECT_CACHE_DISK_MAX_MB": "1",
+                "OBJECT_CACHE_DISK_MAX_OBJECT_MB": "1",
+                "OBJECT_CACHE_DISK_DIR": self.disk_dir.name,
+            },
+        )
+        self.env.start()
+        Singleton._instances.pop(ObjectCache, None)
+        self.cache = ObjectCache()
+
+    def tearDown(self):
+        self.cache.close()
+        Singleton._instances.pop(ObjectCache, None)
+        self.env.stop()
+        self.disk_dir.cleanup()
+
+    def test_small_object_cached_in_memory(self):
+        info = object_info(size=3)
+        fill(self.cache, info, b"abc")
+
+        cached_object = self.cache.get(info)
+
+        self.assertEqual(b"abc", cached_object.data)
+        self.assertEqual(1, self.cache.counters["memory_hits"])
+
+    def test_large_object_cached_on_disk(self):
+        data = b"x" * 2048
+        info = object_info(size=len(data))
+        fill(self.cache, info, data)
+
+        cached_object = self.cache.get(info)
+
+        self.assertIsNone(cached_object.data)
+        self.assertEqual(data, cached_object.read())
+        self.assertEqual(1, self.cache.counters["disk_hits"])
+
+    def test_disk_hit_readable_after_eviction(self):
+        data = b"x" * 2048
+        info = object_info(size=len(data))
+        fill(self.cache, info, data)
+        cached_object = self.cache.get(info)
+
+        self.cache.invalidate("bucket-name", "object-name")
+
+        self.assertFalse(os.path.exists(cached_object.path))
+        self.assertEqual(data, cached_object.read())
+
+    def test_disk_dir_per_process(self):
+        data = b"x" * 2048
+        info = object_info(size=len(data))
+        fill(self.cache, info, data)
+        Singleton._instances.pop(ObjectCache, None)
+        other_cache = ObjectCache()
+
+        self.assertNotEqual(self.cache.disk_dir, other_cache.disk_dir)
+        self.assertEqual(self.disk_dir.name, os.path.dirname(other_cache.disk_dir))
+        self.assertEqual(data, self.cache.get(info).read())
+        other_cache.close()
+        self.assertFalse(os.path.exists(other_cache.disk_dir))
+
+    def test_object_too_large_rejected(self):
+        self.assertIsNone(self.cache.writer(object_info(size=2 * 1024 * 1024)))
+        self.assertEqual(1, self.cache.counters["rejections"])
+
+    def test_admitted_after_min_hits(self):
+        self.cache.min_hits = 2
+        info = object_info(size=3)
+
+        self.assertIsNone(self.cache.writer(info))
+        self.assertIsNotNone(self.cache.writer(info))
+
+    def test_incomplete_object_not_cached(self):
+        info = object_info(size=10)
+        fill(self.cache, info, b"abc")
+
+        self.assertIsNone(self.cache.get(info))
+
+    def test_changed_object_missed(self):
+        fill(self.cache, object_info(size=3), b"abc")
+
+        self.assertIsNone(self.cache.get(object_info(size=3, etag="def")))
+
+    def test_least_recently_used_evicted(self):
+        self.cache.memory_max_bytes = 6
+        first, second = object_info(3, object_name="first"), object_info(
+            3, object_name="second"
+        )
+        fill(self.cache, first, b"abc")
+        fill(self.cache, second, b"def")
+        self.cache.get(first)
+        fill(self.cache, object_info(3, object_name="third"), b"ghi")
+
+        self.assertIsNotNone(self.cache.get(first))
+        self.assertIsNone(self.cache.get(second))
+        self.assertEqual(1, self.cache.counters["memory_evictions"])
+
+    def test_invalidate_removes_all_tiers(self):
+        data = b"x" * 2048
+        info = object_info(size=len(data))
+        fill(self.cache, info, data)
+        cached_object = self.cache.get(info)
+        cached_object.close()
+        path = cached_object.path
+
+        self.cache.invalidate("bucket-name", "object-name")
+
+        self.assertIsNone(self.cache.get(info))
+        self.assertFalse(os.path.exists(path))
+
+    def test_object_stream_fills_cache(self):
+        info = object_info(size=6)
+        response = MagicMock()
+        response.headers = {"ETag": '"abc"'}
+        response.stream.return_value = iter([b"abc", b"def"])
+        stream = ObjectStream(
+            response=response, chunk_size=3, cache_writer=self.cache.writer(info)
+        )
+
+        self.assertEqual([b"abc", b"def"], list(stream))
+        self.assertEqual(b"abcdef", self.cache.get(info).data)
+
+    def test_other_version_not_cached(self):
+        # stale metadata: the object was overwritten with one of the same size
+        info = object_info(size=6)
+        response = MagicMock()
+        response.headers = {"ETag": '"def"'}
+        response.stream.return_value = iter([b"abc", b"def"])
+        stream = ObjectStream(
+            response=response, chunk_size=3, cache_writer=self.cache.writer(info)
+        )
+
+        self.assertEqual([b"abc", b"def"], list(stream))
+        self.assertIsNone(self.cache.get(info))
+
+    def test_closed_object_stream_not_cached(self):
+        info = object_info(size=6)
+        response = MagicMock()
+        response.stream.return_value = iter([b"abc", b"def"])
+        stream = ObjectStream(
+            response=response, chunk_size=3, cache_writer=self.cache.writer(info)
+        )
+
+        next(iter(stream))
+        stream.close()
+
+        self.assertIsNone(self.cache.get(info))
+
+    def test_disabled_cache(self):
+        self.cache.enabled = False
+        info = object_info(size=3)
+
+        self.assertIsNone(self.cache.writer(info))
+        self.assertIsNone(self.cache.get(info))
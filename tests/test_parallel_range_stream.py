@@ -0,0 +1,114 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.models.download.object_info import ObjectInfo
+from src.service.parallel_range_stream import ParallelRangeStream
+
+DATA = bytes(range(256)) * 4
+
+
+class FakeRangeClient:
+    """
+    Minio client serving ranges of DATA, optionally holding requests until released
+    """
+
+    def __init__(self, hold: bool = False):
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.released = threading.Event()
+        if not hold:
+            self.released.set()
+        self._lock = threading.Lock()
+
+    def get_object(self, bucket_name, object_name, offset, length, request_headers):
+        with self._lock:
+            self.requests.append((offset, length, request_headers))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.released.wait(5)
+        with self._lock:
+            self.in_flight -= 1
+        data = DATA[offset : offset + length]
+        response = MagicMock()
+        response.stream.side_effect = lambda size: (
+            data[start : start + size] for start in range(0, len(data), size)
+        )
+        return response
+
+
+class TestParallelRangeStream(unittest.TestCase):
+
+    object_info = ObjectInfo("bucket-name", "object-name", len(DATA), "etag", "a/b")
+
+    def test_ranges_reassembled_in_order(self):
+        client = FakeRangeClient()
+        stream = ParallelRangeStream(
+            client, self.object_info, range_size=100, max_ranges=3, chunk_size=32
+        ).open()
+
+        self.assertEqual(DATA, b"".join(stream))
+        self.assertEqual(11, len(client.requests))
+        self.assertEqual((1000, 24, {"If-Match": '"etag"'}), client.requests[-1])
+        self.assertEqual(len(DATA), stream.content_length)
+        self.assertEqual("a/b", stream.content_type)
+        self.assertEqual('"etag"', stream.validators["ETag"])
+
+    def test_ranges_in_flight_bounded(self):
+        client = FakeRangeClient(hold=True)
+        stream = ParallelRangeStream(
+            client, self.object_info, range_size=100, max_ranges=3, chunk_size=100
+        )
+        opened = threading.Thread(target=stream.open)
+        opened.start()
+        while client.in_flight < 3:
+            threading.Event().wait(0.01)
+        client.released.set()
+        opened.join(5)
+
+        self.assertEqual(DATA, b"".join(stream))
+        self.assertEqual(3, client.max_in_flight)
+
+    def test_failed_range_raised_by_open(self):
+        client = MagicMock()
+        client.get_object.side_effect = S3ProxyServiceException("errors.not_found")
+
+        stream = ParallelRangeStream(
+            client, self.object_info, range_size=100, max_ranges=2, chunk_size=100
+        )
+
+        with self.assertRaises(S3ProxyServiceException):
+            stream.open()
+
+    def test_truncated_range_rejected(self):
+        client = FakeRangeClient()
+        object_info = ObjectInfo("bucket-name", "object-name", len(DATA) + 10, "etag")
+
+        stream = ParallelRangeStream(
+            client, object_info, range_size=512, max_ranges=2, chunk_size=100
+        ).open()
+
+        with self.assertRaises(S3ProxyServiceException):
+            b"".join(stream)
+
+    def test_cache_writer_filled_and_aborted_on_close(self):
+        client = FakeRangeClient()
+        cache_writer = MagicMock()
+        stream = ParallelRangeStream(
+            client,
+            self.object_info,
+            range_size=100,
+            max_ranges=2,
+            chunk_size=100,
+            cache_writer=cache_writer,
+        ).open()
+
+        self.assertEqual(DATA[:100], next(iter(stream)))
+        stream.close()
+        stream.close()
+
+        cache_writer.write.assert_called_once_with(DATA[:100])
+        cache_writer.abort.assert_called_once()
+        cache_writer.commit.assert_not_called()
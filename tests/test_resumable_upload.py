@@ -0,0 +1,329 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.core.common.singleton import Singleton
+from src.core.config.upload_size_limits import UploadSizeLimits
+from src.core.exceptions.error_codes import UploadError
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.core.sessions.upload_session_store import (
+    MemoryUploadSessionStore,
+    SqliteUploadSessionStore,
+)
+from src.models.presign.presigned_url import MultipartUploadPlan, PresignedUrl
+from src.models.upload.upload_result import UploadResult
+from src.models.upload.upload_session import SessionPart, UploadSession
+from src.service.resumable_upload import ResumableUploads
+
+client = TestClient(app, raise_server_exceptions=False)
+
+MB: int = 1024 * 1024
+
+
+def new_session(session_id="session-1", expires_at=None) -> UploadSession:
+    return UploadSession(
+        session_id=session_id,
+        bucket_name="bucket-name",
+        object_name="video.mp4",
+        upload_id="upload-1",
+        size=12,
+        part_size=5,
+        content_type="video/mp4",
+        created_at=time.time(),
+        expires_at=expires_at if expires_at is not None else time.time() + 60,
+    )
+
+
+class TestUploadSession(unittest.TestCase):
+
+    def test_part_sizes(self):
+        session = new_session()
+
+        self.assertEqual(3, session.part_count)
+        self.assertEqual(5, session.expected_part_size(1))
+        self.assertEqual(2, session.expected_part_size(3))
+        self.assertIsNone(session.expected_part_size(0))
+        self.assertIsNone(session.expected_part_size(4))
+        self.assertEqual([1, 2, 3], session.missing_parts)
+
+
+class TestUploadSessionStores(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "sessions", "db.sqlite3")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def stores(self):
+        return [MemoryUploadSessionStore(), SqliteUploadSessionStore(self.path)]
+
+    def test_parts_recorded(self):
+        for store in self.stores():
+            with self.subTest(store=store.__class__.__name__):
+                store.add(new_session())
+                self.assertTrue(store.add_part("session-1", SessionPart(2, "b", 5), 1))
+                self.assertTrue(store.add_part("session-1", SessionPart(1, "a", 5), 1))
+                self.assertTrue(store.add_part("session-1", SessionPart(2, "c", 5), 1))
+
+                session = store.get("session-1")
+
+                self.assertEqual("upload-1", session.upload_id)
+                self.assertEqual([1, 2], sorted(session.parts))
+                self.assertEqual("c", session.parts[2].etag)
+                self.assertEqual([3], session.missing_parts)
+                self.assertEqual(1, session.expires_at)
+                self.assertFalse(store.add_part("missing", SessionPart(1, "a", 5), 1))
+                store.close()
+
+    def test_delete_claims_session_once(self):
+        for store in self.stores():
+            with self.subTest(store=store.__class__.__name__):
+                store.add(new_session())
+                store.add(new_session("session-2", expires_at=time.time() - 1))
+
+                self.assertEqual(
+                    ["session-2"],
+                    [session.session_id for session in store.expired(time.time())],
+                )
+                self.assertTrue(store.delete("session-2"))
+                self.assertFalse(store.delete("session-2"))
+                self.assertIsNone(store.get("session-2"))
+                self.assertEqual([], store.expired(time.time()))
+                store.delete("session-1")
+                store.close()
+
+    def test_sqlite_shared_between_connections(self):
+        first = SqliteUploadSessionStore(self.path)
+        second = SqliteUploadSessionStore(self.path)
+        first.add(new_session())
+        second.add_part("session-1", SessionPart(1, "a", 5), 1)
+
+        self.assertEqual(
+            ["a"], [part.etag for part in first.get("session-1").parts.values()]
+        )
+        first.close()
+        second.close()
+
+
+@patch("src.service.resumable_upload.S3Service")
+class TestResumableUploads(unittest.TestCase):
+
+    def setUp(self):
+        Singleton._instances.pop(ResumableUploads, None)
+        self.uploads = ResumableUploads()
+
+    def tearDown(self):
+        self.uploads.stop_janitor()
+        Singleton._instances.pop(ResumableUploads, None)
+
+    def test_upload_in_parts(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.create_multipart_upload.return_value = ("upload-1", 5)
+        mock_s3_service.upload_part.side_effect = lambda *args: f"etag-{args[3]}"
+        mock_s3_service.complete_multipart_upload.return_value = UploadResult(
+            "bucket-name", "video.mp4"
+        )
+
+        session = self.uploads.create("bucket-name", "video.mp4", 12, None, 100)
+        for part_number, data in ((3, b"ab"), (1, b"01234"), (2, b"56789")):
+            self.uploads.upload_part(session, part_number, data)
+        result = self.uploads.complete(self.uploads.get(session.session_id), 100)
+
+        self.assertEqual(UploadResult("bucket-name", "video.mp4"), result)
+        parts = mock_s3_service.complete_multipart_upload.call_args.kwargs["parts"]
+        self.assertEqual(
+            [(1, "etag-1", 5), (2, "etag-2", 5), (3, "etag-3", 2)],
+            [(part.part_number, part.etag, part.size) for part in parts],
+        )
+        with self.assertRaises(S3ProxyServiceException) as context:
+            self.uploads.get(session.session_id)
+        self.assertEqual(404, context.exception.status_code)
+
+    def test_part_of_wrong_size_rejected(self, mock_s3_service):
+        mock_s3_service.return_value.create_multipart_upload.return_value = (
+            "upload-1",
+            5,
+        )
+        session = self.uploads.create("bucket-name", "video.mp4", 12, None, 100)
+
+        for part_number, data in ((1, b"0123"), (3, b"abc"), (4, b"")):
+            with self.assertRaises(S3ProxyServiceException) as context:
+                self.uploads.upload_part(session, part_number, data)
+            self.assertEqual(UploadError.INVALID_PART, context.exception.key)
+        mock_s3_service.return_value.upload_part.assert_not_called()
+
+    def test_incomplete_session_not_completed(self, mock_s3_service):
+        mock_s3_service.return_value.create_multipart_upload.return_value = (
+            "upload-1",
+            5,
+        )
+        mock_s3_service.return_value.upload_part.return_value = "etag"
+        session = self.uploads.create("bucket-name", "video.mp4", 12, None, 100)
+        self.uploads.upload_part(session, 1, b"01234")
+
+        with self.assertRaises(S3ProxyServiceException) as context:
+            self.uploads.complete(self.uploads.get(session.session_id), 100)
+
+        self.assertEqual(409, context.exception.status_code)
+        mock_s3_service.return_value.complete_multipart_upload.assert_not_called()
+
+    def test_too_large_session_rejected(self, mock_s3_service):
+        with self.assertRaises(S3ProxyServiceException) as context:
+            self.uploads.create("bucket-name", "video.mp4", 101, None, 100)
+
+        self.assertEqual(413, context.exception.status_code)
+        mock_s3_service.return_value.create_multipart_upload.assert_not_called()
+
+    def test_expired_sessions_aborted(self, mock_s3_service):
+        self.uploads.store.add(new_session("old", expires_at=time.time() - 1))
+        self.uploads.store.add(new_session("new"))
+
+        self.assertEqual(1, self.uploads.expire())
+        self.assertEqual(0, self.uploads.expire())
+
+        mock_s3_service.return_value.abort_multipart_upload.assert_called_once_with(
+            "bucket-name", "video.mp4", "upload-1"
+        )
+        self.assertIsNotNone(self.uploads.store.get("new"))
+
+    def test_abandoned_presigned_upload_aborted(self, mock_s3_service):
+        expired_urls = datetime.fromtimestamp(
+            time.time() - self.uploads.ttl_seconds - 1, timezone.utc
+        )
+        self.uploads.track_presigned(
+            MultipartUploadPlan(
+                "bucket-name",
+                "video.mp4",
+                "upload-1",
+                5,
+                [PresignedUrl("PUT", "http://minio/part-1", expired_urls)],
+            ),
+            5,
+            None,
+        )
+        with self.assertRaises(S3ProxyServiceException) as context:
+            self.uploads.get("presigned:upload-1")
+        self.assertEqual(404, context.exception.status_code)
+
+        self.assertEqual(1, self.uploads.expire())
+
+        mock_s3_service.return_value.abort_multipart_upload.assert_called_once_with(
+            "bucket-name", "video.mp4", "upload-1"
+        )
+
+    @patch.dict(os.environ, {"UPLOAD_SESSION_JANITOR_SECONDS": "0.01"})
+    def test_janitor_aborts_expired_sessions(self, mock_s3_service):
+        Singleton._instances.pop(ResumableUploads, None)
+        self.uploads = ResumableUploads()
+        self.uploads.store.add(new_session("old", expires_at=time.time() - 1))
+
+        self.uploads.start_janitor()
+        deadline = time.monotonic() + 5
+        while self.uploads.store.get("old") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.uploads.stop_janitor()
+
+        self.assertIsNone(self.uploads.store.get("old"))
+        mock_s3_service.return_value.abort_multipart_upload.assert_called_once()
+
+
+@patch("src.service.resumable_upload.S3Service")
+class TestResumableUploadApi(unittest.TestCase):
+
+    def setUp(self):
+        self.env = patch.dict(os.environ, {"MAX_UPLOAD_FILE_SIZE_MB": "1"})
+        self.env.start()
+        for singleton in (ResumableUploads, UploadSizeLimits):
+            Singleton._instances.pop(singleton, None)
+
+    def tearDown(self):
+        self.env.stop()
+        for singleton in (ResumableUploads, UploadSizeLimits):
+            Singleton._instances.pop(singleton, None)
+
+    def test_resumable_upload(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.create_multipart_upload.return_value = ("upload-1", 5)
+        mock_s3_service.upload_part.return_value = "etag"
+        mock_s3_service.complete_multipart_upload.return_value = UploadResult(
+            "bucket-name", "video.mp4"
+        )
+
+        response = client.post(
+            "/api/upload/sessions",
+            json={"bucket_name": "bucket-name", "object_name": "video.mp4", "size": 7},
+        )
+        self.assertEqual(200, response.status_code)
+        session_id = response.json()["session_id"]
+        self.assertEqual([1, 2], response.json()["missing_parts"])
+
+        response = client.put(
+            f"/api/upload/sessions/{session_id}/parts/2", content=b"56"
+        )
+        self.assertEqual({"part_number": 2, "etag": "etag", "size": 2}, response.json())
+        response = client.put(
+            f"/api/upload/sessions/{session_id}/parts/1", content=b"0123"
+        )
+        self.assertEqual(400, response.status_code)
+
+        response = client.post(f"/api/upload/sessions/{session_id}/complete")
+        self.assertEqual(409, response.status_code)
+
+        response = client.put(
+            f"/api/upload/sessions/{session_id}/parts/1",
+            content=iter([b"01", b"23"]),
+        )
+        self.assertEqual(400, response.status_code)
+
+        client.put(f"/api/upload/sessions/{session_id}/parts/1", content=b"01234")
+        self.assertEqual(b"01234", mock_s3_service.upload_part.call_args.args[4])
+        response = client.get(f"/api/upload/sessions/{session_id}")
+        self.assertEqual(7, response.json()["received_bytes"])
+
+        response = client.post(f"/api/upload/sessions/{session_id}/complete")
+        self.assertEqual(
+            {"bucket_name": "bucket-name", "object_name": "video.mp4"}, response.json()
+        )
+        self.assertEqual(
+            404, client.get(f"/api/upload/sessions/{session_id}").status_code
+        )
+
+    def test_session_larger_than_limit_rejected(self, mock_s3_service):
+        response = client.post(
+            "/api/upload/sessions",
+            json={
+                "bucket_name": "bucket-name",
+                "object_name": "video.mp4",
+                "size": 2 * MB,
+            },
+        )
+
+        self.assertEqual(413, response.status_code)
+
+    def test_abort_session(self, mock_s3_service):
+        mock_s3_service.return_value.create_multipart_upload.return_value = (
+            "upload-1",
+            5,
+        )
+        session_id = client.post(
+            "/api/upload/sessions",
+            json={"bucket_name": "bucket-name", "object_name": "video.mp4", "size": 7},
+        ).json()["session_id"]
+
+        self.assertEqual(
+            204, client.delete(f"/api/upload/sessions/{session_id}").status_code
+        )
+        self.assertEqual(
+            404, client.delete(f"/api/upload/sessions/{session_id}").status_code
+        )
+        mock_s3_service.return_value.abort_multipart_upload.assert_called_once_with(
+            "bucket-name", "video.mp4", "upload-1"
+        )
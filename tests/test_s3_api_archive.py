@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+client = TestClient(app, raise_server_exceptions=False)
+
+
+def archive_stream(data: bytes, content_type: str = "application/x-tar"):
+    stream = MagicMock()
+    stream.content_type = content_type
+    stream.content_length = None
+    stream.validators = {}
+    stream.__iter__.return_value = iter([data])
+    # a blocking stream, read in the executor
+    del stream.__aiter__
+    return stream
+
+
+class TestDownloadArchive(unittest.TestCase):
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_archive_of_prefix(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stream_archive.return_value = archive_stream(b"tar")
+
+        response = client.get("/api/archive/bucket-name?prefix=photos/2024/")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b"tar", response.content)
+        self.assertEqual("application/x-tar", response.headers["Content-Type"])
+        self.assertEqual(
+            'attachment; filename="2024.tar"', response.headers["Content-Disposition"]
+        )
+        mock_s3_service.stream_archive.assert_called_once_with(
+            bucket_name="bucket-name",
+            archive_format="tar",
+            prefix="photos/2024/",
+            object_names=None,
+        )
+        mock_s3_service.stream_archive.return_value.close.assert_called()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_archive_of_listed_objects(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stream_archive.return_value = archive_stream(
+            b"zip", "application/zip"
+        )
+
+        response = client.get(
+            "/api/archive/bucket-name?object_name=a.txt&object_name=b/c.txt&format=zip"
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            'attachment; filename="bucket-name.zip"',
+            response.headers["Content-Disposition"],
+        )
+        mock_s3_service.stream_archive.assert_called_once_with(
+            bucket_name="bucket-name",
+            archive_format="zip",
+            prefix=None,
+            object_names=["a.txt", "b/c.txt"],
+        )
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_archive_of_objects_in_body(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stream_archive.return_value = archive_stream(b"tar")
+
+        response = client.post(
+            "/api/archive/bucket-name", json={"object_names": ["a.txt", "b.txt"]}
+        )
+
+        self.assertEqual(200, response.status_code)
+        mock_s3_service.stream_archive.assert_called_once_with(
+            bucket_name="bucket-name",
+            archive_format="tar",
+            prefix=None,
+            object_names=["a.txt", "b.txt"],
+        )
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_nothing_to_archive(self, mock_s3_service):
+        response = client.get("/api/archive/bucket-name")
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(
+            "Archive request needs a prefix or a list of object names.",
+            response.json()["message"],
+        )
+        mock_s3_service.return_value.stream_archive.assert_not_called()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_incorrect_names_and_format(self, mock_s3_service):
+        for url in (
+            "/api/archive/bucket_name?prefix=a",
+            "/api/archive/bucket-name?object_name=a b",
+            "/api/archive/bucket-name?prefix=a&format=rar",
+        ):
+            response = client.get(url)
+
+            self.assertEqual(400, response.status_code, url)
+        mock_s3_service.return_value.stream_archive.assert_not_called()
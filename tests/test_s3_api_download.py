@@ -0,0 +1,254 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.core.cache.object_cache import CachedObject
+from src.core.common.singleton import Singleton
+from src.core.config.cache_control import CacheControlPolicy
+from src.models.download.object_info import ObjectInfo
+from src.service.object_stream import ObjectStream
+
+client = TestClient(app, raise_server_exceptions=False)
+
+
+def object_stream(data: bytes, content_type: str = "text/plain") -> ObjectStream:
+    response = MagicMock()
+    response.headers = {"Content-Length": str(len(data)), "Content-Type": content_type}
+    response.stream.return_value = iter([data])
+    return ObjectStream(response=response, chunk_size=1024)
+
+
+class TestDownloadRange(unittest.TestCase):
+    DATA: bytes = b"0123456789"
+    OBJECT_INFO = ObjectInfo(
+        bucket_name="bucket-name",
+        object_name="object-name",
+        size=10,
+        etag="abc",
+        content_type="text/plain",
+    )
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_download_whole_file(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = self.OBJECT_INFO
+        mock_s3_service.cached_file.return_value = None
+        mock_s3_service.stream_file.return_value = object_stream(self.DATA)
+
+        response = client.get("/api/download/bucket-name/object-name")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.DATA, response.content)
+        self.assertEqual("bytes", response.headers["Accept-Ranges"])
+        self.assertEqual('"abc"', response.headers["ETag"])
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_download_single_range(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = self.OBJECT_INFO
+        mock_s3_service.cached_file.return_value = None
+        mock_s3_service.stream_file.return_value = object_stream(self.DATA[2:5])
+
+        response = client.get(
+            "/api/download/bucket-name/object-name", headers={"Range": "bytes=2-4"}
+        )
+
+        self.assertEqual(206, response.status_code)
+        self.assertEqual(b"234", response.content)
+        self.assertEqual("bytes 2-4/10", response.headers["Content-Range"])
+        byte_range = mock_s3_service.stream_file.call_args.kwargs["byte_range"]
+        self.assertEqual((2, 3), (byte_range.start, byte_range.length))
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_download_several_ranges(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = self.OBJECT_INFO
+        mock_s3_service.cached_file.return_value = None
+        mock_s3_service.stream_file.side_effect = [
+            object_stream(self.DATA[0:2]),
+            object_stream(self.DATA[8:10]),
+        ]
+
+        response = client.get(
+            "/api/download/bucket-name/object-name",
+            headers={"Range": "bytes=0-1,-2"},
+        )
+
+        self.assertEqual(206, response.status_code)
+        content_type = response.headers["Content-Type"]
+        self.assertTrue(content_type.startswith("multipart/byteranges; boundary="))
+        boundary = content_type.split("boundary=")[1]
+        self.assertEqual(
+            f"--{boundary}\r\nContent-Type: text/plain\r\n"
+            f"Content-Range: bytes 0-1/10\r\n\r\n01\r\n"
+            f"--{boundary}\r\nContent-Type: text/plain\r\n"
+            f"Content-Range: bytes 8-9/10\r\n\r\n89\r\n"
+            f"--{boundary}--\r\n",
+            response.text,
+        )
+        self.assertEqual(len(response.content), int(response.headers["Content-Length"]))
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_download_range_not_satisfiable(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = self.OBJECT_INFO
+        mock_s3_service.cached_file.return_value = None
+
+        response = client.get(
+            "/api/download/bucket-name/object-name", headers={"Range": "bytes=20-30"}
+        )
+
+        self.assertEqual(416, response.status_code)
+        self.assertEqual("bytes */10", response.headers["Content-Range"])
+        mock_s3_service.stream_file.assert_not_called()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_download_if_range_mismatch_returns_whole_file(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = self.OBJECT_INFO
+        mock_s3_service.cached_file.return_value = None
+        mock_s3_service.stream_file.return_value = object_stream(self.DATA)
+
+        response = client.get(
+            "/api/download/bucket-name/object-name",
+            headers={"Range": "bytes=2-4", "If-Range": '"changed"'},
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.DATA, response.content)
+
+
+class TestDownloadCached(unittest.TestCase):
+    OBJECT_INFO = ObjectInfo(
+        bucket_name="bucket-name",
+        object_name="object-name",
+        size=3,
+        etag="abc",
+        content_type="text/plain",
+    )
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_cached_file_served_without_minio(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = self.OBJECT_INFO
+        mock_s3_service.cached_file.return_value = CachedObject(
+            self.OBJECT_INFO, data=b"abc"
+        )
+
+        response = client.get("/api/download/bucket-name/object-name")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b"abc", response.content)
+        self.assertEqual('"abc"', response.headers["ETag"])
+        mock_s3_service.stream_file.assert_not_called()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_cached_file_on_disk_served(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = self.OBJECT_INFO
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(b"abc")
+            file.flush()
+            mock_s3_service.cached_file.return_value = CachedObject(
+                self.OBJECT_INFO, path=file.name, file=open(file.name, "rb")
+            )
+
+            response = client.get("/api/download/bucket-name/object-name")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b"abc", response.content)
+        self.assertEqual('"abc"', response.headers["ETag"])
+
+
+class TestDownloadConditional(unittest.TestCase):
+    DATA: bytes = b"0123456789"
+    OBJECT_INFO = ObjectInfo(
+        bucket_name="bucket-name",
+        object_name="object-name",
+        size=10,
+        etag="abc",
+        content_type="text/plain",
+        last_modified=datetime(2024, 9, 20, 16, 17, 53, tzinfo=timezone.utc),
+    )
+
+    def setUp(self):
+        Singleton._instances.pop(CacheControlPolicy, None)
+
+    def tearDown(self):
+        Singleton._instances.pop(CacheControlPolicy, None)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_validators_and_cache_control_sent(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = self.OBJECT_INFO
+        mock_s3_service.cached_file.return_value = None
+        mock_s3_service.stream_file.return_value = object_stream(self.DATA)
+
+        with patch.dict(
+            os.environ,
+            {
+                "CACHE_CONTROL_DEFAULT": "no-cache",
+                "CACHE_CONTROL_BUCKET_POLICIES": '{"bucket-name": "public, max-age=60"}',
+            },
+        ):
+            response = client.get("/api/download/bucket-name/object-name")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('"abc"', response.headers["ETag"])
+        self.assertEqual(
+            "Fri, 20 Sep 2024 16:17:53 GMT", response.headers["Last-Modified"]
+        )
+        self.assertEqual("public, max-age=60", response.headers["Cache-Control"])
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_if_none_match_not_modified(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = self.OBJECT_INFO
+        mock_s3_service.cached_file.return_value = None
+
+        response = client.get(
+            "/api/download/bucket-name/object-name",
+            headers={"If-None-Match": '"other", W/"abc"'},
+        )
+
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b"", response.content)
+        self.assertEqual('"abc"', response.headers["ETag"])
+        mock_s3_service.stream_file.assert_not_called()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_if_modified_since_not_modified(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = self.OBJECT_INFO
+        mock_s3_service.cached_file.return_value = None
+
+        response = client.get(
+            "/api/download/bucket-name/object-name",
+            headers={"If-Modified-Since": "Fri, 20 Sep 2024 16:17:53 GMT"},
+        )
+
+        self.assertEqual(304, response.status_code)
+        mock_s3_service.stream_file.assert_not_called()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_modified_file_downloaded(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stat_file.return_value = self.OBJECT_INFO
+        mock_s3_service.cached_file.return_value = None
+        mock_s3_service.stream_file.return_value = object_stream(self.DATA)
+
+        response = client.get(
+            "/api/download/bucket-name/object-name",
+            headers={
+                "If-None-Match": '"other"',
+                "If-Modified-Since": "Fri, 20 Sep 2024 16:17:53 GMT",
+            },
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.DATA, response.content)
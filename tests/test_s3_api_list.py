@@ -0,0 +1,194 @@
+import json
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.models.download.object_listing import ListedObject, ObjectListing
+from src.service.object_list_stream import ObjectListStream
+from src.service.s3_service import S3Service
+
+client = TestClient(app, raise_server_exceptions=False)
+
+LIST_RESULT = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+    "<Name>bucket-name</Name><Prefix>logs/</Prefix><KeyCount>2</KeyCount>"
+    "<MaxKeys>2</MaxKeys><EncodingType>url</EncodingType>"
+    "<IsTruncated>true</IsTruncated><NextContinuationToken>token-2</NextContinuationToken>"
+    "<Contents><Key>logs/a%2Bb.txt</Key><LastModified>2024-09-20T10:00:00.000Z</LastModified>"
+    '<ETag>"abc"</ETag><Size>12</Size></Contents>'
+    "<CommonPrefixes><Prefix>logs/2024/</Prefix></CommonPrefixes>"
+    "</ListBucketResult>"
+)
+
+
+def listing(names, next_continuation_token=None) -> ObjectListing:
+    return ObjectListing(
+        "bucket-name",
+        [
+            (
+                ListedObject(name, is_prefix=True)
+                if name.endswith("/")
+                else ListedObject(name, 1, "etag")
+            )
+            for name in names
+        ],
+        next_continuation_token,
+    )
+
+
+class TestListObjects(unittest.TestCase):
+
+    def test_page_of_listing(self):
+        minio_client = MagicMock()
+        minio_client._execute.return_value.data = LIST_RESULT.encode()
+
+        page = S3Service(client=minio_client).list_objects(
+            "bucket-name", prefix="logs/", delimiter="/", max_keys=2
+        )
+
+        minio_client._execute.assert_called_once_with(
+            "GET",
+            "bucket-name",
+            query_params={
+                "list-type": "2",
+                "delimiter": "/",
+                "encoding-type": "url",
+                "max-keys": "2",
+                "prefix": "logs/",
+            },
+        )
+        self.assertEqual(
+            {
+                "bucket_name": "bucket-name",
+                "objects": [
+                    {
+                        "object_name": "logs/a+b.txt",
+                        "size": 12,
+                        "etag": "abc",
+                        "last_modified": "2024-09-20T10:00:00+00:00",
+                    }
+                ],
+                "prefixes": ["logs/2024/"],
+                "is_truncated": True,
+                "next_continuation_token": "token-2",
+            },
+            page.to_response(),
+        )
+
+    def test_stream_fetches_pages_while_read(self):
+        pages = {
+            None: listing(["a.txt", "b/"], "token-2"),
+            "token-2": listing([], "token-3"),
+            "token-3": listing(["c.txt"]),
+        }
+        requested = []
+
+        def list_page(token):
+            requested.append(token)
+            return pages[token]
+
+        stream = ObjectListStream(list_page).open()
+        self.assertEqual([None], requested)
+        chunks = list(stream)
+
+        self.assertEqual([None, "token-2", "token-3"], requested)
+        self.assertEqual(2, len(chunks))
+        self.assertEqual(
+            [
+                {
+                    "object_name": "a.txt",
+                    "size": 1,
+                    "etag": "etag",
+                    "last_modified": None,
+                },
+                {"prefix": "b/"},
+                {
+                    "object_name": "c.txt",
+                    "size": 1,
+                    "etag": "etag",
+                    "last_modified": None,
+                },
+            ],
+            [json.loads(line) for line in b"".join(chunks).decode().splitlines()],
+        )
+
+
+class TestListApi(unittest.TestCase):
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_list_page(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.list_objects.return_value = ObjectListing(
+            "bucket-name",
+            [
+                ListedObject(
+                    "logs/a.txt",
+                    12,
+                    "abc",
+                    datetime(2024, 9, 20, 10, tzinfo=timezone.utc),
+                )
+            ],
+            "token-2",
+        )
+
+        response = client.get(
+            "/api/list/bucket-name?prefix=logs/&delimiter=/&max-keys=1"
+            "&continuation-token=token-1"
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("token-2", response.json()["next_continuation_token"])
+        self.assertEqual(
+            "2024-09-20T10:00:00+00:00",
+            response.json()["objects"][0]["last_modified"],
+        )
+        mock_s3_service.list_objects.assert_called_once_with(
+            bucket_name="bucket-name",
+            prefix="logs/",
+            delimiter="/",
+            start_after=None,
+            continuation_token="token-1",
+            max_keys=1,
+        )
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_list_as_ndjson(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.stream_object_list.return_value = ObjectListStream(
+            lambda token: listing(["a.txt", "b/"])
+        ).open()
+
+        response = client.get("/api/list/bucket-name?format=ndjson&start-after=0.txt")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/x-ndjson", response.headers["Content-Type"])
+        self.assertEqual(
+            ["a.txt", "b/"],
+            [
+                entry.get("object_name") or entry.get("prefix")
+                for entry in map(json.loads, response.text.splitlines())
+            ],
+        )
+        mock_s3_service.stream_object_list.assert_called_once_with(
+            bucket_name="bucket-name",
+            prefix=None,
+            delimiter=None,
+            start_after="0.txt",
+            continuation_token=None,
+        )
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_invalid_list_request(self, mock_s3_service):
+        for url in (
+            "/api/list/Bucket_Name",
+            "/api/list/bucket-name?max-keys=1001",
+            "/api/list/bucket-name?format=xml",
+            "/api/list/bucket-name?prefix=a%00b",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(400, client.get(url).status_code)
+        mock_s3_service.return_value.list_objects.assert_not_called()
@@ -0,0 +1,219 @@
+import os
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.core.common.singleton import Singleton
+from src.core.config.presign_policy import PresignPolicy
+from src.core.config.upload_size_limits import UploadSizeLimits
+from src.service.resumable_upload import ResumableUploads
+from src.models.presign.presigned_url import (
+    MultipartUploadPlan,
+    PresignedPost,
+    PresignedUrl,
+)
+from src.models.upload.upload_result import UploadResult
+
+client = TestClient(app, raise_server_exceptions=False)
+
+EXPIRES_AT = datetime(2024, 6, 1, 12, 15, tzinfo=timezone.utc)
+
+
+class TestPresign(unittest.TestCase):
+
+    def setUp(self):
+        self.env = patch.dict(
+            os.environ,
+            {
+                "PRESIGN_DEFAULT_ROUTES": "download",
+                "PRESIGN_BUCKET_ROUTES": '{"trusted": ["download", "upload", "multipart"]}',
+                "MAX_UPLOAD_FILE_SIZE_MB": "1",
+            },
+        )
+        self.env.start()
+        for singleton in (PresignPolicy, UploadSizeLimits, ResumableUploads):
+            Singleton._instances.pop(singleton, None)
+
+    def tearDown(self):
+        self.env.stop()
+        for singleton in (PresignPolicy, UploadSizeLimits, ResumableUploads):
+            Singleton._instances.pop(singleton, None)
+
+    def test_policy_per_bucket(self):
+        policy = PresignPolicy()
+
+        self.assertTrue(policy.is_enabled("bucket-name", PresignPolicy.DOWNLOAD))
+        self.assertFalse(policy.is_enabled("bucket-name", PresignPolicy.UPLOAD))
+        self.assertTrue(policy.is_enabled("trusted", PresignPolicy.MULTIPART))
+        self.assertEqual(900, policy.expiry_seconds)
+
+    @patch.dict(os.environ, {"PRESIGN_DEFAULT_ROUTES": "download,delete"})
+    def test_unknown_route_rejected(self):
+        with self.assertRaises(ValueError):
+            PresignPolicy()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_presign_download(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.presign_download.return_value = PresignedUrl(
+            "GET", "http://minio/bucket-name/a.txt?X-Amz-Signature=1", EXPIRES_AT
+        )
+
+        response = client.get("/api/presign/download/bucket-name/a.txt")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            {
+                "method": "GET",
+                "url": "http://minio/bucket-name/a.txt?X-Amz-Signature=1",
+                "expires_at": "2024-06-01T12:15:00+00:00",
+            },
+            response.json(),
+        )
+        mock_s3_service.presign_download.assert_called_once_with(
+            bucket_name="bucket-name", object_name="a.txt"
+        )
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_presign_upload_disabled_for_bucket(self, mock_s3_service):
+        response = client.post(
+            "/api/presign/upload/bucket-name/a.txt", json={"size": 10}
+        )
+
+        self.assertEqual(403, response.status_code)
+        self.assertEqual(
+            "Presigned URLs of this kind are not issued for the bucket.",
+            response.json()["message"],
+        )
+        mock_s3_service.return_value.presign_upload.assert_not_called()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_presign_upload(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.presign_upload.return_value = PresignedPost(
+            "http://minio/trusted", {"key": "a.txt", "policy": "..."}, EXPIRES_AT
+        )
+
+        response = client.post(
+            "/api/presign/upload/trusted/a.txt",
+            json={"size": 10, "content_type": "text/plain"},
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("POST", response.json()["method"])
+        self.assertEqual("a.txt", response.json()["fields"]["key"])
+        mock_s3_service.presign_upload.assert_called_once_with(
+            bucket_name="trusted",
+            object_name="a.txt",
+            size=10,
+            content_type="text/plain",
+        )
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_presign_upload_size_checked(self, mock_s3_service):
+        for url in (
+            "/api/presign/upload/trusted/a",
+            "/api/presign/multipart/trusted/a",
+        ):
+            response = client.post(url, json={"size": 1024 * 1024 + 1})
+
+            self.assertEqual(413, response.status_code, url)
+            response = client.post(url, json={"size": -1})
+
+            self.assertEqual(400, response.status_code, url)
+        mock_s3_service.return_value.presign_upload.assert_not_called()
+        mock_s3_service.return_value.presign_multipart_upload.assert_not_called()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_incorrect_names(self, mock_s3_service):
+        for url in (
+            "/api/presign/download/bucket_name/a.txt",
+            "/api/presign/download/bucket-name/a b",
+        ):
+            response = client.get(url)
+
+            self.assertEqual(400, response.status_code, url)
+        mock_s3_service.return_value.presign_download.assert_not_called()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_multipart_plan(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.presign_multipart_upload.return_value = MultipartUploadPlan(
+            "trusted",
+            "video.mp4",
+            "upload-id",
+            5,
+            [
+                PresignedUrl("PUT", "http://minio/part-1", EXPIRES_AT),
+                PresignedUrl("PUT", "http://minio/part-2", EXPIRES_AT),
+            ],
+        )
+
+        response = client.post(
+            "/api/presign/multipart/trusted/video.mp4",
+            json={"size": 7, "content_type": "video/mp4"},
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("upload-id", response.json()["upload_id"])
+        self.assertEqual(
+            [(1, "http://minio/part-1"), (2, "http://minio/part-2")],
+            [(part["part_number"], part["url"]) for part in response.json()["parts"]],
+        )
+        mock_s3_service.presign_multipart_upload.assert_called_once_with(
+            bucket_name="trusted",
+            object_name="video.mp4",
+            size=7,
+            content_type="video/mp4",
+        )
+        session = ResumableUploads().store.get("presigned:upload-id")
+        self.assertEqual("upload-id", session.upload_id)
+        self.assertEqual(EXPIRES_AT.timestamp() + 86400, session.expires_at)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_complete_and_abort_multipart(self, mock_s3_service):
+        mock_s3_service = mock_s3_service.return_value
+        mock_s3_service.complete_multipart_upload.return_value = UploadResult(
+            "trusted", "video.mp4"
+        )
+        uploads = ResumableUploads()
+        for upload_id in ("upload-id", "other-upload-id"):
+            uploads.track_presigned(
+                MultipartUploadPlan(
+                    "trusted",
+                    "video.mp4",
+                    upload_id,
+                    5,
+                    [PresignedUrl("PUT", "http://minio/part-1", EXPIRES_AT)],
+                ),
+                5,
+                None,
+            )
+
+        completed = client.post(
+            "/api/presign/multipart/trusted/video.mp4/complete",
+            json={"upload_id": "upload-id"},
+        )
+        self.assertIsNone(uploads.store.get("presigned:upload-id"))
+        aborted = client.delete(
+            "/api/presign/multipart/trusted/video.mp4?upload_id=other-upload-id"
+        )
+        self.assertIsNone(uploads.store.get("presigned:other-upload-id"))
+
+        self.assertEqual(200, completed.status_code)
+        self.assertEqual(
+            {"bucket_name": "trusted", "object_name": "video.mp4"}, completed.json()
+        )
+        mock_s3_service.complete_multipart_upload.assert_called_once_with(
+            bucket_name="trusted",
+            object_name="video.mp4",
+            upload_id="upload-id",
+            max_bytes=1024 * 1024,
+        )
+        self.assertEqual(204, aborted.status_code)
+        mock_s3_service.abort_multipart_upload.assert_called_once_with(
+            bucket_name="trusted", object_name="video.mp4", upload_id="other-upload-id"
+        )
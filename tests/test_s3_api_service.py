@@ -5,6 +5,7 @@ from src.models.download.download_request import DownloadRequest
 from src.api.routers.s3_api import S3APIService
 from src.models.upload.upload_request import UploadRequest
 from src.models.upload.upload_result import UploadResult
+from src.service.object_stream import ObjectStream
 
 
 class TestS3APIService(unittest.TestCase):
@@ -36,3 +37,22 @@ class TestS3APIService(unittest.TestCase):
             bucket_name="bucket-name", object_name="object-name"
         )
         self.assertEqual(result, download_response)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_stream_file_from_bucket(self, mock_s3_service):
+        download_request = DownloadRequest(
+            bucket_name="bucket-name", object_name="object-name"
+        )
+        mock_s3_service = mock_s3_service.return_value
+        object_stream = MagicMock(spec=ObjectStream)
+        mock_s3_service.stream_file.return_value = object_stream
+
+        result = S3APIService().stream_file_from_bucket(download_request)
+
+        mock_s3_service.stream_file.assert_called_once_with(
+            bucket_name="bucket-name",
+            object_name="object-name",
+            byte_range=None,
+            object_info=None,
+        )
+        self.assertEqual(result, object_stream)
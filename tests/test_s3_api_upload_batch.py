@@ -0,0 +1,187 @@
+import io
+import os
+import tarfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.api.requests.batch_entries import multipart_entries
+from src.core.common.singleton import Singleton
+from src.core.config.upload_size_limits import UploadSizeLimits
+from src.core.exceptions.exception import S3ProxyServiceException
+from src.models.upload.batch_upload_result import BatchObjectResult, BatchUploadResult
+
+client = TestClient(app, raise_server_exceptions=False)
+
+
+def read_batch(received: list):
+    def upload_batch(bucket_name, entries):
+        results = []
+        for entry in entries:
+            received.append(entry)
+            if entry.error is not None:
+                results.append(BatchObjectResult(entry.object_name, error=entry.error))
+            else:
+                results.append(BatchObjectResult(entry.object_name, etag="etag"))
+        return BatchUploadResult(bucket_name, results)
+
+    return upload_batch
+
+
+def tar_archive(files: dict, mode: str = "w") -> bytes:
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode=mode) as tar:
+        folder = tarfile.TarInfo("folder")
+        folder.type = tarfile.DIRTYPE
+        tar.addfile(folder)
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return archive.getvalue()
+
+
+class TestUploadBatch(unittest.TestCase):
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_multipart_files_uploaded(self, mock_s3_service):
+        received = []
+        mock_s3_service.return_value.upload_batch.side_effect = read_batch(received)
+
+        response = client.post(
+            "/api/upload/batch/bucket-name",
+            data={"comment": "ignored"},
+            files=[
+                ("file", ("a.txt", b"Hola!", "text/plain")),
+                ("file", ("docs/b.json", b"{}", "application/json")),
+            ],
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            {
+                "bucket_name": "bucket-name",
+                "uploaded": 2,
+                "failed": 0,
+                "results": [
+                    {"object_name": "a.txt", "etag": "etag"},
+                    {"object_name": "docs/b.json", "etag": "etag"},
+                ],
+            },
+            response.json(),
+        )
+        self.assertEqual(
+            [
+                ("a.txt", "text/plain", b"Hola!"),
+                ("docs/b.json", "application/json", b"{}"),
+            ],
+            [(entry.object_name, entry.content_type, entry.data) for entry in received],
+        )
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_compressed_tar_unpacked(self, mock_s3_service):
+        received = []
+        mock_s3_service.return_value.upload_batch.side_effect = read_batch(received)
+
+        response = client.post(
+            "/api/upload/batch/bucket-name",
+            content=tar_archive({"a.txt": b"Hola!", "b c.txt": b"x"}, "w:gz"),
+            headers={"Content-Type": "application/gzip"},
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.json()["failed"])
+        self.assertEqual(
+            [("a.txt", "text/plain", b"Hola!"), ("b c.txt", "text/plain", None)],
+            [(entry.object_name, entry.content_type, entry.data) for entry in received],
+        )
+        self.assertEqual("errors.minio.incorrect_object_name", received[1].error)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_zip_unpacked(self, mock_s3_service):
+        received = []
+        mock_s3_service.return_value.upload_batch.side_effect = read_batch(received)
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr("folder/", b"")
+            zip_file.writestr("folder/a.bin", b"Hola!")
+
+        response = client.post(
+            "/api/upload/batch/bucket-name",
+            content=archive.getvalue(),
+            headers={"Content-Type": "application/zip"},
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(["folder/a.bin"], [entry.object_name for entry in received])
+        self.assertEqual(b"Hola!", received[0].data)
+
+    @patch.dict(os.environ, {"MAX_UPLOAD_BATCH_FILE_SIZE_MB": "1"})
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_large_file_rejected_and_not_kept(self, mock_s3_service):
+        Singleton._instances.pop(UploadSizeLimits, None)
+        self.addCleanup(Singleton._instances.pop, UploadSizeLimits, None)
+        received = []
+        mock_s3_service.return_value.upload_batch.side_effect = read_batch(received)
+
+        response = client.post(
+            "/api/upload/batch/bucket-name",
+            content=tar_archive({"large.bin": b"x" * (1024 * 1024 + 1)}),
+            headers={"Content-Type": "application/x-tar"},
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertIsNone(received[0].data)
+        self.assertEqual("errors.upload.file_too_large", received[0].error)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_invalid_archive_rejected(self, mock_s3_service):
+        mock_s3_service.return_value.upload_batch.side_effect = read_batch([])
+
+        response = client.post(
+            "/api/upload/batch/bucket-name",
+            content=b"not a tar archive" * 100,
+            headers={"Content-Type": "application/x-tar"},
+        )
+
+        self.assertEqual(400, response.status_code)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_unsupported_body_rejected(self, mock_s3_service):
+        response = client.post(
+            "/api/upload/batch/bucket-name",
+            content=b"Hola!",
+            headers={"Content-Type": "text/plain"},
+        )
+
+        self.assertEqual(415, response.status_code)
+        mock_s3_service.return_value.upload_batch.assert_not_called()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_incorrect_bucket_name(self, mock_s3_service):
+        response = client.post(
+            "/api/upload/batch/bucket_name",
+            files={"file": ("a.txt", b"Hola!")},
+        )
+
+        self.assertEqual(400, response.status_code)
+        mock_s3_service.return_value.upload_batch.assert_not_called()
+
+
+class TestMultipartEntries(unittest.TestCase):
+
+    def test_truncated_body_rejected(self):
+        body = (
+            b"--boundary\r\n"
+            b'Content-Disposition: form-data; name="file"; filename="a.txt"\r\n\r\n'
+            b"Hola"
+        )
+
+        entries = multipart_entries(io.BytesIO(body), 1024, b"boundary")
+
+        with self.assertRaises(S3ProxyServiceException) as context:
+            list(entries)
+        self.assertEqual("errors.upload.incomplete_file", context.exception.key)
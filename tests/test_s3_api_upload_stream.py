@@ -0,0 +1,138 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.core.common.singleton import Singleton
+from src.core.config.upload_size_limits import UploadSizeLimits
+from src.models.upload.upload_result import UploadResult
+from src.service.upload_pipe import UploadPipe
+
+client = TestClient(app, raise_server_exceptions=False)
+
+
+def read_upload(received: dict):
+    def upload_stream(bucket_name, object_name, data, content_type):
+        chunks = []
+        while True:
+            chunk = data.read(3)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        received.update(data=b"".join(chunks), content_type=content_type)
+        return UploadResult(bucket_name=bucket_name, object_name=object_name)
+
+    return upload_stream
+
+
+class TestUploadStream(unittest.TestCase):
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_multipart_file_streamed(self, mock_s3_service):
+        received = {}
+        mock_s3_service.return_value.upload_stream.side_effect = read_upload(received)
+
+        response = client.post(
+            "/api/upload/stream/bucket-name/object-name",
+            data={"comment": "ignored"},
+            files={"file": ("file.txt", b"Hola, mundo!", "text/plain")},
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            {"bucket_name": "bucket-name", "object_name": "object-name"},
+            response.json(),
+        )
+        self.assertEqual(b"Hola, mundo!", received["data"])
+        self.assertEqual("text/plain", received["content_type"])
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_raw_body_streamed(self, mock_s3_service):
+        received = {}
+        mock_s3_service.return_value.upload_stream.side_effect = read_upload(received)
+
+        response = client.post(
+            "/api/upload/stream/bucket-name/object-name",
+            content=b"Hola!",
+            headers={"Content-Type": "application/pdf"},
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b"Hola!", received["data"])
+        self.assertEqual("application/pdf", received["content_type"])
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_multipart_without_file_rejected(self, mock_s3_service):
+        response = client.post(
+            "/api/upload/stream/bucket-name/object-name",
+            data={"comment": "no file"},
+            files={"other": ("file.txt", b"Hola!")},
+        )
+
+        self.assertEqual(400, response.status_code)
+        mock_s3_service.return_value.upload_stream.assert_not_called()
+
+    @patch.dict(os.environ, {"MAX_UPLOAD_FILE_SIZE_MB": "1"})
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_file_too_large_rejected(self, mock_s3_service):
+        Singleton._instances.pop(UploadSizeLimits, None)
+        self.addCleanup(Singleton._instances.pop, UploadSizeLimits, None)
+        received = {}
+        mock_s3_service.return_value.upload_stream.side_effect = read_upload(received)
+
+        response = client.post(
+            "/api/upload/stream/bucket-name/object-name",
+            content=iter([b"x" * 1024 * 1024, b"x"]),
+        )
+
+        self.assertEqual(413, response.status_code)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_incorrect_bucket_name(self, mock_s3_service):
+        response = client.post(
+            "/api/upload/stream/bucket_name/object-name", content=b"Hola!"
+        )
+
+        self.assertEqual(400, response.status_code)
+        mock_s3_service.return_value.upload_stream.assert_not_called()
+
+
+class TestUploadPipe(unittest.TestCase):
+
+    def test_writer_waits_for_reader(self):
+        async def scenario():
+            pipe = UploadPipe(max_buffered_bytes=4)
+            await pipe.write(b"abcd")
+            blocked_write = asyncio.ensure_future(pipe.write(b"ef"))
+            await asyncio.sleep(0.01)
+            self.assertFalse(blocked_write.done())
+
+            data = await asyncio.get_running_loop().run_in_executor(None, pipe.read, 3)
+            self.assertEqual(b"abc", data)
+            self.assertTrue(await asyncio.wait_for(blocked_write, 1))
+            pipe.close()
+            rest = await asyncio.get_running_loop().run_in_executor(None, pipe.read)
+            self.assertEqual(b"def", rest)
+            self.assertEqual(b"", pipe.read(3))
+
+        asyncio.run(scenario())
+
+    def test_failed_pipe_raises_to_reader(self):
+        async def scenario():
+            pipe = UploadPipe(max_buffered_bytes=4)
+            pipe.fail(ValueError("rejected"))
+            with self.assertRaises(ValueError):
+                pipe.read(3)
+
+        asyncio.run(scenario())
+
+    def test_aborted_pipe_refuses_writes(self):
+        async def scenario():
+            pipe = UploadPipe(max_buffered_bytes=4)
+            pipe.abort()
+            self.assertFalse(await pipe.write(b"abc"))
+
+        asyncio.run(scenario())
@@ -0,0 +1,51 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from src.core.common.singleton import Singleton
+from src.service.s3_client_provider import S3ClientProvider
+from src.service.s3_service import S3Service
+
+
+class TestS3ClientProvider(unittest.TestCase):
+    ENV: dict = {
+        "MINIO_HOST": "localhost:9000",
+        "MINIO_ACCESS_KEY": "access-key",
+        "MINIO_SECRET_KEY": "secret-key",
+        "MINIO_MAX_CONNECTIONS": "7",
+        "MINIO_CONNECT_TIMEOUT_SECONDS": "2",
+        "MINIO_READ_TIMEOUT_SECONDS": "30",
+        "MINIO_RETRIES": "1",
+    }
+
+    def setUp(self):
+        Singleton._instances.pop(S3ClientProvider, None)
+
+    def tearDown(self):
+        S3ClientProvider().close()
+        Singleton._instances.pop(S3ClientProvider, None)
+
+    def test_client_is_shared_between_services(self):
+        with patch.dict(os.environ, self.ENV):
+            S3ClientProvider().start()
+            first_service, second_service = S3Service(), S3Service()
+
+        self.assertIs(first_service.client, second_service.client)
+        self.assertIs(S3ClientProvider().client, first_service.client)
+
+    def test_connection_pool_configured_from_env(self):
+        with patch.dict(os.environ, self.ENV):
+            S3ClientProvider().start()
+
+        http_client = S3ClientProvider()._http_client
+        self.assertEqual(7, http_client.connection_pool_kw["maxsize"])
+        self.assertEqual(2, http_client.connection_pool_kw["timeout"].connect_timeout)
+        self.assertEqual(30, http_client.connection_pool_kw["timeout"].read_timeout)
+        self.assertEqual(1, http_client.connection_pool_kw["retries"].total)
+
+    def test_close_releases_client(self):
+        with patch.dict(os.environ, self.ENV):
+            client = S3ClientProvider().client
+            S3ClientProvider().close()
+
+            self.assertIsNot(client, S3ClientProvider().client)
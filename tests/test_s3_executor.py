@@ -0,0 +1,77 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from src.core.common.s3_executor import S3Executor
+from src.core.common.singleton import Singleton
+
+
+class TestS3Executor(unittest.TestCase):
+
+    def setUp(self):
+        Singleton._instances.pop(S3Executor, None)
+
+    def tearDown(self):
+        S3Executor().shutdown()
+        Singleton._instances.pop(S3Executor, None)
+
+    def test_run_in_executor_thread(self):
+        result = asyncio.run(
+            S3Executor().run(lambda x: (x, threading.current_thread().name), "arg")
+        )
+
+        self.assertEqual("arg", result[0])
+        self.assertTrue(result[1].startswith("s3-io"))
+
+    def test_run_is_bounded_by_max_workers(self):
+        running = 0
+        max_running = 0
+        lock = threading.Lock()
+
+        def blocking_call():
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+
+        async def run_all():
+            await asyncio.gather(*[S3Executor().run(blocking_call) for _ in range(8)])
+
+        with patch.dict(os.environ, {"S3_EXECUTOR_MAX_WORKERS": "2"}):
+            asyncio.run(run_all())
+
+        self.assertEqual(2, max_running)
+
+    def test_event_loop_is_not_blocked(self):
+        async def run_all():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            ticker_task = asyncio.create_task(ticker())
+            await S3Executor().run(time.sleep, 0.2)
+            ticker_task.cancel()
+            return ticks
+
+        self.assertGreater(asyncio.run(run_all()), 5)
+
+    def test_iterate(self):
+        async def collect():
+            return [item async for item in S3Executor().iterate([b"Ho", b"la", b"!"])]
+
+        self.assertEqual([b"Ho", b"la", b"!"], asyncio.run(collect()))
+
+    def test_executor_restarts_after_shutdown(self):
+        S3Executor().shutdown()
+
+        self.assertEqual(4, asyncio.run(S3Executor().run(lambda: 2 + 2)))
@@ -1,21 +1,44 @@
+import asyncio
+import base64
+import io
+import json
 import os
+import threading
+import time
 import unittest
+from urllib.parse import parse_qs, urlsplit
 from unittest.mock import patch, MagicMock
 
 from fastapi import UploadFile
 from urllib3.exceptions import HTTPError
 
-from minio import Minio
+from minio import Minio, S3Error
+from minio.datatypes import Part
 from starlette.types import Message
 
 from src.models.upload.upload_result import UploadResult
 from src.models.upload.upload_request import UploadRequest
+from src.core.cache.metadata_cache import MetadataCache
+from src.core.cache.object_cache import CachedObject, ObjectCache
+from src.core.common.s3_executor import S3BatchExecutor, S3PartExecutor
+from src.core.common.singleton import Singleton
+from src.core.config.presign_policy import PresignPolicy
 from src.core.exceptions.exception import S3ProxyServiceException
+from src.models.download.byte_range import ByteRange
+from src.models.download.object_info import ObjectInfo
+from src.models.upload.batch_entry import BatchEntry
+from src.models.upload.batch_upload_result import BatchObjectResult
+from src.service.s3_client_provider import S3ClientProvider
 from src.service.s3_service import S3Service
 
+MB: int = 1024 * 1024
+
 
 class TestS3Service(unittest.TestCase):
 
+    def setUp(self):
+        MetadataCache().clear()
+
     @patch.object(Minio, "__init__", return_value=None)
     def test_download_file_no_exceptions(self, minio_client_init):
         s3_service = S3Service()
@@ -55,12 +78,92 @@ class TestS3Service(unittest.TestCase):
                 bucket_name="bucket-name", object_name="object-name"
             )
 
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_stream_file_reads_chunks_and_releases_connection(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+
+        mock_download_response = MagicMock()
+        mock_download_response.headers = {"Content-Length": "5"}
+        mock_download_response.stream.return_value = iter([b"Ho", b"la", b"!"])
+        mock_minio_client.get_object.return_value = mock_download_response
+
+        with patch.dict(os.environ, {"DOWNLOAD_CHUNK_SIZE_KB": "2"}):
+            object_stream = s3_service.stream_file(
+                bucket_name="bucket-name", object_name="object-name"
+            )
+        chunks = list(object_stream)
+
+        mock_download_response.stream.assert_called_once_with(2048)
+        self.assertEqual([b"Ho", b"la", b"!"], chunks)
+        self.assertEqual(5, object_stream.content_length)
+        mock_download_response.close.assert_called_once()
+        mock_download_response.release_conn.assert_called_once()
+
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_stream_file_closed_before_exhausted(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+
+        mock_download_response = MagicMock()
+        mock_download_response.stream.return_value = iter([b"Ho", b"la", b"!"])
+        mock_minio_client.get_object.return_value = mock_download_response
+
+        object_stream = s3_service.stream_file(
+            bucket_name="bucket-name", object_name="object-name"
+        )
+        self.assertEqual(b"Ho", next(iter(object_stream)))
+        object_stream.close()
+        object_stream.close()
+
+        mock_download_response.close.assert_called_once()
+        mock_download_response.release_conn.assert_called_once()
+
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_stream_file_range(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+
+        s3_service.stream_file(
+            bucket_name="bucket-name",
+            object_name="object-name",
+            byte_range=ByteRange(10, 19),
+        )
+
+        mock_minio_client.get_object.assert_called_once_with(
+            bucket_name="bucket-name", object_name="object-name", offset=10, length=10
+        )
+
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_stat_file(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+        mock_stat = MagicMock()
+        mock_stat.size = 5
+        mock_stat.etag = "etag"
+        mock_stat.content_type = "text/plain"
+        mock_stat.last_modified = None
+        mock_stat.metadata = {}
+        mock_minio_client.stat_object.return_value = mock_stat
+
+        object_info = s3_service.stat_file("bucket-name", "object-name")
+
+        self.assertEqual(
+            ObjectInfo("bucket-name", "object-name", 5, "etag", "text/plain"),
+            object_info,
+        )
+
     @patch.object(Minio, "__init__", return_value=None)
     def test_upload_file_bucket_must_be_created(self, minio_client_init):
         s3_service = S3Service()
         mock_minio_client = MagicMock()
         mock_file = MagicMock(spec=UploadFile)
         mock_file.file = b"Hola!"
+        mock_file.size = 5
         mock_file.content_type = "content-type"
         mock_upload_request = MagicMock(spec=UploadRequest)
         mock_upload_request.bucket_name = "bucket-name"
@@ -88,8 +191,9 @@ class TestS3Service(unittest.TestCase):
             data=b"Hola!",
             object_name="object-name",
             content_type="content-type",
-            part_size=10485760,
-            length=-1,
+            part_size=16 * 1024 * 1024,
+            length=5,
+            metadata=None,
         )
 
         self.assertEqual(mock_upload_result, result)
@@ -100,6 +204,7 @@ class TestS3Service(unittest.TestCase):
         mock_minio_client = MagicMock()
         mock_file = MagicMock(spec=UploadFile)
         mock_file.file = b"Hola!"
+        mock_file.size = 5
         mock_file.content_type = "content-type"
         mock_upload_request = MagicMock(spec=UploadRequest)
         mock_upload_request.bucket_name = "bucket-name"
@@ -125,6 +230,446 @@ class TestS3Service(unittest.TestCase):
             data=b"Hola!",
             object_name="object-name",
             content_type="content-type",
-            part_size=10485760,
-            length=-1,
+            part_size=16 * 1024 * 1024,
+            length=5,
+            metadata=None,
+        )
+
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_upload_file_bucket_existence_cached(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+        mock_minio_client.bucket_exists.return_value = True
+        mock_upload_request = MagicMock(spec=UploadRequest)
+        mock_upload_request.bucket_name = "bucket-name"
+        mock_upload_request.object_name = "object-name"
+        mock_upload_request.file = MagicMock(spec=UploadFile)
+        mock_upload_request.file.file = b"Hola!"
+        mock_upload_request.file.size = 5
+
+        s3_service.upload_file(mock_upload_request)
+        s3_service.upload_file(mock_upload_request)
+
+        mock_minio_client.bucket_exists.assert_called_once_with(
+            bucket_name="bucket-name"
+        )
+        self.assertEqual(2, mock_minio_client.put_object.call_count)
+
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_stat_file_cached_until_upload(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+        mock_minio_client.bucket_exists.return_value = True
+        mock_stat = MagicMock()
+        mock_stat.size = 5
+        mock_stat.etag = "etag"
+        mock_minio_client.stat_object.return_value = mock_stat
+        mock_upload_request = MagicMock(spec=UploadRequest)
+        mock_upload_request.bucket_name = "bucket-name"
+        mock_upload_request.object_name = "object-name"
+        mock_upload_request.file = MagicMock(spec=UploadFile)
+        mock_upload_request.file.file = b"Hola!"
+        mock_upload_request.file.size = 5
+
+        first = s3_service.stat_file("bucket-name", "object-name")
+        second = s3_service.stat_file("bucket-name", "object-name")
+        s3_service.upload_file(mock_upload_request)
+        s3_service.stat_file("bucket-name", "object-name")
+
+        self.assertIs(first, second)
+        self.assertEqual((5, "etag"), (first.size, first.etag))
+        self.assertEqual(2, mock_minio_client.stat_object.call_count)
+
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_download_file_read_through_object_cache(self, minio_client_init):
+        s3_service = S3Service()
+        s3_service.object_cache = MagicMock(spec=ObjectCache)
+        s3_service.object_cache.enabled = True
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+        mock_stat = MagicMock()
+        mock_stat.size = 5
+        mock_stat.etag = "etag"
+        mock_minio_client.stat_object.return_value = mock_stat
+        object_info = s3_service.stat_file("bucket-name", "object-name")
+        s3_service.object_cache.get.return_value = CachedObject(
+            object_info, data=b"Hola!"
+        )
+
+        file = s3_service.download_file("bucket-name", "object-name")
+
+        self.assertEqual(b"Hola!", file)
+        mock_minio_client.get_object.assert_not_called()
+
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_concurrent_stream_file_coalesced(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+        mock_download_response = MagicMock()
+        mock_download_response.headers = {"Content-Length": "5"}
+        mock_download_response.stream.return_value = iter([b"Hola!"])
+        mock_minio_client.get_object.return_value = mock_download_response
+        object_info = ObjectInfo("bucket-name", "object-name", 5, "etag")
+
+        first = s3_service.stream_file(
+            "bucket-name", "object-name", object_info=object_info
+        )
+        second = s3_service.stream_file(
+            "bucket-name", "object-name", object_info=object_info
+        )
+
+        async def read_all():
+            return [[chunk async for chunk in stream] for stream in (first, second)]
+
+        self.assertEqual([[b"Hola!"], [b"Hola!"]], asyncio.run(read_all()))
+        mock_minio_client.get_object.assert_called_once_with(
+            bucket_name="bucket-name", object_name="object-name"
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "PARALLEL_DOWNLOAD_ENABLED": "true",
+            "PARALLEL_DOWNLOAD_THRESHOLD_MB": "1",
+            "PARALLEL_DOWNLOAD_RANGE_SIZE_MB": "1",
+        },
+    )
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_stream_large_file_parallel_ranges(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+        mock_minio_client.get_object.side_effect = lambda **kwargs: MagicMock(
+            stream=lambda size: iter([b"x" * kwargs["length"]])
+        )
+        size = 2 * 1024 * 1024 + 1
+        object_info = ObjectInfo("bucket-name", "object-name", size, "large-etag")
+
+        object_stream = s3_service.stream_file(
+            "bucket-name", "object-name", object_info=object_info
+        )
+
+        async def read_all():
+            return b"".join([chunk async for chunk in object_stream])
+
+        self.assertEqual(size, len(asyncio.run(read_all())))
+        self.assertEqual(3, mock_minio_client.get_object.call_count)
+        mock_minio_client.get_object.assert_any_call(
+            bucket_name="bucket-name",
+            object_name="object-name",
+            offset=2 * 1024 * 1024,
+            length=1,
+            request_headers={"If-Match": '"large-etag"'},
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "PARALLEL_DOWNLOAD_ENABLED": "true",
+            "PARALLEL_DOWNLOAD_THRESHOLD_MB": "1",
+            "PARALLEL_DOWNLOAD_RANGE_SIZE_MB": "1",
+        },
+    )
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_stream_parallel_ranges_of_stale_object_info(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+        stale_object_info = ObjectInfo("bucket-name", "object-name", 2 * MB, "old-etag")
+        MetadataCache().put_object_info(stale_object_info)
+
+        def get_object(**kwargs):
+            if kwargs.get("request_headers"):
+                raise S3Error(
+                    "PreconditionFailed", "changed", "object-name", "", "", None
+                )
+            return MagicMock(
+                headers={"Content-Length": "3", "ETag": '"new-etag"'},
+                stream=lambda size: iter([b"new"]),
+            )
+
+        mock_minio_client.get_object.side_effect = get_object
+
+        object_stream = s3_service.stream_file(
+            "bucket-name", "object-name", object_info=stale_object_info
+        )
+
+        async def read_all():
+            return b"".join([chunk async for chunk in object_stream])
+
+        self.assertEqual(b"new", asyncio.run(read_all()))
+        self.assertEqual({"ETag": '"new-etag"'}, object_stream.validators)
+        self.assertIsNone(MetadataCache().get_object_info("bucket-name", "object-name"))
+        mock_minio_client.get_object.assert_called_with(
+            bucket_name="bucket-name", object_name="object-name"
+        )
+
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_upload_batch(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+        mock_minio_client.bucket_exists.return_value = True
+        mock_minio_client.put_object.side_effect = lambda **kwargs: MagicMock(
+            etag=kwargs["object_name"] + "-etag"
+        )
+
+        result = s3_service.upload_batch(
+            "bucket-name",
+            [
+                BatchEntry("a.txt", None, b"Hola!"),
+                BatchEntry("b.txt", None, None, "errors.upload.file_too_large"),
+                BatchEntry("c.txt", "text/csv", b"1,2"),
+            ],
+        )
+
+        self.assertEqual(
+            [
+                BatchObjectResult("a.txt", etag="a.txt-etag"),
+                BatchObjectResult("b.txt", error="Upload file is larger than allowed."),
+                BatchObjectResult("c.txt", etag="c.txt-etag"),
+            ],
+            result.results,
+        )
+        self.assertEqual(1, result.failed)
+        mock_minio_client.bucket_exists.assert_called_once_with(
+            bucket_name="bucket-name"
+        )
+        self.assertEqual(2, mock_minio_client.put_object.call_count)
+
+    @patch.dict(
+        os.environ,
+        {
+            "UPLOAD_MULTIPART_THRESHOLD_MB": "5",
+            "UPLOAD_MIN_PART_SIZE_MB": "5",
+            "UPLOAD_BATCH_CONCURRENCY": "2",
+            "S3_PART_EXECUTOR_MAX_WORKERS": "1",
+        },
+    )
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_upload_batch_of_multipart_files(self, minio_client_init):
+        for executor in (S3PartExecutor, S3BatchExecutor):
+            Singleton._instances.pop(executor, None)
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+        mock_minio_client.bucket_exists.return_value = True
+        mock_minio_client._create_multipart_upload.return_value = "upload-id"
+        mock_minio_client._upload_part.return_value = "part-etag"
+        data = b"x" * (6 * 1024 * 1024)
+        results = []
+
+        # the files wait for their parts, which must not queue behind them
+        thread = threading.Thread(
+            target=lambda: results.append(
+                s3_service.upload_batch(
+                    "bucket-name",
+                    [BatchEntry("a.bin", None, data), BatchEntry("b.bin", None, data)],
+                )
+            ),
+            daemon=True,
+        )
+        thread.start()
+        thread.join(10)
+
+        self.assertEqual(0, results[0].failed)
+        self.assertEqual(4, mock_minio_client._upload_part.call_count)
+        for executor in (S3PartExecutor, S3BatchExecutor):
+            executor().shutdown()
+            Singleton._instances.pop(executor, None)
+
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_upload_batch_failed_file_reported(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+        mock_minio_client.bucket_exists.return_value = True
+        mock_minio_client.put_object.side_effect = HTTPError()
+
+        result = s3_service.upload_batch(
+            "bucket-name", [BatchEntry("a.txt", None, b"Hola!")]
+        )
+
+        self.assertEqual(
+            [
+                BatchObjectResult(
+                    "a.txt", error="There is a problem connect to minio instance."
+                )
+            ],
+            result.results,
+        )
+
+    @patch.object(Minio, "__init__", return_value=None)
+    def test_upload_stream(self, minio_client_init):
+        s3_service = S3Service()
+        mock_minio_client = MagicMock()
+        s3_service.client = mock_minio_client
+        mock_minio_client.bucket_exists.return_value = True
+        data = io.BytesIO(b"Hola!")
+
+        result = s3_service.upload_stream(
+            "bucket-name", "object-name", data, "text/plain"
+        )
+
+        mock_minio_client.put_object.assert_called_once()
+        put_kwargs = mock_minio_client.put_object.call_args.kwargs
+        self.assertEqual(b"Hola!", put_kwargs["data"].read())
+        self.assertEqual(
+            ("text/plain", 5), (put_kwargs["content_type"], put_kwargs["length"])
+        )
+        self.assertEqual(UploadResult("bucket-name", "object-name"), result)
+
+
+class TestS3ServicePresign(unittest.TestCase):
+    ENV: dict = {
+        "MINIO_HOST": "minio:9000",
+        "MINIO_ACCESS_KEY": "access-key",
+        "MINIO_SECRET_KEY": "secret-key",
+        "PRESIGN_ENDPOINT": "https://files.example.com",
+        "PRESIGN_EXPIRY_SECONDS": "60",
+        "UPLOAD_MIN_PART_SIZE_MB": "5",
+        "CREATE_BUCKET_ON_FILE_UPLOAD": "false",
+    }
+
+    def setUp(self):
+        MetadataCache().clear()
+        self.env = patch.dict(os.environ, self.ENV)
+        self.env.start()
+        for singleton in (S3ClientProvider, PresignPolicy):
+            Singleton._instances.pop(singleton, None)
+        self.mock_minio_client = MagicMock()
+        self.s3_service = S3Service(client=self.mock_minio_client)
+
+    def tearDown(self):
+        self.env.stop()
+        for singleton in (S3ClientProvider, PresignPolicy):
+            Singleton._instances.pop(singleton, None)
+
+    def test_presign_download_signs_for_public_endpoint(self):
+        self.mock_minio_client.stat_object.return_value = MagicMock(size=5)
+
+        presigned_url = self.s3_service.presign_download("bucket-name", "a.txt")
+
+        url = urlsplit(presigned_url.url)
+        query = parse_qs(url.query)
+        self.assertEqual("GET", presigned_url.method)
+        self.assertEqual(
+            ("https", "files.example.com", "/bucket-name/a.txt"),
+            (url.scheme, url.netloc, url.path),
+        )
+        self.assertEqual(["60"], query["X-Amz-Expires"])
+        self.assertIn("X-Amz-Signature", query)
+        self.assertAlmostEqual(
+            time.time() + 60, presigned_url.expires_at.timestamp(), delta=5
+        )
+        self.mock_minio_client.stat_object.assert_called_once()
+
+    def test_presign_upload_policy_limits_size(self):
+        self.mock_minio_client.bucket_exists.return_value = True
+
+        presigned_post = self.s3_service.presign_upload(
+            "bucket-name", "a.txt", 1024, "text/plain"
+        )
+
+        self.assertEqual("https://files.example.com/bucket-name", presigned_post.url)
+        self.assertEqual(
+            ("a.txt", "text/plain"),
+            (presigned_post.fields["key"], presigned_post.fields["Content-Type"]),
+        )
+        self.assertIn("x-amz-signature", presigned_post.fields)
+        policy = json.loads(base64.b64decode(presigned_post.fields["policy"]))
+        self.assertIn(["content-length-range", 0, 1024], policy["conditions"])
+        self.assertIn(["eq", "$key", "a.txt"], policy["conditions"])
+        self.assertAlmostEqual(
+            time.time() + 60, presigned_post.expires_at.timestamp(), delta=5
+        )
+
+    def test_presign_upload_missing_bucket(self):
+        self.mock_minio_client.bucket_exists.return_value = False
+
+        with self.assertRaises(S3ProxyServiceException) as context:
+            self.s3_service.presign_upload("bucket-name", "a.txt", 10)
+
+        self.assertEqual("errors.minio.bucket_missing", context.exception.key)
+        self.assertEqual(404, context.exception.status_code)
+
+    def test_presign_multipart_upload_plan(self):
+        self.mock_minio_client.bucket_exists.return_value = True
+        self.mock_minio_client._create_multipart_upload.return_value = "upload-id"
+
+        plan = self.s3_service.presign_multipart_upload(
+            "bucket-name", "video.mp4", 11 * MB, "video/mp4"
+        )
+
+        self.assertEqual(("upload-id", 5 * MB), (plan.upload_id, plan.part_size))
+        self.assertEqual(
+            [
+                {"partNumber": [str(part_number)], "uploadId": ["upload-id"]}
+                for part_number in (1, 2, 3)
+            ],
+            [
+                {
+                    key: value
+                    for key, value in parse_qs(urlsplit(part.url).query).items()
+                    if not key.startswith("X-Amz")
+                }
+                for part in plan.parts
+            ],
+        )
+        self.mock_minio_client._create_multipart_upload.assert_called_once_with(
+            "bucket-name", "video.mp4", {"Content-Type": "video/mp4"}
+        )
+
+    def test_complete_multipart_upload(self):
+        parts = [Part(1, "etag-1", size=5 * MB), Part(2, "etag-2", size=MB)]
+        self.mock_minio_client._list_parts.side_effect = [
+            MagicMock(parts=parts[:1], is_truncated=True, next_part_number_marker=1),
+            MagicMock(parts=parts[1:], is_truncated=False),
+        ]
+
+        result = self.s3_service.complete_multipart_upload(
+            "bucket-name", "video.mp4", "upload-id", 6 * MB
+        )
+
+        self.assertEqual(UploadResult("bucket-name", "video.mp4"), result)
+        self.mock_minio_client._complete_multipart_upload.assert_called_once_with(
+            "bucket-name", "video.mp4", "upload-id", parts
+        )
+        self.assertEqual(
+            "1",
+            self.mock_minio_client._list_parts.call_args.kwargs["part_number_marker"],
+        )
+
+    def test_complete_multipart_upload_checks_parts(self):
+        self.mock_minio_client._list_parts.return_value = MagicMock(
+            parts=[Part(1, "etag-1", size=5 * MB), Part(3, "etag-3", size=MB)],
+            is_truncated=False,
+        )
+
+        with self.assertRaises(S3ProxyServiceException) as context:
+            self.s3_service.complete_multipart_upload(
+                "bucket-name", "video.mp4", "upload-id", 6 * MB
+            )
+
+        self.assertEqual("errors.presign.parts_missing", context.exception.key)
+        self.mock_minio_client._complete_multipart_upload.assert_not_called()
+
+    def test_complete_multipart_upload_too_large_aborted(self):
+        self.mock_minio_client._list_parts.return_value = MagicMock(
+            parts=[Part(1, "etag-1", size=5 * MB), Part(2, "etag-2", size=MB + 1)],
+            is_truncated=False,
+        )
+
+        with self.assertRaises(S3ProxyServiceException) as context:
+            self.s3_service.complete_multipart_upload(
+                "bucket-name", "video.mp4", "upload-id", 6 * MB
+            )
+
+        self.assertEqual(413, context.exception.status_code)
+        self.mock_minio_client._abort_multipart_upload.assert_called_once_with(
+            "bucket-name", "video.mp4", "upload-id"
         )
+        self.mock_minio_client._complete_multipart_upload.assert_not_called()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.core.common.singleton import Singleton
+from src.core.profiling.sampling_profiler import SamplingProfiler
+
+client = TestClient(app, raise_server_exceptions=False)
+
+
+class TestSamplingProfiler(unittest.TestCase):
+
+    def setUp(self):
+        Singleton._instances.pop(SamplingProfiler, None)
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.env = {
+            "PROFILER_ENABLED": "true",
+            "PROFILER_INTERVAL_MS": "1",
+            "PROFILER_OUTPUT_DIR": self.output_dir.name,
+        }
+
+    def tearDown(self):
+        Singleton._instances.pop(SamplingProfiler, None)
+        self.output_dir.cleanup()
+
+    def test_capture_writes_collapsed_stacks(self):
+        stop = threading.Event()
+
+        def busy_worker():
+            while not stop.is_set():
+                sum(range(1000))
+
+        worker = threading.Thread(target=busy_worker, name="busy-worker")
+        worker.start()
+        path = os.path.join(self.output_dir.name, "profile.folded")
+        with patch.dict(os.environ, self.env):
+            samples = SamplingProfiler().capture(0.05, path)
+        stop.set()
+        worker.join()
+
+        with open(path) as profile:
+            lines = profile.read().splitlines()
+        self.assertGreater(samples, 0)
+        worker_stacks = [line for line in lines if line.startswith("busy-worker;")]
+        self.assertTrue(worker_stacks)
+        stack, count = worker_stacks[0].rsplit(" ", 1)
+        self.assertIn("busy_worker (test_sampling_profiler.py:", stack)
+        self.assertGreater(int(count), 0)
+        self.assertFalse(any("sampling-profiler" in line for line in lines))
+
+    def test_profile_endpoint(self):
+        with patch.dict(os.environ, self.env):
+            response = client.post("/admin/profile", params={"seconds": 0.05})
+            busy_response = client.post("/admin/profile", params={"seconds": 0.05})
+            path = response.json()["path"]
+            deadline = time.monotonic() + 5
+            while SamplingProfiler().running and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        self.assertEqual(202, response.status_code)
+        self.assertEqual(409, busy_response.status_code)
+        self.assertTrue(path.startswith(self.output_dir.name))
+        self.assertTrue(os.path.isfile(path))
+
+    def test_profile_endpoint_disabled_by_default(self):
+        with patch.dict(os.environ, {"PROFILER_ENABLED": "false"}):
+            response = client.post("/admin/profile")
+
+        self.assertEqual(403, response.status_code)
@@ -0,0 +1,164 @@
+import io
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+import urllib3
+from fastapi.testclient import TestClient
+from minio import S3Error
+
+from main import app
+from src.core.cache.metadata_cache import MetadataCache
+from src.core.common.s3_executor import S3PartExecutor
+from src.core.common.singleton import Singleton
+from src.core.tracing.trace_context import TraceContext
+from src.core.tracing.tracer import Tracer, traced
+from src.service.s3_client_provider import TracingPoolManager
+from src.service.s3_service import S3Service
+
+client = TestClient(app, raise_server_exceptions=False)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+TRACEPARENT = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+
+
+class TestTraceContext(unittest.TestCase):
+
+    def test_parse(self):
+        context = TraceContext.parse(TRACEPARENT)
+
+        self.assertEqual(TRACE_ID, context.trace_id)
+        self.assertEqual("00f067aa0ba902b7", context.parent_id)
+        self.assertTrue(context.sampled)
+        self.assertFalse(TraceContext.parse(TRACEPARENT[:-1] + "0").sampled)
+
+    def test_invalid_traceparent_ignored(self):
+        for traceparent in (
+            None,
+            "",
+            "00-xyz-00f067aa0ba902b7-01",
+            f"00-{'0' * 32}-00f067aa0ba902b7-01",
+            f"00-{TRACE_ID}-{'0' * 16}-01",
+            f"ff-{TRACE_ID}-00f067aa0ba902b7-01",
+            TRACEPARENT + "-extra",
+        ):
+            self.assertIsNone(TraceContext.parse(traceparent), traceparent)
+
+    def test_format(self):
+        self.assertEqual(
+            TRACEPARENT, TraceContext.format(TRACE_ID, "00f067aa0ba902b7", True)
+        )
+
+
+class TestTracer(unittest.TestCase):
+    ENV: dict = {"TRACING_ENABLED": "true", "TRACING_SLOW_REQUEST_MS": "60000"}
+
+    def setUp(self):
+        Singleton._instances.pop(Tracer, None)
+        MetadataCache().clear()
+
+    def tearDown(self):
+        Singleton._instances.pop(Tracer, None)
+
+    def test_disabled_by_default(self):
+        with patch.dict(os.environ, {"TRACING_ENABLED": "false"}):
+            response = client.get("/admin/traces")
+
+        self.assertNotIn("traceparent", response.headers)
+        self.assertEqual({"enabled": False, "traces": []}, response.json())
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_request_spans_continue_client_trace(self, mock_s3_service):
+        mock_minio_client = MagicMock()
+        mock_minio_client.bucket_exists.return_value = True
+        mock_s3_service.side_effect = lambda: S3Service(client=mock_minio_client)
+
+        with patch.dict(os.environ, self.ENV):
+            response = client.post(
+                "/api/upload/stream/bucket-name/a.txt",
+                content=b"Hola!",
+                headers={"traceparent": TRACEPARENT},
+            )
+            traces = client.get("/admin/traces").json()["traces"]
+
+        self.assertEqual(200, response.status_code)
+        returned_context = TraceContext.parse(response.headers["traceparent"])
+        self.assertEqual(TRACE_ID, returned_context.trace_id)
+        spans = {span["name"]: span for span in traces[-1]["spans"]}
+        root = spans["POST /api/upload/stream/{bucket_name}/{object_name}"]
+        self.assertEqual(returned_context.parent_id, root["span_id"])
+        self.assertEqual("00f067aa0ba902b7", root["parent_id"])
+        self.assertEqual(200, root["attributes"]["http.status_code"])
+        upload_span = spans["S3Service.upload_stream"]
+        self.assertEqual(root["span_id"], upload_span["parent_id"])
+        self.assertEqual(
+            upload_span["span_id"], spans["S3Service.put_object"]["parent_id"]
+        )
+        self.assertEqual(
+            spans["S3Service.put_object"]["span_id"],
+            spans["S3Service.prepare_bucket"]["parent_id"],
+        )
+        self.assertIn("S3Service.write_object", spans)
+
+    def test_unsampled_client_trace_not_recorded(self):
+        with patch.dict(os.environ, self.ENV):
+            response = client.get(
+                "/admin/coalescing/stats",
+                headers={"traceparent": TRACEPARENT[:-1] + "0"},
+            )
+
+        self.assertNotIn("traceparent", response.headers)
+        self.assertEqual([], Tracer().recent())
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_errors_recorded(self, mock_s3_service):
+        mock_s3_service.return_value.stat_file.side_effect = S3Error(
+            "NoSuchKey", "missing", "resource", "", "", MagicMock()
+        )
+
+        with patch.dict(os.environ, self.ENV):
+            response = client.get("/api/download/bucket-name/a.txt")
+
+        self.assertEqual(404, response.status_code)
+        root = Tracer().recent()[0]["spans"][0]
+        self.assertEqual("S3Error", root["attributes"]["error"])
+        self.assertEqual("NoSuchKey", root["attributes"]["error.code"])
+        self.assertEqual(404, root["attributes"]["http.status_code"])
+
+    def test_traceparent_sent_to_minio(self):
+        with patch.dict(os.environ, self.ENV), patch.object(
+            urllib3.PoolManager, "urlopen"
+        ) as urlopen:
+            pool_manager = TracingPoolManager()
+            pool_manager.urlopen("GET", "http://minio/a", headers={"Host": "minio"})
+            with Tracer().trace("request") as root:
+                pool_manager.urlopen("GET", "http://minio/a", headers={"Host": "minio"})
+
+        self.assertNotIn("traceparent", urlopen.call_args_list[0].kwargs["headers"])
+        headers = urlopen.call_args_list[1].kwargs["headers"]
+        self.assertEqual(root.traceparent, headers["traceparent"])
+        self.assertEqual("minio", headers["Host"])
+
+    def test_spans_carried_to_part_executor(self):
+        @traced("part")
+        def part():
+            return Tracer.traceparent()
+
+        with patch.dict(os.environ, self.ENV):
+            with Tracer().trace("request") as root:
+                traceparent = S3PartExecutor().submit(part).result()
+
+        spans = Tracer().recent()[0]["spans"]
+        self.assertEqual(["request", "part"], [span["name"] for span in spans])
+        self.assertEqual(root.span_id, spans[1]["parent_id"])
+        self.assertIn(spans[1]["span_id"], traceparent)
+
+    def test_slow_requests_logged(self):
+        with patch.dict(os.environ, {**self.ENV, "TRACING_SLOW_REQUEST_MS": "0"}):
+            with self.assertLogs("Tracer", "WARNING") as logs:
+                with Tracer().trace("request"):
+                    S3Service(client=MagicMock()).upload_stream(
+                        "bucket-name", "a.txt", io.BytesIO(b"Hola!"), None
+                    )
+
+        self.assertIn("S3Service.upload_stream", logs.output[0])
@@ -0,0 +1,64 @@
+import unittest
+
+from src.core.cache.ttl_cache import TTLCache
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(max_entries=2, ttl_seconds=10, clock=self.clock)
+
+    def test_get_missing(self):
+        self.assertIs(TTLCache.MISSING, self.cache.get("key"))
+        self.assertEqual(1, self.cache.misses)
+
+    def test_get_cached_falsy_value(self):
+        self.cache.put("key", False)
+
+        self.assertIs(False, self.cache.get("key"))
+        self.assertEqual(1, self.cache.hits)
+
+    def test_entry_expires(self):
+        self.cache.put("key", "value")
+        self.clock.now = 10
+
+        self.assertIs(TTLCache.MISSING, self.cache.get("key"))
+        self.assertEqual(1, self.cache.expirations)
+
+    def test_least_recently_used_evicted(self):
+        self.cache.put("first", 1)
+        self.cache.put("second", 2)
+        self.cache.get("first")
+        self.cache.put("third", 3)
+
+        self.assertEqual(1, self.cache.get("first"))
+        self.assertIs(TTLCache.MISSING, self.cache.get("second"))
+        self.assertEqual(1, self.cache.evictions)
+
+    def test_invalidate(self):
+        self.cache.put("key", "value")
+        self.cache.invalidate("key")
+
+        self.assertIs(TTLCache.MISSING, self.cache.get("key"))
+
+    def test_stats(self):
+        self.cache.put("key", "value")
+        self.cache.get("key")
+        self.cache.get("other")
+
+        stats = self.cache.stats()
+
+        self.assertEqual(1, stats["size"])
+        self.assertEqual(1, stats["hits"])
+        self.assertEqual(1, stats["misses"])
+        self.assertEqual(0.5, stats["hit_ratio"])
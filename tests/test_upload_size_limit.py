@@ -0,0 +1,115 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.core.common.singleton import Singleton
+from src.core.config.upload_size_limits import UploadSizeLimits
+from src.models.upload.upload_result import UploadResult
+
+client = TestClient(app, raise_server_exceptions=False)
+
+MB: int = 1024 * 1024
+
+
+class TestUploadSizeLimit(unittest.TestCase):
+
+    def setUp(self):
+        self.env = patch.dict(
+            os.environ,
+            {
+                "MAX_UPLOAD_FILE_SIZE_MB": "1",
+                "MAX_UPLOAD_FILE_SIZE_BUCKET_LIMITS_MB": '{"large-bucket": 2}',
+                "MAX_UPLOAD_BATCH_SIZE_MB": "3",
+            },
+        )
+        self.env.start()
+        Singleton._instances.pop(UploadSizeLimits, None)
+
+    def tearDown(self):
+        Singleton._instances.pop(UploadSizeLimits, None)
+        self.env.stop()
+
+    def test_limits_per_bucket(self):
+        limits = UploadSizeLimits()
+
+        self.assertEqual(MB, limits.for_bucket("bucket-name"))
+        self.assertEqual(2 * MB, limits.for_bucket("large-bucket"))
+        self.assertEqual(2 * MB, limits.max_bytes)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_rejected_by_content_length_before_body_read(self, mock_s3_service):
+        response = client.post(
+            "/api/upload/stream/bucket-name/object-name",
+            content=b"x" * (MB + 1),
+        )
+
+        self.assertEqual(413, response.status_code)
+        self.assertEqual("close", response.headers["Connection"])
+        mock_s3_service.return_value.upload_stream.assert_not_called()
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_chunked_body_rejected_when_limit_crossed(self, mock_s3_service):
+        def body():
+            for _ in range(4):
+                yield b"x" * (MB // 2)
+
+        response = client.post(
+            "/api/upload/stream/bucket-name/object-name", content=body()
+        )
+
+        self.assertEqual(413, response.status_code)
+        self.assertEqual("close", response.headers["Connection"])
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_bucket_limit_applied(self, mock_s3_service):
+        mock_s3_service.return_value.upload_stream.side_effect = (
+            lambda bucket_name, object_name, data, content_type: data.read(2 * MB)
+            and UploadResult(bucket_name, object_name)
+        )
+
+        response = client.post(
+            "/api/upload/stream/large-bucket/object-name",
+            content=b"x" * (MB + 1),
+        )
+
+        self.assertEqual(200, response.status_code)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_form_upload_checks_bucket_limit_in_megabytes(self, mock_s3_service):
+        mock_s3_service.return_value.upload_file.return_value = UploadResult(
+            "bucket-name", "object-name"
+        )
+
+        accepted = client.post(
+            "/api/upload",
+            data={"bucket_name": "bucket-name", "object_name": "object-name"},
+            files={"file": ("file.bin", b"x" * (MB // 2))},
+        )
+        rejected = client.post(
+            "/api/upload",
+            data={"bucket_name": "bucket-name", "object_name": "object-name"},
+            files={"file": ("file.bin", b"x" * (MB + 1))},
+        )
+
+        self.assertEqual(200, accepted.status_code)
+        self.assertEqual(413, rejected.status_code)
+
+    @patch("src.api.routers.s3_api.S3Service")
+    def test_batch_limited_as_a_whole(self, mock_s3_service):
+        response = client.post(
+            "/api/upload/batch/bucket-name",
+            content=b"x" * (3 * MB + 1),
+            headers={"Content-Type": "application/x-tar"},
+        )
+
+        self.assertEqual(413, response.status_code)
+        self.assertEqual(3 * MB, UploadSizeLimits().batch_max_bytes)
+        mock_s3_service.return_value.upload_batch.assert_not_called()
+
+    def test_other_paths_not_limited(self):
+        response = client.get("/admin/cache/stats")
+
+        self.assertEqual(200, response.status_code)